@@ -21,6 +21,8 @@ from __future__ import absolute_import
 import base64
 import struct
 
+from numpy import frombuffer, empty, dtype, asarray
+
 
 def format_blob(blob):
     return base64.b64decode(blob)
@@ -67,4 +69,89 @@ def unpack(blob, fmt='>ff', step=8, decode=False):
     else:
         return [[] for _ in fmt.count('f')]
 
+
+def xy_dtype(endianness='>'):
+    """
+    structured dtype equivalent to the struct format "{endianness}ff"
+    """
+    return dtype([('x', '{}f4'.format(endianness)), ('y', '{}f4'.format(endianness))])
+
+
+def unpack_xy(blob, endianness='>', reverse=False, strict=True):
+    """
+    decode a blob of packed float32 (x,y) pairs.
+
+    the returned arrays are read-only views onto ``blob`` (no copy is made) and keep the
+    byte order of the blob. use ``astype(float)`` to get native float64 arrays.
+
+    @param blob: bytes
+    @param endianness: '>' big-endian, '<' little-endian
+    @param reverse: if True the pairs are stored as (y,x)
+    @param strict: if True raise ValueError when the blob length is not a multiple of 8.
+        otherwise a trailing partial record is ignored
+    @return: xs, ys
+    """
+    dt = xy_dtype(endianness)
+    n, r = divmod(len(blob), dt.itemsize)
+    if r and strict:
+        raise ValueError('blob length {} not a multiple of {}'.format(len(blob), dt.itemsize))
+
+    rec = frombuffer(blob, dtype=dt, count=n)
+    xs, ys = rec['x'], rec['y']
+    if reverse:
+        xs, ys = ys, xs
+    return xs, ys
+
+
+def pack_xy(xs, ys, endianness='>'):
+    """
+    encode xs, ys as packed float32 (x,y) pairs. equivalent to
+
+        b''.join((struct.pack('{}ff'.format(endianness), x, y) for x, y in zip(xs, ys)))
+
+    @return: bytes
+    """
+    n = min(len(xs), len(ys))
+    rec = empty(n, dtype=xy_dtype(endianness))
+    rec['x'] = xs[:n]
+    rec['y'] = ys[:n]
+    return rec.tobytes()
+
+
+def pack_points(points, endianness='>'):
+    """
+    encode [(x0, y0), (x1, y1), ...] with pack_xy. equivalent to pack('{}ff'.format(endianness), points)
+
+    @return: bytes
+    """
+    pts = asarray(points, dtype=float).reshape(-1, 2)
+    return pack_xy(pts[:, 0], pts[:, 1], endianness)
+
+
+if __name__ == '__main__':
+    import timeit
+
+    from numpy import linspace
+
+    def struct_unpack_xy(blob):
+        return list(zip(*[struct.unpack('>ff', blob[i:i + 8]) for i in range(0, len(blob), 8)]))
+
+    def struct_pack_xy(xs, ys):
+        return b''.join((struct.pack('>ff', x, y) for x, y in zip(xs, ys)))
+
+    for npts in (100, 1000, 10000):
+        xs = linspace(0, 100, npts)
+        ys = linspace(10, 5, npts)
+        b = struct_pack_xy(xs, ys)
+        assert b == pack_xy(xs, ys)
+
+        nloops = 200
+        for name, func in (('struct pack', lambda: struct_pack_xy(xs, ys)),
+                           ('numpy pack', lambda: pack_xy(xs, ys)),
+                           ('struct unpack', lambda: struct_unpack_xy(b)),
+                           ('numpy unpack', lambda: unpack_xy(b)),
+                           ('numpy unpack float64', lambda: [a.astype(float) for a in unpack_xy(b)])):
+            t = timeit.timeit(func, number=nloops)
+            print('{:>6d} pts {:<22s} {:0.2f} us/call'.format(npts, name, t / nloops * 1e6))
+
 # ============= EOF =============================================
@@ -38,7 +38,12 @@ def subdirize(root, name, n=1, l=2, mode='r'):
             if mode == 'r':
                 return
 
-            os.mkdir(path)
+            try:
+                os.mkdir(path)
+            except OSError:
+                # created by another thread
+                if not os.path.isdir(path):
+                    raise
 
         root = path
 
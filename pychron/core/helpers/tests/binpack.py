@@ -0,0 +1,65 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import struct
+import unittest
+
+from numpy import linspace
+
+from pychron.core.helpers.binpack import pack_xy, unpack_xy, pack, pack_points
+from pychron.processing.isotope import Isotope
+
+
+def struct_pack(xs, ys, fmt='>ff'):
+    return b''.join((struct.pack(fmt, x, y) for x, y in zip(xs, ys)))
+
+
+class BinpackTestCase(unittest.TestCase):
+    def setUp(self):
+        self.xs = linspace(0, 100, 50)
+        self.ys = linspace(10, 5, 50)
+
+    def test_pack_big(self):
+        self.assertEqual(pack_xy(self.xs, self.ys), struct_pack(self.xs, self.ys))
+
+    def test_pack_little(self):
+        self.assertEqual(pack_xy(self.xs, self.ys, '<'), struct_pack(self.xs, self.ys, '<ff'))
+
+    def test_pack_points(self):
+        pts = list(zip(self.xs, self.ys))
+        self.assertEqual(pack_points(pts), pack('>ff', pts))
+        self.assertEqual(pack_points(pts, '<'), pack('<ff', pts))
+        self.assertEqual(pack_points([]), b'')
+
+    def test_unpack(self):
+        blob = struct_pack(self.xs, self.ys)
+        xs, ys = unpack_xy(blob)
+        ex, ey = zip(*[struct.unpack('>ff', blob[i:i + 8]) for i in range(0, len(blob), 8)])
+        self.assertEqual(list(xs), list(ex))
+        self.assertEqual(list(ys), list(ey))
+
+    def test_unpack_reverse(self):
+        blob = struct_pack(self.xs, self.ys)
+        xs, ys = unpack_xy(blob, reverse=True)
+        self.assertEqual(list(xs), list(unpack_xy(blob)[1]))
+
+    def test_unpack_partial(self):
+        blob = struct_pack(self.xs, self.ys) + b'\x00\x01'
+        self.assertRaises(ValueError, unpack_xy, blob)
+
+        xs, ys = unpack_xy(blob, strict=False)
+        self.assertEqual(len(xs), 50)
+
+    def test_isotope_roundtrip(self):
+        iso = Isotope('Ar40', 'H1')
+        iso.xs, iso.ys = self.xs, self.ys
+
+        iso2 = Isotope('Ar40', 'H1')
+        iso2.unpack_data(iso.pack(as_hex=False))
+        self.assertEqual(iso2.xs.dtype, float)
+        self.assertEqual(iso2.n, 50)
+        self.assertAlmostEqual(iso2.ys[-1], 5, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+from numpy import asarray, zeros, ones, arange, einsum, sqrt, abs as nabs, errstate, linalg, newaxis, \
+    where, nan, isfinite
+
+# ============= local library imports  ==========================
+from pychron.core.regression.tinv import tinv
+from pychron.pychron_constants import SEM
+
+"""
+Batched ordinary least squares.
+
+Fits many polynomial series of the same length and degree in one set of stacked numpy operations instead of one
+statsmodels ``OLS`` per series. Results match ``OLSRegressor``, including the outlier filtering iterations of
+``BaseRegressor.calculate_filtered_data``.
+"""
+
+SD = 'SD'
+CI = 'CI'
+BATCH_ERROR_TYPES = (SEM, SD, CI)
+
+
+class BatchFitResult(object):
+    """
+    fit of a single series. ``excluded`` are the indices of all excluded points (user, truncated and outliers)
+    """
+    __slots__ = ('coefficients', 'coefficient_errors', 'intercept', 'intercept_error',
+                 'excluded', 'n', 'standard_error_fit', 'rsquared', 'rsquared_adj')
+
+    def __init__(self, **kw):
+        for k in self.__slots__:
+            setattr(self, k, kw.get(k))
+
+
+def design_matrix(xs, degree):
+    """
+    @param xs: (..., n) array
+    @return: (..., n, degree+1) array. columns are xs**0, xs**1, ..., xs**degree
+    """
+    xs = asarray(xs, dtype=float)
+    return xs[..., newaxis] ** arange(degree + 1)
+
+
+def ols_solve(X, ys, included):
+    """
+    least squares solve of a stack of series. excluded points are given zero weight so every series keeps the
+    same shape
+
+    @param X: (m, n, p) design matrices
+    @param ys: (m, n)
+    @param included: (m, n) bool
+    @return: coefficients (m, p), normalized covariance (m, p, p)
+    """
+    w = included.astype(float)
+    pinv_x = linalg.pinv(X * w[:, :, newaxis])
+    coeffs = einsum('mpn,mn->mp', pinv_x, ys * w)
+    ncov = einsum('mpn,mqn->mpq', pinv_x, pinv_x)
+    return coeffs, ncov
+
+
+def filter_outliers_batch(X, ys, excluded, iterations=1, std_devs=2):
+    """
+    outlier filtering iterations of BaseRegressor.calculate_filtered_data
+
+    @param X: (m, n, p) design matrices
+    @param ys: (m, n)
+    @param excluded: (m, n) bool array of user/truncate excluded points
+    @return: (m, n) bool array of the points to include in the final fit
+    """
+    q = X.shape[2]
+    outliers = zeros(ys.shape, dtype=bool)
+    for _ in range(iterations):
+        # BaseRegressor combines the exclusions with a symmetric difference
+        included = ~(excluded ^ outliers)
+        coeffs, _ = ols_solve(X, ys, included)
+        resid = ys - einsum('mnp,mp->mn', X, coeffs)
+        s, _ = _standard_error_fit(resid, included, q)
+        with errstate(invalid='ignore'):
+            outliers |= nabs(resid) >= (s * std_devs)[:, newaxis]
+
+    return ~(excluded ^ outliers)
+
+
+def _standard_error_fit(resid, included, q):
+    ss = (resid ** 2 * included).sum(axis=1)
+    with errstate(divide='ignore', invalid='ignore'):
+        return sqrt(ss / (included.sum(axis=1) - q)), ss
+
+
+def ols_batch(xs, ys, degree, excluded=None, filter_outliers=False, iterations=1, std_devs=2,
+              error_calc=SEM):
+    """
+    fit a stack of series and return the intercept (value at x=0) and its error
+
+    @param xs: (m, n) array
+    @param ys: (m, n) array
+    @param degree: 1=linear, 2=parabolic, 3=cubic
+    @param excluded: (m, n) bool array of user/truncate excluded points
+    @param error_calc: SEM, SD or CI
+    @return: list of BatchFitResult. None for series that need the full OLSRegressor, e.g. too few points
+    """
+    xs = asarray(xs, dtype=float)
+    ys = asarray(ys, dtype=float)
+    m, n = ys.shape
+    q = degree + 1
+
+    if excluded is None:
+        base = zeros((m, n), dtype=bool)
+    else:
+        base = asarray(excluded, dtype=bool)
+
+    X = design_matrix(xs, degree)
+    if filter_outliers:
+        included = filter_outliers_batch(X, ys, base, iterations, std_devs)
+    else:
+        included = ~base
+
+    coeffs, ncov = ols_solve(X, ys, included)
+    resid = ys - einsum('mnp,mp->mn', X, coeffs)
+    s, ssr = _standard_error_fit(resid, included, q)
+
+    nclean = included.sum(axis=1)
+    with errstate(divide='ignore', invalid='ignore'):
+        coeff_errs = s[:, newaxis] * sqrt(einsum('mpp->mp', ncov))
+
+        ymean = (ys * included).sum(axis=1) / nclean
+        tss = (((ys - ymean[:, newaxis]) * included) ** 2).sum(axis=1)
+        rsquared = 1 - ssr / tss
+        rsquared_adj = 1 - (nclean - 1) / (nclean - q).astype(float) * (1 - rsquared)
+
+    intercepts = coeffs[:, 0]
+    valid = nclean > q
+    if error_calc == SEM:
+        errs = s * sqrt(ncov[:, 0, 0])
+    elif error_calc == SD:
+        errs = sqrt(s ** 2 + s ** 2 * ncov[:, 0, 0])
+    else:
+        errs, ci_valid = _intercept_ci(xs, ys, resid, included)
+        valid &= ci_valid
+
+    valid &= isfinite(intercepts) & isfinite(errs)
+
+    results = []
+    for i in range(m):
+        if valid[i]:
+            r = BatchFitResult(coefficients=coeffs[i],
+                               coefficient_errors=coeff_errs[i],
+                               intercept=float(intercepts[i]),
+                               intercept_error=float(errs[i]),
+                               excluded=list(where(~included[i])[0]),
+                               n=int(nclean[i]),
+                               standard_error_fit=float(s[i]),
+                               rsquared=float(rsquared[i]),
+                               rsquared_adj=float(rsquared_adj[i]))
+        else:
+            r = None
+        results.append(r)
+
+    return results
+
+
+def _intercept_ci(xs, ys, resid, included, confidence=95):
+    """
+    vectorized version of BaseRegressor._calculate_confidence_interval evaluated at x=0
+    """
+    alpha = 1.0 - confidence / 100.0
+
+    nclean = included.sum(axis=1)
+    valid = nclean > 2
+
+    w = included.astype(float)
+    with errstate(divide='ignore', invalid='ignore'):
+        xm = (xs * w).sum(axis=1) / nclean
+        ssx = (((xs - xm[:, newaxis]) * w) ** 2).sum(axis=1)
+        syx = sqrt((resid ** 2 * w).sum(axis=1) / (nclean - 2))
+        d = 1. / nclean + xm ** 2 / ssx
+
+    # tinv is a scalar root finder. evaluate it once per distinct number of points
+    ti = ones(nclean.shape[0]) * nan
+    for ni in set(nclean[valid]):
+        ti[nclean == ni] = tinv(alpha, ni - 1)
+
+    with errstate(invalid='ignore'):
+        errs = ti * syx * d ** 0.5 / 2.
+    return errs, valid
+
+# ============= EOF =============================================
@@ -0,0 +1,287 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+from numpy import asarray, dot, sqrt, diag, linalg, einsum, zeros, zeros_like, newaxis, errstate, where, nan
+
+# ============= local library imports  ==========================
+from pychron.core.regression.batch_regressor import design_matrix, filter_outliers_batch, SD, CI
+from pychron.core.regression.tinv import cached_tinv
+from pychron.pychron_constants import SEM, MSEM
+
+"""
+Plain numpy ordinary least squares. No traits and no statsmodels.
+
+``OLSEngine`` and ``OLSResult`` implement the parts of the statsmodels ``OLS``/``RegressionResults`` api used by
+``OLSRegressor``. ``PolynomialFit`` is a complete polynomial fit, including outlier filtering and prediction errors,
+for headless code that does not need a ``HasTraits`` regressor.
+"""
+
+
+class OLSResult(object):
+    """
+    least squares solution of ``endog = exog * params``.  solved with the pseudo inverse like statsmodels
+    """
+
+    def __init__(self, model, pinv_exog, rank):
+        self.model = model
+
+        endog, exog = model.wendog, model.wexog
+        self.nobs = nobs = float(exog.shape[0])
+        self.params = params = dot(pinv_exog, endog)
+        self.normalized_cov_params = dot(pinv_exog, pinv_exog.T)
+
+        self.resid = resid = endog - dot(exog, params)
+        self.ssr = ssr = dot(resid, resid)
+        self.df_resid = df_resid = nobs - rank
+
+        with errstate(divide='ignore', invalid='ignore'):
+            self.scale = ssr / df_resid
+            self.bse = sqrt(diag(self.normalized_cov_params) * self.scale)
+
+            centered_tss = ((endog - endog.mean()) ** 2).sum()
+            self.rsquared = rsquared = 1 - ssr / centered_tss
+            self.rsquared_adj = 1 - (nobs - 1) / df_resid * (1 - rsquared)
+
+    def predict(self, exog):
+        return dot(exog, self.params)
+
+
+class OLSEngine(object):
+    """
+    drop in replacement for ``statsmodels.api.OLS`` as used by OLSRegressor
+    """
+
+    def __init__(self, endog, exog):
+        self.endog = self.wendog = asarray(endog, dtype=float)
+        self.exog = self.wexog = asarray(exog, dtype=float)
+
+    def whiten(self, x):
+        return x
+
+    def fit(self):
+        u, s, vt = linalg.svd(self.wexog, full_matrices=False)
+        cutoff = 1e-15 * s.max() if s.shape[0] else 0
+        mask = s > cutoff
+
+        s = where(mask, s, 1)
+        inv_s = where(mask, 1 / s, 0)
+
+        self.pinv_wexog = pinv = dot(vt.T * inv_s, u.T)
+        return OLSResult(self, pinv, mask.sum())
+
+    def statsmodels_result(self):
+        """
+        the equivalent statsmodels result. only used for the summary and prediction envelopes
+        """
+        from statsmodels.api import OLS
+        return OLS(self.endog, self.exog).fit()
+
+
+def prediction_error(exog, normalized_cov, standard_error_fit, error_calc=SEM, mswd=None):
+    """
+    error in predicted y. draper and smith chapter 2.4 page 56
+
+    @param exog: (k, p) rows of [1, x, x**2, ...]
+    @param normalized_cov: (p, p)
+    @return: (k,) array
+    """
+    var_hat = einsum('ij,jk,ik->i', exog, normalized_cov, exog)
+    sef = standard_error_fit
+    if error_calc == SEM:
+        e = sef * sqrt(var_hat)
+    elif error_calc == MSEM:
+        m = mswd ** 0.5 if mswd and mswd > 1 else 1
+        e = sef * sqrt(var_hat) * m
+    else:
+        e = sqrt(sef ** 2 + sef ** 2 * var_hat)
+    return e
+
+
+def confidence_interval(xs, resid, rx, confidence=95):
+    """
+    same as BaseRegressor._calculate_confidence_interval.
+
+    @param xs: fitted x values
+    @param resid: residuals of the fitted values
+    @param rx: x values to evaluate
+    @return: array or None if there are too few points
+    """
+    alpha = 1.0 - confidence / 100.0
+
+    n = xs.shape[0]
+    if n > 2:
+        xm = xs.mean()
+        ti = cached_tinv(alpha, n - 1)
+        syx = (1. / (n - 2) * (resid ** 2).sum()) ** 0.5
+        ssx = ((xs - xm) ** 2).sum()
+        d = n ** -1 + (asarray(rx) - xm) ** 2 / ssx
+        return ti * syx * d ** 0.5 / 2.
+
+
+class PolynomialFit(object):
+    """
+    polynomial least squares fit with the outlier filtering of BaseRegressor.
+
+    equivalent to a calculated PolynomialRegressor with ``user_excluded``/``truncate_excluded`` combined into
+    ``excluded``::
+
+        fit = PolynomialFit(xs, ys, 2, filter_outliers_dict={'filter_outliers': True,
+                                                             'iterations': 1, 'std_devs': 2})
+        fit.predict(0), fit.predict_error(0)
+    """
+
+    def __init__(self, xs, ys, degree=1, excluded=None, filter_outliers_dict=None, error_calc_type=None):
+        self.xs = asarray(xs, dtype=float)
+        self.ys = asarray(ys, dtype=float)
+        self.degree = degree
+        self.excluded = excluded
+        self.filter_outliers_dict = filter_outliers_dict or {}
+        self.error_calc_type = error_calc_type
+        self.result = None
+        self.included = None
+        self._intercept = None
+        self.calculate()
+
+    def calculate(self):
+        xs, ys = self.xs, self.ys
+        n = xs.shape[0]
+
+        base = zeros(n, dtype=bool)
+        if self.excluded:
+            base[list(self.excluded)] = True
+
+        X = design_matrix(xs, self.degree)
+
+        fod = self.filter_outliers_dict
+        if fod.get('filter_outliers', False):
+            included = filter_outliers_batch(X[newaxis], ys[newaxis], base[newaxis],
+                                             fod.get('iterations', 1), fod.get('std_devs', 2))[0]
+        else:
+            included = ~base
+
+        self.included = included
+        self._intercept = None
+        if included.sum() > 1:
+            self.result = OLSEngine(ys[included], X[included]).fit()
+        else:
+            self.result = None
+
+    @property
+    def clean_xs(self):
+        return self.xs[self.included]
+
+    @property
+    def clean_ys(self):
+        return self.ys[self.included]
+
+    @property
+    def n(self):
+        return int(self.included.sum())
+
+    def get_excluded(self):
+        return list(where(~self.included)[0])
+
+    @property
+    def coefficients(self):
+        if self.result:
+            return self.result.params
+        return [0, 0]
+
+    @property
+    def coefficient_errors(self):
+        if self.result:
+            return self.result.bse
+        return [0, 0]
+
+    @property
+    def var_covar(self):
+        if self.result:
+            return self.result.normalized_cov_params
+
+    @property
+    def rsquared(self):
+        if self.result:
+            return self.result.rsquared
+
+    @property
+    def rsquared_adj(self):
+        if self.result:
+            return self.result.rsquared_adj
+
+    @property
+    def intercept(self):
+        return self._get_intercept()[0]
+
+    @property
+    def intercept_error(self):
+        return self._get_intercept()[1]
+
+    def _get_intercept(self):
+        if self._intercept is None:
+            self._intercept = self.predict(0), self.predict_error(0)
+        return self._intercept
+
+    @property
+    def standard_error_fit(self):
+        return self.calculate_standard_error_fit()
+
+    def calculate_standard_error_fit(self):
+        if self.result:
+            resid = self.result.resid
+            with errstate(divide='ignore', invalid='ignore'):
+                return ((resid ** 2).sum() / (resid.shape[0] - len(self.coefficients))) ** 0.5
+        return 0
+
+    def predict(self, x):
+        single = isinstance(x, (float, int))
+        x = asarray([x] if single else x, dtype=float)
+
+        if self.result:
+            y = self.result.predict(design_matrix(x, self.degree))
+        else:
+            y = zeros_like(x)
+
+        return y[0] if single else y
+
+    def predict_error(self, x, error_calc=None):
+        """
+        @param error_calc: SEM, SD or CI. defaults to ``error_calc_type``. CI if neither is set
+        """
+        if error_calc is None:
+            error_calc = self.error_calc_type
+
+        single = isinstance(x, (float, int))
+        x = asarray([x] if single else x, dtype=float)
+
+        if not self.result:
+            e = zeros_like(x)
+        elif not error_calc or error_calc == CI:
+            e = confidence_interval(self.clean_xs, self.result.resid, x)
+            if e is None:
+                e = zeros_like(x) + nan
+        elif error_calc in (SEM, SD):
+            e = prediction_error(design_matrix(x, self.degree), self.result.normalized_cov_params,
+                                 self.calculate_standard_error_fit(), error_calc)
+        else:
+            raise ValueError('unsupported error_calc "{}"'.format(error_calc))
+
+        return e[0] if single else e
+
+# ============= EOF =============================================
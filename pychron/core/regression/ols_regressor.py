@@ -22,7 +22,6 @@ import logging
 
 from numpy import asarray, column_stack, matrix, sqrt, dot, linalg, zeros_like, hstack, ones_like
 from six.moves import range
-from statsmodels.api import OLS
 from traits.api import Int, Property
 
 from pychron.core.helpers.fits import FITS
@@ -33,6 +32,7 @@ logger = logging.getLogger('Regressor')
 
 # ============= local library imports  ==========================
 from .base_regressor import BaseRegressor
+from .ols_core import OLSEngine, prediction_error
 
 
 class OLSRegressor(BaseRegressor):
@@ -134,7 +134,7 @@ class OLSRegressor(BaseRegressor):
     def calculate_prediction_envelope(self, fx, fy):
         from statsmodels.sandbox.regression.predstd import wls_prediction_std
 
-        prstd, iv_l, iv_u = wls_prediction_std(self._result)
+        prstd, iv_l, iv_u = wls_prediction_std(self._statsmodels_result())
         return iv_l, iv_u, self._result.model.exog[::, 1]
 
     def predict(self, pos):
@@ -212,38 +212,12 @@ class OLSRegressor(BaseRegressor):
 
         """
         x = asarray(x)
-        sef = self.calculate_standard_error_fit()
-
-        def calc_hat(xi):
-            Xk = self._get_X(xi).T
-
-            covarM = matrix(self.var_covar)
-            varY_hat = (Xk.T * covarM * Xk)
-
-            return varY_hat[0, 0]
-
-        if error_calc == SEM:
-            def func(xi):
-                varY_hat = calc_hat(xi)
-                return sef * sqrt(varY_hat)
-        elif error_calc == MSEM:
-            mswd = self.mswd
-
-            def func(xi):
-                varY_hat = calc_hat(xi)
-                m = mswd ** 0.5 if mswd > 1 else 1
-                return sef * sqrt(varY_hat) * m
-        else:
-            def func(xi):
-                varY_hat = calc_hat(xi)
-                return sqrt(sef ** 2 + sef ** 2 * varY_hat)
-
         if not self._result:
             return zeros_like(x)
-        else:
-            return [func(xi) for xi in x]
-            # func = calc_sem if error_calc == 'SEM' else calc_sd
-            # return [func(xi) for xi in x]
+
+        sef = self.calculate_standard_error_fit()
+        mswd = self.mswd if error_calc == MSEM else None
+        return prediction_error(self._get_X(x), self.var_covar, sef, error_calc, mswd)
 
     def predict_error_al(self, x, error_calc='sem'):
         """
@@ -312,7 +286,13 @@ class OLSRegressor(BaseRegressor):
             return [0, 0]
 
     def _engine_factory(self, fy, X, check_integrity=True):
-        return OLS(fy, X)
+        return OLSEngine(fy, X)
+
+    def _statsmodels_result(self):
+        res = self._result
+        if isinstance(self._ols, OLSEngine):
+            res = self._ols.statsmodels_result()
+        return res
 
     def _get_degree(self):
         return self._degree
@@ -323,7 +303,7 @@ class OLSRegressor(BaseRegressor):
     @property
     def summary(self):
         if self._result:
-            return self._result.summary()
+            return self._statsmodels_result().summary()
 
     @property
     def var_covar(self):
@@ -0,0 +1,190 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+from math import hypot
+
+from numpy import zeros, arange, dot, sqrt, linalg, errstate, isfinite
+
+# ============= local library imports  ==========================
+from pychron.core.regression.batch_regressor import BatchFitResult, SD, CI
+from pychron.core.regression.tinv import cached_tinv
+from pychron.pychron_constants import SEM
+
+"""
+Incremental least squares for data collection.
+
+Points are added one at a time and any polynomial fit up to ``max_degree``, or the mean, is available after each
+point at a cost that does not depend on the number of points. Outlier filtering and excluded points are not
+supported. Use ``PolynomialFit`` or a regressor for those.
+"""
+
+
+class StreamingPolynomialFit(object):
+    """
+    running QR factorization of the design matrix [1, x, x**2, ..., x**max_degree].
+
+    each point is folded into the upper triangular ``R`` and ``Q.T*y`` with Givens rotations (Gentleman 1973).
+    because the leading k x k block of ``R`` is the factor of the first k columns, a single accumulator gives the
+    mean (degree 0) and every polynomial up to ``max_degree``::
+
+        sf = StreamingPolynomialFit()
+        for x, y in data:
+            sf.add(x, y)
+            r = sf.result(2, 'SEM')
+            r.intercept, r.intercept_error
+    """
+
+    def __init__(self, max_degree=3):
+        self.max_degree = max_degree
+
+        p = max_degree + 1
+        self._powers = arange(p)
+        self._r = zeros((p, p))
+        self._qty = zeros(p)
+        self._ssr = 0
+
+        self.n = 0
+        # running means and sums of squared deviations (Welford)
+        self._xmean = 0
+        self._xm2 = 0
+        self._ymean = 0
+        self._ym2 = 0
+
+    def add(self, x, y):
+        x, y = float(x), float(y)
+        row = x ** self._powers
+
+        r, qty = self._r, self._qty
+        yr = y
+        for j in range(self.max_degree + 1):
+            rj = row[j]
+            if rj == 0:
+                continue
+
+            h = hypot(r[j, j], rj)
+            c, s = r[j, j] / h, rj / h
+
+            rr = r[j, j:].copy()
+            r[j, j:] = c * rr + s * row[j:]
+            row[j:] = c * row[j:] - s * rr
+
+            q = qty[j]
+            qty[j] = c * q + s * yr
+            yr = c * yr - s * q
+
+        # what is left of y after the rotations is its residual from the max_degree fit
+        self._ssr += yr * yr
+
+        self.n += 1
+        n = self.n
+        dx = x - self._xmean
+        self._xmean += dx / n
+        self._xm2 += dx * (x - self._xmean)
+
+        dy = y - self._ymean
+        self._ymean += dy / n
+        self._ym2 += dy * (y - self._ymean)
+
+    def extend(self, xs, ys):
+        for x, y in zip(xs, ys):
+            self.add(x, y)
+
+    def slope(self):
+        """
+        slope of the linear fit
+        """
+        r = self.result(1)
+        if r is not None:
+            return r.coefficients[1]
+
+    def result(self, degree, error_calc=None, mean=False):
+        """
+        @param degree: 0-max_degree
+        @param error_calc: SEM, SD or CI. CI if not set. CI is not available for the mean
+        @param mean: error of a mean (MeanRegressor) instead of a degree 0 polynomial
+        @return: BatchFitResult or None if there are too few points or the fit is singular
+        """
+        k = degree + 1
+        n = self.n
+        if degree > self.max_degree or n <= k:
+            return
+
+        r = self._r[:k, :k]
+        qty = self._qty[:k]
+        try:
+            rinv = linalg.inv(r)
+        except linalg.LinAlgError:
+            return
+
+        coeffs = dot(rinv, qty)
+        ncov = dot(rinv, rinv.T)
+        ssr = self._ssr + (self._qty[k:] ** 2).sum()
+
+        with errstate(divide='ignore', invalid='ignore'):
+            sef = (ssr / (n - k)) ** 0.5
+            rsquared = 1 - ssr / self._ym2
+            rsquared_adj = 1 - (n - 1) / float(n - k) * (1 - rsquared)
+
+        if not error_calc:
+            error_calc = SEM if mean else CI
+
+        if mean:
+            if error_calc == SEM:
+                e = sef * n ** -0.5
+            elif error_calc == SD:
+                e = sef
+            else:
+                return
+        elif error_calc == SEM:
+            e = sef * sqrt(ncov[0, 0])
+        elif error_calc == SD:
+            e = sqrt(sef ** 2 + sef ** 2 * ncov[0, 0])
+        elif error_calc == CI:
+            e = self._intercept_ci(ssr)
+        else:
+            return
+
+        intercept = float(coeffs[0])
+        if e is None or not (isfinite(intercept) and isfinite(e)):
+            return
+
+        return BatchFitResult(coefficients=coeffs,
+                              coefficient_errors=sef * sqrt(ncov.diagonal()),
+                              intercept=intercept,
+                              intercept_error=float(e),
+                              excluded=[],
+                              n=n,
+                              standard_error_fit=float(sef),
+                              rsquared=float(rsquared),
+                              rsquared_adj=float(rsquared_adj))
+
+    def _intercept_ci(self, ssr, confidence=95):
+        """
+        ols_core.confidence_interval evaluated at x=0 from the running sums
+        """
+        n = self.n
+        if n > 2 and self._xm2:
+            alpha = 1.0 - confidence / 100.0
+            ti = cached_tinv(alpha, n - 1)
+            syx = (ssr / (n - 2.)) ** 0.5
+            d = 1. / n + self._xmean ** 2 / self._xm2
+            return ti * syx * d ** 0.5 / 2.
+
+# ============= EOF =============================================
@@ -22,12 +22,15 @@
 from __future__ import absolute_import
 from unittest import TestCase
 
-from numpy import linspace, polyval
+from numpy import linspace, polyval, array
 
 # ============= local library imports  ==========================
+from pychron.core.regression.batch_regressor import ols_batch
 from pychron.core.regression.mean_regressor import MeanRegressor  #, WeightedMeanRegressor
 from pychron.core.regression.new_york_regressor import ReedYorkRegressor, NewYorkRegressor
+from pychron.core.regression.ols_core import PolynomialFit
 from pychron.core.regression.ols_regressor import OLSRegressor
+from pychron.core.regression.streaming_regressor import StreamingPolynomialFit
 # from pychron.core.regression.york_regressor import YorkRegressor
 from pychron.core.regression.tests.standard_data import mean_data, filter_data, ols_data, pearson
 
@@ -127,6 +130,99 @@ class FilterOLSRegressionTest(RegressionTestCase, TestCase):
         self.assertAlmostEqual(e, self.solution['pred_error'], 3)
 
 
+class BatchOLSRegressionTest(TestCase):
+    def setUp(self):
+        xs, ys, sol = filter_data()
+        self.xs = array([xs, xs])
+        self.ys = array([ys, ys])
+        self.ys[1] *= 2
+        self.solution = sol
+
+    def _regressor(self, xs, ys, degree, error_calc):
+        reg = OLSRegressor(xs=xs, ys=ys, error_calc_type=error_calc,
+                           filter_outliers_dict={'filter_outliers': True, 'iterations': 2, 'std_devs': 2})
+        reg.set_degree(degree, refresh=False)
+        reg.calculate()
+        return reg
+
+    def testFilter(self):
+        r = ols_batch(self.xs, self.ys, 1, filter_outliers=True, iterations=1, std_devs=2)[0]
+        self.assertAlmostEqual(r.coefficients[-1], self.solution['slope'], 4)
+        self.assertAlmostEqual(r.intercept, self.solution['y_intercept'], 4)
+        self.assertEqual(r.n, self.solution['n'])
+
+    def testMatchOLS(self):
+        for degree in (1, 2):
+            for error_calc in ('SEM', 'SD', 'CI'):
+                rs = ols_batch(self.xs, self.ys, degree, filter_outliers=True, iterations=2, std_devs=2,
+                               error_calc=error_calc)
+                for xs, ys, r in zip(self.xs, self.ys, rs):
+                    reg = self._regressor(xs, ys, degree, error_calc)
+                    self.assertAlmostEqual(r.intercept, reg.predict(0), 8)
+                    self.assertAlmostEqual(r.intercept_error, reg.predict_error(0), 8)
+                    self.assertEqual(r.n, reg.n)
+
+
+class PolynomialFitTest(TestCase):
+    def setUp(self):
+        self.xs, self.ys, self.solution = filter_data()
+
+    def testFilter(self):
+        fit = PolynomialFit(self.xs, self.ys, 1, filter_outliers_dict={'filter_outliers': True,
+                                                                        'iterations': 1, 'std_devs': 2})
+        self.assertAlmostEqual(fit.coefficients[-1], self.solution['slope'], 4)
+        self.assertAlmostEqual(fit.intercept, self.solution['y_intercept'], 4)
+        self.assertEqual(fit.n, self.solution['n'])
+
+    def testMatchOLS(self):
+        fod = {'filter_outliers': True, 'iterations': 2, 'std_devs': 2}
+        for degree in (1, 2, 3):
+            for error_calc in ('SEM', 'SD', 'CI'):
+                fit = PolynomialFit(self.xs, self.ys, degree, excluded=[0], filter_outliers_dict=fod,
+                                    error_calc_type=error_calc)
+
+                reg = OLSRegressor(xs=self.xs, ys=self.ys, error_calc_type=error_calc, filter_outliers_dict=fod)
+                reg.set_degree(degree, refresh=False)
+                reg.user_excluded = [0]
+                reg.calculate()
+
+                self.assertAlmostEqual(fit.intercept, reg.predict(0), 8)
+                self.assertAlmostEqual(fit.intercept_error, reg.predict_error(0), 8)
+                self.assertAlmostEqual(fit.rsquared_adj, reg.rsquared_adj, 8)
+                self.assertEqual(fit.get_excluded(), reg.get_excluded())
+
+
+class StreamingRegressionTest(TestCase):
+    def setUp(self):
+        self.xs, self.ys, _ = filter_data()
+        self.fit = StreamingPolynomialFit()
+        self.fit.extend(self.xs, self.ys)
+
+    def testMatchOLS(self):
+        for degree in (1, 2, 3):
+            for error_calc in ('SEM', 'SD', 'CI'):
+                r = self.fit.result(degree, error_calc)
+                fit = PolynomialFit(self.xs, self.ys, degree, error_calc_type=error_calc)
+                self.assertAlmostEqual(r.intercept, fit.intercept, 8)
+                self.assertAlmostEqual(r.intercept_error, fit.intercept_error, 8)
+                self.assertAlmostEqual(r.rsquared_adj, fit.rsquared_adj, 8)
+                self.assertEqual(r.n, fit.n)
+
+    def testMean(self):
+        for error_calc in ('SEM', 'SD'):
+            reg = MeanRegressor(xs=self.xs, ys=self.ys, error_calc_type=error_calc)
+            reg.calculate()
+            r = self.fit.result(0, error_calc, mean=True)
+            self.assertAlmostEqual(r.intercept, reg.predict(0), 8)
+            self.assertAlmostEqual(r.intercept_error, reg.predict_error(0), 8)
+
+    def testTooFewPoints(self):
+        fit = StreamingPolynomialFit()
+        fit.extend(self.xs[:3], self.ys[:3])
+        self.assertIsNone(fit.result(2))
+        self.assertIsNotNone(fit.result(1, 'SEM'))
+
+
 class PearsonRegressionTest(RegressionTestCase):
     kind = ''
     def setUp(self):
@@ -16,174 +16,245 @@
 
 # ============= enthought library imports =======================
 # ============= standard library imports ========================
+from __future__ import absolute_import
 
-from numpy import zeros, percentile, array, random, abs as nabs, column_stack
-from scipy.stats import norm
+from multiprocessing import Pool, cpu_count
 
+from numpy import percentile, asarray, random, abs as nabs, ones, dot, einsum, linalg, newaxis, vstack, \
+    zeros
 
 # ============= local library imports  ==========================
 
+# per worker process state. set by _init_worker
+_problem = None
+
+
+class MonteCarloProblem(object):
+    """
+    picklable description of a monte carlo error estimation of a linear least squares fit.
+
+    every trial perturbs ``ys`` by ``yserr`` and optionally the fit positions (``mean_position_error``) or the
+    prediction positions (``position_error``), refits and predicts at ``pts``. trials are solved in stacks of
+    ``ntrials`` with one pseudo inverse (or one stacked pseudo inverse if the fit positions are perturbed)
+    """
+
+    def __init__(self, get_exog, xs, ys, yserr, pts, weights=None, position_error=0, mean_position_error=0):
+        """
+        @param get_exog: function returning the design matrix for an array of positions. must work row by row
+        @param xs: fit positions
+        @param weights: sqrt of the fit weights, i.e. ``whiten(1)``. None for unweighted fits
+        """
+        self.get_exog = get_exog
+        self.xs = asarray(xs, dtype=float)
+        self.ys = ys = asarray(ys, dtype=float)
+        self.yserr = yserr
+        self.pts = pts = asarray(pts, dtype=float)
+
+        if weights is None:
+            weights = ones(ys.shape[0])
+        self.weights = weights
+
+        self.position_error = position_error
+        self.mean_position_error = mean_position_error
+
+        self.exog = get_exog(self.xs)
+        self.pexog = get_exog(pts)
+        self.pinv_wexog = linalg.pinv(self.exog * weights[:, newaxis])
+
+    @property
+    def nnormals(self):
+        """
+        number of standard normal deviates used per trial
+        """
+        n = self.ys.shape[0]
+        if self.mean_position_error:
+            n += 2 * self.xs.shape[0]
+        elif self.position_error:
+            n += 2 * self.pts.shape[0]
+        return n
+
+    def simulate(self, ga):
+        """
+        @param ga: (ntrials, nnormals) standard normal deviates
+        @return: (ntrials, npts) predicted values
+        """
+        ntrials = ga.shape[0]
+        n = self.ys.shape[0]
+        w = self.weights
+
+        wyp = (self.ys + self.yserr * ga[:, :n]) * w
+
+        # the fit positions or, if they are not perturbed, the prediction positions are perturbed. never both
+        if self.mean_position_error:
+            xs = self._perturb(self.xs, ga[:, n:], self.mean_position_error)
+            wexog = self._stacked_exog(xs) * w[:, newaxis]
+            beta = einsum('mpn,mn->mp', linalg.pinv(wexog), wyp)
+            ps = dot(beta, self.pexog.T)
+        else:
+            beta = dot(wyp, self.pinv_wexog.T)
+            if self.position_error:
+                pexog = self._stacked_exog(self._perturb(self.pts, ga[:, n:], self.position_error))
+                ps = einsum('mkp,mp->mk', pexog, beta)
+            else:
+                ps = dot(beta, self.pexog.T)
+
+        return ps.reshape(ntrials, -1)
+
+    def _perturb(self, pts, ga, e):
+        """
+        @param pts: (k, 2) positions
+        @param ga: (ntrials, 2k) deviates. x deviates then y deviates
+        @param e: position error
+        @return: (ntrials, k, 2)
+        """
+        k = pts.shape[0]
+
+        ps = zeros((ga.shape[0], k, 2))
+        ps[:, :, 0] = pts[:, 0] + e * ga[:, :k]
+        ps[:, :, 1] = pts[:, 1] + e * ga[:, k:2 * k]
+        return ps
+
+    def _stacked_exog(self, pts):
+        m, k = pts.shape[:2]
+        return self.get_exog(pts.reshape(m * k, -1)).reshape(m, k, -1)
+
+
+def _init_worker(problem):
+    global _problem
+    _problem = problem
+
+
+def _simulate_chunk(args):
+    """
+    worker entry point
+
+    @param args: (seed, chunk index, ntrials)
+    """
+    return simulate_chunk(_problem, *args)
+
+
+def simulate_chunk(problem, seed, idx, ntrials):
+    """
+    the deviates of a chunk only depend on ``seed`` and the chunk index so results do not depend on whether the
+    chunks are run serially or in a pool
+    """
+    rs = random.RandomState([seed, idx])
+    return problem.simulate(rs.standard_normal((ntrials, problem.nnormals)))
+
+
 class MonteCarloEstimator(object):
+    """
+    @param seed: results are reproducible for a given seed and chunksize
+    @param chunksize: number of trials solved at once. bounds memory use
+    @param nprocesses: run chunks in a process pool. 0 or 1 runs serially. None uses all cpus
+    """
 
-    def __init__(self, ntrials, regressor, seed=None):
+    def __init__(self, ntrials, regressor, seed=None, chunksize=2000, nprocesses=0):
         self.regressor = regressor
         self.ntrials = ntrials
         self.seed = seed
+        self.chunksize = chunksize
+        self.nprocesses = nprocesses
 
     def _calculate(self, nominal_ys, ps):
         res = nominal_ys - ps
 
         pct = (15.87, 84.13)
 
-        a, b = array([percentile(ri, pct) for ri in res.T]).T
+        a, b = percentile(res, pct, axis=0)
         a, b = nabs(a), nabs(b)
         return (a + b) * 0.5
 
-    def _get_dist(self, n, npts):
-        if self.seed:
-            random.seed(self.seed)
+    def _problem_factory(self, pts, ys, yserr, **kw):
+        reg = self.regressor
+        weights = None
+
+        ols = getattr(reg, '_ols', None)
+        if ols is not None:
+            weights = ols.whiten(ones(len(ys)))
+
+        return MonteCarloProblem(reg.get_exog, reg.clean_xs, ys, yserr, pts, weights=weights, **kw)
 
-        ndist = norm()
+    def _simulate(self, problem):
+        seed = self.seed
+        if seed is None:
+            seed = random.randint(2 ** 31)
+
+        chunksize = max(1, self.chunksize)
         ntrials = self.ntrials
+        chunks = [(seed, i, min(chunksize, ntrials - s)) for i, s in enumerate(range(0, ntrials, chunksize))]
+
+        nprocesses = self.nprocesses
+        if nprocesses is None:
+            nprocesses = cpu_count()
+
+        if nprocesses > 1 and len(chunks) > 1:
+            pool = Pool(processes=min(nprocesses, len(chunks)), initializer=_init_worker, initargs=(problem,))
+            try:
+                ps = pool.map(_simulate_chunk, chunks)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            ps = [simulate_chunk(problem, *c) for c in chunks]
 
-        ga = ndist.rvs((ntrials, n))
-        ps = zeros((ntrials, npts))
-        return ndist, ga, ps
+        return vstack(ps)
 
 
-class RegressionEstimator(MonteCarloEstimator):
     def estimate(self, pts):
-        reg = self.regressor
-        pexog = reg.get_exog(pts)
-        nominal_ys = reg.predict(pts)
-
-        ys = reg.clean_ys
-        yserr = reg.clean_yserr
+        """
+        @return: nominal values and errors at ``pts``
+        """
+        nominal_ys = self.regressor.predict(pts)
+        ps = self.simulate(pts)
+        return nominal_ys, self._calculate(nominal_ys, ps)
 
-        ndist, ga, ps = self._get_dist(len(ys), len(pts))
-        pred = reg.fast_predict2
-        yp = ys+yserr*ga
-        for i in range(self.ntrials):
+    def simulate(self, pts):
+        """
+        @return: (ntrials, npts) array of the predicted values of every trial
+        """
+        raise NotImplementedError
 
-            ps[i] = pred(yp[i], pexog)
 
-        return nominal_ys, self._calculate(nominal_ys, ps)
+class RegressionEstimator(MonteCarloEstimator):
+    def simulate(self, pts):
+        reg = self.regressor
+        problem = self._problem_factory(pts, reg.clean_ys, reg.clean_yserr)
+        return self._simulate(problem)
 
 
 class FluxEstimator(MonteCarloEstimator):
-    def __init__(self, ntrials, regressor, position_only, position_error, mean_position_only=False, mean_position_error=0):
-        super(FluxEstimator, self).__init__(ntrials, regressor)
+    def __init__(self, ntrials, regressor, position_only, position_error, mean_position_only=False,
+                 mean_position_error=0, *args, **kw):
+        super(FluxEstimator, self).__init__(ntrials, regressor, *args, **kw)
 
         self.position_error = position_error
         self.position_only = position_only
         self.mean_position_error = mean_position_error
         self.mean_position_only = mean_position_only
 
-    def estimate(self, pts):
+    def simulate(self, pts):
         reg = self.regressor
-        pexog = reg.get_exog(pts)
-        nominal_ys = reg.predict(pts)
-        ys = reg.ys
-        yserr = reg.yserr
-
-        n, npts = len(ys), len(pts)
-
-        ntrials = self.ntrials
-        ndist, ga, ps = self._get_dist(n, npts)
 
-        pred = reg.fast_predict2
+        yserr = reg.clean_yserr
         if self.mean_position_only or self.position_only:
             yserr = 0
 
-        yp = ys + yserr * ga
-        if self.mean_position_error:
-            pgax = ndist.rvs((ntrials, n))
-            pgay = ndist.rvs((ntrials, n))
-
-            xs = reg.clean_xs
-
-            ox, oy = xs.T
-            for i in range(ntrials):
-                x = ox + self.mean_position_error * pgax[i]
-                y = oy + self.mean_position_error * pgay[i]
-                x = reg.get_exog(column_stack((x, y)))
-                ps[i] = pred(yp[i], pexog, exog=x)
-        elif self.position_error:
-            pgax = ndist.rvs((ntrials, n))
-            pgay = ndist.rvs((ntrials, n))
-
-            ox, oy = pts.T
-            for i in range(ntrials):
-                x = ox + self.position_error * pgax[i]
-                y = oy + self.position_error * pgay[i]
-                pexog = reg.get_exog(column_stack((x, y)))
-                ps[i] = pred(yp[i], pexog)
-
-        else:
-            for i in range(ntrials):
-                ps[i] = pred(yp[i], pexog)
-
-        return nominal_ys, self._calculate(nominal_ys, ps)
+        problem = self._problem_factory(pts, reg.clean_ys, yserr,
+                                        position_error=self.position_error,
+                                        mean_position_error=self.mean_position_error)
+        return self._simulate(problem)
 
 
 def monte_carlo_error_estimation(reg, nominal_ys, pts, ntrials=100, position_error=None,
                                  position_only=False,
                                  mean_position_error=None,
                                  mean_position_only=False, seed=None):
-    pexog = reg.get_exog(pts)
-    ys = reg.ys
-    yserr = reg.yserr
-
-    n = len(ys)
-    npts = len(pts)
-    if seed:
-        random.seed(seed)
-    ndist = norm()
-    ga = ndist.rvs((ntrials, n))
-    ps = zeros((ntrials, npts))
-
-    pred = reg.fast_predict2
-    if mean_position_only or position_only:
-        yserr = 0
-
-    yp = ys + yserr * ga
-    if mean_position_error:
-        pgax = ndist.rvs((ntrials, n))
-        pgay = ndist.rvs((ntrials, n))
-
-        xs = reg.clean_xs
-
-        ox, oy = xs.T
-        for i in range(ntrials):
-            x = ox + mean_position_error * pgax[i]
-            y = oy + mean_position_error * pgay[i]
-            x = reg.get_exog(column_stack((x, y)))
-            ps[i] = pred(yp[i], pexog, exog=x)
-    elif position_error:
-        pgax = ndist.rvs((ntrials, n))
-        pgay = ndist.rvs((ntrials, n))
-
-        # xs = reg.clean_xs
-        ox, oy = pts.T
-        for i in range(ntrials):
-            x = ox + position_error * pgax[i]
-            y = oy + position_error * pgay[i]
-            pexog = reg.get_exog(column_stack((x, y)))
-            ps[i] = pred(yp[i], pexog)
-
-    else:
-        for i in range(ntrials):
-            ps[i] = pred(yp[i], pexog)
-
-    res = nominal_ys - ps
-
-    res = res.T
-
-    pct = (15.87, 84.13)
-
-    a, b = array([percentile(ri, pct) for ri in res]).T
-    a, b = nabs(a), nabs(b)
-    return (a + b) * 0.5
+    fe = FluxEstimator(ntrials, reg, position_only, position_error,
+                       mean_position_only=mean_position_only,
+                       mean_position_error=mean_position_error, seed=seed)
+    ps = fe.simulate(pts)
+    return fe._calculate(nominal_ys, ps)
 
 # def perturb(pred, exog, nominal_ys, y_es, ga, yp):
 # def perturb(pred, exog, nominal_ys, ys, es, ga):
@@ -18,36 +18,137 @@
 
 # ============= standard library imports ========================
 from __future__ import absolute_import
-from math import pi
 
-from numpy import linspace, zeros, ones, exp
-from six.moves import zip
+from collections import OrderedDict
+from math import pi
+from threading import Lock
 
+from numpy import linspace, zeros, exp, asarray, abs as nabs
 
 # ============= local library imports  ==========================
 
+# number of age/bin pairs evaluated at once. bounds the temporary arrays for large datasets
+CHUNK_SIZE = 2 ** 18
+CACHE_SIZE = 32
+
+_cache = OrderedDict()
+_cache_lock = Lock()
+
+
+def _valid(ages, errors):
+    ages = asarray(ages, dtype=float).ravel()
+    errors = asarray(errors, dtype=float).ravel()
+    n = min(len(ages), len(errors))
+    ages, errors = ages[:n], errors[:n]
+
+    m = (nabs(ages) >= 1e-10) & (nabs(errors) >= 1e-10)
+    return ages[m], errors[m]
+
+
+def probability_density(ages, errors, xs):
+    """
+    sum of the normal distributions ages +/- errors evaluated at xs.
+
+    p = 1/sqrt(2*pi*sigma2) * exp(-(x-u)**2/(2*sigma2))
+    see http://en.wikipedia.org/wiki/Normal_distribution
+
+    ages and errors must already be filtered, see ``_valid``
+    """
+    xs = asarray(xs, dtype=float)
+    probs = zeros(xs.shape)
+    if not len(ages):
+        return probs
+
+    es2 = 2 * errors * errors
+    norm = (es2 * pi) ** -0.5
+
+    step = max(1, CHUNK_SIZE // max(1, xs.size))
+    for i in range(0, len(ages), step):
+        ai = ages[i:i + step, None]
+        ei = es2[i:i + step, None]
+        gs = norm[i:i + step, None] * exp(-(ai - xs.ravel()) ** 2 / ei)
+        probs += gs.sum(axis=0).reshape(xs.shape)
+
+    return probs
+
 
 def cumulative_probability(ages, errors, xmi, xma, n=100):
-    bins = linspace(xmi, xma, n)
-    probs = zeros(n)
-
-    for ai, ei in zip(ages, errors):
-        if abs(ai) < 1e-10 or abs(ei) < 1e-10:
-            continue
-
-        # calculate probability curve for ai+/-ei
-        # p=1/(2*pi*sigma2) *exp (-(x-u)**2)/(2*sigma2)
-        # see http://en.wikipedia.org/wiki/Normal_distribution
-        ds = (ones(n) * ai - bins) ** 2
-        es = ones(n) * ei
-        es2 = 2 * es * es
-        gs = (es2 * pi) ** -0.5 * exp(-ds / es2)
-
-        # cumulate probabilities
-        # numpy element_wise addition
-        probs += gs
-
-    return bins, probs
+    ages, errors = _valid(ages, errors)
+
+    key = (ages.tobytes(), errors.tobytes(), float(xmi), float(xma), n)
+    with _cache_lock:
+        r = _cache.pop(key, None)
+        if r is not None:
+            _cache[key] = r
+
+    if r is None:
+        bins = linspace(xmi, xma, n)
+        r = bins, probability_density(ages, errors, bins)
+        with _cache_lock:
+            _cache[key] = r
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    # callers may modify the returned arrays
+    bins, probs = r
+    return bins.copy(), probs.copy()
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def asymptotic_limits(ages, errors, xmi, xma, tol=10, n=100):
+    """
+    widen xmi, xma until the curve at each limit is less than tol% of its maximum.
+
+    outside the range of the ages the curve is monotonic so each limit is found by bisection in O(log) evaluations
+    of the density at a single point.
+
+    @return: bins, probs, x1, x2
+    """
+    ages, errors = _valid(ages, errors)
+    if not len(ages):
+        bins, probs = cumulative_probability(ages, errors, xmi, xma, n)
+        return bins, probs, xmi, xma
+
+    xmi, xma = min(xmi, ages.min()), max(xma, ages.max())
+    _, probs = cumulative_probability(ages, errors, xmi, xma, n)
+    # a peak narrower than the bin spacing may fall between bins
+    tt = tol * 0.01 * max(probs.max(), probability_density(ages, errors, ages).max())
+
+    def density(x):
+        return probability_density(ages, errors, asarray([x]))[0]
+
+    emax = errors.max()
+    xtol = max(xma - xmi, emax) * 1e-4
+
+    def limit(x0, sign):
+        if density(x0) < tt:
+            return x0
+
+        # bracket by doubling the step away from the ages
+        inner, step = x0, emax
+        outer = x0 + sign * step
+        for _ in range(64):
+            if density(outer) < tt:
+                break
+            inner = outer
+            step *= 2
+            outer = x0 + sign * step
+
+        while abs(outer - inner) > xtol:
+            mid = 0.5 * (inner + outer)
+            if density(mid) < tt:
+                outer = mid
+            else:
+                inner = mid
+        return outer
+
+    x1, x2 = limit(xmi, -1), limit(xma, 1)
+    bins, probs = cumulative_probability(ages, errors, x1, x2, n)
+    return bins, probs, x1, x2
 
 
 def kernel_density(self, ages, errors, xmi, xma, n=100):
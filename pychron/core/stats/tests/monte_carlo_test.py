@@ -0,0 +1,65 @@
+from __future__ import absolute_import
+
+import unittest
+
+from numpy import linspace, ones, random, array, array_equal, column_stack, cos, sin, pi
+
+from pychron.core.regression.flux_regressor import PlaneFluxRegressor
+from pychron.core.regression.ols_regressor import PolynomialRegressor
+from pychron.core.stats.monte_carlo import RegressionEstimator, FluxEstimator
+
+
+class MonteCarloTestCase(unittest.TestCase):
+    def setUp(self):
+        rs = random.RandomState(1)
+        xs = linspace(0, 10, 30)
+        ys = 1 + 2 * xs + rs.normal(0, 0.1, 30)
+        reg = PolynomialRegressor(xs=xs, ys=ys, yserr=ones(30) * 0.1, fit='linear')
+        reg.calculate()
+        self.reg = reg
+
+        th = linspace(0, 2 * pi, 12, endpoint=False)
+        xy = column_stack((cos(th), sin(th)))
+        zs = 0.01 + 0.0001 * xy[:, 0] + rs.normal(0, 1e-6, 12)
+        freg = PlaneFluxRegressor(xs=xy, ys=zs, yserr=ones(12) * 1e-6, error_calc_type='SD')
+        freg.calculate()
+        self.freg = freg
+
+    def test_reproducible(self):
+        a = RegressionEstimator(1000, self.reg, seed=12).estimate([0, 5])[1]
+        b = RegressionEstimator(1000, self.reg, seed=12).estimate([0, 5])[1]
+        self.assertListEqual(list(a), list(b))
+
+    def test_error(self):
+        # the mc error of a fit with exact y errors approaches the analytical error
+        es = RegressionEstimator(20000, self.reg, seed=12).estimate([0, 5])[1]
+        self.reg.yserr = ones(30) * self.reg.calculate_standard_error_fit()
+        ees = self.reg.predict_error(array([0, 5]), error_calc='SEM')
+        for e, ee in zip(es, ees):
+            self.assertAlmostEqual(e / ee, 1, 1)
+
+    def test_chunks_in_pool(self):
+        pts = [[0, 0], [0.5, 0.5]]
+        fe = FluxEstimator(3000, self.freg, False, 0.1, seed=5, chunksize=1000)
+        a = fe.estimate(pts)[1]
+
+        fe.nprocesses = 2
+        b = fe.estimate(pts)[1]
+        self.assertListEqual(list(a), list(b))
+
+    def test_mean_position_error_precedence(self):
+        # the prediction positions are not perturbed if the fit positions are
+        pts = [[0, 0], [0.5, 0.5]]
+        a = FluxEstimator(500, self.freg, False, 0, mean_position_error=0.05, seed=5).simulate(pts)
+        b = FluxEstimator(500, self.freg, False, 0.1, mean_position_error=0.05, seed=5).simulate(pts)
+        self.assertTrue(array_equal(a, b))
+
+    def test_position_error(self):
+        pts = [[0, 0], [0.5, 0.5]]
+        a = FluxEstimator(2000, self.freg, True, 0.1, seed=5).estimate(pts)[1]
+        b = FluxEstimator(2000, self.freg, True, 0.2, seed=5).estimate(pts)[1]
+        self.assertTrue(all(bi > ai for ai, bi in zip(a, b)))
+
+
+if __name__ == '__main__':
+    unittest.main()
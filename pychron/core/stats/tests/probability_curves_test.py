@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+
+__author__ = 'ross'
+
+import unittest
+from math import pi
+
+from numpy import linspace, zeros, exp, allclose, random
+
+from pychron.core.stats.probability_curves import cumulative_probability, asymptotic_limits, clear_cache
+
+
+def loop_cumulative_probability(ages, errors, xmi, xma, n=100):
+    bins = linspace(xmi, xma, n)
+    probs = zeros(n)
+    for ai, ei in zip(ages, errors):
+        if abs(ai) < 1e-10 or abs(ei) < 1e-10:
+            continue
+        es2 = 2 * ei * ei
+        probs += (es2 * pi) ** -0.5 * exp(-(ai - bins) ** 2 / es2)
+    return bins, probs
+
+
+class ProbabilityCurvesTestCase(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+        rs = random.RandomState(1)
+        self.ages = rs.normal(100, 2, 50)
+        self.errors = rs.uniform(0.1, 1, 50)
+
+    def test_matches_loop(self):
+        ages, errors = list(self.ages), list(self.errors)
+        ages[3] = 0
+        errors[5] = 0
+        _, p1 = loop_cumulative_probability(ages, errors, 90, 110, 500)
+        _, p2 = cumulative_probability(ages, errors, 90, 110, 500)
+        self.assertTrue(allclose(p1, p2))
+
+    def test_empty(self):
+        bins, probs = cumulative_probability([], [], 0, 1, 10)
+        self.assertEqual(len(bins), 10)
+        self.assertFalse(probs.any())
+
+    def test_cache_copy(self):
+        _, p1 = cumulative_probability(self.ages, self.errors, 90, 110)
+        p1[:] = 0
+        _, p2 = cumulative_probability(self.ages, self.errors, 90, 110)
+        self.assertTrue(p2.any())
+
+    def test_asymptotic_limits(self):
+        xmi, xma = self.ages.min(), self.ages.max()
+        bins, probs, x1, x2 = asymptotic_limits(self.ages, self.errors, xmi, xma, tol=10, n=500)
+        self.assertLessEqual(x1, xmi)
+        self.assertGreaterEqual(x2, xma)
+        self.assertAlmostEqual(bins[0], x1)
+        self.assertAlmostEqual(bins[-1], x2)
+
+        tt = 0.1 * probs.max()
+        self.assertLess(probs[0], tt)
+        self.assertLess(probs[-1], tt)
+
+    def test_asymptotic_limits_single(self):
+        # the curve falls to 10% of its peak at age +/- sqrt(2*ln(10)) sigma
+        bins, probs, x1, x2 = asymptotic_limits([10], [1], 10, 10, tol=10)
+        w = (2 * 2.302585) ** 0.5
+        self.assertAlmostEqual(x1, 10 - w, 2)
+        self.assertAlmostEqual(x2, 10 + w, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,7 +25,8 @@ from cStringIO import StringIO
 import hashlib
 from sqlalchemy import Date, distinct
 from sqlalchemy.sql.functions import count
-from sqlalchemy.sql.expression import and_, func, not_, cast as sql_cast
+from sqlalchemy.sql.expression import and_, or_, func, not_, cast as sql_cast
+from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm.exc import NoResultFound
 # ============= local library imports  ==========================
 from pychron.database.core.functions import delete_one
@@ -1728,6 +1729,19 @@ class IsotopeAdapter(DatabaseAdapter):
             except NoResultFound:
                 return []
 
+    def get_analyses_aliquots(self, keys):
+        """
+            the analyses of ``keys``, a list of (identifier, aliquot), in one query. every step of an aliquot is
+            returned. the labnumber of each analysis is loaded with it
+        """
+        with self.session_ctx() as sess:
+            q = sess.query(meas_AnalysisTable)
+            q = q.join(gen_LabTable)
+            q = q.options(contains_eager('labnumber'))
+            q = q.filter(or_(*[and_(gen_LabTable.identifier == idn,
+                                    meas_AnalysisTable.aliquot == aliquot) for idn, aliquot in keys]))
+            return self._query_all(q, verbose_query=False)
+
     def get_analysis_runid(self, identifier, aliquot, step=None):
         with self.session_ctx() as sess:
             q = sess.query(meas_AnalysisTable)
@@ -20,6 +20,7 @@ from __future__ import absolute_import
 from __future__ import print_function
 import os
 import sys
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from threading import Lock
 
@@ -230,6 +231,10 @@ class DatabaseAdapter(Loggable):
 
     modified = False
     _trying_to_add = False
+
+    # see deferred_commit
+    _ndeferred = 0
+    _deferred_failed = False
     _test_connection_enabled = True
 
     # def __init__(self, *args, **kw):
@@ -387,6 +392,8 @@ host= {}\nurl= {}'.format(self.name, self.username, self.host, self.public_url)
 
     def rollback(self):
         if self.session:
+            if self._ndeferred:
+                self._deferred_failed = True
             self.session.rollback()
 
     def flush(self):
@@ -397,19 +404,61 @@ host= {}\nurl= {}'.format(self.name, self.username, self.host, self.public_url)
             try:
                 self.session.flush()
             except:
-                self.session.rollback()
+                self.rollback()
 
     def commit(self):
         """
         commit the session
         """
         if self.session:
+            if self._ndeferred:
+                self.flush()
+                return
+
             try:
                 self.session.commit()
             except BaseException as e:
                 self.warning('Commit exception: {}'.format(e))
                 self.session.rollback()
 
+    @contextmanager
+    def deferred_commit(self):
+        """
+        commit everything added in the block in one transaction. commits in the block only flush.
+
+        raises if anything in the block was rolled back so the caller knows none of it was saved
+        """
+        self._ndeferred += 1
+        try:
+            yield
+        except BaseException:
+            self._ndeferred -= 1
+            if not self._ndeferred:
+                self._end_deferred(False)
+            raise
+        else:
+            self._ndeferred -= 1
+            if not self._ndeferred:
+                self._end_deferred(True)
+
+    def _end_deferred(self, ok):
+        failed, self._deferred_failed = self._deferred_failed, False
+        sess = self.session
+        if not sess:
+            return
+
+        if ok and not failed:
+            try:
+                sess.commit()
+                return
+            except BaseException as e:
+                self.warning('Commit exception: {}'.format(e))
+                failed = True
+
+        sess.rollback()
+        if failed:
+            raise SQLAlchemyError('deferred commit rolled back')
+
     def delete(self, obj):
         if self.session:
             self.session.delete(obj)
@@ -562,7 +611,7 @@ host= {}\nurl= {}'.format(self.name, self.username, self.host, self.public_url)
                     self.modified = True
 
                 self._trying_to_add = True
-                if not self.autocommit:
+                if not self.autocommit and not self._ndeferred:
                     sess.commit()
 
                 return obj
@@ -570,7 +619,7 @@ host= {}\nurl= {}'.format(self.name, self.username, self.host, self.public_url)
                 import traceback
                 # traceback.print_exc()
                 self.debug('add_item exception {} {}'.format(obj, traceback.format_exc()))
-                sess.rollback()
+                self.rollback()
                 if self.reraise:
                     raise
         else:
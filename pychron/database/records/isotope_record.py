@@ -146,6 +146,71 @@ class DVCIsotopeRecordView:
         #     return '{} {} {} {}'.format(self.identifier, self.aliquot, self.timestamp, self.uuid)
 
 
+class DVCAnalysisRecord(object):
+    """
+    lightweight, detached record built from a flat column projection. see DVCDatabase.get_analysis_records
+
+    has the attributes of DVCIsotopeRecordView used to make analyses without any lazily loaded relationships
+    """
+    __slots__ = ('uuid', 'aliquot', 'increment', 'timestamp', 'analysis_type', 'mass_spectrometer',
+                 'extract_device', 'identifier', 'irradiation_position_position', 'irradiation_level',
+                 'irradiation', 'sample', 'project', 'tag', 'repository_ids', 'repository_identifier',
+                 'use_repository_suffix', 'group_id', 'load_name', 'load_holder', 'step', 'record_id')
+
+    def __init__(self, uuid, aliquot, increment, timestamp, analysis_type, mass_spectrometer, extract_device,
+                 identifier, irradiation_position_position, irradiation_level, irradiation, sample, project, tag):
+        self.uuid = uuid
+        self.aliquot = aliquot
+        self.increment = increment
+        self.timestamp = timestamp
+        self.analysis_type = analysis_type
+        self.mass_spectrometer = mass_spectrometer
+        self.extract_device = extract_device
+        self.identifier = identifier
+        self.irradiation_position_position = irradiation_position_position
+        self.irradiation_level = irradiation_level
+        self.irradiation = irradiation
+        self.sample = sample
+        self.project = project
+        self.tag = tag
+
+        self.repository_ids = []
+        self.repository_identifier = None
+        self.use_repository_suffix = False
+        self.group_id = 0
+        self.load_name = ''
+        self.load_holder = ''
+
+        if increment is not None and increment >= 0:
+            self.step = ALPHAS[increment]
+        else:
+            self.step = ''
+
+        self.record_id = make_runid(identifier, aliquot, self.step)
+
+    @property
+    def rundate(self):
+        return self.timestamp
+
+    @property
+    def irradiation_info(self):
+        return '{}{} {}'.format(self.irradiation, self.irradiation_level, self.irradiation_position_position)
+
+    def add_repository(self, repository):
+        if repository and repository not in self.repository_ids:
+            self.repository_ids.append(repository)
+            self.repository_identifier = self.repository_ids[0] if len(self.repository_ids) == 1 else None
+
+    def update(self, record):
+        """
+        copy the attributes set on a record view by the browser
+        """
+        self.repository_identifier = record.repository_identifier
+        self.use_repository_suffix = record.use_repository_suffix
+        self.record_id = record.record_id
+        self.group_id = record.group_id
+
+
 class IsotopeRecordView(object):
     # __slots__ = ('sample', 'project', 'labnumber', 'identifier', 'aliquot', 'step',
     #              '_increment',
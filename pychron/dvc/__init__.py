@@ -108,7 +108,12 @@ def analysis_path(runid, repository, modifier=None, extension='.json', mode='r',
             if mode == 'r':
                 return
 
-            os.mkdir(d)
+            try:
+                os.mkdir(d)
+            except OSError:
+                # created by another thread
+                if not os.path.isdir(d):
+                    raise
 
         root = d
         fmt = '{}.{}'
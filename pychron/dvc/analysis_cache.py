@@ -0,0 +1,228 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+from __future__ import absolute_import
+from traits.api import Int, Str
+# ============= standard library imports ========================
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+from threading import Lock
+
+# ============= local library imports  ==========================
+from pychron.dvc.parallel_loader import compact_analysis
+from pychron.loggable import Loggable
+from pychron.paths import paths
+
+# bump when the pickled analysis layout changes to invalidate all entries
+CACHE_VERSION = 1
+
+MISSING = 'missing'
+
+
+def blob_sha(path):
+    """
+    git blob sha of a file. equivalent to ``git hash-object <path>``
+    """
+    with open(path, 'rb') as rfile:
+        data = rfile.read()
+
+    sha = hashlib.sha1()
+    sha.update('blob {}\0'.format(len(data)).encode('utf-8'))
+    sha.update(data)
+    return sha.hexdigest()
+
+
+class AnalysisCache(Loggable):
+    """
+    content addressed cache of loaded and calculated DVCAnalyses.
+
+    The key is built from the git blob shas of the files an analysis is computed from (see ``make_key``) so an entry
+    is never stale. Blob shas are cached by path, mtime and size, like the git index, so unchanged files are not
+    rehashed.
+
+    Entries are evicted least recently used first once the cache grows beyond ``max_size_mb``.
+    """
+    path = Str
+    max_size_mb = Int(500)
+
+    hits = Int
+    misses = Int
+    evictions = Int
+
+    def __init__(self, path=None, *args, **kw):
+        super(AnalysisCache, self).__init__(*args, **kw)
+        if path is None:
+            path = os.path.join(paths.appdata_dir, 'analysis_cache.sqlite3')
+        self.path = path
+        self._lock = Lock()
+        self._conn = None
+        self._shas = {}
+
+    def file_sha(self, path):
+        if not path or not os.path.isfile(path):
+            return MISSING
+
+        st = os.stat(path)
+        stat = (st.st_mtime, st.st_size)
+        r = self._shas.get(path)
+        if r is None:
+            with self._lock:
+                row = self._execute('SELECT mtime, size, sha FROM blobs WHERE path=?', (path,)).fetchone()
+            if row:
+                r = (row[0], row[1]), row[2]
+
+        if r is not None and r[0] == stat:
+            return r[1]
+
+        sha = blob_sha(path)
+        self._shas[path] = (stat, sha)
+        with self._lock:
+            self._execute('INSERT OR REPLACE INTO blobs (path, mtime, size, sha) VALUES (?,?,?,?)',
+                          (path, stat[0], stat[1], sha), commit=True)
+        return sha
+
+    def make_key(self, file_paths, *extra):
+        """
+        @param file_paths: paths of every file the analysis is computed from. missing files are allowed
+        @param extra: any other values that affect the result e.g. calculate_f_only
+        @return: hex digest
+        """
+        sha = hashlib.sha1()
+        sha.update(str(CACHE_VERSION).encode('utf-8'))
+        for p in file_paths:
+            sha.update(self.file_sha(p).encode('utf-8'))
+        for e in extra:
+            sha.update(repr(e).encode('utf-8'))
+        return sha.hexdigest()
+
+    def contains(self, key):
+        with self._lock:
+            return self._execute('SELECT 1 FROM analyses WHERE key=?', (key,)).fetchone() is not None
+
+    def get(self, key):
+        with self._lock:
+            row = self._execute('SELECT value FROM analyses WHERE key=?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return
+
+            self._execute('UPDATE analyses SET last_access=? WHERE key=?', (time.time(), key), commit=True)
+
+        try:
+            a = pickle.loads(zlib.decompress(row[0]))
+        except BaseException as e:
+            self.debug('failed unpickling cached analysis. {}'.format(e))
+            self.remove(key)
+            self.misses += 1
+            return
+
+        self.hits += 1
+        return a
+
+    def put(self, key, record_id, analysis):
+        compact_analysis(analysis)
+        try:
+            value = zlib.compress(pickle.dumps(analysis, 2))
+        except BaseException as e:
+            self.debug('failed pickling analysis {}. {}'.format(record_id, e))
+            return
+
+        now = time.time()
+        with self._lock:
+            self._execute('INSERT OR REPLACE INTO analyses (key, record_id, value, size, created, last_access) '
+                          'VALUES (?,?,?,?,?,?)',
+                          (key, record_id, sqlite3.Binary(value), len(value), now, now), commit=True)
+            self._evict()
+
+    def remove(self, key):
+        with self._lock:
+            self._execute('DELETE FROM analyses WHERE key=?', (key,), commit=True)
+
+    def clear(self):
+        with self._lock:
+            self._execute('DELETE FROM analyses', commit=True)
+            self._execute('DELETE FROM blobs', commit=True)
+            self._execute('VACUUM')
+        self._shas = {}
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            n, size = self._execute('SELECT COUNT(*), SUM(size) FROM analyses').fetchone()
+
+        size = size or 0
+        if os.path.isfile(self.path):
+            file_size = os.path.getsize(self.path)
+        else:
+            file_size = 0
+
+        return dict(path=self.path,
+                    n=n or 0,
+                    size_mb=size / 1024. ** 2,
+                    file_size_mb=file_size / 1024. ** 2,
+                    max_size_mb=self.max_size_mb,
+                    hits=self.hits,
+                    misses=self.misses,
+                    evictions=self.evictions)
+
+    # private
+    def _evict(self):
+        max_size = self.max_size_mb * 1024 ** 2
+        total = self._execute('SELECT SUM(size) FROM analyses').fetchone()[0] or 0
+        if total > max_size:
+            # evict down to 90% so that eviction does not happen on every put
+            target = total - 0.9 * max_size
+            removed, n = 0, 0
+            for key, size in self._execute('SELECT key, size FROM analyses ORDER BY last_access').fetchall():
+                self._execute('DELETE FROM analyses WHERE key=?', (key,))
+                removed += size
+                n += 1
+                if removed >= target:
+                    break
+
+            self._get_connection().commit()
+            self.evictions += n
+            self.debug('evicted {} analyses from cache. {:0.1f} MB'.format(n, removed / 1024. ** 2))
+
+    def _execute(self, sql, args=None, commit=False):
+        conn = self._get_connection()
+        cur = conn.execute(sql, args or ())
+        if commit:
+            conn.commit()
+        return cur
+
+    def _get_connection(self):
+        if self._conn is None:
+            root = os.path.dirname(self.path)
+            if root and not os.path.isdir(root):
+                os.makedirs(root)
+
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, record_id TEXT, value BLOB, '
+                         'size INTEGER, created REAL, last_access REAL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS last_access_idx ON analyses (last_access)')
+            conn.execute('CREATE TABLE IF NOT EXISTS blobs (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, '
+                         'sha TEXT)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+# ============= EOF =============================================
@@ -0,0 +1,246 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+from __future__ import absolute_import
+
+from traits.api import Int, Float, Str, Any, Bool
+
+# ============= standard library imports ========================
+import io
+import os
+import time
+from collections import OrderedDict
+from threading import RLock
+
+# ============= local library imports  ==========================
+from pychron import json
+from pychron.loggable import Loggable
+from pychron.paths import paths
+
+PENDING_COMMITS_NAME = 'pending_commits.jsonl'
+
+
+class PendingChange(object):
+    def __init__(self, repository, paths, message, key=None, timestamp=None):
+        self.repository = repository
+        self.paths = paths
+        self.message = message
+        self.key = key
+        self.timestamp = timestamp or time.time()
+
+    def to_dict(self):
+        return dict(repository=self.repository, paths=self.paths, message=self.message,
+                    key=self.key, timestamp=self.timestamp)
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['repository'], d['paths'], d['message'], d.get('key'), d.get('timestamp'))
+
+
+def commit_groups(changes):
+    """
+    group changes by their commit message, in the order the messages were first added. changes with the same tag
+    but different messages, e.g. "<COLLECTION>" and "<COLLECTION> log", are committed separately so no file is
+    committed under another change's message
+
+    @return: list of (message, paths)
+    """
+    groups = OrderedDict()
+    for c in changes:
+        ps = groups.setdefault(c.message, [])
+        for p in c.paths:
+            if p not in ps:
+                ps.append(p)
+
+    return list(groups.items())
+
+
+class CommitBatcher(Loggable):
+    """
+    collects the files saved for each run and commits them per repository in batches.
+
+    a batch is due once it holds ``max_runs`` runs or its oldest change is ``max_age`` seconds old. when a batch is
+    flushed each repository is pulled, its changes are committed with one commit per message and it is pushed once.
+    every change is appended to a log before ``add`` returns and is removed from it once committed, so changes left
+    by a crash are committed by ``recover``::
+
+        batcher.add(repo.path, ps, '<COLLECTION>', key=runid)
+        if batcher.is_due():
+            batcher.flush()
+    """
+    max_runs = Int(10)
+    max_age = Float(600)
+    log_path = Str
+    pull = Bool(True)
+
+    # callable(repository path) -> GitRepoManager
+    repo_factory = Any
+    # callable(GitRepoManager). push a committed repository
+    pusher = Any
+
+    def __init__(self, *args, **kw):
+        super(CommitBatcher, self).__init__(*args, **kw)
+        self._lock = RLock()
+        self._changes = []
+
+    @property
+    def npending(self):
+        with self._lock:
+            return len(self._changes)
+
+    @property
+    def keys(self):
+        with self._lock:
+            return self._keys(self._changes)
+
+    def add(self, repository, paths, message, key=None):
+        """
+        add the changed ``paths`` of ``repository``. ``message`` is the commit message, starting with a tag.
+        ``key``, usually the runid, identifies the run
+        """
+        if not isinstance(paths, (list, tuple)):
+            paths = [paths]
+
+        change = PendingChange(repository, list(paths), message, key)
+        with self._lock:
+            self._changes.append(change)
+            self._append_log(change)
+
+    def is_due(self):
+        with self._lock:
+            cs = self._changes
+            if not cs:
+                return False
+            return len(self._keys(cs)) >= self.max_runs or time.time() - cs[0].timestamp >= self.max_age
+
+    def flush(self):
+        """
+        commit and push all pending changes. a repository that fails stays pending
+
+        @return: keys of the committed changes
+        """
+        with self._lock:
+            repos = OrderedDict()
+            for c in self._changes:
+                repos.setdefault(c.repository, []).append(c)
+
+            committed = []
+            for root, changes in repos.items():
+                st = time.time()
+                try:
+                    self._commit_repository(root, changes)
+                except BaseException as e:
+                    self.warning('failed committing {} changes to {}. {}'.format(len(changes), root, e))
+                    self.debug_exception()
+                    continue
+
+                self.debug('committed {} runs to {} in {:0.2f}s'.format(len(self._keys(changes)), root,
+                                                                       time.time() - st))
+                committed.extend(changes)
+                self._changes = [c for c in self._changes if c.repository != root]
+                self._write_log()
+
+            return self._keys(committed)
+
+    def recover(self):
+        """
+        load the changes left in the log by a previous session
+
+        @return: number of recovered changes
+        """
+        p = self._get_log_path()
+        if not p or not os.path.isfile(p):
+            return 0
+
+        cs = []
+        with self._lock:
+            with io.open(p, 'r', encoding='utf-8') as rfile:
+                for line in rfile:
+                    try:
+                        cs.append(PendingChange.from_dict(json.loads(line)))
+                    except (ValueError, KeyError):
+                        # a line cut off by a crash
+                        self.debug('skipping invalid pending commit "{}"'.format(line.strip()))
+
+            # every change added this session is also in the log
+            self._changes = cs
+            self._write_log()
+
+        if cs:
+            self.info('recovered {} pending commits'.format(len(cs)))
+        return len(cs)
+
+    # private
+    def _keys(self, changes):
+        keys = []
+        for c in changes:
+            if c.key not in keys:
+                keys.append(c.key)
+        return keys
+
+    def _commit_repository(self, root, changes):
+        if self.repo_factory:
+            repo = self.repo_factory(root)
+        else:
+            from pychron.git_archive.repo_manager import GitRepoManager
+            repo = GitRepoManager()
+            repo.open_repo(root)
+
+        if self.pull:
+            repo.smart_pull(accept_their=True)
+
+        for msg, ps in commit_groups(changes):
+            ps = [p for p in ps if os.path.isfile(p)]
+            if ps:
+                repo.commit_paths(ps, msg)
+
+        if self.pusher:
+            self.pusher(repo)
+
+    def _get_log_path(self):
+        p = self.log_path
+        if not p and paths.hidden_dir:
+            p = os.path.join(paths.hidden_dir, PENDING_COMMITS_NAME)
+        return p
+
+    def _append_log(self, change):
+        p = self._get_log_path()
+        if p:
+            with io.open(p, 'a', encoding='utf-8') as wfile:
+                wfile.write(u'{}\n'.format(json.dumps(change.to_dict())))
+                wfile.flush()
+                os.fsync(wfile.fileno())
+
+    def _write_log(self):
+        p = self._get_log_path()
+        if not p:
+            return
+
+        if not self._changes:
+            if os.path.isfile(p):
+                os.remove(p)
+            return
+
+        tmp = '{}.tmp'.format(p)
+        with io.open(tmp, 'w', encoding='utf-8') as wfile:
+            for c in self._changes:
+                wfile.write(u'{}\n'.format(json.dumps(c.to_dict())))
+            wfile.flush()
+            os.fsync(wfile.fileno())
+        os.replace(tmp, p)
+
+# ============= EOF =============================================
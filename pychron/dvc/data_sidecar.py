@@ -0,0 +1,195 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+import os
+from zipfile import BadZipfile
+
+from numpy import load, column_stack, savez
+
+# ============= local library imports  ==========================
+from pychron.core.helpers.binpack import format_blob, unpack_xy
+from pychron.dvc import dvc_load
+from pychron.paths import paths, r_mkdir
+
+"""
+Binary sidecars for DVC ``.data`` files.
+
+A sidecar is an uncompressed ``.npz`` file with one (n, 2) float32 array per signal, baseline and sniff. Members of
+an npz file are only read when accessed so loading a subset of the isotopes only materializes the requested arrays.
+
+Sidecars live outside of the repositories in ``paths.repository_sidecar_dir`` mirroring the repository layout. The
+json ``.data`` file remains the source of truth. A sidecar is only used if it is at least as new as its json file.
+"""
+
+SIGNAL = 'signal'
+BASELINE = 'baseline'
+SNIFF = 'sniff'
+EXTENSION = '.npz'
+
+
+def sidecar_key(kind, detector, isotope=None):
+    if isotope is None:
+        return '{}/{}'.format(kind, detector)
+    return '{}/{}/{}'.format(kind, isotope, detector)
+
+
+def sidecar_path(data_path):
+    rel = os.path.relpath(data_path, paths.repository_dataset_dir)
+    head, _ = os.path.splitext(rel)
+    return os.path.join(paths.repository_sidecar_dir, '{}{}'.format(head, EXTENSION))
+
+
+def write_sidecar(data_path, jd=None):
+    """
+    write a sidecar for the ``.data`` json file at ``data_path``.
+
+    @param data_path: path to the json file
+    @param jd: the already loaded json dict. loaded from ``data_path`` if None
+    @return: path to the sidecar
+    """
+    if jd is None:
+        jd = dvc_load(data_path)
+
+    endianness = jd.get('format', '>ff')[0]
+
+    arrays = {}
+
+    def add(key, blob):
+        xs, ys = unpack_xy(format_blob(blob), endianness, strict=False)
+        arrays[key] = column_stack((xs, ys)).astype('f4')
+
+    for sd in jd.get('signals', []):
+        iso, det = sd.get('isotope'), sd.get('detector')
+        if iso is not None and det is not None:
+            add(sidecar_key(SIGNAL, det, iso), sd.get('blob', ''))
+
+    for sd in jd.get('sniffs', []):
+        iso, det = sd.get('isotope'), sd.get('detector')
+        if iso is not None and det is not None:
+            add(sidecar_key(SNIFF, det, iso), sd.get('blob', ''))
+
+    for bd in jd.get('baselines', []):
+        det = bd.get('detector')
+        if det is not None:
+            add(sidecar_key(BASELINE, det), bd.get('blob', ''))
+
+    p = sidecar_path(data_path)
+    r_mkdir(os.path.dirname(p))
+
+    # write to a temporary file so a partially written sidecar is never read
+    tmp = '{}.tmp'.format(p)
+    with open(tmp, 'wb') as wfile:
+        savez(wfile, **arrays)
+
+    os.replace(tmp, p)
+    return p
+
+
+def open_sidecar(data_path):
+    """
+    return a DataSidecar for ``data_path`` or None if there is no sidecar or it is older than the json file
+    """
+    p = sidecar_path(data_path)
+    if os.path.isfile(p) and os.path.isfile(data_path):
+        if os.path.getmtime(p) >= os.path.getmtime(data_path):
+            try:
+                return DataSidecar(load(p))
+            except (IOError, ValueError, BadZipfile):
+                pass
+
+
+class DataSidecar(object):
+    """
+    read only view of a sidecar. use as a context manager to close the underlying file
+    """
+
+    def __init__(self, npz):
+        self._npz = npz
+        self._keys = set(npz.files)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._npz.close()
+
+    def iter_keys(self, kind):
+        """
+        yield (isotope, detector) for ``kind``. isotope is None for baselines
+        """
+        prefix = '{}/'.format(kind)
+        for k in self._keys:
+            if k.startswith(prefix):
+                args = k[len(prefix):].split('/')
+                if len(args) == 1:
+                    yield None, args[0]
+                else:
+                    yield args[0], args[1]
+
+    def has(self, kind, detector, isotope=None):
+        return sidecar_key(kind, detector, isotope) in self._keys
+
+    def get(self, kind, detector, isotope=None):
+        """
+        return xs, ys. only the requested member is read from disk
+        """
+        a = self._npz[sidecar_key(kind, detector, isotope)]
+        return a[:, 0], a[:, 1]
+
+
+def iter_data_paths(repository_identifier):
+    root = os.path.join(paths.repository_dataset_dir, repository_identifier)
+    for r, ds, fs in os.walk(root):
+        if '.git' in ds:
+            ds.remove('.git')
+
+        if os.path.basename(r) == '.data':
+            for f in fs:
+                if f.endswith('.data.json'):
+                    yield os.path.join(r, f)
+
+
+def backfill_sidecar(data_path, overwrite=False):
+    """
+    write a sidecar for ``data_path`` if it does not have an up to date one
+
+    @return: True if a sidecar was written
+    """
+    if not overwrite:
+        sc = open_sidecar(data_path)
+        if sc is not None:
+            sc.close()
+            return False
+
+    write_sidecar(data_path)
+    return True
+
+
+def backfill_sidecars(repository_identifier, overwrite=False):
+    """
+    write sidecars for all ``.data`` files in a repository
+
+    @return: number of sidecars written
+    """
+    return sum((backfill_sidecar(p, overwrite) for p in iter_data_paths(repository_identifier)))
+
+# ============= EOF =============================================
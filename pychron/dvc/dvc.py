@@ -19,6 +19,7 @@ from __future__ import print_function
 
 import os
 import shutil
+from copy import copy
 from datetime import datetime
 from itertools import groupby
 from math import isnan
@@ -29,20 +30,21 @@ import time
 # ============= enthought library imports =======================
 from apptools.preferences.preference_binding import bind_preference
 from git import Repo
-from traits.api import Instance, Str, Set, List, provides
+from traits.api import Instance, Str, Set, List, Bool, Int, Property, provides
 from uncertainties import nominal_value, std_dev, ufloat
 
 from pychron import json
-from pychron.core.helpers.filetools import remove_extension, list_subdirectories
+from pychron.core.helpers.filetools import remove_extension, list_subdirectories, add_extension
 from pychron.core.i_datastore import IDatastore
 from pychron.core.progress import progress_loader, progress_iterator
 from pychron.database.interpreted_age import InterpretedAge
+from pychron.database.records.isotope_record import DVCIsotopeRecordView
 from pychron.dvc import dvc_dump, dvc_load, analysis_path, repository_path, AnalysisNotAnvailableError
 from pychron.dvc.defaults import TRIGA, HOLDER_24_SPOKES, LASER221, LASER65
 from pychron.dvc.dvc_analysis import DVCAnalysis, PATH_MODIFIERS
 from pychron.dvc.dvc_database import DVCDatabase
 from pychron.dvc.func import find_interpreted_age_path, GitSessionCTX, push_repositories
-from pychron.dvc.meta_repo import MetaRepo, Production
+from pychron.dvc.meta_repo import MetaRepo, frozen_production
 from pychron.dvc.tasks.dvc_preferences import DVCConnectionItem
 from pychron.envisage.browser.record_views import InterpretedAgeRecordView
 from pychron.git.hosts import IGitHost, CredentialException
@@ -151,6 +153,19 @@ class DVC(Loggable):
     data_source = Instance(DVCConnectionItem)
     favorites = List
 
+    use_parallel_load = Bool(False)
+    parallel_load_nprocesses = Int(0)
+    parallel_load_threshold = Int(100)
+    use_data_sidecars = Bool(False)
+    use_analysis_cache = Bool(False)
+    analysis_cache_max_size_mb = Int(500)
+    analysis_cache = Property
+    commit_batcher = Instance('pychron.dvc.commit_batcher.CommitBatcher')
+    _analysis_cache = None
+    _arar_constants_key = None
+    # meta repo files of the cache keys. irradiation level or 'spectrometers' -> paths
+    _meta_key_paths = None
+
     def __init__(self, bind=True, *args, **kw):
         super(DVC, self).__init__(*args, **kw)
 
@@ -748,6 +763,8 @@ class DVC(Loggable):
         # load repositories
         st = time.time()
 
+        records = self._get_bulk_records(records)
+
         def func(xi, prog, i, n):
             if prog:
                 prog.change_message('Syncing repository= {}'.format(xi))
@@ -759,6 +776,10 @@ class DVC(Loggable):
         exps = {r.repository_identifier for r in records}
         progress_iterator(exps, func, threshold=1)
 
+        # constants and meta files may have been edited since the last load
+        self._arar_constants_key = None
+        self._meta_key_paths = None
+
         # for ei in exps:
         branches = {ei: get_repository_branch(os.path.join(paths.repository_dataset_dir, ei)) for ei in exps}
 
@@ -768,21 +789,8 @@ class DVC(Loggable):
         sens = {}
         meta_repo = self.meta_repo
         if not quick:
-            for r in records:
-                irrad = r.irradiation
-                if irrad != 'NoIrradiation':
-                    level = r.irradiation_level
-                    flux_levels = fluxes.get(irrad, {})
-                    prod_levels = productions.get(irrad, {})
-
-                    if level not in flux_levels:
-                        flux_levels[level] = meta_repo.get_flux_positions(irrad, level)
-                    if level not in prod_levels:
-                        prod_levels[level] = meta_repo.get_production(irrad, level)
-                    if irrad not in chronos:
-                        chronos[irrad] = meta_repo.get_chronology(irrad)
-                    fluxes[irrad] = flux_levels
-                    productions[irrad] = prod_levels
+            levels = ((r.irradiation, r.irradiation_level) for r in records if r.irradiation != 'NoIrradiation')
+            fluxes, productions, chronos = meta_repo.get_irradiation_metadata(levels)
 
             sens = meta_repo.get_sensitivities()
         make_record = self._make_record
@@ -798,7 +806,11 @@ class DVC(Loggable):
                 self.debug('make analysis exception')
                 self.debug_exception()
 
-        ret = progress_loader(records, func, threshold=1, step=25)
+        if self.use_parallel_load and len(records) >= self.parallel_load_threshold:
+            ret = self._make_analyses_parallel(records, func, branches, chronos, productions, fluxes, sens,
+                                               calculate_f_only, reload, quick)
+        else:
+            ret = progress_loader(records, func, threshold=1, step=25)
         et = time.time() - st
 
         n = len(records)
@@ -806,6 +818,52 @@ class DVC(Loggable):
         self.debug('Make analysis time, total: {}, n: {}, average: {}'.format(et, n, et / float(n)))
         return ret
 
+    def _get_bulk_records(self, records):
+        """
+        replace the database record views in ``records`` with DVCAnalysisRecords retrieved in bulk so making the
+        analyses does not lazy load the irradiation position, repositories and load of every record
+        """
+        uuids = [r.uuid for r in records if isinstance(r, DVCIsotopeRecordView)]
+        if not uuids or not self.db.connected:
+            return records
+
+        try:
+            bulk = self.db.get_analysis_records(uuids)
+        except BaseException as e:
+            self.debug('bulk record retrieval failed. {}'.format(e))
+            return records
+
+        def replace(r):
+            if isinstance(r, DVCIsotopeRecordView):
+                br = bulk.get(r.uuid)
+                if br is not None:
+                    # the same analysis can be selected once per repository
+                    br = copy(br)
+                    br.update(r)
+                    return br
+            return r
+
+        return [replace(r) for r in records]
+
+    def backfill_data_sidecars(self, repository_identifier, overwrite=False):
+        """
+        write binary sidecars for all the analyses in a repository
+        """
+        from pychron.dvc.data_sidecar import iter_data_paths, backfill_sidecar
+
+        ps = list(iter_data_paths(repository_identifier))
+        written = []
+
+        def func(p, prog, i, n):
+            if prog and not i % 25:
+                prog.change_message('Writing sidecars for {}. {}/{}'.format(repository_identifier, i, n))
+            if backfill_sidecar(p, overwrite):
+                written.append(p)
+
+        progress_iterator(ps, func, threshold=1)
+        self.info('wrote {} sidecars for {}'.format(len(written), repository_identifier))
+        return len(written)
+
     # repositories
     def repository_add_paths(self, repository_identifier, paths):
         repo = self._get_repository(repository_identifier)
@@ -816,6 +874,24 @@ class DVC(Loggable):
         repo = self._get_repository(repository)
         repo.commit(msg)
 
+    def flush_commits(self):
+        """
+        commit and push the changes batched by ``commit_batcher`` then commit and push the meta repo
+        """
+        keys = self.commit_batcher.flush()
+        if keys:
+            self.meta_pull(accept_our=True)
+            self.meta_commit('repo updated for analyses {}'.format(', '.join(k for k in keys if k)))
+            self.meta_push()
+        return keys
+
+    def recover_commits(self):
+        """
+        commit the batched changes left uncommitted by a previous session
+        """
+        if self.commit_batcher.recover():
+            self.flush_commits()
+
     def repository_push(self, repository, *args, **kw):
         self.debug('Pushing repository {}'.format(repository))
         repo = self._get_repository(repository)
@@ -1192,6 +1268,7 @@ class DVC(Loggable):
             os.mkdir(p)
         with open(os.path.join(root, 'productions.json'), 'w') as wfile:
             json.dump({}, wfile)
+        self.meta_repo.invalidate_index()
 
         if add_repo and principal_investigator:
             self.add_repository('Irradiation-{}'.format(name), principal_investigator)
@@ -1318,31 +1395,26 @@ class DVC(Loggable):
             # this accounts for ~85% of the time!!!
             prog.change_message('Loading analysis {}. {}/{}'.format(record.record_id, i, n))
 
-        expid = record.repository_identifier
-        if not expid:
-            exps = record.repository_ids
-            self.debug('Analysis {} is associated multiple repositories '
-                       '{}'.format(record.record_id, ','.join(exps)))
-            expid = None
-            if self.selected_repositories:
-                rr = [si for si in self.selected_repositories if si in exps]
-                if rr:
-                    if len(rr) > 1:
-                        expid = self._get_requested_experiment_id(rr)
-                    else:
-                        expid = rr[0]
-
-            if expid is None:
-                expid = self._get_requested_experiment_id(exps)
+        expid = self._get_record_repository_identifier(record)
 
         if isinstance(record, DVCAnalysis) and not reload:
             a = record
         else:
             # self.debug('use_repo_suffix={} record_id={}'.format(record.use_repository_suffix, record.record_id))
+            rid = record.record_id
+            if record.use_repository_suffix:
+                rid = '-'.join(rid.split('-')[:-1])
+
+            cache, cache_key = None, None
+            if not quick:
+                cache = self.analysis_cache
+                if cache is not None:
+                    cache_key = self._analysis_cache_key(record, rid, expid, calculate_f_only)
+                    a = cache.get(cache_key)
+                    if a is not None:
+                        return self._set_cached_analysis(a, record, expid, branches)
+
             try:
-                rid = record.record_id
-                if record.use_repository_suffix:
-                    rid = '-'.join(rid.split('-')[:-1])
                 a = DVCAnalysis(rid, expid)
                 a.group_id = record.group_id
             except AnalysisNotAnvailableError:
@@ -1402,32 +1474,185 @@ class DVC(Loggable):
                         fd = meta_repo.get_flux(record.irradiation,
                                                 record.irradiation_level,
                                                 record.irradiation_position_position)
-                    a.j = fd['j']
-                    if fd['lambda_k']:
-                        a.arar_constants.lambda_k = fd['lambda_k']
-
-                    for attr in ('age', 'name', 'material'):
-                        skey = 'monitor_{}'.format(attr)
-                        try:
-                            setattr(a, skey, fd[skey])
-                        except KeyError as e:
-                            try:
-                                key = 'standard_{}'.format(attr)
-                                setattr(a, skey, fd[key])
-                            except KeyError:
-                                print('b', attr, key, e)
-                                pass
+                    a.set_flux(fd)
 
                     if calculate_f_only:
                         a.calculate_F()
                     else:
                         a.calculate_age()
+
+                if cache_key is not None:
+                    cache.put(cache_key, rid, a)
         return a
 
+    def _make_analyses_parallel(self, records, func, branches, chronos, productions, fluxes, sens,
+                                calculate_f_only, reload, quick):
+        """
+        load and calculate the analyses in worker processes.
+
+        records that are already loaded are passed through ``func`` as usual. if a worker fails to load an
+        analysis it is loaded serially with ``func`` so that missing repositories etc are handled the same way
+        as a normal load
+        """
+        from pychron.dvc.parallel_loader import ParallelAnalysisLoader, LoadTask
+        from pychron.processing.arar_constants import ArArConstants
+
+        cache = None if quick else self.analysis_cache
+
+        tasks = []
+        for r in records:
+            if isinstance(r, DVCAnalysis) and not reload:
+                tasks.append(None)
+                continue
+
+            expid = self._get_record_repository_identifier(r)
+            rid = r.record_id
+            if r.use_repository_suffix:
+                rid = '-'.join(rid.split('-')[:-1])
+
+            if cache is not None:
+                # cached analyses are returned by ``func`` without hitting the pool
+                cache_key = self._analysis_cache_key(r, rid, expid, calculate_f_only)
+                if cache.contains(cache_key):
+                    tasks.append(None)
+                    continue
+
+            kw = {}
+            if not quick:
+                kw = dict(load_name=r.load_name,
+                          load_holder=r.load_holder,
+                          branch=branches.get(expid, ''),
+                          irradiation_position=r.irradiation_position_position)
+
+                irrad, level = r.irradiation, r.irradiation_level
+                if irrad != 'NoIrradiation':
+                    kw.update(chronology=chronos.get(irrad),
+                              production=productions.get(irrad, {}).get(level),
+                              positions=fluxes.get(irrad, {}).get(level))
+
+            tasks.append(LoadTask(record_id=rid, repository_identifier=expid, group_id=r.group_id,
+                                  quick=quick, calculate_f_only=calculate_f_only, **kw))
+
+        n = len(records)
+        self.debug('parallel load. n={}, nprocesses={}'.format(n, self.parallel_load_nprocesses or 'auto'))
+        with ParallelAnalysisLoader(self.parallel_load_nprocesses,
+                                    arar_constants=ArArConstants(),
+                                    sens=sens) as loader:
+            results = loader.imap([t for t in tasks if t is not None])
+
+            def gen():
+                for r, t in zip(records, tasks):
+                    yield r, None if t is None else next(results)
+
+            def pfunc(item, prog, i, n):
+                record, result = item
+                if result is not None:
+                    ok, a = result
+                    if ok:
+                        if prog:
+                            prog.change_message('Loaded analysis {}. {}/{}'.format(record.record_id, i, n))
+                        if cache is not None:
+                            cache.put(self._analysis_cache_key(record, a.record_id, a.repository_identifier,
+                                                               calculate_f_only), a.record_id, a)
+                        return a
+
+                    self.debug('parallel load failed for {}. loading serially\n{}'.format(record.record_id, a))
+                return func(record, prog, i, n)
+
+            return progress_loader(gen(), pfunc, threshold=1, step=25, n=n)
+
+    def _get_analysis_cache(self):
+        if self.use_analysis_cache:
+            cache = self._analysis_cache
+            if cache is None:
+                from pychron.dvc.analysis_cache import AnalysisCache
+                cache = AnalysisCache()
+                self._analysis_cache = cache
+
+            cache.max_size_mb = self.analysis_cache_max_size_mb
+            return cache
+
+    def _analysis_cache_key(self, record, rid, expid, calculate_f_only):
+        """
+        the key is built from every file the analysis is computed from. any edit, commit, pull or checkout that
+        changes one of these files changes the key
+        """
+        ps = []
+        try:
+            for m in PATH_MODIFIERS + ('productions',):
+                ps.append(analysis_path(rid, expid, modifier=m))
+        except AnalysisNotAnvailableError:
+            pass
+
+        irrad = record.irradiation
+        if irrad and irrad != 'NoIrradiation':
+            ps.extend(self._get_meta_key_paths((irrad, record.irradiation_level)))
+
+        ps.extend(self._get_meta_key_paths('spectrometers'))
+
+        if self._arar_constants_key is None:
+            from pychron.processing.arar_constants import ArArConstants
+            c = ArArConstants()
+            self._arar_constants_key = sorted(c.trait_get(c.copyable_trait_names()).items())
+
+        return self.analysis_cache.make_key(ps, calculate_f_only, self._arar_constants_key)
+
+    def _get_meta_key_paths(self, key):
+        """
+        the meta repo files of an irradiation level or the sensitivity files. looked up once per make_analyses
+        """
+        kps = self._meta_key_paths
+        if kps is None:
+            kps = self._meta_key_paths = {}
+
+        ps = kps.get(key)
+        if ps is None:
+            ps = []
+            if key == 'spectrometers':
+                sroot = os.path.join(paths.meta_root, 'spectrometers')
+                if os.path.isdir(sroot):
+                    ps = [os.path.join(sroot, p) for p in sorted(os.listdir(sroot)) if p.endswith('.sens.json')]
+            else:
+                irrad, level = key
+                root = os.path.join(paths.meta_root, irrad)
+                pp = os.path.join(root, 'productions.json')
+                ps = [self.meta_repo.get_level_path(irrad, level), os.path.join(root, 'chronology.txt'), pp]
+                if os.path.isfile(pp):
+                    pname = dvc_load(pp).get(level)
+                    if pname:
+                        ps.append(os.path.join(root, 'productions', add_extension(pname, ext='.json')))
+
+            ps = kps[key] = tuple(ps)
+        return ps
+
+    def _set_cached_analysis(self, a, record, expid, branches):
+        a.group_id = record.group_id
+        a.load_name = record.load_name
+        a.load_holder = record.load_holder
+        a.branch = branches.get(expid, '') if branches else ''
+        return a
+
+    def _get_record_repository_identifier(self, record):
+        expid = record.repository_identifier
+        if not expid:
+            exps = record.repository_ids
+            self.debug('Analysis {} is associated multiple repositories '
+                       '{}'.format(record.record_id, ','.join(exps)))
+            expid = None
+            if self.selected_repositories:
+                rr = [si for si in self.selected_repositories if si in exps]
+                if rr:
+                    if len(rr) > 1:
+                        expid = self._get_requested_experiment_id(rr)
+                    else:
+                        expid = rr[0]
+
+            if expid is None:
+                expid = self._get_requested_experiment_id(exps)
+        return expid
+
     def _get_frozen_production(self, rid, repo):
-        path = analysis_path(rid, repo, 'productions')
-        if path:
-            return Production(path)
+        return frozen_production(rid, repo)
 
     def get_repository(self, repo):
         return self._get_repository(repo, as_current=False)
@@ -1460,6 +1685,11 @@ class DVC(Loggable):
         self._favorites_changed(self.favorites)
         self._set_meta_repo_name()
 
+        prefid = 'pychron.dvc.performance'
+        for attr in ('use_parallel_load', 'parallel_load_nprocesses', 'parallel_load_threshold',
+                     'use_data_sidecars', 'use_analysis_cache', 'analysis_cache_max_size_mb'):
+            bind_preference(self, attr, '{}.{}'.format(prefid, attr))
+
     def _favorites_changed(self, items):
         try:
             ds = [DVCConnectionItem(attrs=f, load_names=False) for f in items]
@@ -1567,6 +1797,10 @@ class DVC(Loggable):
     def _meta_repo_default(self):
         return MetaRepo()
 
+    def _commit_batcher_default(self):
+        from pychron.dvc.commit_batcher import CommitBatcher
+        return CommitBatcher(pusher=self.push_repository)
+
 
 if __name__ == '__main__':
     paths.build('_dev')
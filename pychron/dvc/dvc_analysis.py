@@ -28,6 +28,7 @@ from pychron.core.helpers.datetime_tools import make_timef
 from pychron.core.helpers.filetools import add_extension
 from pychron.core.helpers.iterfuncs import partition
 from pychron.dvc import dvc_dump, dvc_load, analysis_path, make_ref_list, get_spec_sha, get_masses
+from pychron.dvc.data_sidecar import open_sidecar, SIGNAL, SNIFF, BASELINE
 from pychron.experiment.utilities.environmentals import set_environmentals
 from pychron.experiment.utilities.identifier import make_aliquot_step, make_step
 from pychron.paths import paths
@@ -65,6 +66,79 @@ class TIsotope:
         return ufloat((1, 0.5))
 
 
+class JSONRawData(object):
+    """
+    raw data from a ``.data`` json file. each blob is decoded at most once
+    """
+
+    def __init__(self, jd):
+        self._jd = jd
+        self._baselines = {}
+
+    def signals(self):
+        return self._iter('signals')
+
+    def sniffs(self):
+        return self._iter('sniffs')
+
+    def baseline(self, det):
+        if det not in self._baselines:
+            bd = next((b for b in self._jd.get('baselines', []) if b.get('detector') == det), None)
+            self._baselines[det] = self._loader(bd.get('blob', '')) if bd else None
+        return self._baselines[det]
+
+    def _iter(self, tag):
+        for sd in self._jd.get(tag, []):
+            yield sd.get('isotope'), sd.get('detector'), self._loader(sd.get('blob', ''))
+
+    def _loader(self, blob):
+        cache = []
+
+        def load(m, n_only):
+            if not cache:
+                cache.append(format_blob(blob))
+            m.unpack_data(cache[0], n_only)
+
+        return load
+
+
+class SidecarRawData(object):
+    """
+    raw data from a binary sidecar. see pychron.dvc.data_sidecar
+    """
+
+    def __init__(self, sidecar):
+        self._sidecar = sidecar
+
+    def signals(self):
+        return self._iter(SIGNAL)
+
+    def sniffs(self):
+        return self._iter(SNIFF)
+
+    def baseline(self, det):
+        if self._sidecar.has(BASELINE, det):
+            return self._loader(BASELINE, det)
+
+    def _iter(self, kind):
+        for iso, det in self._sidecar.iter_keys(kind):
+            yield iso, det, self._loader(kind, det, iso)
+
+    def _loader(self, kind, det, iso=None):
+        cache = []
+
+        def load(m, n_only):
+            if not cache:
+                cache.append(self._sidecar.get(kind, det, iso))
+
+            xs, ys = cache[0]
+            if m.reverse_unpack:
+                xs, ys = ys, xs
+            m.set_data(xs, ys, n_only)
+
+        return load
+
+
 class DVCAnalysis(Analysis):
     # icfactor_reviewed = False
     # blank_reviewed = False
@@ -200,68 +274,56 @@ class DVCAnalysis(Analysis):
     def load_raw_data(self, keys=None, n_only=False, use_name_pairs=True):
 
         path = self._analysis_path(modifier='.data')
-        isotopes = self.isotopes
-
-        jd = dvc_load(path)
-
-        signals = jd.get('signals', [])
-        baselines = jd.get('baselines', [])
-        sniffs = jd.get('sniffs', [])
 
-        for sd in signals:
-            isok = sd.get('isotope')
-            det = sd.get('detector')
+        sidecar = open_sidecar(path) if path else None
+        if sidecar is not None:
+            with sidecar:
+                self._load_raw_data(SidecarRawData(sidecar), keys, n_only, use_name_pairs)
+        else:
+            jd = dvc_load(path)
+            self._load_raw_data(JSONRawData(jd), keys, n_only, use_name_pairs)
 
+    def _load_raw_data(self, src, keys, n_only, use_name_pairs):
+        for isok, det, loader in src.signals():
             if isok is None or det is None:
                 continue
 
-            # print isok, keys
             key = isok
             if use_name_pairs:
                 key = '{}{}'.format(isok, det)
 
             if keys and key not in keys and isok not in keys:
                 continue
-            #
-            # try:
-            #     iso = isotopes[isok]
-            # except KeyError, e:
-            #     print e, isotopes.keys()
-            #     continue
-            # iso = next((i for i in self.itervalues() if i.detector == det and i.name == isok), None)
+
             iso = self.get_isotope(name=isok, detector=det)
             if not iso:
                 continue
 
-            iso.unpack_data(format_blob(sd.get('blob', '')), n_only)
+            loader(iso, n_only)
 
-            # det = sd['detector']
-            bd = next((b for b in baselines if b.get('detector') == det), None)
-            if bd:
-                iso.baseline.unpack_data(format_blob(bd.get('blob', '')), n_only)
+            bloader = src.baseline(det)
+            if bloader:
+                bloader(iso.baseline, n_only)
 
         # loop thru keys to make sure none were missed this can happen when only loading baseline
         if keys:
             for k in keys:
-                bd = next((b for b in baselines if b.get('detector') == k), None)
-                if bd:
+                bloader = src.baseline(k)
+                if bloader:
                     for iso in self.itervalues():
                         if iso.detector == k:
-                            iso.baseline.unpack_data(format_blob(bd.get('blob', '')), n_only)
+                            bloader(iso.baseline, n_only)
 
-        for sn in sniffs:
-            isok = sn.get('isotope')
-            det = sn.get('detector')
+        for isok, det, loader in src.sniffs():
             if use_name_pairs:
                 isok = '{}{}'.format(isok, det)
 
             if keys and isok not in keys:
                 continue
 
-            data = format_blob(sn.get('blob', ''))
             for iso in self.itervalues():
                 if iso.detector == det:
-                    iso.sniff.unpack_data(data, n_only)
+                    loader(iso.sniff, n_only)
 
     def set_production(self, prod, r):
         self.production_obj = r
@@ -269,6 +331,21 @@ class DVCAnalysis(Analysis):
         self.production_ratios = r.to_dict(('Ca_K', 'Cl_K'))
         self.interference_corrections = r.to_dict(INTERFERENCE_KEYS)
 
+    def set_flux(self, fd):
+        self.j = fd['j']
+        if fd['lambda_k']:
+            self.arar_constants.lambda_k = fd['lambda_k']
+
+        for attr in ('age', 'name', 'material'):
+            skey = 'monitor_{}'.format(attr)
+            try:
+                setattr(self, skey, fd[skey])
+            except KeyError:
+                try:
+                    setattr(self, skey, fd['standard_{}'.format(attr)])
+                except KeyError:
+                    self.debug('no {} in flux for {}'.format(skey, self.record_id))
+
     def set_chronology(self, chron):
         analts = self.rundate
 
@@ -23,6 +23,7 @@ from datetime import timedelta, datetime
 import six
 from six.moves import map
 from sqlalchemy import not_, func, distinct, or_, select, and_, join
+from sqlalchemy.orm import joinedload, subqueryload
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql.functions import count
 from sqlalchemy.util import OrderedSet
@@ -33,6 +34,7 @@ from pychron.core.helpers.datetime_tools import bin_datetimes
 from pychron.core.spell_correct import correct
 from pychron.database.core.database_adapter import DatabaseAdapter, binfunc
 from pychron.database.core.query import compile_query, in_func
+from pychron.database.records.isotope_record import DVCAnalysisRecord
 from pychron.dvc.dvc_orm import AnalysisTbl, ProjectTbl, MassSpectrometerTbl, \
     IrradiationTbl, LevelTbl, SampleTbl, \
     MaterialTbl, IrradiationPositionTbl, UserTbl, ExtractDeviceTbl, LoadTbl, \
@@ -167,6 +169,21 @@ def exclude_invalid_analyses(q):
     return q.filter(AnalysisChangeTbl.tag != 'invalid')
 
 
+def eager_load_analyses(q):
+    """
+    load the relationships used to build record views and analyses with the query instead of lazily. one lazy
+    SELECT per relationship per analysis otherwise
+    """
+    ip = joinedload('irradiation_position')
+    sample = ip.joinedload('sample')
+    return q.options(ip.joinedload('level').joinedload('irradiation'),
+                     sample.joinedload('project').joinedload('principal_investigator'),
+                     sample.joinedload('material'),
+                     joinedload('change'),
+                     subqueryload('repository_associations'),
+                     subqueryload('measured_positions').joinedload('load'))
+
+
 def extract_devices_query(analysis_types, extract_devices, q):
     if extract_devices and ('air' not in analysis_types and 'cocktail' not in analysis_types):
         a = any((a in analysis_types for a in ('air', 'cocktail', 'blank_air', 'blank_cocktail')))
@@ -688,6 +705,8 @@ class DVCDatabase(DatabaseAdapter):
                 ff = chain_func(ff, AnalysisTbl.id.in_(ss))
 
             q = q.filter(ff)
+            if not return_labnumbers:
+                q = eager_load_analyses(q)
             return self._query_all(q, verbose_query=True)
 
     # def add_analysis_group_set(self, group, analysis, **kw):
@@ -1108,8 +1127,72 @@ class DVCDatabase(DatabaseAdapter):
         with self.session_ctx() as sess:
             q = sess.query(AnalysisTbl)
             q = q.filter(AnalysisTbl.uuid.in_(uuids))
+            q = eager_load_analyses(q)
             return self._query_all(q, verbose_query=False)
 
+    def get_analysis_records(self, uuids, chunksize=500):
+        """
+        bulk retrieval of the attributes needed to make analyses as a flat column projection. one SELECT per
+        ``chunksize`` uuids
+
+        @return: dict of uuid: DVCAnalysisRecord
+        """
+        uuids = list(uuids)
+        records = {}
+        with self.session_ctx() as sess:
+            for i in range(0, len(uuids), chunksize):
+                q = sess.query(AnalysisTbl.uuid, AnalysisTbl.aliquot, AnalysisTbl.increment,
+                               AnalysisTbl.timestamp, AnalysisTbl.analysis_type, AnalysisTbl.mass_spectrometer,
+                               AnalysisTbl.extract_device,
+                               IrradiationPositionTbl.identifier, IrradiationPositionTbl.position,
+                               LevelTbl.name, IrradiationTbl.name, SampleTbl.name, ProjectTbl.name,
+                               AnalysisChangeTbl.tag,
+                               RepositoryAssociationTbl.repository,
+                               MeasuredPositionTbl.loadName, LoadTbl.holderName)
+
+                q = q.outerjoin(IrradiationPositionTbl, AnalysisTbl.irradiation_positionID == IrradiationPositionTbl.id)
+                q = q.outerjoin(LevelTbl, IrradiationPositionTbl.levelID == LevelTbl.id)
+                q = q.outerjoin(IrradiationTbl, LevelTbl.irradiationID == IrradiationTbl.id)
+                q = q.outerjoin(SampleTbl, IrradiationPositionTbl.sampleID == SampleTbl.id)
+                q = q.outerjoin(ProjectTbl, SampleTbl.projectID == ProjectTbl.id)
+                q = q.outerjoin(AnalysisChangeTbl, AnalysisChangeTbl.analysisID == AnalysisTbl.id)
+                q = q.outerjoin(RepositoryAssociationTbl, RepositoryAssociationTbl.analysisID == AnalysisTbl.id)
+                q = q.outerjoin(MeasuredPositionTbl, MeasuredPositionTbl.analysisID == AnalysisTbl.id)
+                q = q.outerjoin(LoadTbl, MeasuredPositionTbl.loadName == LoadTbl.name)
+
+                q = q.filter(AnalysisTbl.uuid.in_(uuids[i:i + chunksize]))
+                q = q.order_by(AnalysisTbl.id, MeasuredPositionTbl.id)
+
+                for row in self._query_all(q, verbose_query=False):
+                    # one row per repository association and measured position
+                    uuid = row[0]
+                    r = records.get(uuid)
+                    if r is None:
+                        r = DVCAnalysisRecord(*row[:14])
+                        r.load_name = row[15] or ''
+                        r.load_holder = row[16] or ''
+                        records[uuid] = r
+
+                    r.add_repository(row[14])
+
+        return records
+
+    def get_analysis_keys(self, identifiers, chunksize=500):
+        """
+        bulk existence check. one SELECT per ``chunksize`` identifiers
+
+        @return: set of (identifier, aliquot, increment)
+        """
+        identifiers = list(identifiers)
+        keys = set()
+        with self.session_ctx() as sess:
+            for i in range(0, len(identifiers), chunksize):
+                q = sess.query(IrradiationPositionTbl.identifier, AnalysisTbl.aliquot, AnalysisTbl.increment)
+                q = q.join(AnalysisTbl, AnalysisTbl.irradiation_positionID == IrradiationPositionTbl.id)
+                q = q.filter(IrradiationPositionTbl.identifier.in_(identifiers[i:i + chunksize]))
+                keys.update(tuple(r) for r in self._query_all(q, verbose_query=False))
+        return keys
+
     def get_analysis_runid(self, idn, aliquot, step=None):
         with self.session_ctx() as sess:
             q = sess.query(AnalysisTbl)
@@ -1218,6 +1301,7 @@ class DVCDatabase(DatabaseAdapter):
                 q = q.order_by(getattr(AnalysisTbl.timestamp, order)())
 
             tc = q.count()
+            q = eager_load_analyses(q)
             return self._query_all(q, verbose_query=True), tc
 
     def get_repository_date_range(self, names):
@@ -1304,6 +1388,7 @@ class DVCDatabase(DatabaseAdapter):
             if limit:
                 q = q.limit(limit)
 
+            q = eager_load_analyses(q)
             return self._query_all(q, verbose_query=verbose)
 
     def _get_date_range(self, q, asc=None, desc=None, hours=0):
@@ -1688,6 +1773,7 @@ class DVCDatabase(DatabaseAdapter):
             q = q.filter(IrradiationTbl.name == irradiation)
             q = q.filter(LevelTbl.name == level)
             q = q.order_by(RepositoryAssociationTbl.repository)
+            q = eager_load_analyses(q)
 
             return self._query_all(q, verbose_query=verbose)
 
@@ -2054,8 +2140,7 @@ class DVCDatabase(DatabaseAdapter):
             q = sess.query(AnalysisTbl)
             q = q.join(IrradiationPositionTbl, LevelTbl, IrradiationTbl,
                        SampleTbl, AnalysisChangeTbl)
-            # q = q.options(joinedload('experiment_associations'))
-            # q = q.options(joinedload('irradiation_position'))
+            q = eager_load_analyses(q)
             q = q.filter(IrradiationTbl.name == irradiation)
             q = q.filter(LevelTbl.name == level)
             q = q.filter(SampleTbl.name == sample)
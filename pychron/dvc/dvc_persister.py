@@ -17,22 +17,28 @@
 import hashlib
 import os
 import shutil
-import struct
 from datetime import datetime
+from threading import RLock, Lock
 
 from git.exc import GitCommandError
 # ============= enthought library imports =======================
 from traits.api import Instance, Bool, Str
 from uncertainties import std_dev, nominal_value
 
-from pychron.core.helpers.binpack import encode_blob, pack
+from pychron.core.helpers.binpack import encode_blob, pack_points
 from pychron.dvc import dvc_dump, analysis_path
+from pychron.dvc.data_sidecar import write_sidecar
 from pychron.experiment.automated_run.persistence import BasePersister
 from pychron.git_archive.repo_manager import GitRepoManager
 from pychron.paths import paths
 from pychron.processing.analyses.analysis import EXTRACTION_ATTRS, META_ATTRS
 from pychron.pychron_constants import DVC_PROTOCOL, LINE_STR, NULL_STR
 
+# a run may be committed on the executor's persistence queue while the next run pulls the same repositories
+GIT_LOCK = RLock()
+# runs saved in parallel can share a spectrometer file
+SPECTROMETER_LOCK = Lock()
+
 
 def format_repository_identifier(project):
     return project.replace('/', '_').replace('\\', '_')
@@ -58,6 +64,7 @@ class DVCPersister(BasePersister):
     _positions = None
 
     save_log_enabled = Bool(False)
+    use_commit_batching = Bool(False)
 
     def per_spec_save(self, pr, repository_identifier=None, commit=False, commit_tag=None):
         self.per_spec = pr
@@ -70,6 +77,39 @@ class DVCPersister(BasePersister):
         self.post_extraction_save()
         self.post_measurement_save(commit=commit, commit_tag=commit_tag)
 
+    def per_spec_save_files(self, pr, check_repository=True):
+        """
+        write the files of a run without committing them or saving the run to the database.
+        ``per_spec_save_db`` finishes the save. the files of many runs can be written in parallel by clones of this
+        persister as long as ``check_repository`` is False, which skips the database query
+
+        :return: timestamp to pass to per_spec_save_db
+        """
+        self.per_spec = pr
+        self.pre_extraction_save()
+        self.pre_measurement_save()
+        self.post_extraction_save()
+        _, timestamp = self._save_files(check_repository)
+        return timestamp
+
+    def per_spec_save_db(self, timestamp):
+        """
+        save the run written by per_spec_save_files to the database. the caller provides the session
+        """
+        self._save_analysis_db(timestamp)
+
+    def clone(self):
+        """
+        a persister for a single run that shares the dvc and settings of this one
+        """
+        return self.__class__(dvc=self.dvc,
+                              use_isotope_classifier=self.use_isotope_classifier,
+                              stage_files=self.stage_files,
+                              default_principal_investigator=self.default_principal_investigator,
+                              save_enabled=self.save_enabled,
+                              save_log_enabled=self.save_log_enabled,
+                              use_commit_batching=self.use_commit_batching)
+
     def initialize(self, repository, pull=True):
         """
         setup git repos.
@@ -81,18 +121,19 @@ class DVCPersister(BasePersister):
         """
         self.debug('^^^^^^^^^^^^^ Initialize DVCPersister {} pull={}'.format(repository, pull))
 
-        self.dvc.initialize()
+        with GIT_LOCK:
+            self.dvc.initialize()
 
-        repository = format_repository_identifier(repository)
-        self.active_repository = repo = GitRepoManager()
+            repository = format_repository_identifier(repository)
+            self.active_repository = repo = GitRepoManager()
 
-        root = os.path.join(paths.repository_dataset_dir, repository)
-        repo.open_repo(root)
+            root = os.path.join(paths.repository_dataset_dir, repository)
+            repo.open_repo(root)
 
-        remote = 'origin'
-        if repo.has_remote(remote) and pull:
-            self.info('pulling changes from repo: {}'.format(repository))
-            self.active_repository.pull(remote=remote, use_progress=False)
+            remote = 'origin'
+            if repo.has_remote(remote) and pull:
+                self.info('pulling changes from repo: {}'.format(repository))
+                self.active_repository.pull(remote=remote, use_progress=False)
 
     def pre_extraction_save(self):
         pass
@@ -153,7 +194,8 @@ class DVCPersister(BasePersister):
         self._positions = ps
         obj['positions'] = ps
 
-        hexsha = self.dvc.get_meta_head()
+        with GIT_LOCK:
+            hexsha = self.dvc.get_meta_head()
         obj['commit'] = str(hexsha)
 
         path = self._make_path(modifier='extraction')
@@ -178,40 +220,16 @@ class DVCPersister(BasePersister):
         ret = True
 
         ar = self.active_repository
-
-        # save spectrometer
-        spec_sha = self._get_spectrometer_sha()
-        spec_path = os.path.join(ar.path, '{}.json'.format(spec_sha))
-        if not os.path.isfile(spec_path):
-            self._save_spectrometer_file(spec_path)
-
-        # self.dvc.meta_repo.save_gains(self.per_spec.run_spec.mass_spectrometer,
-        #                               self.per_spec.gains)
-
-        # save analysis
-
-        if not self.per_spec.timestamp:
-            timestamp = datetime.now()
-        else:
-            timestamp = self.per_spec.timestamp
-
-        # check repository identifier before saving
-        # will modify repository to NoRepo if repository_identifier does not exist
-        self._check_repository_identifier()
-
-        self._save_analysis(timestamp)
-
-        # save monitor
-        self._save_monitor()
-
-        # save peak center
-        self._save_peak_center(self.per_spec.peak_center)
+        spec_path, timestamp = self._save_files()
 
         # stage files
         dvc = self.dvc
 
         if self.stage_files:
-            if commit:
+            if commit and self.use_commit_batching:
+                self._batch_commit(spec_path, commit_tag)
+            elif commit:
+                GIT_LOCK.acquire()
                 try:
                     ar.smart_pull(accept_their=True)
 
@@ -268,6 +286,8 @@ class DVCPersister(BasePersister):
                                                 timeout_ret=False,
                                                 timeout=30):
                         ret = False
+                finally:
+                    GIT_LOCK.release()
 
         with dvc.session_ctx():
             self._save_analysis_db(timestamp)
@@ -281,12 +301,78 @@ class DVCPersister(BasePersister):
             npath = self._make_path('logs', '.log')
             shutil.copyfile(path, npath)
             ar = self.active_repository
-            ar.smart_pull(accept_their=True)
-            ar.add(npath, commit=False)
-            ar.commit('<COLLECTION> log')
-            self.dvc.push_repository(ar)
+            if self.use_commit_batching:
+                self.dvc.commit_batcher.add(ar.path, npath, '<COLLECTION> log', key=self.per_spec.run_spec.runid)
+                return
+
+            with GIT_LOCK:
+                ar.smart_pull(accept_their=True)
+                ar.add(npath, commit=False)
+                ar.commit('<COLLECTION> log')
+                self.dvc.push_repository(ar)
 
     # private
+    def _batch_commit(self, spec_path, commit_tag):
+        """
+        add the files of this run to the dvc's commit batcher instead of committing them. the batch is committed and
+        pushed once it is due
+        """
+        pms = (None, '.data', 'tags', 'peakcenter', 'extraction', 'monitor')
+        changes = (([spec_path] + [self._make_path(modifier=m) for m in pms], '<{}>'.format(commit_tag)),
+                   ([self._make_path('intercepts'), self._make_path('baselines')],
+                    '<ISOEVO> default collection fits'),
+                   ([self._make_path('blanks')], '<BLANKS> preceding {}'.format(self.per_spec.previous_blank_runid)),
+                   ([self._make_path('icfactors')], '<ICFactor> default'))
+
+        ar = self.active_repository
+        runid = self.per_spec.run_spec.runid
+        batcher = self.dvc.commit_batcher
+        for ps, msg in changes:
+            ps = [p for p in ps if os.path.isfile(p)]
+            if ps:
+                batcher.add(ar.path, ps, msg, key=runid)
+
+        if batcher.is_due():
+            with GIT_LOCK:
+                try:
+                    self.dvc.flush_commits()
+                except GitCommandError as e:
+                    self.warning(e)
+
+    def _save_files(self, check_repository=True):
+        ar = self.active_repository
+
+        # save spectrometer
+        spec_sha = self._get_spectrometer_sha()
+        spec_path = os.path.join(ar.path, '{}.json'.format(spec_sha))
+        with SPECTROMETER_LOCK:
+            if not os.path.isfile(spec_path):
+                self._save_spectrometer_file(spec_path)
+
+        # self.dvc.meta_repo.save_gains(self.per_spec.run_spec.mass_spectrometer,
+        #                               self.per_spec.gains)
+
+        # save analysis
+
+        if not self.per_spec.timestamp:
+            timestamp = datetime.now()
+        else:
+            timestamp = self.per_spec.timestamp
+
+        # check repository identifier before saving
+        # will modify repository to NoRepo if repository_identifier does not exist
+        if check_repository:
+            self._check_repository_identifier()
+
+        self._save_analysis(timestamp)
+
+        # save monitor
+        self._save_monitor()
+
+        # save peak center
+        self._save_peak_center(self.per_spec.peak_center)
+        return spec_path, timestamp
+
     def _check_repository_identifier(self):
         repo_id = self.per_spec.run_spec.repository_identifier
         db = self.dvc.db
@@ -488,11 +574,12 @@ class DVCPersister(BasePersister):
 
         # save the scripts
         ms = per_spec.run_spec.mass_spectrometer
-        for si in ('measurement', 'extraction', 'post_measurement', 'post_equilibration'):
-            name = getattr(per_spec, '{}_name'.format(si))
-            blob = getattr(per_spec, '{}_blob'.format(si))
-            self.dvc.meta_repo.update_script(ms, name, blob)
-            obj[si] = name
+        with GIT_LOCK:
+            for si in ('measurement', 'extraction', 'post_measurement', 'post_equilibration'):
+                name = getattr(per_spec, '{}_name'.format(si))
+                blob = getattr(per_spec, '{}_blob'.format(si))
+                self.dvc.meta_repo.update_script(ms, name, blob)
+                obj[si] = name
 
         # save experiment
         self.debug('---------------- Experiment Queue saving disabled')
@@ -501,7 +588,8 @@ class DVCPersister(BasePersister):
 
         self._save_macrochron(obj)
 
-        hexsha = str(self.dvc.get_meta_head())
+        with GIT_LOCK:
+            hexsha = str(self.dvc.get_meta_head())
         obj['commit'] = hexsha
 
         # dump runid.json
@@ -529,6 +617,9 @@ class DVCPersister(BasePersister):
                 'signals': signals, 'baselines': baselines, 'sniffs': sniffs}
         dvc_dump(data, p)
 
+        if self.dvc.use_data_sidecars:
+            write_sidecar(p, data)
+
     def _save_macrochron(self, obj):
         pass
 
@@ -537,7 +628,7 @@ class DVCPersister(BasePersister):
             p = self._make_path(modifier='monitor')
             checks = []
             for ci in self.per_spec.monitor.checks:
-                data = b''.join([struct.pack('>ff', x, y) for x, y in ci.data])
+                data = pack_points(ci.data)
                 params = dict(name=ci.name,
                               parameter=ci.parameter, criterion=ci.criterion,
                               comparator=ci.comparator, tripped=ci.tripped,
@@ -568,7 +659,7 @@ class DVCPersister(BasePersister):
             results = pc.get_results()
             if results:
                 for result in results:
-                    points = encode_blob(pack(fmt, result.points))
+                    points = encode_blob(pack_points(result.points, fmt[0]))
 
                     obj[result.detector] = {'low_dac': result.low_dac,
                                             'center_dac': result.center_dac,
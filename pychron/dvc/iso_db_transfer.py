@@ -19,9 +19,7 @@ from __future__ import absolute_import
 from __future__ import print_function
 import json
 import os
-import time
 from datetime import timedelta
-from itertools import groupby
 
 from numpy import array_split
 from traits.api import Instance
@@ -33,6 +31,7 @@ from pychron.database.records.isotope_record import IsotopeRecordView
 from pychron.dvc import dvc_dump
 from pychron.dvc.dvc import DVC
 from pychron.dvc.dvc_persister import DVCPersister, format_repository_identifier
+from pychron.dvc.transfer_engine import TransferEngine, TransferCheckpoint, TransferError
 from pychron.dvc.pychrondata_transfer_helpers import get_irradiation_timestamps, get_project_timestamps, \
     set_spectrometer_files, commit_initial_import
 from pychron.experiment.automated_run.persistence_spec import PersistenceSpec
@@ -315,38 +314,54 @@ class IsoDBTransfer(Loggable):
             ais = [ai.record_id for ai in runs]
         self.do_export(ais, repository_identifier, creator)
 
-    def do_export(self, runs, repository_identifier, creator, create_repo=False, monitor_mapping=None):
+    def do_export(self, runs, repository_identifier, creator, create_repo=False, monitor_mapping=None,
+                  batch_size=50, nworkers=4, resume=True):
+        """
+        transfer ``runs`` in batches of ``batch_size``. the analyses of a batch are queried together, their files
+        written by ``nworkers`` threads and saved to the database in one transaction.
 
-        # self._init_src_dest()
+        with ``resume`` the outcome of each run is recorded in a checkpoint file and runs already transferred by
+        an earlier, interrupted export are skipped
+
+        :return: TransferMetrics
+        """
         src = self.processor.db
         dest = self.dvc.db
 
-        with src.session_ctx():
-            key = lambda x: x.split('-')[0]
-            runs = sorted(runs, key=key)
+        key = lambda x: x.split('-')[0]
+        runs = sorted(runs, key=key)
+        with dest.session_ctx():
+            repo = self._add_repository(dest, repository_identifier, creator, create_repo)
+
+        self.persister.active_repository = repo
+        self.dvc.current_repository = repo
+
+        # _add_repository made sure this repository exists so the persister does not check it for every run
+        exp = format_repository_identifier(repository_identifier)
+
+        checkpoint = None
+        if resume:
+            checkpoint = TransferCheckpoint(os.path.join(paths.hidden_dir, 'iso_db_transfer', '{}.jsonl'.format(exp)))
+
+        def fetch(batch):
+            with dest.session_ctx():
+                return self._fetch_analyses(batch, exp, monitor_mapping)
+
+        def write(ps):
+            # a persister per run. the shared one holds the state of a single run
+            p = self.persister.clone()
+            p.active_repository = repo
+            return p, p.per_spec_save_files(ps, check_repository=False)
+
+        def insert(payloads):
             with dest.session_ctx():
-                repo = self._add_repository(dest, repository_identifier, creator, create_repo)
-
-            self.persister.active_repository = repo
-            self.dvc.current_repository = repo
-
-            total = len(runs)
-            j = 0
-
-            for ln, ans in groupby(runs, key=key):
-                ans = list(ans)
-                n = len(ans)
-                for i, a in enumerate(ans):
-                    with dest.session_ctx() as sess:
-                        st = time.time()
-                        try:
-                            if self._transfer_analysis(a, repository_identifier, monitor_mapping=monitor_mapping):
-                                j += 1
-                                self.debug('{}/{} transfer time {:0.3f}'.format(j, total, time.time() - st))
-                        except BaseException as e:
-                            import traceback
-                            traceback.print_exc()
-                            self.warning('failed transfering {}. {}'.format(a, e))
+                with dest.deferred_commit():
+                    for p, timestamp in payloads:
+                        p.per_spec_save_db(timestamp)
+
+        engine = TransferEngine(batch_size=batch_size, nworkers=nworkers)
+        with src.session_ctx():
+            return engine.run(runs, fetch, write, insert, checkpoint=checkpoint)
 
     # private
     def _get_project_timestamps(self, project, mass_spectrometer, tol_hrs=6):
@@ -530,49 +545,83 @@ class IsoDBTransfer(Loggable):
 
             yd.append({'j': j, 'j_err': e, 'position': pos, 'decay_constants': {}})
             dvc_dump(yd, p)
+            meta_repo.invalidate_index()
 
         dest.commit()
 
-    def _transfer_analysis(self, rec, exp, overwrite=True, monitor_mapping=None):
-        dest = self.dvc.db
-        proc = self.processor
-        src = proc.db
-
-        # args = rec.split('-')
-        # idn = '-'.join(args[:-1])
-        # t = args[-1]
-        # try:
-        #     aliquot = int(t)
-        #     step = None
-        # except ValueError:
-        #     aliquot = int(t[:-1])
-        #     step = t[-1]
+    def _parse_runid(self, rec):
         m = IDENTIFIER_REGEX.match(rec)
         if not m:
             m = SPECIAL_IDENTIFIER_REGEX.match(rec)
 
         if not m:
-            self.warning('invalid runid {}'.format(rec))
             return
-        else:
-            idn = m.group('identifier')
-            aliquot = m.group('aliquot')
-            try:
-                step = m.group('step') or None
-            except IndexError:
-                step = None
+
+        idn = m.group('identifier')
+        aliquot = int(m.group('aliquot'))
+        try:
+            step = m.group('step') or None
+        except IndexError:
+            step = None
 
         if idn == '4359':
             idn = 'c-01-j'
         elif idn == '4358':
             idn = 'c-01-o'
 
-        # check if analysis already exists. skip if it does
-        if dest.get_analysis_runid(idn, aliquot, step):
-            self.warning('{} already exists'.format(make_runid(idn, aliquot, step)))
-            return
+        return idn, aliquot, step
+
+    def _fetch_analyses(self, runs, exp, monitor_mapping=None):
+        """
+        make the persistence specs of ``runs`` with one query of the source and one of the destination
+
+        :return: list of (runid, PersistenceSpec). the spec is None if the run already exists and a TransferError
+        if it could not be made
+        """
+        dest = self.dvc.db
+        src = self.processor.db
+
+        parsed = [(rec, self._parse_runid(rec)) for rec in runs]
+        keys = list({p[:2] for _, p in parsed if p})
+
+        existing, dbans = set(), {}
+        if keys:
+            existing = dest.get_analysis_keys(list({idn for idn, _ in keys}))
+            for dban in src.get_analyses_aliquots(keys):
+                dbans[(dban.labnumber.identifier, dban.aliquot, dban.step or None)] = dban
+
+        existing_aliquots = {(i, a) for i, a, _ in existing}
+
+        ret = []
+        for rec, p in parsed:
+            if not p:
+                ps = TransferError('invalid runid {}'.format(rec))
+            else:
+                ps = None
+                idn, aliquot, step = p
+                # check if analysis already exists. skip if it does
+                if step:
+                    exists = (idn, aliquot, ALPHAS.index(step)) in existing
+                else:
+                    exists = (idn, aliquot) in existing_aliquots
+
+                if exists:
+                    self.warning('{} already exists'.format(make_runid(idn, aliquot, step)))
+                else:
+                    dban = dbans.get(p)
+                    if dban is None:
+                        ps = TransferError('{} not in source database'.format(rec))
+                    else:
+                        ps = self._make_persistence_spec(dban, idn, aliquot, step, exp, monitor_mapping)
+                        if ps is None:
+                            ps = TransferError('failed to make {}'.format(rec))
+            ret.append((rec, ps))
+        return ret
+
+    def _make_persistence_spec(self, dban, idn, aliquot, step, exp, monitor_mapping):
+        dest = self.dvc.db
+        proc = self.processor
 
-        dban = src.get_analysis_runid(idn, aliquot, step)
         iv = IsotopeRecordView()
         iv.uuid = dban.uuid
 
@@ -584,7 +633,6 @@ class IsoDBTransfer(Loggable):
             return
 
         self._transfer_meta(dest, dban, monitor_mapping)
-        # return
 
         dblab = dban.labnumber
 
@@ -648,7 +696,7 @@ class IsoDBTransfer(Loggable):
                               uuid=dban.uuid,
                               _step=inc,
                               comment=dban.comment or '',
-                              aliquot=int(aliquot),
+                              aliquot=aliquot,
                               extract_device=ed,
                               duration=extraction.extract_duration,
                               cleanup=extraction.cleanup_duration,
@@ -688,9 +736,7 @@ class IsoDBTransfer(Loggable):
                              use_repository_association=True,
                              positions=[p.position for p in extraction.positions])
 
-        self.debug('transfer analysis with persister')
-        self.persister.per_spec_save(ps, commit=False, commit_tag='Database Transfer')
-        return True
+        return ps
 
     def _get_irradpos(self, dest, irradname, levelname, identifier):
         dl = dest.get_irradiation_level(irradname, levelname)
@@ -33,7 +33,7 @@ from pychron.canvas.utils import iter_geom
 from pychron.core.helpers.datetime_tools import ISO_FORMAT_STR
 from pychron.core.helpers.filetools import list_directory2, add_extension, \
     list_directory
-from pychron.dvc import dvc_dump, dvc_load
+from pychron.dvc import dvc_dump, dvc_load, analysis_path
 from pychron.git_archive.repo_manager import GitRepoManager
 from pychron.paths import paths, r_mkdir
 from pychron.pychron_constants import INTERFERENCE_KEYS, RATIO_KEYS, DEFAULT_MONITOR_NAME, DATE_FORMAT
@@ -74,6 +74,42 @@ def irradiation_chronology(name):
     return Chronology(p)
 
 
+def frozen_production(rid, repository_identifier):
+    path = analysis_path(rid, repository_identifier, 'productions')
+    if path:
+        return Production(path)
+
+
+def flux_from_positions(position, positions):
+    j, je, lambda_k = 0, 0, None
+    monitor_name, monitor_material, monitor_age = DEFAULT_MONITOR_NAME, 'sanidine', ufloat(28.201, 0)
+    if positions:
+        pos = next((p for p in positions if p['position'] == position), None)
+        if pos:
+            j, je = pos.get('j', 0), pos.get('j_err', 0)
+            dc = pos.get('decay_constants')
+            if dc:
+                # this was a temporary fix and likely can be removed
+                if isinstance(dc, float):
+                    v, e = dc, 0
+                else:
+                    v, e = dc.get('lambda_k_total', 0), dc.get('lambda_k_total_error', 0)
+                lambda_k = ufloat(v, e)
+            mon = pos.get('monitor')
+            if mon:
+                monitor_name = mon.get('name', DEFAULT_MONITOR_NAME)
+                sa = mon.get('age', 28.201)
+                se = mon.get('error', 0)
+                monitor_age = ufloat(sa, se, tag='monitor_age')
+                monitor_material = mon.get('material', 'sanidine')
+
+    fd = {'j': ufloat(j, je, tag='J'), 'lambda_k': lambda_k,
+          'monitor_name': monitor_name,
+          'monitor_material': monitor_material,
+          'monitor_age': monitor_age}
+    return fd
+
+
 def dump_chronology(path, doses):
     if doses is None:
         doses = []
@@ -336,8 +372,27 @@ class Cached(object):
 cached = Cached
 
 
+class MetaIndex(object):
+    """
+    in memory index of irradiation metadata.
+
+    levels: (irradiation, level) -> (positions, (production name, Production))
+    chronologies: irradiation -> Chronology
+
+    an index is only valid for the meta repo commit ``head``
+    """
+
+    def __init__(self, head=None):
+        self.head = head
+        self.levels = {}
+        self.chronologies = {}
+        self.production_names = {}
+        self.productions = {}
+
+
 class MetaRepo(GitRepoManager):
     clear_cache = Bool
+    _index = None
 
     def get_molecular_weights(self):
         p = os.path.join(paths.meta_root, 'molecular_weights.json')
@@ -393,6 +448,7 @@ class MetaRepo(GitRepoManager):
 
         prod.update(params)
         prod.dump()
+        self.invalidate_index()
         if add:
             self.add(p, commit=commit)
 
@@ -414,6 +470,7 @@ class MetaRepo(GitRepoManager):
             setattr(p, ke, e)
 
         p.dump()
+        self.invalidate_index()
         if add:
             self.add(p.path, commit=commit)
 
@@ -441,12 +498,14 @@ class MetaRepo(GitRepoManager):
                                                                                       production))
                 obj[level] = production
                 dvc_dump(obj, p)
+                self.invalidate_index()
 
                 if add:
                     self.add(p, commit=False)
         else:
             obj[level] = production
             dvc_dump(obj, p)
+            self.invalidate_index()
             if add:
                 self.add(p, commit=False)
 
@@ -470,6 +529,7 @@ class MetaRepo(GitRepoManager):
         p = self.get_level_path(irrad, level)
         l = dict(z=0, positions=[])
         dvc_dump(l, p)
+        self.invalidate_index()
         if add:
             self.add(p, commit=False)
 
@@ -478,6 +538,7 @@ class MetaRepo(GitRepoManager):
 
         # Chronology.dump(p, doses)
         dump_chronology(p, doses)
+        self.invalidate_index()
         if add:
             self.add(p, commit=False)
 
@@ -511,6 +572,7 @@ class MetaRepo(GitRepoManager):
         #                                                       for ai in analyses]} for ji in jd]
 
         dvc_dump({'z': z, 'positions': positions}, p)
+        self.invalidate_index()
         if add:
             self.add(p, commit=False)
 
@@ -556,6 +618,7 @@ class MetaRepo(GitRepoManager):
             add = True
 
         dvc_dump(obj, p)
+        self.invalidate_index()
         if add:
             self.add(p, commit=False)
 
@@ -592,6 +655,7 @@ class MetaRepo(GitRepoManager):
                 ip['j_err'] = e
 
             dvc_dump(jd, p)
+            self.invalidate_index()
             if add:
                 self.add(p, commit=False)
 
@@ -634,12 +698,14 @@ class MetaRepo(GitRepoManager):
 
         obj = {'z': z, 'positions': npositions}
         dvc_dump(obj, p)
+        self.invalidate_index()
         if add:
             self.add(p, commit=False)
 
     def update_chronology(self, name, doses):
         p = self._chron_name(name)
         dump_chronology(p, doses)
+        self.invalidate_index()
         # Chronology.dump(p, doses)
 
         self.add(p, commit=False)
@@ -674,6 +740,57 @@ class MetaRepo(GitRepoManager):
     #         pr = Production(os.path.join(root, di))
     #         prs.append(pr)
     #     return prs
+    def get_irradiation_metadata(self, levels):
+        """
+        bulk lookup of the flux positions, productions and chronologies for a set of irradiation levels.
+
+        results are served from an in memory index that is rebuilt when the meta repo HEAD changes, a file is
+        added with ``add``/``add_paths`` or the metadata is written by a MetaRepo method. the returned objects are
+        shared between calls and should not be modified
+
+        @param levels: iterable of (irradiation, level)
+        @return: fluxes, productions, chronologies. fluxes[irradiation][level] = positions,
+        productions[irradiation][level] = (production name, Production), chronologies[irradiation] = Chronology
+        """
+        index = self._get_index()
+
+        fluxes, productions, chronos = {}, {}, {}
+        n = 0
+        for irrad, level in set(levels):
+            key = (irrad, level)
+            entry = index.levels.get(key)
+            if entry is None:
+                entry = self._get_level_positions(irrad, level), self._get_indexed_production(index, irrad, level)
+                index.levels[key] = entry
+                n += 1
+
+            positions, production = entry
+            fluxes.setdefault(irrad, {})[level] = positions
+            productions.setdefault(irrad, {})[level] = production
+
+            if irrad not in chronos:
+                chron = index.chronologies.get(irrad)
+                if chron is None:
+                    chron = self.get_chronology(irrad)
+                    index.chronologies[irrad] = chron
+                chronos[irrad] = chron
+
+        if n:
+            self.debug('indexed {} irradiation levels. head={}'.format(n, index.head))
+
+        return fluxes, productions, chronos
+
+    def invalidate_index(self):
+        self._index = None
+
+    def add(self, *args, **kw):
+        self.invalidate_index()
+        return super(MetaRepo, self).add(*args, **kw)
+
+    def add_paths(self, *args, **kw):
+        self.invalidate_index()
+        return super(MetaRepo, self).add_paths(*args, **kw)
+
     def get_flux_positions(self, irradiation, level):
         positions = self._get_level_positions(irradiation, level)
         return positions
@@ -683,36 +800,7 @@ class MetaRepo(GitRepoManager):
         return self.get_flux_from_positions(position, positions)
 
     def get_flux_from_positions(self, position, positions):
-
-        # path = os.path.join(paths.meta_root, irradiation, add_extension(level, '.json'))
-        j, je, lambda_k = 0, 0, None
-        monitor_name, monitor_material, monitor_age = DEFAULT_MONITOR_NAME, 'sanidine', ufloat(28.201, 0)
-        # positions = self._get_level_positions(irradiation, level)
-        if positions:
-            pos = next((p for p in positions if p['position'] == position), None)
-            if pos:
-                j, je = pos.get('j', 0), pos.get('j_err', 0)
-                dc = pos.get('decay_constants')
-                if dc:
-                    # this was a temporary fix and likely can be removed
-                    if isinstance(dc, float):
-                        v, e = dc, 0
-                    else:
-                        v, e = dc.get('lambda_k_total', 0), dc.get('lambda_k_total_error', 0)
-                    lambda_k = ufloat(v, e)
-                mon = pos.get('monitor')
-                if mon:
-                    monitor_name = mon.get('name', DEFAULT_MONITOR_NAME)
-                    sa = mon.get('age', 28.201)
-                    se = mon.get('error', 0)
-                    monitor_age = ufloat(sa, se, tag='monitor_age')
-                    monitor_material = mon.get('material', 'sanidine')
-
-        fd = {'j': ufloat(j, je, tag='J'), 'lambda_k': lambda_k,
-              'monitor_name': monitor_name,
-              'monitor_material': monitor_material,
-              'monitor_age': monitor_age}
-        return fd
+        return flux_from_positions(position, positions)
 
     def get_gains(self, name):
         g = self.get_gain_obj(name)
@@ -798,7 +886,39 @@ class MetaRepo(GitRepoManager):
     def sensitivity_path(self):
         return os.path.join(paths.meta_root, 'sensitivity.json')
 
+    # handlers
+    def _clear_cache_changed(self, new):
+        if new:
+            self.invalidate_index()
+
     # private
+    def _get_index(self):
+        try:
+            head = self.get_head()
+        except BaseException:
+            head = None
+
+        index = self._index
+        if index is None or index.head != head:
+            index = MetaIndex(head)
+            self._index = index
+        return index
+
+    def _get_indexed_production(self, index, irrad, level):
+        names = index.production_names.get(irrad)
+        if names is None:
+            names = dvc_load(os.path.join(paths.meta_root, irrad, 'productions.json'))
+            index.production_names[irrad] = names
+
+        pname = names.get(level, '')
+        key = (irrad, pname)
+        prod = index.productions.get(key)
+        if prod is None:
+            prod = Production(os.path.join(paths.meta_root, irrad, 'productions', add_extension(pname, ext='.json')))
+            index.productions[key] = prod
+
+        return pname, prod
+
     def _get_level_positions(self, irrad, level):
         p = self.get_level_path(irrad, level)
         obj = dvc_load(p)
@@ -0,0 +1,167 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+import traceback
+from multiprocessing import Pool, cpu_count
+
+# ============= local library imports  ==========================
+from pychron.paths import paths
+
+# per worker process state. set by _init_worker
+_arar_constants = None
+_sens = None
+
+
+class LoadTask(object):
+    """
+    picklable description of a single analysis to load
+    """
+    __slots__ = ('record_id', 'repository_identifier', 'group_id', 'load_name', 'load_holder', 'branch',
+                 'irradiation_position', 'chronology', 'production', 'positions',
+                 'quick', 'calculate_f_only')
+
+    def __init__(self, **kw):
+        for k in self.__slots__:
+            setattr(self, k, kw.get(k))
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state):
+            setattr(self, k, v)
+
+
+def _init_worker(root, arar_constants, sens):
+    global _arar_constants, _sens
+
+    if paths.root_dir != root:
+        paths.build(root)
+
+    _arar_constants = arar_constants
+    _sens = sens
+
+
+def compact_analysis(a):
+    """
+    drop objects that are rebuilt lazily and are not worth pickling
+    """
+    a._analysis_view = None
+    for iso in a.itervalues():
+        iso._regressor = None
+        iso.baseline._regressor = None
+        iso.blank._regressor = None
+
+
+def load_analysis(task):
+    """
+    worker entry point
+
+    @param task: LoadTask
+    @return: (True, DVCAnalysis) or (False, formatted traceback)
+    """
+    from pychron.dvc.dvc_analysis import DVCAnalysis
+    from pychron.dvc.meta_repo import frozen_production, flux_from_positions
+
+    try:
+        a = DVCAnalysis(task.record_id, task.repository_identifier)
+        a.group_id = task.group_id
+
+        if not task.quick:
+            a.load_name = task.load_name
+            a.load_holder = task.load_holder
+            a.branch = task.branch
+
+            if _arar_constants is not None:
+                a.arar_constants = _arar_constants.clone_traits()
+
+            sens = _sens.get(a.mass_spectrometer.lower(), []) if _sens else []
+            a.set_sensitivity(sens)
+
+            if a.irradiation and a.irradiation not in ('NoIrradiation',):
+                a.set_chronology(task.chronology)
+
+                prod = frozen_production(task.record_id, a.repository_identifier)
+                if prod:
+                    pname = prod.name
+                else:
+                    pname, prod = task.production
+
+                a.set_production(pname, prod)
+                a.set_flux(flux_from_positions(task.irradiation_position, task.positions))
+
+                if task.calculate_f_only:
+                    a.calculate_F()
+                else:
+                    a.calculate_age()
+
+        compact_analysis(a)
+        return True, a
+    except BaseException:
+        return False, traceback.format_exc()
+
+
+class ParallelAnalysisLoader(object):
+    """
+    Load DVCAnalyses in a pool of worker processes.
+
+    The parent process resolves everything that needs the database, the meta repo or user interaction (repository
+    identifier, branch, chronology, production, flux positions) and hands a LoadTask to a worker. The worker parses
+    the analysis json, applies the irradiation metadata, calculates the age (or F) and ships the analysis back.
+
+    usage::
+
+        with ParallelAnalysisLoader(nprocesses, arar_constants, sens) as loader:
+            for ok, result in loader.imap(tasks):
+                ...
+
+    results are returned in the same order as ``tasks``
+    """
+
+    def __init__(self, nprocesses=None, arar_constants=None, sens=None, chunksize=None):
+        if not nprocesses:
+            nprocesses = cpu_count()
+
+        self.nprocesses = nprocesses
+        self.chunksize = chunksize
+        self._initargs = (paths.root_dir, arar_constants, sens)
+        self._pool = None
+
+    def __enter__(self):
+        self._pool = Pool(processes=self.nprocesses,
+                          initializer=_init_worker,
+                          initargs=self._initargs)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # terminate instead of close. if the user canceled or accepted a partial load the remaining results
+        # are not wanted
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+
+    def imap(self, tasks):
+        chunksize = self.chunksize
+        if not chunksize:
+            # keep the workers busy while still reporting progress regularly
+            chunksize = max(1, min(25, len(tasks) // (self.nprocesses * 4)))
+
+        return self._pool.imap(load_analysis, tasks, chunksize)
+
+# ============= EOF =============================================
@@ -127,6 +127,13 @@ class BookmarkAction(LocalRepositoryAction):
     tooltip = 'Add a bookmark to the data reduction history. e.g. git tag -a <name> -m <message>'
     image = icon('bookmark')
 
+
+class BuildDataSidecarsAction(LocalRepositoryAction):
+    name = 'Build Sidecars'
+    method = 'build_data_sidecars'
+    tooltip = 'Write binary sidecars of the raw data for faster loading. The json files are not modified'
+    image = icon('lightning')
+
 # class SyncMetaDataAction(Action):
 #     name = 'Sync Repo/DB Metadata'
 #
@@ -235,6 +242,21 @@ class WorkOfflineAction(Action):
                 wo.edit_traits()
 
 
+class AnalysisCacheAction(Action):
+    name = 'Analysis Cache...'
+
+    def perform(self, event):
+        app = event.task.window.application
+        dvc = app.get_service(DVC_PROTOCOL)
+
+        cache = dvc.analysis_cache
+        if cache is None:
+            information(None, 'The analysis cache is disabled. Enable it in Preferences/DVC')
+        else:
+            from pychron.dvc.tasks.analysis_cache_view import AnalysisCacheView
+            AnalysisCacheView(cache=cache).edit_traits()
+
+
 class UseOfflineDatabase(Action):
     name = 'Use Offline Database'
 
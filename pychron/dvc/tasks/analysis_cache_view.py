@@ -0,0 +1,66 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+from __future__ import absolute_import
+from traits.api import HasTraits, Instance, Str, Int, Float, Button
+from traitsui.api import View, Item, VGroup, UItem, HGroup, spring
+
+# ============= standard library imports ========================
+# ============= local library imports  ==========================
+from pychron.dvc.analysis_cache import AnalysisCache
+
+
+class AnalysisCacheView(HasTraits):
+    cache = Instance(AnalysisCache)
+    path = Str
+    n = Int
+    size_mb = Float
+    file_size_mb = Float
+    max_size_mb = Int
+    hits = Int
+    misses = Int
+    evictions = Int
+
+    refresh_button = Button('Refresh')
+    clear_button = Button('Clear')
+
+    def __init__(self, *args, **kw):
+        super(AnalysisCacheView, self).__init__(*args, **kw)
+        self._refresh_button_fired()
+
+    def _refresh_button_fired(self):
+        self.trait_set(**self.cache.stats())
+
+    def _clear_button_fired(self):
+        self.cache.clear()
+        self._refresh_button_fired()
+
+    def traits_view(self):
+        v = View(VGroup(Item('path', style='readonly'),
+                        Item('n', label='N. Analyses', style='readonly'),
+                        Item('size_mb', label='Size (MB)', style='readonly', format_str='%0.1f'),
+                        Item('file_size_mb', label='File Size (MB)', style='readonly', format_str='%0.1f'),
+                        Item('max_size_mb', label='Max. Size (MB)', style='readonly'),
+                        Item('hits', style='readonly'),
+                        Item('misses', style='readonly'),
+                        Item('evictions', style='readonly'),
+                        HGroup(spring, UItem('refresh_button'), UItem('clear_button'))),
+                 title='Analysis Cache',
+                 resizable=True)
+        return v
+
+# ============= EOF =============================================
@@ -30,9 +30,10 @@ from pyface.tasks.action.schema_addition import SchemaAddition
 from pychron.dvc.dvc import DVC
 from pychron.dvc.dvc_persister import DVCPersister
 from pychron.dvc.tasks import list_local_repos
-from pychron.dvc.tasks.actions import WorkOfflineAction, UseOfflineDatabase, ShareChangesAction
+from pychron.dvc.tasks.actions import WorkOfflineAction, UseOfflineDatabase, ShareChangesAction, \
+    AnalysisCacheAction
 from pychron.dvc.tasks.dvc_preferences import DVCConnectionPreferencesPane, DVCExperimentPreferencesPane, \
-    DVCRepositoryPreferencesPane
+    DVCRepositoryPreferencesPane, DVCPerformancePreferencesPane
 from pychron.dvc.tasks.repo_task import ExperimentRepoTask
 from pychron.envisage.tasks.base_task_plugin import BaseTaskPlugin
 from pychron.git.hosts import IGitHost
@@ -134,7 +135,8 @@ class DVCPlugin(BaseTaskPlugin):
         return self._preferences_factory('dvc')
 
     def _preferences_panes_default(self):
-        return [DVCConnectionPreferencesPane, DVCExperimentPreferencesPane, DVCRepositoryPreferencesPane]
+        return [DVCConnectionPreferencesPane, DVCExperimentPreferencesPane, DVCRepositoryPreferencesPane,
+                DVCPerformancePreferencesPane]
 
     def _tasks_default(self):
         return [TaskFactory(id='pychron.experiment_repo.task',
@@ -148,6 +150,8 @@ class DVCPlugin(BaseTaskPlugin):
                                   path='MenuBar/tools.menu'),
                    SchemaAddition(factory=ShareChangesAction,
                                   path='MenuBar/tools.menu'),
+                   SchemaAddition(factory=AnalysisCacheAction,
+                                  path='MenuBar/tools.menu'),
                    # SchemaAddition(factory=SyncMetaDataAction,
                    #                path='MenuBar/tools.menu')
                    # SchemaAddition(factory=PullAction),
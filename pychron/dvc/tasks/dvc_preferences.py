@@ -16,7 +16,7 @@
 
 # ============= enthought library imports =======================
 from envisage.ui.tasks.preferences_pane import PreferencesPane
-from traits.api import Str, Password, Bool
+from traits.api import Str, Password, Bool, Int
 from traitsui.api import View, Item, VGroup, UItem, TextEditor, EnumEditor, TableEditor, HGroup, spring, Spring, Label
 from traitsui.extras.checkbox_column import CheckboxColumn
 from traitsui.table_column import ObjectColumn
@@ -151,6 +151,9 @@ class DVCConnectionPreferencesPane(ConnectionPreferencesPane):
 class DVCExperimentPreferences(BasePreferencesHelper):
     preferences_path = 'pychron.dvc.experiment'
     use_dvc_persistence = Bool
+    use_commit_batching = Bool
+    commit_batch_runs = Int(10)
+    commit_batch_period = Int(10)
 
 
 class DVCExperimentPreferencesPane(PreferencesPane):
@@ -158,7 +161,18 @@ class DVCExperimentPreferencesPane(PreferencesPane):
     category = 'Experiment'
 
     def traits_view(self):
+        batch_grp = VGroup(Item('use_commit_batching', label='Batch Commits',
+                                tooltip='Commit and push the analyses of several runs together instead of after '
+                                        'every run'),
+                           Item('commit_batch_runs', label='N Runs',
+                                enabled_when='use_commit_batching',
+                                tooltip='Commit once this many runs are waiting'),
+                           Item('commit_batch_period', label='Period (min)',
+                                enabled_when='use_commit_batching',
+                                tooltip='Commit once the oldest waiting run is this old'),
+                           label='Commits', show_border=True)
         v = View(VGroup(Item('use_dvc_persistence', label='Use DVC Persistence'),
+                        batch_grp,
                         label='DVC', show_border=True))
         return v
 
@@ -176,4 +190,44 @@ class DVCRepositoryPreferencesPane(PreferencesPane):
         v = View(VGroup(Item('check_for_changes', label='Check for Changes'),
                         label='', show_border=True))
         return v
+
+
+class DVCPerformancePreferences(BasePreferencesHelper):
+    preferences_path = 'pychron.dvc.performance'
+    use_parallel_load = Bool
+    parallel_load_nprocesses = Int
+    parallel_load_threshold = Int(100)
+    use_data_sidecars = Bool
+    use_analysis_cache = Bool
+    analysis_cache_max_size_mb = Int(500)
+
+
+class DVCPerformancePreferencesPane(PreferencesPane):
+    model_factory = DVCPerformancePreferences
+    category = 'DVC'
+
+    def traits_view(self):
+        load_grp = VGroup(Item('use_parallel_load', label='Use Parallel Load',
+                               tooltip='Load and calculate analyses in worker processes'),
+                          Item('parallel_load_nprocesses', label='N Processes',
+                               enabled_when='use_parallel_load',
+                               tooltip='Number of worker processes. 0 uses one process per CPU'),
+                          Item('parallel_load_threshold', label='Threshold',
+                               enabled_when='use_parallel_load',
+                               tooltip='Only use parallel loading when loading at least this many analyses'),
+                          label='Analysis Loading', show_border=True)
+        data_grp = VGroup(Item('use_data_sidecars', label='Write Data Sidecars',
+                               tooltip='Write a binary copy of the raw data when saving an analysis. '
+                                       'Sidecars are stored outside of the repositories and are used '
+                                       'instead of the json data when up to date'),
+                          label='Raw Data', show_border=True)
+        cache_grp = VGroup(Item('use_analysis_cache', label='Use Analysis Cache',
+                                tooltip='Cache loaded and calculated analyses on disk. Entries are keyed by the '
+                                        'contents of the analysis and metadata files so they are never stale'),
+                           Item('analysis_cache_max_size_mb', label='Max. Size (MB)',
+                                enabled_when='use_analysis_cache'),
+                           label='Analysis Cache', show_border=True)
+        v = View(VGroup(load_grp, data_grp, cache_grp))
+        return v
+
 # ============= EOF =============================================
@@ -32,7 +32,7 @@ from pychron.core.progress import progress_loader
 from pychron.dvc.tasks import list_local_repos
 from pychron.dvc.tasks.actions import CloneAction, AddBranchAction, CheckoutBranchAction, PushAction, PullAction, \
     FindChangesAction, LoadOriginAction, DeleteLocalChangesAction, ArchiveRepositoryAction, SyncSampleInfoAction, \
-    SyncRepoAction, RepoStatusAction, BookmarkAction
+    SyncRepoAction, RepoStatusAction, BookmarkAction, BuildDataSidecarsAction
 from pychron.dvc.tasks.panes import RepoCentralPane, SelectionPane
 from pychron.envisage.tasks.base_task import BaseTask
 # from pychron.git_archive.history import from_gitlog
@@ -83,7 +83,8 @@ class ExperimentRepoTask(BaseTask):
                           ArchiveRepositoryAction(),
                           RepoStatusAction(),
                           BookmarkAction()),
-                 SToolBar(SyncSampleInfoAction())]
+                 SToolBar(SyncSampleInfoAction(),
+                          BuildDataSidecarsAction())]
 
     commits = List
     git_tags = List
@@ -229,6 +230,12 @@ class ExperimentRepoTask(BaseTask):
         if selected:
             self.dvc.status_view(selected.name)
 
+    def build_data_sidecars(self):
+        selected = self._has_selected_local()
+        if selected:
+            n = self.dvc.backfill_data_sidecars(selected.name)
+            self.information_dialog('Wrote {} sidecars for "{}"'.format(n, selected.name))
+
     def add_bookmark(self):
         selected = self._has_selected_local()
         if selected:
@@ -0,0 +1,78 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+
+from pychron.dvc.analysis_cache import AnalysisCache, blob_sha, MISSING
+
+
+class FakeAnalysis(object):
+    def __init__(self, record_id, payload=b''):
+        self.record_id = record_id
+        self.payload = payload
+
+    def itervalues(self):
+        return iter([])
+
+
+class AnalysisCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = AnalysisCache(path=os.path.join(self.root, 'cache.sqlite3'))
+        self.path = os.path.join(self.root, '45-01A.json')
+        self._write('{"a": 1}')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, txt):
+        with open(self.path, 'w') as wfile:
+            wfile.write(txt)
+
+    def test_blob_sha(self):
+        try:
+            sha = subprocess.check_output(['git', 'hash-object', self.path]).decode('utf-8').strip()
+        except (OSError, subprocess.CalledProcessError):
+            self.skipTest('git not available')
+        self.assertEqual(blob_sha(self.path), sha)
+
+    def test_missing(self):
+        self.assertEqual(self.cache.file_sha(os.path.join(self.root, 'foo.json')), MISSING)
+
+    def test_key_changes(self):
+        k1 = self.cache.make_key([self.path], False)
+        self.assertEqual(k1, self.cache.make_key([self.path], False))
+        self.assertNotEqual(k1, self.cache.make_key([self.path], True))
+
+        self._write('{"a": 2}')
+        t = time.time() + 10
+        os.utime(self.path, (t, t))
+        self.assertNotEqual(k1, self.cache.make_key([self.path], False))
+
+    def test_put_get(self):
+        key = self.cache.make_key([self.path])
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.put(key, '45-01A', FakeAnalysis('45-01A'))
+        self.assertTrue(self.cache.contains(key))
+        self.assertEqual(self.cache.get(key).record_id, '45-01A')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_evict(self):
+        self.cache.max_size_mb = 1
+        payload = os.urandom(300 * 1024)
+        for i in range(5):
+            self.cache.put('key{}'.format(i), str(i), FakeAnalysis(str(i), payload))
+
+        self.assertFalse(self.cache.contains('key0'))
+        self.assertTrue(self.cache.contains('key4'))
+        self.assertLessEqual(self.cache.stats()['size_mb'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from pychron.globals import globalv
+
+globalv.use_logger_display = False
+
+from pychron.dvc.dvc_database import DVCDatabase
+from pychron.dvc.dvc_orm import Base, AnalysisTbl, IrradiationTbl, LevelTbl, IrradiationPositionTbl, SampleTbl, \
+    ProjectTbl, MaterialTbl, PrincipalInvestigatorTbl, RepositoryTbl, RepositoryAssociationTbl, AnalysisChangeTbl, \
+    MeasuredPositionTbl, LoadTbl, LoadHolderTbl, MassSpectrometerTbl
+
+NANALYSES = 60
+
+
+def make_view(a):
+    return a.make_record_view('repo1')
+
+
+def make_record(a):
+    """
+    the attributes DVC.make_analyses reads from a record
+    """
+    return (a.record_id, a.repository_identifier, a.irradiation, a.irradiation_level,
+            a.irradiation_position_position, a.load_name, a.load_holder, a.sample, a.project, a.tag)
+
+
+class BulkQueryTestCase(unittest.TestCase):
+    """
+    counts the SELECTs issued to build records for NANALYSES analyses. run this module directly to print the counts
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        db = DVCDatabase(kind='sqlite', path=os.path.join(cls.root, 'bulk.sqlite'))
+        db.connect()
+        with db.session_ctx(use_parent_session=False) as sess:
+            Base.metadata.create_all(sess.bind)
+            cls._populate(sess)
+            sess.commit()
+            cls.engine = sess.bind
+
+        cls.db = db
+        cls.statements = []
+
+        def counter(conn, cursor, statement, *args):
+            cls.statements.append(statement)
+
+        event.listen(cls.engine, 'before_cursor_execute', counter)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root, ignore_errors=True)
+
+    @classmethod
+    def _populate(cls, sess):
+        sess.add(MassSpectrometerTbl(name='jan', kind='ArgusVI'))
+        pi = PrincipalInvestigatorTbl(last_name='Ross', first_initial='J')
+        project = ProjectTbl(name='Bulk', principal_investigator=pi)
+        material = MaterialTbl(name='sanidine')
+        irrad = IrradiationTbl(name='NM-100')
+        holder = LoadHolderTbl(name='221')
+        load = LoadTbl(name='1000', holderName='221')
+        sess.add_all((pi, project, material, irrad, holder, load))
+        for name in ('repo1', 'repo2'):
+            sess.add(RepositoryTbl(name=name))
+        sess.flush()
+
+        t = datetime.now()
+        cls.uuids = []
+        for i in range(NANALYSES):
+            if not i % 10:
+                level = LevelTbl(name='ABCDEF'[i // 10], irradiation=irrad)
+                sample = SampleTbl(name='sample{}'.format(i), project=project, material=material)
+                ip = IrradiationPositionTbl(identifier=str(10000 + i), position=i // 10 + 1,
+                                            level=level, sample=sample)
+                sess.add_all((level, sample, ip))
+
+            uuid = '{:032d}'.format(i)
+            cls.uuids.append(uuid)
+            a = AnalysisTbl(uuid=uuid, aliquot=i % 10 + 1, increment=-1, analysis_type='unknown',
+                            mass_spectrometer='jan', timestamp=t + timedelta(minutes=i))
+            a.irradiation_position = ip
+            a.change = AnalysisChangeTbl(tag='ok')
+            a.repository_associations.append(RepositoryAssociationTbl(repository='repo1'))
+            if i == 0:
+                # associated with two repositories
+                a.repository_associations.append(RepositoryAssociationTbl(repository='repo2'))
+            a.measured_positions.append(MeasuredPositionTbl(position=i + 1, loadName='1000'))
+            sess.add(a)
+
+    def _count(self, func):
+        del self.statements[:]
+        with self.db.session_ctx():
+            ret = func()
+        return ret, len(self.statements)
+
+    def test_lazy_loading(self):
+        def func():
+            with self.db.session_ctx() as sess:
+                q = sess.query(AnalysisTbl).filter(AnalysisTbl.uuid.in_(self.uuids))
+                return [make_record(make_view(a)) for a in q.all()]
+
+        records, n = self._count(func)
+        self.assertEqual(len(records), NANALYSES)
+        self.assertGreater(n, NANALYSES)
+
+    def test_eager_loading(self):
+        def func():
+            return [make_record(make_view(a)) for a in self.db.get_analyses_uuid(self.uuids)]
+
+        records, n = self._count(func)
+        self.assertEqual(len(records), NANALYSES)
+        # the joined query plus one per subquery loaded collection
+        self.assertLessEqual(n, 4)
+
+    def test_analysis_records(self):
+        records, n = self._count(lambda: self.db.get_analysis_records(self.uuids))
+        self.assertEqual(n, 1)
+        self.assertEqual(len(records), NANALYSES)
+
+        r = records[self.uuids[11]]
+        self.assertEqual(r.record_id, '10010-02')
+        self.assertEqual(r.irradiation, 'NM-100')
+        self.assertEqual(r.irradiation_level, 'B')
+        self.assertEqual(r.irradiation_position_position, 2)
+        self.assertEqual(r.repository_identifier, 'repo1')
+        self.assertEqual(r.load_name, '1000')
+        self.assertEqual(r.load_holder, '221')
+        self.assertEqual(r.sample, 'sample10')
+        self.assertEqual(r.project, 'Bulk')
+
+        r = records[self.uuids[0]]
+        self.assertEqual(r.repository_identifier, None)
+        self.assertEqual(r.repository_ids, ['repo1', 'repo2'])
+
+    def test_matches_orm(self):
+        with self.db.session_ctx():
+            views = [make_view(a) for a in self.db.get_analyses_uuid(self.uuids)]
+            orm = {v.uuid: make_record(v) for v in views}
+
+        records = self.db.get_analysis_records(self.uuids)
+        bulk = {}
+        for v in views:
+            # as in DVC._get_bulk_records
+            r = records[v.uuid]
+            r.update(v)
+            bulk[v.uuid] = make_record(r)
+
+        self.assertEqual(orm, bulk)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
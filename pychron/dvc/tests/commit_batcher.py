@@ -0,0 +1,172 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from pychron.dvc.commit_batcher import CommitBatcher, commit_groups, PendingChange
+from pychron.globals import globalv
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+
+class FakeRepo(object):
+    def __init__(self, root, fail=False):
+        self.path = root
+        self.fail = fail
+        self.commits = []
+        self.pulls = 0
+
+    def smart_pull(self, **kw):
+        self.pulls += 1
+
+    def commit_paths(self, ps, msg):
+        if self.fail:
+            raise IOError('index.lock could not be obtained')
+        self.commits.append((msg, list(ps)))
+
+
+class CommitBatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.repos = {}
+        self.pushed = []
+        self.failing = set()
+
+        self.batcher = self._make_batcher()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _make_batcher(self, **kw):
+        def factory(root):
+            r = FakeRepo(root, fail=root in self.failing)
+            self.repos.setdefault(root, []).append(r)
+            return r
+
+        return CommitBatcher(log_path=os.path.join(self.root, 'pending.jsonl'),
+                             repo_factory=factory,
+                             pusher=lambda r: self.pushed.append(r.path), **kw)
+
+    def _add_run(self, batcher, repo, runid):
+        ps = []
+        for ext in ('json', 'intercepts.json', 'blanks.json'):
+            p = os.path.join(self.root, '{}.{}'.format(runid, ext))
+            with open(p, 'w') as wfile:
+                wfile.write('{}')
+            ps.append(p)
+
+        batcher.add(repo, ps[0], '<COLLECTION>', key=runid)
+        batcher.add(repo, ps[1], '<ISOEVO> default collection fits', key=runid)
+        batcher.add(repo, ps[2], '<BLANKS> preceding b-{}'.format(runid), key=runid)
+        return ps
+
+    def test_commit_groups(self):
+        cs = [PendingChange('r', ['a.json'], '<COLLECTION>'),
+              PendingChange('r', ['a.i.json'], '<ISOEVO> default collection fits'),
+              PendingChange('r', ['b.json'], '<COLLECTION>'),
+              PendingChange('r', ['a.b.json'], '<BLANKS> preceding 1'),
+              PendingChange('r', ['b.b.json'], '<BLANKS> preceding 2'),
+              PendingChange('r', ['c.b.json'], '<BLANKS> preceding 1')]
+
+        gs = commit_groups(cs)
+        self.assertEqual(gs, [('<COLLECTION>', ['a.json', 'b.json']),
+                              ('<ISOEVO> default collection fits', ['a.i.json']),
+                              ('<BLANKS> preceding 1', ['a.b.json', 'c.b.json']),
+                              ('<BLANKS> preceding 2', ['b.b.json'])])
+
+    def test_commit_groups_log(self):
+        cs = [PendingChange('r', ['a.json'], '<COLLECTION>'),
+              PendingChange('r', ['a.log'], '<COLLECTION> log'),
+              PendingChange('r', ['b.json'], '<COLLECTION>')]
+
+        # the data files are not committed under the log message
+        gs = commit_groups(cs)
+        self.assertEqual(gs, [('<COLLECTION>', ['a.json', 'b.json']),
+                              ('<COLLECTION> log', ['a.log'])])
+
+    def test_due_runs(self):
+        b = self.batcher
+        b.max_runs = 2
+        self._add_run(b, 'repo', 'a-01')
+        self.assertFalse(b.is_due())
+        self._add_run(b, 'repo', 'a-02')
+        self.assertTrue(b.is_due())
+
+    def test_due_age(self):
+        b = self.batcher
+        b.max_age = 0.05
+        self._add_run(b, 'repo', 'a-01')
+        self.assertFalse(b.is_due())
+        time.sleep(0.1)
+        self.assertTrue(b.is_due())
+
+    def test_flush(self):
+        b = self.batcher
+        for i in range(3):
+            self._add_run(b, 'repo1', 'a-0{}'.format(i))
+        self._add_run(b, 'repo2', 'b-01')
+
+        keys = b.flush()
+        self.assertEqual(keys, ['a-00', 'a-01', 'a-02', 'b-01'])
+        self.assertEqual(b.npending, 0)
+        self.assertFalse(os.path.isfile(b.log_path))
+
+        r1 = self.repos['repo1'][0]
+        self.assertEqual(r1.pulls, 1)
+        self.assertEqual([c[0] for c in r1.commits], ['<COLLECTION>',
+                                                      '<ISOEVO> default collection fits',
+                                                      '<BLANKS> preceding b-a-00',
+                                                      '<BLANKS> preceding b-a-01',
+                                                      '<BLANKS> preceding b-a-02'])
+        self.assertEqual(len(r1.commits[0][1]), 3)
+        self.assertEqual(self.pushed, ['repo1', 'repo2'])
+
+    def test_flush_failed_repository(self):
+        b = self.batcher
+        self.failing.add('repo1')
+        self._add_run(b, 'repo1', 'a-01')
+        self._add_run(b, 'repo2', 'b-01')
+
+        self.assertEqual(b.flush(), ['b-01'])
+        self.assertEqual(b.keys, ['a-01'])
+        self.assertEqual(self.pushed, ['repo2'])
+
+        # only the failed repository is left in the log
+        b2 = self._make_batcher()
+        self.assertEqual(b2.recover(), 3)
+        self.assertEqual(b2.keys, ['a-01'])
+
+    def test_missing_files_skipped(self):
+        b = self.batcher
+        ps = self._add_run(b, 'repo', 'a-01')
+        os.remove(ps[1])
+        b.flush()
+        msgs = [c[0] for c in self.repos['repo'][0].commits]
+        self.assertNotIn('<ISOEVO> default collection fits', msgs)
+
+    def test_recover(self):
+        self._add_run(self.batcher, 'repo', 'a-01')
+        self._add_run(self.batcher, 'repo', 'a-02')
+
+        # a crash while appending leaves a partial line
+        with open(self.batcher.log_path, 'a') as wfile:
+            wfile.write('{"repository": "repo", "pa')
+
+        b = self._make_batcher()
+        self.assertEqual(b.recover(), 6)
+        self.assertEqual(b.keys, ['a-01', 'a-02'])
+
+        self.assertEqual(b.flush(), ['a-01', 'a-02'])
+        self.assertEqual(len(self.repos['repo'][0].commits), 4)
+
+    def test_recover_no_log(self):
+        self.assertEqual(self.batcher.recover(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from numpy import linspace
+
+from pychron.core.helpers.binpack import pack_xy, encode_blob
+from pychron.dvc import dvc_dump
+from pychron.dvc.data_sidecar import backfill_sidecars, open_sidecar, sidecar_path, SIGNAL, BASELINE
+from pychron.paths import paths
+
+
+class DataSidecarTestCase(unittest.TestCase):
+    def setUp(self):
+        self._paths = paths.repository_dataset_dir, paths.repository_sidecar_dir
+        self.root = tempfile.mkdtemp()
+        paths.repository_dataset_dir = os.path.join(self.root, 'repositories')
+        paths.repository_sidecar_dir = os.path.join(self.root, 'sidecars')
+
+        d = os.path.join(paths.repository_dataset_dir, 'Foo', '123', '.data')
+        os.makedirs(d)
+
+        self.xs = linspace(0, 100, 25)
+        self.ys = linspace(10, 5, 25)
+        self.path = os.path.join(d, '45-01A.data.json')
+        dvc_dump({'format': '>ff',
+                  'signals': [{'isotope': 'Ar40', 'detector': 'H1',
+                               'blob': encode_blob(pack_xy(self.xs, self.ys))}],
+                  'baselines': [{'detector': 'H1', 'blob': encode_blob(pack_xy(self.xs, self.ys * 0.1))}],
+                  'sniffs': []}, self.path)
+
+    def tearDown(self):
+        paths.repository_dataset_dir, paths.repository_sidecar_dir = self._paths
+        shutil.rmtree(self.root)
+
+    def test_backfill(self):
+        self.assertEqual(backfill_sidecars('Foo'), 1)
+        self.assertEqual(backfill_sidecars('Foo'), 0)
+
+    def test_read(self):
+        backfill_sidecars('Foo')
+        with open_sidecar(self.path) as sc:
+            self.assertEqual(list(sc.iter_keys(SIGNAL)), [('Ar40', 'H1')])
+            self.assertTrue(sc.has(BASELINE, 'H1'))
+
+            xs, ys = sc.get(SIGNAL, 'H1', 'Ar40')
+            self.assertAlmostEqual(xs[-1], 100, 4)
+            self.assertAlmostEqual(ys[-1], 5, 4)
+
+    def test_stale(self):
+        backfill_sidecars('Foo')
+        t = time.time() + 10
+        os.utime(self.path, (t, t))
+        self.assertIsNone(open_sidecar(self.path))
+
+    def test_truncated(self):
+        backfill_sidecars('Foo')
+        p = sidecar_path(self.path)
+        with open(p, 'rb') as rfile:
+            blob = rfile.read()
+        with open(p, 'wb') as wfile:
+            wfile.write(blob[:len(blob) // 2])
+
+        self.assertIsNone(open_sidecar(self.path))
+
+    def test_rewrite(self):
+        self.assertEqual(backfill_sidecars('Foo'), 1)
+        os.utime(self.path, (time.time() + 10, time.time() + 10))
+        self.assertEqual(backfill_sidecars('Foo'), 1)
+        self.assertFalse(os.path.isfile('{}.tmp'.format(sidecar_path(self.path))))
+
+
+if __name__ == '__main__':
+    unittest.main()
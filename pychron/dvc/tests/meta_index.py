@@ -0,0 +1,111 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pychron.dvc import dvc_dump
+from pychron.dvc.meta_repo import MetaRepo
+from pychron.globals import globalv
+from pychron.paths import paths
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+IRRAD = 'NM-100'
+LEVEL = 'A'
+
+
+class FixtureMetaRepo(MetaRepo):
+    _head = 'a'
+
+    def get_head(self, *args, **kw):
+        return self._head
+
+
+class MetaIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self._root_dir = paths.root_dir
+        paths.build(self.root)
+
+        d = os.path.join(paths.meta_root, IRRAD)
+        os.makedirs(os.path.join(d, 'productions'))
+        dvc_dump({}, os.path.join(d, 'productions.json'))
+
+        self.repo = FixtureMetaRepo()
+        self.repo.add_chronology(IRRAD, [], add=False)
+        self.repo.add_level(IRRAD, LEVEL, add=False)
+        self.repo.update_flux(IRRAD, LEVEL, 1, 'a-01', 0.001, 1e-6, 0.001, 1e-6, add=False)
+
+    def tearDown(self):
+        if self._root_dir:
+            paths.build(self._root_dir)
+        shutil.rmtree(self.root)
+
+    def _positions(self):
+        fluxes, _, _ = self.repo.get_irradiation_metadata([(IRRAD, LEVEL)])
+        return fluxes[IRRAD][LEVEL]
+
+    def _js(self):
+        return [p['j'] for p in self._positions()]
+
+    def test_hit(self):
+        a = self._positions()
+        self.assertIs(self._positions(), a)
+
+    def test_chronology_hit(self):
+        _, _, a = self.repo.get_irradiation_metadata([(IRRAD, LEVEL)])
+        _, _, b = self.repo.get_irradiation_metadata([(IRRAD, LEVEL)])
+        self.assertIs(a[IRRAD], b[IRRAD])
+
+    def test_update_flux(self):
+        self.assertEqual(self._js(), [0.001])
+        self.repo.update_flux(IRRAD, LEVEL, 1, 'a-01', 0.002, 1e-6, 0.002, 1e-6, add=False)
+        self.assertEqual(self._js(), [0.002])
+
+    def test_update_flux_position(self):
+        self._positions()
+        self.repo.update_flux(IRRAD, LEVEL, 2, 'a-02', 0.003, 1e-6, 0.003, 1e-6, add=False)
+        self.assertEqual(self._js(), [0.001, 0.003])
+
+    def test_update_fluxes(self):
+        self._positions()
+        self.repo.update_fluxes(IRRAD, LEVEL, 0.004, 1e-6, add=False)
+        self.assertEqual(self._js(), [0.004])
+
+    def test_update_productions(self):
+        _, ps, _ = self.repo.get_irradiation_metadata([(IRRAD, LEVEL)])
+        self.assertEqual(ps[IRRAD][LEVEL][0], '')
+
+        self.repo.update_productions(IRRAD, LEVEL, 'TRIGA', add=False)
+        _, ps, _ = self.repo.get_irradiation_metadata([(IRRAD, LEVEL)])
+        self.assertEqual(ps[IRRAD][LEVEL][0], 'TRIGA')
+
+    def test_head_change(self):
+        a = self._positions()
+
+        # a pull or checkout changes the files without a MetaRepo writer
+        dvc_dump({'z': 0, 'positions': [{'position': 1, 'j': 0.005}]}, self.repo.get_level_path(IRRAD, LEVEL))
+        self.assertIs(self._positions(), a)
+
+        self.repo._head = 'b'
+        self.assertEqual(self._js(), [0.005])
+
+    def test_invalidate(self):
+        a = self._positions()
+        self.repo.invalidate_index()
+        b = self._positions()
+        self.assertIsNot(a, b)
+        self.assertEqual(a, b)
+
+    def test_clear_cache(self):
+        a = self._positions()
+        self.repo.clear_cache = True
+        self.assertIsNot(self._positions(), a)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from functools import partial
+
+from pychron.core.progress import progress_loader
+from pychron.dvc import analysis_path, dvc_dump
+from pychron.dvc import dvc as dvc_module
+from pychron.dvc.dvc import DVC
+from pychron.dvc.dvc_analysis import DVCAnalysis
+from pychron.dvc.parallel_loader import ParallelAnalysisLoader, LoadTask, load_analysis
+from pychron.globals import globalv
+from pychron.paths import paths
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+REPOSITORY = 'Foo'
+RUNIDS = ['12345-01A', '12345-01B', '12345-02', '12346-01']
+MISSING = '12347-01'
+
+
+class Record(object):
+    use_repository_suffix = False
+    group_id = 0
+
+    def __init__(self, record_id):
+        self.record_id = record_id
+        self.repository_identifier = REPOSITORY
+
+
+def write_analysis(runid, i):
+    identifier, aliquot = runid.split('-')
+    dvc_dump({'timestamp': '2018-01-0{}T12:00:00'.format(i + 1),
+              'spec_sha': 'spec',
+              'identifier': identifier,
+              'aliquot': int(aliquot[:2]),
+              'sample': 'sample{}'.format(i),
+              'mass_spectrometer': 'jan',
+              'isotopes': {'Ar40': {'name': 'Ar40', 'detector': 'H1'},
+                           'Ar39': {'name': 'Ar39', 'detector': 'AX'}}},
+             analysis_path(runid, REPOSITORY, mode='w'))
+
+    dvc_dump({'extract_value': 5 + i, 'extract_units': 'W'},
+             analysis_path(runid, REPOSITORY, modifier='extraction', mode='w'))
+
+    dvc_dump({'Ar40': {'value': 100. + i, 'error': 0.1, 'fit': 'linear'},
+              'Ar39': {'value': 10. + i, 'error': 0.01, 'fit': 'parabolic'}},
+             analysis_path(runid, REPOSITORY, modifier='intercepts', mode='w'))
+
+
+def summarize(a):
+    return (a.record_id, a.identifier, a.aliquot, a.sample, a.extract_value,
+            sorted((k, iso.detector, iso.value, iso.error, iso.fit) for k, iso in a.isotopes.items()))
+
+
+class ParallelLoaderTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        cls._root_dir = paths.root_dir
+        paths.build(cls.root)
+
+        d = os.path.join(paths.repository_dataset_dir, REPOSITORY)
+        os.makedirs(d)
+        dvc_dump({'spectrometer': {}, 'gains': {}, 'deflections': {}}, os.path.join(d, 'spec.json'))
+        for i, runid in enumerate(RUNIDS):
+            write_analysis(runid, i)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls._root_dir:
+            paths.build(cls._root_dir)
+        shutil.rmtree(cls.root)
+
+    def setUp(self):
+        # the real progress loader without the dialog
+        self._progress_loader = dvc_module.progress_loader
+        dvc_module.progress_loader = partial(progress_loader, use_progress=False)
+
+    def tearDown(self):
+        dvc_module.progress_loader = self._progress_loader
+
+    def _task(self, runid):
+        return LoadTask(record_id=runid, repository_identifier=REPOSITORY, group_id=0, quick=True)
+
+    def _serial(self, runids):
+        return [summarize(DVCAnalysis(r, REPOSITORY)) for r in runids]
+
+    def test_task_pickle(self):
+        t = pickle.loads(pickle.dumps(self._task(RUNIDS[0])))
+        self.assertEqual((t.record_id, t.repository_identifier, t.quick), (RUNIDS[0], REPOSITORY, True))
+        self.assertIsNone(t.positions)
+
+    def test_loader(self):
+        with ParallelAnalysisLoader(2) as loader:
+            results = list(loader.imap([self._task(r) for r in RUNIDS]))
+
+        self.assertTrue(all(ok for ok, _ in results))
+        self.assertEqual([summarize(a) for _, a in results], self._serial(RUNIDS))
+
+    def test_loader_failed(self):
+        ok, tb = load_analysis(self._task(MISSING))
+        self.assertFalse(ok)
+        self.assertIn('Traceback', tb)
+
+    def test_make_analyses_parallel(self):
+        dvc = DVC(bind=False)
+        dvc.parallel_load_nprocesses = 2
+
+        fallback = []
+
+        def func(record, prog, i, n):
+            fallback.append(record.record_id)
+            try:
+                return DVCAnalysis(record.record_id, record.repository_identifier)
+            except BaseException:
+                pass
+
+        runids = RUNIDS[:2] + [MISSING] + RUNIDS[2:]
+        ans = dvc._make_analyses_parallel([Record(r) for r in runids], func, {}, {}, {}, {}, {},
+                                          False, False, True)
+
+        # only the analysis the worker failed to load is loaded serially
+        self.assertEqual(fallback, [MISSING])
+        self.assertEqual([summarize(a) for a in ans], self._serial(RUNIDS))
+
+    def test_make_analyses_parallel_loaded(self):
+        dvc = DVC(bind=False)
+        dvc.parallel_load_nprocesses = 2
+
+        loaded = DVCAnalysis(RUNIDS[0], REPOSITORY)
+        passed = []
+
+        def func(record, prog, i, n):
+            passed.append(record)
+            return record
+
+        ans = dvc._make_analyses_parallel([loaded] + [Record(r) for r in RUNIDS[1:]], func, {}, {}, {}, {}, {},
+                                          False, False, True)
+
+        # an already loaded analysis is not sent to the pool
+        self.assertEqual(passed, [loaded])
+        self.assertIs(ans[0], loaded)
+        self.assertEqual([summarize(a) for a in ans], self._serial(RUNIDS))
+
+
+if __name__ == '__main__':
+    unittest.main()
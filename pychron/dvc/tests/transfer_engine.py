@@ -0,0 +1,158 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from pychron.dvc.transfer_engine import TransferEngine, TransferCheckpoint, TransferMetrics, TransferError, \
+    DONE, SKIPPED, FAILED
+from pychron.globals import globalv
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+
+class TransferEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'transfer', 'repo.jsonl')
+
+        self.fetched = []
+        self.inserts = []
+        self.skip = set()
+        self.missing = set()
+        self.bad_write = set()
+        self.bad_insert = set()
+
+        self.engine = TransferEngine(batch_size=3, nworkers=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _fetch(self, keys):
+        self.fetched.extend(keys)
+        return [(k, self._fetch_item(k)) for k in keys]
+
+    def _fetch_item(self, k):
+        if k in self.skip:
+            return
+        elif k in self.missing:
+            return TransferError('{} not in source'.format(k))
+        return k.upper()
+
+    def _write(self, item):
+        if item in self.bad_write:
+            raise IOError('failed writing {}'.format(item))
+        return '{}.json'.format(item)
+
+    def _insert(self, payloads):
+        if any(p in self.bad_insert for p in payloads):
+            raise ValueError('duplicate entry')
+        self.inserts.append(list(payloads))
+
+    def _run(self, keys, checkpoint=None):
+        return self.engine.run(keys, self._fetch, self._write, self._insert, checkpoint=checkpoint)
+
+    def _keys(self, n):
+        return ['a-{:02n}'.format(i) for i in range(n)]
+
+    def test_batches(self):
+        self._run(self._keys(7))
+        self.assertEqual([len(i) for i in self.inserts], [3, 3, 1])
+        self.assertEqual(self.inserts[0], ['A-00.json', 'A-01.json', 'A-02.json'])
+        self.assertEqual(self.engine.ndone, 7)
+
+    def test_single_worker(self):
+        self.engine.nworkers = 1
+        self._run(self._keys(4))
+        self.assertEqual(self.engine.ndone, 4)
+
+    def test_skipped(self):
+        self.skip.add('a-01')
+        self._run(self._keys(3))
+        self.assertEqual(self.inserts, [['A-00.json', 'A-02.json']])
+        self.assertEqual(self.engine.nskipped, 1)
+
+    def test_write_failed(self):
+        self.bad_write.add('A-01')
+        self._run(self._keys(3))
+        self.assertEqual(self.inserts, [['A-00.json', 'A-02.json']])
+        self.assertEqual((self.engine.ndone, self.engine.nfailed), (2, 1))
+
+    def test_insert_fallback(self):
+        self.bad_insert.add('A-04.json')
+        self._run(self._keys(6))
+        # the failed batch is inserted one at a time
+        self.assertEqual(self.inserts, [['A-00.json', 'A-01.json', 'A-02.json'],
+                                        ['A-03.json'], ['A-05.json']])
+        self.assertEqual((self.engine.ndone, self.engine.nfailed), (5, 1))
+
+    def test_fetch_item_failed(self):
+        self.missing.add('a-01')
+        self._run(self._keys(3), TransferCheckpoint(self.path))
+        self.assertEqual(self.inserts, [['A-00.json', 'A-02.json']])
+        self.assertEqual((self.engine.ndone, self.engine.nskipped, self.engine.nfailed), (2, 0, 1))
+
+        c = TransferCheckpoint(self.path)
+        self.assertEqual(c.status['a-01'], FAILED)
+
+        # a run that was missing is retried on resume
+        self.missing.clear()
+        self.fetched = []
+        self._run(self._keys(3), TransferCheckpoint(self.path))
+        self.assertEqual(self.fetched, ['a-01'])
+        self.assertEqual(TransferCheckpoint(self.path).count(DONE), 3)
+
+    def test_fetch_failed(self):
+        def fetch(keys):
+            raise ValueError('lost connection')
+
+        self.engine.run(self._keys(4), fetch, self._write, self._insert)
+        self.assertEqual(self.engine.nfailed, 4)
+        self.assertEqual(self.inserts, [])
+
+    def test_checkpoint(self):
+        self.skip.add('a-00')
+        self.bad_insert.add('A-01.json')
+        self._run(self._keys(3), TransferCheckpoint(self.path))
+
+        c = TransferCheckpoint(self.path)
+        self.assertEqual(c.status, {'a-00': SKIPPED, 'a-01': FAILED, 'a-02': DONE})
+
+    def test_resume(self):
+        keys = self._keys(5)
+        self.bad_insert.add('A-03.json')
+        self._run(keys, TransferCheckpoint(self.path))
+
+        # an interrupted write leaves a partial line
+        with open(self.path, 'a') as wfile:
+            wfile.write('{"key": "a-0')
+
+        self.bad_insert.clear()
+        self.fetched = []
+        self.inserts = []
+        self._run(keys, TransferCheckpoint(self.path))
+
+        # only the failed run is retried
+        self.assertEqual(self.fetched, ['a-03'])
+        self.assertEqual(self.inserts, [['A-03.json']])
+        self.assertEqual(TransferCheckpoint(self.path).count(DONE), 5)
+
+    def test_metrics(self):
+        m = self._run(self._keys(4))
+        d = m.to_dict()
+        self.assertEqual(list(d.keys()), ['fetch', 'write', 'insert'])
+        self.assertEqual([v['n'] for v in d.values()], [4, 4, 4])
+        self.assertIn('elapsed', m.summary())
+
+    def test_metrics_record(self):
+        m = TransferMetrics()
+        m.record('write', 10, 2.)
+        m.record('write', 10, 2.)
+        self.assertEqual(m.to_dict()['write'], {'n': 20, 'seconds': 4., 'rate': 5.})
+
+
+if __name__ == '__main__':
+    unittest.main()
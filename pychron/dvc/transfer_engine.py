@@ -0,0 +1,270 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+from __future__ import absolute_import
+from traits.api import Int
+
+# ============= standard library imports ========================
+import json
+import os
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
+from threading import Lock
+
+# ============= local library imports  ==========================
+from pychron.loggable import Loggable
+
+DONE = 'done'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+
+class TransferError(Exception):
+    """
+    returned by ``fetch`` in place of an item that could not be fetched. the key is marked failed and retried
+    when the transfer is resumed
+    """
+
+
+class TransferMetrics(object):
+    """
+    number of items and wall time spent in each stage of a transfer
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._stages = OrderedDict()
+        self.started = time.time()
+
+    @contextmanager
+    def stage(self, name, n=1):
+        st = time.time()
+        try:
+            yield
+        finally:
+            self.record(name, n, time.time() - st)
+
+    def record(self, name, n, seconds):
+        with self._lock:
+            s = self._stages.setdefault(name, [0, 0.])
+            s[0] += n
+            s[1] += seconds
+
+    def to_dict(self):
+        with self._lock:
+            return OrderedDict((name, {'n': n, 'seconds': t, 'rate': n / t if t else 0})
+                               for name, (n, t) in self._stages.items())
+
+    def summary(self):
+        ss = ['{}: {} in {:0.1f}s ({:0.1f}/s)'.format(k, v['n'], v['seconds'], v['rate'])
+              for k, v in self.to_dict().items()]
+        ss.append('elapsed: {:0.1f}s'.format(time.time() - self.started))
+        return ', '.join(ss)
+
+
+class TransferCheckpoint(object):
+    """
+    append only record of the outcome of each transferred item. a transfer restarted with the same checkpoint
+    skips the items that are done or skipped and retries the failed ones.
+
+    one JSON object per line. every line is flushed to disk so an interrupted transfer loses at most the line
+    being written, which is ignored on load
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.status = {}
+        self.load()
+
+    def load(self):
+        self.status = {}
+        self._partial = False
+        if not os.path.isfile(self.path):
+            return
+
+        with open(self.path, 'r') as rfile:
+            for line in rfile:
+                self._partial = not line.endswith('\n')
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    continue
+                self.status[obj['key']] = obj['status']
+
+    def is_complete(self, key):
+        return self.status.get(key) in (DONE, SKIPPED)
+
+    def mark(self, keys, status, error=None):
+        if not keys:
+            return
+
+        root = os.path.dirname(self.path)
+        if root and not os.path.isdir(root):
+            os.makedirs(root)
+
+        with open(self.path, 'a') as wfile:
+            if self._partial:
+                # end the partial line so the next record is not appended to it
+                wfile.write('\n')
+                self._partial = False
+
+            for k in keys:
+                obj = {'key': k, 'status': status, 'timestamp': time.time()}
+                if error:
+                    obj['error'] = error
+                wfile.write('{}\n'.format(json.dumps(obj)))
+                self.status[k] = status
+
+            wfile.flush()
+            os.fsync(wfile.fileno())
+
+    def count(self, status):
+        return sum(1 for v in self.status.values() if v == status)
+
+
+class TransferEngine(Loggable):
+    """
+    move items through three stages, one batch at a time::
+
+        fetch(keys) -> [(key, item), ...]   main thread. batched source queries. item is None to skip the key or
+                                            a TransferError to fail it
+        write(item) -> payload              ``nworkers`` threads. e.g. generating the JSON files of an analysis
+        insert(payloads)                    main thread. the whole batch in one database transaction
+
+    if ``insert`` fails for a batch its payloads are inserted one at a time so one bad item does not fail the
+    others. the outcome of every key is recorded in the checkpoint
+    """
+    batch_size = Int(50)
+    nworkers = Int(4)
+
+    ndone = Int
+    nskipped = Int
+    nfailed = Int
+
+    def run(self, keys, fetch, write, insert, checkpoint=None, metrics=None):
+        if metrics is None:
+            metrics = TransferMetrics()
+        self.ndone = self.nskipped = self.nfailed = 0
+
+        if checkpoint:
+            n = len(keys)
+            keys = [k for k in keys if not checkpoint.is_complete(k)]
+            if n != len(keys):
+                self.info('resuming transfer. {} of {} already complete'.format(n - len(keys), n))
+
+        total = len(keys)
+        bs = max(1, self.batch_size)
+        nworkers = max(1, self.nworkers)
+        pool = ThreadPool(nworkers) if nworkers > 1 else None
+        try:
+            for i in range(0, total, bs):
+                batch = keys[i:i + bs]
+                self._run_batch(batch, fetch, write, insert, checkpoint, metrics, pool)
+                self.debug('transferred {}/{}. {}'.format(min(i + bs, total), total, metrics.summary()))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self.info('transfer finished. done={} skipped={} failed={}. {}'.format(self.ndone, self.nskipped,
+                                                                              self.nfailed, metrics.summary()))
+        return metrics
+
+    # private
+    def _run_batch(self, batch, fetch, write, insert, checkpoint, metrics, pool):
+        with metrics.stage('fetch', len(batch)):
+            try:
+                items = fetch(batch)
+            except BaseException as e:
+                self.warning('fetch failed for {}. {}'.format(batch, e))
+                self.debug(traceback.format_exc())
+                self._mark(checkpoint, batch, FAILED, str(e))
+                return
+
+        fetched = {k for k, _ in items}
+        skipped = [k for k, item in items if item is None]
+        # keys the fetch did not return are skipped too
+        skipped.extend(k for k in batch if k not in fetched)
+        self._mark(checkpoint, skipped, SKIPPED)
+
+        for k, item in items:
+            if isinstance(item, TransferError):
+                self.warning('fetch failed for {}. {}'.format(k, item))
+                self._mark(checkpoint, [k], FAILED, str(item))
+
+        items = [(k, item) for k, item in items if not (item is None or isinstance(item, TransferError))]
+        if not items:
+            return
+
+        def func(item):
+            try:
+                return True, write(item)
+            except BaseException as e:
+                self.debug(traceback.format_exc())
+                return False, e
+
+        with metrics.stage('write', len(items)):
+            objs = [item for _, item in items]
+            results = pool.map(func, objs) if pool is not None else [func(obj) for obj in objs]
+
+        written = []
+        for (k, _), (ok, r) in zip(items, results):
+            if ok:
+                written.append((k, r))
+            else:
+                self.warning('write failed for {}. {}'.format(k, r))
+                self._mark(checkpoint, [k], FAILED, str(r))
+
+        if not written:
+            return
+
+        with metrics.stage('insert', len(written)):
+            try:
+                insert([p for _, p in written])
+            except BaseException as e:
+                self.warning('batch insert failed. inserting one at a time. {}'.format(e))
+                self._insert_each(written, insert, checkpoint)
+            else:
+                self._mark(checkpoint, [k for k, _ in written], DONE)
+
+    def _insert_each(self, written, insert, checkpoint):
+        for k, p in written:
+            try:
+                insert([p])
+            except BaseException as e:
+                self.warning('insert failed for {}. {}'.format(k, e))
+                self.debug(traceback.format_exc())
+                self._mark(checkpoint, [k], FAILED, str(e))
+            else:
+                self._mark(checkpoint, [k], DONE)
+
+    def _mark(self, checkpoint, keys, status, error=None):
+        n = len(keys)
+        if status == DONE:
+            self.ndone += n
+        elif status == SKIPPED:
+            self.nskipped += n
+        else:
+            self.nfailed += n
+
+        if checkpoint:
+            checkpoint.mark(keys, status, error)
+
+# ============= EOF =============================================
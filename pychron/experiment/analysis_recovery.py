@@ -17,9 +17,12 @@
 # ============= enthought library imports =======================
 # ============= standard library imports ========================
 from __future__ import absolute_import
+import os
+
 from numpy import array
 # ============= local library imports  ==========================
 from pychron.database.adapters.local_lab_adapter import LocalLabAdapter
+from pychron.experiment.automated_run.data_journal import JOURNAL_EXT, read_journal
 from pychron.experiment.automated_run.persistence import AutomatedRunPersister
 from pychron.experiment.automated_run.persistence_spec import PersistenceSpec
 from pychron.experiment.automated_run.spec import AutomatedRunSpec
@@ -76,6 +79,48 @@ class AnalysisRecoverer(Loggable):
         run_spec.uuid = lt.uuid
 
         cp = lt.collection_path
+        jp = '{}{}'.format(os.path.splitext(cp)[0], JOURNAL_EXT)
+        if os.path.isfile(jp):
+            # the journal is written as the data is collected. the hdf5 file may be incomplete after a crash
+            self.debug('recovering data from journal {}'.format(jp))
+            self._load_journal(jp, arar_age)
+        else:
+            self._load_h5(cp, arar_age)
+
+        return per_spec
+
+    def _load_journal(self, path, arar_age):
+        data = read_journal(path)
+
+        # add signal/isotopes
+        for (group, isok, det), (xs, ys) in data.items():
+            # only handle one detector per isotope
+            if group == 'signal' and isok not in arar_age.isotopes:
+                iso = Isotope(name=isok,
+                              fit='linear')
+                iso.detector = det
+                iso.xs = xs
+                iso.ys = ys
+
+                arar_age.isotopes[isok] = iso
+
+        # add sniffs and baselines
+        for (group, isok, det), (xs, ys) in data.items():
+            if group == 'sniff':
+                iso = arar_age.isotopes.get(isok)
+                if iso is not None:
+                    iso.sniff.detector = det
+                    iso.sniff.xs = xs
+                    iso.sniff.ys = ys
+
+            elif group == 'baseline':
+                for iso in six.itervalues(arar_age.isotopes):
+                    if iso.detector == det:
+                        iso.baseline.xs = xs
+                        iso.baseline.ys = ys
+                        iso.baseline.fit = 'average'
+
+    def _load_h5(self, cp, arar_age):
         man = H5DataManager()
         man.open_file(cp)
 
@@ -124,8 +169,6 @@ class AnalysisRecoverer(Loggable):
                     iso.baseline.ys = ys
                     iso.baseline.fit = 'average'
 
-        return per_spec
-
 # ============= EOF =============================================
 
 
@@ -227,8 +227,9 @@ class AutomatedRun(Loggable):
             set_preference(preferences, self, attr, 'pychron.experiment.{}'.format(attr), cast)
 
         self.persister.set_preferences(preferences)
-        self.multi_collector.console_set_preferences(preferences, 'pychron.experiment')
-        self.peak_hop_collector.console_set_preferences(preferences, 'pychron.experiment')
+        for c in (self.multi_collector, self.peak_hop_collector):
+            c.console_set_preferences(preferences, 'pychron.experiment')
+            set_preference(preferences, c, 'plot_frame_rate', 'pychron.experiment.plot_frame_rate', float)
 
     # ===============================================================================
     # pyscript interface
@@ -1022,6 +1023,16 @@ class AutomatedRun(Loggable):
                 self.debug('no log path to save')
 
     def save(self):
+        if self.prepare_save():
+            return self.persist()
+        return True
+
+    def prepare_save(self):
+        """
+            gather everything that is saved. call on the executor thread before the next run starts
+
+            @return: True if there is something to save
+        """
         self.debug('post measurement save measured={} aborted={}'.format(self._measured, self._aborted))
         if self._measured and not self._aborted:
             # set filtering
@@ -1037,29 +1048,38 @@ class AutomatedRun(Loggable):
             self._update_persister_spec(active_detectors=self._active_detectors,
                                         conditionals=[c for cond in conds for c in cond],
                                         tripped_conditional=self.tripped_conditional, **env)
+            return True
 
-            # save to database
-            self._persister_save_action('post_measurement_save')
+    def persist(self, background=False):
+        """
+            write the run with each persister. may run on the executor's persistence queue while the next run
+            extracts and measures
 
-            self.spec.new_result(self)
+            @param background: True when called from the persistence queue. the executor reports a failure
+            @return: True if successful
+        """
+        # save to database
+        self._persister_save_action('post_measurement_save')
 
-            if self.plot_panel:
-                self.plot_panel.analysis_view.refresh_needed = True
+        self.spec.new_result(self)
 
-            # save analysis. don't cancel immediately
-            # ret = None
-            # if self.system_health:
-            #     ret = self.system_health.add_analysis(self)
+        if self.plot_panel:
+            self.plot_panel.analysis_view.refresh_needed = True
 
-            if self.persister.secondary_database_fail:
-                self.executor_event = {'kind': 'cancel', 'cancel_run': True,
-                                       'msg': self.persister.secondary_database_fail}
+        # save analysis. don't cancel immediately
+        # ret = None
+        # if self.system_health:
+        #     ret = self.system_health.add_analysis(self)
 
-            else:
-                return True
-        else:
+        if not self.persister.secondary_database_fail:
             return True
 
+        # in the background the run in progress is the next one. cancelling it would cancel the wrong run
+        if not background:
+            self.executor_event = {'kind': 'cancel', 'cancel_run': True,
+                                   'msg': self.persister.secondary_database_fail}
+        return False
+
     # def get_previous_blanks(self):
     #     blanks = None
     #     pid = 0
@@ -15,7 +15,7 @@
 # ===============================================================================
 
 # ============= enthought library imports =======================
-from traits.api import Any, List, CInt, Int, Bool, Enum, Str, Instance
+from traits.api import Any, List, CInt, Int, Bool, Enum, Str, Instance, Float
 
 import time
 from threading import Event, Thread
@@ -61,10 +61,17 @@ class DataCollector(Consoleable):
     _queue = None
 
     err_message = Str
+    # maximum number of plot redraws per second. 0 redraws for every count
+    plot_frame_rate = Float(10)
+    _last_plot_update = 0
+
     no_intensity_threshold = 100
     not_intensity_count = 0
     trigger = None
 
+    # {key order: [(detector, index of its signal), ...]}
+    _readout_plans = None
+
     def wait(self):
         st = time.time()
         self.debug('wait started')
@@ -171,6 +178,9 @@ class DataCollector(Consoleable):
                 break
 
         evt.set()
+        if self.plot_panel:
+            self._flush_plot_data()
+
         self.debug('waiting for write to finish')
         t.join()
 
@@ -274,15 +284,37 @@ class DataCollector(Consoleable):
         a = self.isotope_group
         kind = self.collection_kind
 
-        for dn in keys:
-            dn = self._get_detector(dn)
-            if dn:
-                iso = dn.isotope
-                signal = self._get_signal(keys, signals, dn.name)
-                if signal is not None:
-                    if not a.append_data(iso, dn.name, x, signal, kind):
-                        self.debug('{} - failed appending data for {}. not a current isotope {}'.format(kind, iso,
-                                                                                                        a.isotope_keys))
+        for det, idx in self._get_readout_plan(keys):
+            iso = det.isotope
+            if not a.append_data(iso, det.name, x, signals[idx], kind):
+                self.debug('{} - failed appending data for {}. not a current isotope {}'.format(kind, iso,
+                                                                                                a.isotope_keys))
+
+    def _get_readout_plan(self, keys):
+        """
+        the detector and signal index of each key that is one of ``detectors``. keys arrive in the same order every
+        count so the detectors are looked up once per key order
+        """
+        kt = tuple(keys)
+        plans = self._readout_plans
+        if plans is None:
+            plans = self._readout_plans = {}
+
+        plan = plans.get(kt)
+        if plan is None:
+            dets = {d.name: d for d in self.detectors}
+            plan = [(dets[k], i) for i, k in enumerate(kt) if k in dets]
+            missing = [k for k in kt if k not in dets]
+            if missing:
+                self.debug('no detector obj for {}. detectors={}'.format(missing, list(dets.keys())))
+            plans[kt] = plan
+        return plan
+
+    def _detectors_changed(self):
+        self._readout_plans = None
+
+    def _detectors_items_changed(self):
+        self._readout_plans = None
 
     def _get_signal(self, keys, signals, det):
         try:
@@ -294,21 +326,24 @@ class DataCollector(Consoleable):
                 self.canceled = True
                 self.stop()
 
-    def _get_detector(self, d):
-        if isinstance(d, str):
-            d = next((di for di in self.detectors
-                      if di.name == d), None)
-        return d
-
     def _plot_data(self, cnt, x, keys, signals):
-        for dn, signal in zip(keys, signals):
-            det = self._get_detector(dn)
-            if det:
-                self._set_plot_data(cnt, det.isotope, det.name, x, signal)
-            else:
-                print('no detector obj for {}'.format(dn), [d.name for d in self.detectors])
+        for det, idx in self._get_readout_plan(keys):
+            self._set_plot_data(cnt, det.isotope, det.name, x, signals[idx])
+
+        # points are buffered by the graphs and redrawn at most plot_frame_rate times a second
+        now = time.time()
+        rate = self.plot_frame_rate
+        if not rate or now - self._last_plot_update >= 1. / rate:
+            self._last_plot_update = now
+            self._flush_plot_data()
 
-        self.plot_panel.update()
+    def _flush_plot_data(self):
+        pp = self.plot_panel
+        for g in (pp.sniff_graph, pp.isotope_graph, pp.baseline_graph):
+            if g is not None:
+                g.flush_data()
+
+        pp.update()
 
     def _set_plot_data(self, cnt, iso, det, x, signal):
 
@@ -335,7 +370,8 @@ class DataCollector(Consoleable):
                         series=series,
                         plotid=pid,
                         update_y_limits=True,
-                        ypadding='0.1')
+                        ypadding='0.1',
+                        flush=False)
             if fit:
                 g.set_fit(fit, plotid=pid, series=fit_series)
 
@@ -481,27 +517,6 @@ class DataCollector(Consoleable):
             return self.automated_run.cancelation_conditionals
 
             # ============= EOF =============================================
-            # def _plot_baseline_for_peak_hop(self, cnt, x, keys, signals):
-            #     for dn, signal in zip(keys, signals):
-            #         det = self._get_detector(dn)
-            #         if det:
-            #             self._set_plot_data(cnt, det.isotope, det.name, x, signal)
-            #
-            #     # for k, v in six.iteritems(self.isotope_group):
-            #     #     signal = signals[keys.index(v.detector)]
-            #     #     self._set_plot_data(i, None, v.detector, x, signal)
-            #
-            # def _plot_data_(self, cnt, x, keys, signals):
-            #     print('n={} keys={}'.format(len(keys), keys))
-            #     print('n={} signals={}'.format(len(signals), signals))
-            #
-            #     for dn, signal in zip(keys, signals):
-            #         det = self._get_detector(dn)
-            #         if det:
-            #             self._set_plot_data(cnt, det.isotope, det.name, x, signal)
-            #         else:
-            #             print('no detector obj for {}'.format(dn), [d.name for d in self.detectors])
-            #
             # def _get_fit(self, cnt, det, iso):
             #     # isotopes = self.isotope_group.isotopes
             #
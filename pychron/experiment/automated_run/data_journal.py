@@ -0,0 +1,201 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+import os
+import struct
+import time
+from collections import OrderedDict
+
+from numpy import frombuffer, dtype, ones, flatnonzero
+
+# ============= local library imports  ==========================
+
+"""
+Append-only binary journal of the data collected during a run.
+
+The file is an 18 byte header followed by 18 byte records::
+
+    <u2 channel, <f8 x, <f8 y
+
+A channel is a (group, isotope, detector) triple. It is defined the first time it is written by a record with
+channel=DEFINE, x=channel id and y=length of the utf-8 name. The name, tab delimited and zero padded, fills the next
+ceil(length/18) records.
+
+Every record has the same width, so a journal cut off by a crash is read up to the last complete record.
+"""
+
+JOURNAL_EXT = '.pjl'
+HEADER = b'PYCHRON JOURNAL 1\n'
+DEFINE = 0xFFFF
+
+RECORD = struct.Struct('<Hdd')
+RECORD_DTYPE = dtype([('channel', '<u2'), ('x', '<f8'), ('y', '<f8')])
+RECORD_SIZE = RECORD.size
+
+
+class DataJournalError(Exception):
+    pass
+
+
+class DataJournal(object):
+    """
+    writes (x, y) records for each detector as data arrives.
+
+    records are buffered and the file is flushed and fsynced at most every ``sync_period`` seconds, so a crash loses
+    at most ``sync_period`` seconds of data::
+
+        with DataJournal(path) as j:
+            j.write('signal', 'Ar40', 'H1', x, y)
+    """
+
+    def __init__(self, path, sync_period=1.0):
+        self.path = path
+        self.sync_period = sync_period
+        self.nrecords = 0
+
+        self._channels = {}
+        self._file = None
+        self._last_sync = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        """
+        open for appending. channels already in the file are reused
+        """
+        if self._file is not None:
+            return
+
+        if os.path.isfile(self.path) and os.path.getsize(self.path):
+            channels, _, n = _read(self.path)
+            self._channels = {v: k for k, v in channels.items()}
+            # drop a partial record or definition left by a crash so new records stay aligned
+            with open(self.path, 'r+b') as wfile:
+                wfile.truncate(len(HEADER) + n * RECORD_SIZE)
+            self._file = open(self.path, 'ab')
+        else:
+            self._file = open(self.path, 'wb')
+            self._file.write(HEADER)
+
+        self._last_sync = time.time()
+
+    def close(self):
+        if self._file is not None:
+            self.flush(sync=True)
+            self._file.close()
+            self._file = None
+
+    def write(self, group, isotope, detector, x, y):
+        key = (group, isotope, detector)
+        cid = self._channels.get(key)
+        if cid is None:
+            cid = self._define(key)
+
+        self._file.write(RECORD.pack(cid, x, y))
+        self.nrecords += 1
+        self._sync_if_due()
+
+    def write_signals(self, group, dets, x, keys, signals):
+        """
+        write the signals of one count. same arguments as the writer returned by AutomatedRunPersister.get_data_writer
+        """
+        for det in dets:
+            k = det.name
+            if k in keys:
+                self.write(group, det.isotope, k, x, signals[keys.index(k)])
+
+    def flush(self, sync=False):
+        if self._file is not None:
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+                self._last_sync = time.time()
+
+    def _sync_if_due(self):
+        if time.time() - self._last_sync >= self.sync_period:
+            self.flush(sync=True)
+
+    def _define(self, key):
+        cid = len(self._channels)
+        if cid >= DEFINE:
+            raise DataJournalError('too many channels')
+
+        name = '\t'.join(key).encode('utf-8')
+        n = len(name)
+        nslots = -(-n // RECORD_SIZE)
+
+        self._file.write(RECORD.pack(DEFINE, cid, n))
+        self._file.write(name.ljust(nslots * RECORD_SIZE, b'\0'))
+        self._channels[key] = cid
+        return cid
+
+
+def _read(path):
+    with open(path, 'rb') as rfile:
+        buf = rfile.read()
+
+    if not buf.startswith(HEADER):
+        raise DataJournalError('{} is not a data journal'.format(path))
+
+    body = buf[len(HEADER):]
+    n = len(body) // RECORD_SIZE
+    records = frombuffer(body, dtype=RECORD_DTYPE, count=n)
+
+    channels = {}
+    nvalid = n
+    mask = ones(n, dtype=bool)
+    # utf-8 text never starts with 0xFF so the name slots are not mistaken for definitions
+    for i in flatnonzero(records['channel'] == DEFINE):
+        cid, nbytes = int(records['x'][i]), int(records['y'][i])
+        nslots = -(-nbytes // RECORD_SIZE)
+        if i + 1 + nslots > n:
+            # definition cut off by a crash
+            mask[i:] = False
+            nvalid = i
+            break
+
+        s = (i + 1) * RECORD_SIZE
+        channels[cid] = tuple(body[s:s + nbytes].decode('utf-8').split('\t'))
+        mask[i:i + 1 + nslots] = False
+
+    return channels, records[mask], nvalid
+
+
+def read_journal(path):
+    """
+    read a journal written by ``DataJournal``
+
+    @return: OrderedDict of (group, isotope, detector): (xs, ys) in the order the channels were defined
+    """
+    channels, records, _ = _read(path)
+    cs = records['channel']
+
+    ret = OrderedDict()
+    for cid, key in sorted(channels.items()):
+        r = records[cs == cid]
+        ret[key] = (r['x'].copy(), r['y'].copy())
+    return ret
+
+# ============= EOF =============================================
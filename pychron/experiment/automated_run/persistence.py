@@ -20,15 +20,18 @@ import binascii
 import math
 import os
 import time
+from contextlib import contextmanager
 
 from traits.api import Instance, Bool, Interface, provides, Long, Str, Float
 from xlwt import Workbook, struct
 
+from pychron.core.helpers.binpack import pack_xy
 from pychron.core.helpers.datetime_tools import get_datetime
 from pychron.core.helpers.filetools import subdirize
 from pychron.core.helpers.strtools import to_bool
 from pychron.core.ui.preference_binding import set_preference
 from pychron.database.adapters.local_lab_adapter import LocalLabAdapter
+from pychron.experiment.automated_run.data_journal import DataJournal, DataJournalError, JOURNAL_EXT
 from pychron.experiment.automated_run.hop_util import parse_hops
 from pychron.loggable import Loggable
 from pychron.paths import paths
@@ -225,6 +228,7 @@ class AutomatedRunPersister(BasePersister):
     _db_extraction_id = None
     _temp_analysis_buffer = None
     _current_data_frame = None
+    _journal = None
 
     def __init__(self, *args, **kw):
         super(AutomatedRunPersister, self).__init__(*args, **kw)
@@ -285,6 +289,13 @@ class AutomatedRunPersister(BasePersister):
         tables = {}
 
         def write_data(dets, x, keys, signals):
+            journal = self._journal
+            if journal is not None:
+                try:
+                    journal.write_signals(grpname, dets, x, keys, signals)
+                except (IOError, OSError, DataJournalError) as e:
+                    self.debug('failed writing to journal. {}'.format(e))
+
             # todo: test whether saving data to h5 in real time is expansive
 
             # disable H5 data writer
@@ -363,8 +374,34 @@ class AutomatedRunPersister(BasePersister):
     def get_last_aliquot(self, identifier):
         return self.datahub.get_greatest_aliquot(identifier)
 
+    @contextmanager
     def writer_ctx(self):
-        return self.data_manager.open_file(self._current_data_frame)
+        try:
+            with self.data_manager.open_file(self._current_data_frame):
+                yield
+        finally:
+            if self._journal is not None:
+                self._journal.flush(sync=True)
+
+    def close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _open_journal(self, name):
+        """
+        open an append-only journal next to the hdf5 file. the data is in the journal as soon as it is collected so
+        a run can be recovered after a crash
+        """
+        self.close_journal()
+
+        root, tail = subdirize(paths.isotope_dir, '{}{}'.format(name, JOURNAL_EXT), mode='w')
+        journal = DataJournal(os.path.join(root, tail))
+        try:
+            journal.open()
+            self._journal = journal
+        except (IOError, OSError, DataJournalError) as e:
+            self.warning('failed to open data journal. {}'.format(e))
 
     # def pre_extraction_save(self):
     #     """
@@ -426,6 +463,8 @@ class AutomatedRunPersister(BasePersister):
 
         dm.close_file()
 
+        self._open_journal(name)
+
     def post_measurement_save(self, save_local=True):
         """
         check for runid conflicts. automatically update runid if conflict
@@ -436,6 +475,7 @@ class AutomatedRunPersister(BasePersister):
         """
         # self.debug('AutomatedRunPersister post_measurement_save deprecated')
         # return
+        self.close_journal()
 
         if DEBUG:
             self.debug('Not measurement saving to database')
@@ -698,7 +738,7 @@ class AutomatedRunPersister(BasePersister):
 
         self.debug('saving data {} {} xs={}'.format(iso.name, kind, len(m.xs)))
         dbiso = db.add_isotope(analysis, iso.name, dbdet, kind=kind)
-        data = ''.join([struct.pack('>ff', x, y) for x, y in zip(m.xs, m.ys)])
+        data = pack_xy(m.xs, m.ys)
         db.add_signal(dbiso, data)
 
         add_result = kind in ('baseline', 'signal')
@@ -307,6 +307,13 @@ class AutomatedRunSpec(HasTraits):
         logger.debug('Run total estimated duration= {:0.3f}'.format(self._estimated_duration))
         return self._estimated_duration
 
+    def set_estimated_duration(self, d):
+        """
+            set an estimate calculated elsewhere, e.g. by QueueValidator. includes the db save time
+        """
+        self._estimated_duration = d
+        self._changed = False
+
     def make_run(self, new_uuid=True, run=None):
         if run is None:
             args = self.run_klass.split('.')
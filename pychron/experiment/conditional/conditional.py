@@ -27,8 +27,8 @@ import pprint
 # ============= local library imports  ==========================
 import yaml
 from pychron.experiment.conditional.regexes import MAPPER_KEY_REGEX, \
-    STD_REGEX, INTERPOLATE_REGEX, EXTRACTION_STR_ABS_REGEX, EXTRACTION_STR_PERCENT_REGEX
-from pychron.experiment.conditional.utilities import tokenize, get_teststr_attr_func, extract_attr
+    INTERPOLATE_REGEX, EXTRACTION_STR_ABS_REGEX, EXTRACTION_STR_PERCENT_REGEX
+from pychron.experiment.conditional.utilities import tokenize, extract_attr, CompiledTestStr
 from pychron.experiment.utilities.conditionals import RUN, QUEUE, SYSTEM
 from pychron.loggable import Loggable
 from pychron.paths import paths
@@ -216,7 +216,8 @@ class AutomatedRunConditional(BaseConditional):
 
     _teststr = None
     _ctx = None
-    value_context = None
+    _compiled = None
+    _compiled_mapper = None
 
     # def __init__(self, attr, teststr,
     # start_count=0,
@@ -235,6 +236,13 @@ class AutomatedRunConditional(BaseConditional):
         self.frequency = frequency
         super(AutomatedRunConditional, self).__init__(*args, **kw)
 
+    def from_dict(self, teststr, cd, kw):
+        super(AutomatedRunConditional, self).from_dict(teststr, cd, kw)
+        try:
+            self.compile()
+        except BaseException as e:
+            self.warning('failed to compile teststr="{}". {}'.format(teststr, e))
+
     def to_string(self):
         s = '{} {}'.format(self.teststr, self.message)
         return s
@@ -259,6 +267,20 @@ class AutomatedRunConditional(BaseConditional):
         hash_id = self._hash_id()
         return {'teststr': self._teststr, 'context': self.value_context, 'hash_id': hash_id}
 
+    @property
+    def value_context(self):
+        if self._ctx is not None:
+            return pprint.pformat(self._ctx, width=1)
+
+    def compile(self):
+        """
+        parse the teststr once. recompiled if the teststr changes
+        """
+        c = self._compiled
+        if c is None or c.source != self.teststr:
+            c = self._compiled = CompiledTestStr(self.teststr)
+        return c
+
     def _should_check(self, run, data, cnt):
         if self.analysis_types:
             if run.analysis_type.lower() not in self.analysis_types:
@@ -285,18 +307,18 @@ class AutomatedRunConditional(BaseConditional):
         evaluate the teststr with the context
 
         """
+        compiled = self.compile()
         teststr, ctx = self._make_context(run, data)
         self._teststr, self._ctx = teststr, ctx
 
-        self.value_context = vc = pprint.pformat(ctx, width=1)
+        if self.debug_enabled():
+            self.debug('testing {}'.format(teststr))
+            if verbose:
+                self.debug('attribute context {}'.format(pprint.pformat(self._attr_dict(), width=1)))
+            self.debug('evaluate ot="{}" t="{}", ctx="{}"'.format(self.teststr, teststr, self.value_context))
 
-        self.debug('testing {}'.format(teststr))
-        if verbose:
-            self.debug('attribute context {}'.format(pprint.pformat(self._attr_dict(), width=1)))
-        msg = 'evaluate ot="{}" t="{}", ctx="{}"'.format(self.teststr, teststr, vc)
-        self.debug(msg)
         if teststr and ctx:
-            if eval(teststr, ctx):
+            if compiled.evaluate(teststr, ctx):
                 self.trips += 1
                 self.debug('condition {} is true trips={}/{}'.format(teststr, self.trips,
                                                                      self.ntrips))
@@ -309,34 +331,36 @@ class AutomatedRunConditional(BaseConditional):
                 self.trips = 0
 
     def _make_context(self, obj, data):
-        teststr = self.teststr
+        compiled = self.compile()
         ctx = {}
         tt = []
-        for ti, oper in tokenize(teststr):
-            ts, attr, func = get_teststr_attr_func(ti)
-
-            attr = attr.replace('(', '_').replace(')', '_')
-            ts = ts.replace('(', '_').replace(')', '_')
-
-            v = func(obj, data, self.window)
+        for term in compiled.terms:
+            v = term.func(obj, data, self.window)
             if v is not None:
-                vv = std_dev(v) if STD_REGEX.match(teststr) else nominal_value(v)
+                vv = std_dev(v) if compiled.use_std_dev else nominal_value(v)
                 vv = self._map_value(vv)
-                ctx[attr] = vv
+                ctx[term.key] = vv
 
-                ts = self._interpolate_teststr(ts, obj, data)
+                ts = term.teststr
+                if term.interpolate:
+                    ts = self._interpolate_teststr(ts, obj, data)
                 tt.append(ts)
-                if oper:
-                    tt.append(oper)
+                if term.oper:
+                    tt.append(term.oper)
 
         return ' '.join(tt), ctx
 
     def _map_value(self, vv):
         if self.mapper:
-            m = MAPPER_KEY_REGEX.search(self.mapper)
-            if m:
-                key = m.group(0)
-                vv = eval(self.mapper, {key: vv})
+            c = self._compiled_mapper
+            if c is None or c[0] != self.mapper:
+                m = MAPPER_KEY_REGEX.search(self.mapper)
+                code = compile(self.mapper, '<mapper>', 'eval') if m else None
+                c = self._compiled_mapper = (self.mapper, m.group(0) if m else None, code)
+
+            mapper, key, code = c
+            if code is not None:
+                vv = eval(code, {key: vv})
         return vv
 
     def _interpolate_teststr(self, ts, obj, data):
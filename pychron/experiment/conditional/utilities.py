@@ -18,17 +18,72 @@
 # ============= standard library imports ========================
 # ============= local library imports  ==========================
 from __future__ import absolute_import
+
+from collections import OrderedDict
+
 from uncertainties import ufloat
 
 from pychron.experiment.conditional.regexes import COMP_REGEX, ARGS_REGEX, DEFLECTION_REGEX, BASELINECOR_REGEX, \
     BASELINE_REGEX, MIN_REGEX, MAX_REGEX, CP_REGEX, PARENTHESES_REGEX, KEY_REGEX, ACTIVE_REGEX, SLOPE_REGEX, AVG_REGEX, \
-    RATIO_REGEX, BETWEEN_REGEX, PRESSURE_REGEX, DEVICE_REGEX
+    RATIO_REGEX, BETWEEN_REGEX, PRESSURE_REGEX, DEVICE_REGEX, STD_REGEX, INTERPOLATE_REGEX
 
 
 def interpolate_teststr():
     pass
 
 
+class CompiledTerm(object):
+    """
+    one token of a teststr. ``func(obj, data, window)`` returns the value of ``key`` used to evaluate ``teststr``
+    """
+    __slots__ = ('teststr', 'key', 'func', 'oper', 'interpolate')
+
+    def __init__(self, teststr, key, func, oper):
+        self.teststr = teststr
+        self.key = key
+        self.func = func
+        self.oper = oper
+        # teststr contains $variables that are replaced with the run's values when checked
+        self.interpolate = bool(INTERPOLATE_REGEX.search(teststr))
+
+
+class CompiledTestStr(object):
+    """
+    a teststr parsed once into terms. the evaluated expression depends on which terms have a value so the code
+    objects are cached by expression. an interpolated teststr makes a new expression whenever the interpolated
+    values change so only the ``maxsize`` most recently used expressions are kept
+    """
+    maxsize = 8
+
+    def __init__(self, teststr):
+        self.source = teststr
+        self.use_std_dev = bool(STD_REGEX.match(teststr))
+
+        terms = []
+        for ti, oper in tokenize(teststr):
+            ts, attr, func = get_teststr_attr_func(ti)
+
+            attr = attr.replace('(', '_').replace(')', '_')
+            ts = ts.replace('(', '_').replace(')', '_')
+            terms.append(CompiledTerm(ts, attr, func, oper))
+
+        self.terms = terms
+        self._codes = OrderedDict()
+
+    def evaluate(self, teststr, ctx):
+        code = self._codes.pop(teststr, None)
+        if code is None:
+            code = compile(teststr, '<conditional>', 'eval')
+
+        # most recently used last
+        self._codes[teststr] = code
+        while len(self._codes) > self.maxsize:
+            self._codes.popitem(last=False)
+
+        # eval adds __builtins__ to the globals it is passed
+        return eval(code, dict(ctx))
+
+
 def get_teststr_attr_func(token):
     for args in (
             (DEVICE_REGEX, 'obj.get_device_value(attr)', wrapper, device_teststr),
@@ -79,7 +134,8 @@ def get_teststr_attr_func(token):
 
 # wrappers
 def wrapper(fstr, token, ai):
-    return lambda obj, data, window: eval(fstr, {'attr': ai,
+    code = compile(fstr, '<conditional>', 'eval')
+    return lambda obj, data, window: eval(code, {'attr': ai,
                                                  'aa': obj.isotope_group,
                                                  'obj': obj,
                                                  'data': data, 'window': window})
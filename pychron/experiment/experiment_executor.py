@@ -46,6 +46,7 @@ from pychron.experiment.conflict_resolver import ConflictResolver
 from pychron.experiment.datahub import Datahub
 from pychron.experiment.experiment_scheduler import ExperimentScheduler
 from pychron.experiment.experiment_status import ExperimentStatus
+from pychron.experiment.persistence_queue import PersistenceQueue, PersistenceError
 from pychron.experiment.stats import StatsGroup
 from pychron.experiment.utilities.conditionals import test_queue_conditionals_name, SYSTEM, QUEUE, RUN, \
     CONDITIONAL_GROUP_TAGS
@@ -60,16 +61,21 @@ from pychron.pychron_constants import DEFAULT_INTEGRATION_TIME, LINE_STR, AR_AR,
 from pychron.wait.wait_group import WaitGroup
 
 
+# runs saved in the background remove their backups on the persistence queue's thread
+BACKUP_LOCK = Lock()
+
+
 def remove_backup(uuid_str):
     """
         remove uuid from backup recovery file
     """
-    with open(paths.backup_recovery_file, 'r') as rfile:
-        r = rfile.read()
+    with BACKUP_LOCK:
+        with open(paths.backup_recovery_file, 'r') as rfile:
+            r = rfile.read()
 
-    r = r.replace('{}\n'.format(uuid_str), '')
-    with open(paths.backup_recovery_file, 'w') as wfile:
-        wfile.write(r)
+        r = r.replace('{}\n'.format(uuid_str), '')
+        with open(paths.backup_recovery_file, 'w') as wfile:
+            wfile.write(r)
 
 
 class ExperimentExecutor(Consoleable, PreferenceMixin):
@@ -163,10 +169,20 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
     use_xls_persistence = Bool(False)
     use_db_persistence = Bool(True)
 
+    # save a run while the next one extracts and measures
+    use_background_persistence = Bool(False)
+    persistence_queue_size = Int(2)
+    persistence_queue = Instance(PersistenceQueue, ())
+
     # dvc
     use_dvc_persistence = Bool(False)
     default_principal_investigator = Str
 
+    # commit runs to the dvc repositories in batches
+    use_commit_batching = Bool(False)
+    commit_batch_runs = Int(10)
+    commit_batch_period = Int(10)
+
     baseline_color = Color
     sniff_color = Color
     signal_color = Color
@@ -235,12 +251,17 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
                  'default_integration_time',
                  'use_xls_persistence',
                  'use_db_persistence',
+                 'use_background_persistence',
+                 'persistence_queue_size',
                  'experiment_type',
                  'laboratory')
         self._preference_binder(prefid, attrs)
 
         # dvc
-        self._preference_binder('pychron.dvc.experiment', ('use_dvc_persistence',))
+        self._preference_binder('pychron.dvc.experiment', ('use_dvc_persistence',
+                                                           'use_commit_batching',
+                                                           'commit_batch_runs',
+                                                           'commit_batch_period'))
 
         # dashboard
         self._preference_binder('pychron.dashboard.experiment', ('use_dashboard_client',))
@@ -664,6 +685,12 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
                 # wait for overlapped runs to finish.
                 self._wait_for(lambda x: self.extracting_run or self.measuring_run)
 
+        if self.use_background_persistence:
+            self._flush_persistence_queue()
+
+        if self.use_dvc_persistence and self.use_commit_batching:
+            self._flush_commits()
+
         if self._err_message:
             self.warning('automated runs did not complete successfully')
             self.warning('error: {}'.format(self._err_message))
@@ -802,11 +829,18 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
             if run.spec.state not in ('truncated', 'canceled', 'failed'):
                 run.spec.state = 'success'
 
-        if run.spec.state in ('success', 'truncated', 'terminated'):
-            run.save()
-            self.run_completed = run
+        background = self.use_background_persistence
+        persist = False
+        completed = run.spec.state in ('success', 'truncated', 'terminated')
+        if completed:
+            if background:
+                persist = run.prepare_save()
+            else:
+                run.save()
+                self.run_completed = run
 
-        remove_backup(run.uuid)
+        if not background:
+            remove_backup(run.uuid)
 
         # check to see if action should be taken
         if run.spec.state not in ('canceled', 'failed'):
@@ -827,7 +861,7 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
         if run.spec.state not in ('canceled', 'failed', 'aborted'):
             self._retroactive_repository_identifiers(run.spec)
 
-        if self.use_autoplot:
+        if self.use_autoplot and not background:
             self.autoplot_event = run
 
         self.wait_group.pop()
@@ -849,10 +883,66 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
                        experiment_queue=self.experiment_queue)
 
         remove_root_handler(handler)
-        run.post_finish()
+        if background:
+            # queued once the log is complete
+            self._put_persistence_job(run, persist, completed)
+        else:
+            run.post_finish()
         self._set_thread_name(self.experiment_queue.name)
         self.experiment_queue.refresh_table_needed = True
 
+    def _put_persistence_job(self, run, persist, completed):
+        autoplot = self.use_autoplot
+
+        def func():
+            try:
+                if persist and not run.persist(background=True):
+                    raise PersistenceError(run.persister.secondary_database_fail or 'persist failed')
+            finally:
+                run.post_finish()
+
+            # keep the backup of a run that failed to save so it can be recovered
+            remove_backup(run.uuid)
+
+            # the handlers query the database so only fire once the run is saved
+            if completed:
+                self.run_completed = run
+            if autoplot:
+                self.autoplot_event = run
+
+        pq = self.persistence_queue
+        pq.maxsize = max(1, self.persistence_queue_size)
+        pq.put(run.runid, func, run.spec.labnumber)
+
+    def _flush_persistence_queue(self):
+        self.info('waiting for {} runs to save'.format(self.persistence_queue.npending))
+        self.persistence_queue.stop()
+        self._check_persistence_errors()
+
+    def _flush_commits(self):
+        dvc = self.datahub.mainstore
+        self.info('committing {} batched runs'.format(len(dvc.commit_batcher.keys)))
+        try:
+            dvc.flush_commits()
+        except BaseException as e:
+            self.warning('committing batched runs failed. {}'.format(e))
+            self.debug_exception()
+
+        if dvc.commit_batcher.npending:
+            self.warning('runs not committed {}. they are committed at the start of the next '
+                         'queue'.format(', '.join(str(k) for k in dvc.commit_batcher.keys)))
+
+    def _check_persistence_errors(self):
+        """
+            return True if a run saved in the background failed
+        """
+        errs = self.persistence_queue.pop_errors()
+        if errs:
+            msg = ', '.join('{} {}'.format(*e) for e in errs)
+            self.warning('background save failed. {}'.format(msg))
+            self._err_message = 'Save failed {}'.format(msg)
+            return True
+
     def _close_cv(self):
         self.debug('close cv {}'.format(self._cv_info))
         if self._cv_info:
@@ -1254,14 +1344,26 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
         if self.use_dvc_persistence:
             dvcp = self.application.get_service('pychron.dvc.dvc_persister.DVCPersister')
             if dvcp:
+                pull = True
+                if self.use_background_persistence:
+                    # the previous run may still be saving with its own persister
+                    dvcp = dvcp.clone()
+                    # pending saves pull before they commit
+                    pull = not self.persistence_queue.npending
+
                 dvcp.load_name = exp.load_name
                 dvcp.default_principal_investigator = self.default_principal_investigator
+                dvcp.use_commit_batching = self.use_commit_batching
+                if self.use_commit_batching:
+                    batcher = dvcp.dvc.commit_batcher
+                    batcher.max_runs = max(1, self.commit_batch_runs)
+                    batcher.max_age = self.commit_batch_period * 60
                 arun.dvc_persister = dvcp
 
                 repid = spec.repository_identifier
                 self.datahub.mainstore.add_repository(repid, self.default_principal_investigator, inform=False)
 
-                arun.dvc_persister.initialize(repid)
+                arun.dvc_persister.initialize(repid, pull=pull)
 
         mon = self.monitor
         if mon is not None:
@@ -1290,6 +1392,10 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
         if spec.conflicts_checked:
             return True
 
+        if self.use_background_persistence:
+            # the aliquot and step come from the database so wait for saves of this labnumber
+            self.persistence_queue.wait_for(spec.labnumber)
+
         # if a run in executed runs is in extraction or measurement state
         # we are in overlap mode
         dh = self.datahub
@@ -1475,8 +1581,9 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
             add uuid to backup recovery file
         """
 
-        with open(paths.backup_recovery_file, 'a') as rfile:
-            rfile.write('{}\n'.format(uuid_str))
+        with BACKUP_LOCK:
+            with open(paths.backup_recovery_file, 'a') as rfile:
+                rfile.write('{}\n'.format(uuid_str))
 
     # ===============================================================================
     # checks
@@ -1906,6 +2013,9 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
         if self._check_for_errors(inform):
             return True
 
+        if self._check_persistence_errors():
+            return True
+
         if self.monitor:
             if not self.monitor.check():
                 self._err_message = 'Automated Run Monitor Failed'
@@ -1992,6 +2102,11 @@ class ExperimentExecutor(Consoleable, PreferenceMixin):
                 return True
 
     def _sync_repositories(self, prog):
+        if self.use_dvc_persistence and self.use_commit_batching:
+            if prog:
+                prog.change_message('Committing pending runs')
+            self.datahub.mainstore.recover_commits()
+
         experiment_ids = {a.repository_identifier for q in self.experiment_queues for a in q.cleaned_automated_runs}
         for e in experiment_ids:
             if prog:
@@ -0,0 +1,180 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+from __future__ import absolute_import
+
+from traits.api import Int
+
+# ============= standard library imports ========================
+import time
+from collections import deque
+from threading import Thread, Condition
+
+# ============= local library imports  ==========================
+from pychron.loggable import Loggable
+
+
+class PersistenceError(Exception):
+    pass
+
+
+class PersistenceJob(object):
+    def __init__(self, name, func, key=None):
+        self.name = name
+        self.func = func
+        self.key = key
+
+
+class PersistenceQueue(Loggable):
+    """
+    saves runs on a worker thread so the next run can extract and measure while the previous one is written.
+
+    jobs run one at a time in the order they were added. ``put`` blocks while ``maxsize`` jobs are waiting or
+    running, so a slow database or git remote holds up the queue instead of accumulating unsaved runs. a job that
+    raises is recorded and returned by ``pop_errors``::
+
+        pq = PersistenceQueue(maxsize=2)
+        pq.put(run.runid, run.persist, key=run.spec.identifier)
+        ...
+        pq.flush()
+        for name, err in pq.pop_errors():
+            ...
+    """
+    maxsize = Int(2)
+
+    def __init__(self, *args, **kw):
+        super(PersistenceQueue, self).__init__(*args, **kw)
+        self._cond = Condition()
+        self._jobs = deque()
+        # jobs waiting or running
+        self._pending = []
+        self._errors = []
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def npending(self):
+        with self._cond:
+            return len(self._pending)
+
+    def put(self, name, func, key=None):
+        """
+        add a job. blocks until fewer than ``maxsize`` jobs are pending
+
+        @param name: used in log and error messages
+        @param func: callable. raise to signal failure
+        @param key: used by ``wait_for``
+        """
+        job = PersistenceJob(name, func, key)
+        with self._cond:
+            if len(self._pending) >= self.maxsize:
+                self.debug('persistence queue full. waiting to add {}'.format(name))
+                st = time.time()
+                while len(self._pending) >= self.maxsize:
+                    self._cond.wait(1)
+                self.debug('waited {:0.2f}s to add {}'.format(time.time() - st, name))
+
+            self._jobs.append(job)
+            self._pending.append(job)
+            self._start_worker()
+            self._cond.notify_all()
+
+    def wait_for(self, key, timeout=None):
+        """
+        wait until no job with ``key`` is pending
+
+        @return: True if no job with ``key`` is pending
+        """
+        return self._wait(lambda: not any(j.key == key for j in self._pending), timeout)
+
+    def flush(self, timeout=None):
+        """
+        wait until all jobs are finished
+
+        @return: True if all jobs are finished
+        """
+        return self._wait(lambda: not self._pending, timeout)
+
+    def pop_errors(self):
+        """
+        @return: list of (name, error message) of the jobs that failed since the last call
+        """
+        with self._cond:
+            errs, self._errors = self._errors, []
+        return errs
+
+    def stop(self, timeout=None):
+        """
+        flush and stop the worker thread. a later ``put`` starts a new one
+        """
+        self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            t = self._thread
+        if t is not None:
+            t.join(timeout)
+
+    # private
+    def _wait(self, predicate, timeout):
+        st = time.time()
+        with self._cond:
+            while not predicate():
+                if timeout is not None:
+                    rem = timeout - (time.time() - st)
+                    if rem <= 0:
+                        return False
+                    self._cond.wait(min(rem, 1))
+                else:
+                    self._cond.wait(1)
+        return True
+
+    def _start_worker(self):
+        # a worker that is stopping but has not returned takes the new job
+        self._stopped = False
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name='PersistenceQueue')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while 1:
+            with self._cond:
+                while not self._jobs:
+                    if self._stopped:
+                        self._thread = None
+                        return
+                    self._cond.wait(1)
+                job = self._jobs.popleft()
+
+            st = time.time()
+            self.debug('saving {}'.format(job.name))
+            try:
+                job.func()
+            except BaseException as e:
+                with self._cond:
+                    self._errors.append((job.name, str(e)))
+                self.warning('saving {} failed. {}'.format(job.name, e))
+                self.debug_exception()
+            else:
+                self.debug('saved {} in {:0.2f}s'.format(job.name, time.time() - st))
+            finally:
+                with self._cond:
+                    self._pending.remove(job)
+                    self._cond.notify_all()
+
+# ============= EOF =============================================
@@ -24,6 +24,7 @@ from traits.api import Property, String, Float, Any, Int, List, Instance, Bool
 from pychron.core.helpers.timer import Timer
 from pychron.core.ui.pie_clock import PieClockModel
 from pychron.experiment.duration_tracker import AutomatedRunDurationTracker
+from pychron.experiment.utilities.queue_validator import QueueValidator
 from pychron.loggable import Loggable
 from pychron.pychron_constants import MEASUREMENT_COLOR, EXTRACTION_COLOR, NULL_STR
 from six.moves import map
@@ -172,10 +173,17 @@ class ExperimentStats(Loggable):
 
         dur = 0
         if runs:
-            script_ctx = dict()
-            warned = []
             ni = len(runs)
 
+            # estimate the runs the tracker does not know in bulk
+            untracked = [a for a in runs if a.script_hash not in self.duration_tracker]
+            estimated = {}
+            if untracked:
+                report = QueueValidator().validate(untracked)
+                for a, rv in zip(untracked, report.runs):
+                    a.set_estimated_duration(rv.duration)
+                    estimated[id(a)] = rv.duration
+
             btw = 0
             run_dur = 0
             d = 0
@@ -190,7 +198,7 @@ class ExperimentStats(Loggable):
                     #     run_dur += self.duration_tracker[sh]
                     run_dur += self.duration_tracker[sh]
                 else:
-                    run_dur += a.get_estimated_duration(script_ctx, warned, True)
+                    run_dur += estimated[id(a)]
                 d = a.get_delay_after(self.delay_between_analyses, self.delay_after_blank, self.delay_after_air)
                 btw += d
 
@@ -82,6 +82,8 @@ class ExperimentPreferences(BasePreferencesHelper):
 
     use_xls_persistence = Bool
     use_db_persistence = Bool
+    use_background_persistence = Bool
+    persistence_queue_size = Int(2)
 
     success_color = Color
     extraction_color = Color
@@ -99,6 +101,7 @@ class ExperimentPreferences(BasePreferencesHelper):
 
     n_executed_display = Int
     failed_intensity_count_threshold = Int(3)
+    plot_frame_rate = Float(10)
 
     def _get_memory_threshold(self):
         return self._memory_threshold
@@ -234,6 +237,12 @@ class ExperimentPreferencesPane(PreferencesPane):
 
         persist_grp = Group(Item('use_xls_persistence', label='Save analyses to Excel workbook'),
                             Item('use_db_persistence', label='Save analyses to Database'),
+                            Item('use_background_persistence', label='Save in background',
+                                 tooltip='Save an analysis while the next analysis extracts and measures'),
+                            Item('persistence_queue_size', label='Max. Unsaved Analyses',
+                                 enabled_when='use_background_persistence',
+                                 tooltip='The experiment waits before starting a new save if this many analyses are '
+                                         'waiting to be saved'),
                             label='Persist', show_border=True)
 
         pc_grp = Group(Item('use_peak_center_threshold', label='Use Peak Center Threshold',
@@ -259,6 +268,10 @@ class ExperimentPreferencesPane(PreferencesPane):
                                           label='N. Failed Intensity',
                                           tooltip='Cancel Experiment if pychron fails to get intensities from '
                                                   'mass spectrometer more than "N. Failed Intensity" times'),
+                                     Item('plot_frame_rate',
+                                          label='Plot Frame Rate',
+                                          tooltip='Maximum number of times per second the plots are redrawn while '
+                                                  'collecting data. 0 redraws for every count'),
                                      pc_grp,
                                      persist_grp,
                                      monitor_grp, overlap_grp),
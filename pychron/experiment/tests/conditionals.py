@@ -4,6 +4,7 @@ import unittest
 from numpy import linspace
 
 from pychron.experiment.conditional.conditional import conditional_from_dict, tokenize
+from pychron.experiment.conditional.utilities import CompiledTestStr
 from pychron.processing.arar_age import ArArAge
 from pychron.processing.isotope import Isotope
 
@@ -299,6 +300,36 @@ class ConditionalsTestCase(unittest.TestCase):
         d = {'check': 'L2(CDD).deflection==2000', 'attr': 'CDD'}
         self._test(d)
 
+    @unittest.skipIf(DEBUGGING, 'Debugging')
+    def test_Compiled(self):
+        d = {'check': 'Ar40>1 and Ar39>0.5', 'attr': 'Ar40'}
+        c = conditional_from_dict(d, 'TerminationConditional')
+        compiled = c.compile()
+        self.assertEqual([t.key for t in compiled.terms], ['Ar40', 'Ar39'])
+
+        for cnt in (1000, 1001, 1002):
+            self.assertTrue(c.check(self.arun, ([], []), cnt))
+        self.assertIs(c.compile(), compiled)
+        self.assertEqual(c.result_dict()['teststr'], 'Ar40>1 and Ar39>0.5')
+        self.assertNotIn('__builtins__', c.value_context)
+
+        c.teststr = 'Ar40>10'
+        self.assertIsNot(c.compile(), compiled)
+        self.assertFalse(c.check(self.arun, ([], []), 1000))
+
+    def test_compiled_cache(self):
+        c = CompiledTestStr('Ar40>1')
+        self.assertTrue(c.evaluate('Ar40>1', {'Ar40': 2}))
+        code = c._codes['Ar40>1']
+
+        # interpolated values make a new expression every check
+        for i in range(100):
+            self.assertFalse(c.evaluate('Ar40>{}'.format(i + 2), {'Ar40': 2}))
+            self.assertTrue(c.evaluate('Ar40>1', {'Ar40': 2}))
+
+        self.assertLessEqual(len(c._codes), c.maxsize)
+        self.assertIs(c._codes['Ar40>1'], code)
+
     def _test_between(self, l, h):
         self.arun.isotope_group.isotopes['Ar40'].value = 3.4
         d = {'check': 'between(Ar40,{},{})'.format(l, h), 'attr': 'Ar40'}
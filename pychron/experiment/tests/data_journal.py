@@ -0,0 +1,111 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from numpy import arange
+
+from pychron.experiment.automated_run.data_journal import DataJournal, DataJournalError, read_journal, HEADER, \
+    RECORD_SIZE
+
+
+class Detector(object):
+    def __init__(self, name, isotope):
+        self.name = name
+        self.isotope = isotope
+
+
+DETECTORS = [Detector('H1', 'Ar40'), Detector('AX', 'Ar39'), Detector('L2(CDD)', 'Ar36')]
+KEYS = [d.name for d in DETECTORS]
+
+
+class DataJournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'run.pjl')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write(self, n=50, group='signal'):
+        with DataJournal(self.path) as j:
+            for i in range(n):
+                j.write_signals(group, DETECTORS, float(i), KEYS, [i, 2 * i, 3 * i])
+
+    def test_read(self):
+        self._write()
+        data = read_journal(self.path)
+        self.assertListEqual(list(data.keys()), [('signal', 'Ar40', 'H1'),
+                                                 ('signal', 'Ar39', 'AX'),
+                                                 ('signal', 'Ar36', 'L2(CDD)')])
+        xs, ys = data[('signal', 'Ar39', 'AX')]
+        self.assertListEqual(list(xs), list(arange(50.)))
+        self.assertListEqual(list(ys), list(2 * arange(50.)))
+
+    def test_fixed_width(self):
+        self._write()
+        size = os.path.getsize(self.path) - len(HEADER)
+        self.assertEqual(size % RECORD_SIZE, 0)
+
+    def test_missing_detector(self):
+        with DataJournal(self.path) as j:
+            j.write_signals('baseline', DETECTORS, 1.0, ['H1'], [5])
+
+        data = read_journal(self.path)
+        self.assertListEqual(list(data.keys()), [('baseline', 'Ar40', 'H1')])
+
+    def test_append(self):
+        self._write(10)
+        self._write(5, group='baseline')
+        self._write(5)
+
+        data = read_journal(self.path)
+        self.assertEqual(len(data), 6)
+        xs, ys = data[('signal', 'Ar40', 'H1')]
+        self.assertEqual(len(xs), 15)
+
+    def test_truncated(self):
+        self._write()
+        # simulate a crash part way through writing a record
+        with open(self.path, 'ab') as wfile:
+            wfile.write(b'\x00\x00\x01\x02\x03')
+
+        data = read_journal(self.path)
+        xs, ys = data[('signal', 'Ar36', 'L2(CDD)')]
+        self.assertEqual(len(xs), 50)
+
+        # appending after a crash drops the partial record
+        self._write(1)
+        xs, ys = read_journal(self.path)[('signal', 'Ar40', 'H1')]
+        self.assertEqual(len(xs), 51)
+        self.assertEqual(xs[-1], 0)
+
+    def test_truncated_definition(self):
+        self._write(2)
+        size = os.path.getsize(self.path)
+        with DataJournal(self.path) as j:
+            j.write('sniff', 'Ar40', 'H1', 0, 1)
+
+        # cut the new channel's name in half
+        with open(self.path, 'r+b') as wfile:
+            wfile.truncate(size + RECORD_SIZE + 5)
+
+        data = read_journal(self.path)
+        self.assertEqual(len(data), 3)
+
+        with DataJournal(self.path) as j:
+            j.write('sniff', 'Ar40', 'H1', 0, 1)
+        data = read_journal(self.path)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(len(data[('signal', 'Ar40', 'H1')][0]), 2)
+
+    def test_not_journal(self):
+        with open(self.path, 'wb') as wfile:
+            wfile.write(b'foo')
+        self.assertRaises(DataJournalError, read_journal, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+from __future__ import absolute_import
+
+import time
+import unittest
+from threading import Event, Thread
+
+from pychron.globals import globalv
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+from pychron.experiment.persistence_queue import PersistenceQueue
+
+
+class PersistenceQueueTestCase(unittest.TestCase):
+    def setUp(self):
+        self.queue = PersistenceQueue(maxsize=2)
+        self.saved = []
+
+    def tearDown(self):
+        self.queue.stop(timeout=5)
+
+    def _job(self, name, event=None):
+        def func():
+            if event is not None:
+                event.wait(5)
+            self.saved.append(name)
+
+        return func
+
+    def test_order(self):
+        for i in range(10):
+            self.queue.put(str(i), self._job(i))
+
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertEqual(self.saved, list(range(10)))
+        self.assertEqual(self.queue.npending, 0)
+
+    def test_backpressure(self):
+        evt = Event()
+        self.queue.put('a', self._job('a', evt))
+        self.queue.put('b', self._job('b'))
+
+        added = Event()
+
+        def put():
+            self.queue.put('c', self._job('c'))
+            added.set()
+
+        t = Thread(target=put)
+        t.start()
+        # the queue is full until "a" finishes
+        self.assertFalse(added.wait(0.2))
+        evt.set()
+        self.assertTrue(added.wait(5))
+        t.join()
+
+        self.queue.flush(timeout=5)
+        self.assertEqual(self.saved, ['a', 'b', 'c'])
+
+    def test_errors(self):
+        def fail():
+            raise ValueError('no database')
+
+        self.queue.put('a', fail)
+        self.queue.put('b', self._job('b'))
+        self.queue.flush(timeout=5)
+
+        self.assertEqual(self.saved, ['b'])
+        self.assertEqual(self.queue.pop_errors(), [('a', 'no database')])
+        self.assertEqual(self.queue.pop_errors(), [])
+
+    def test_wait_for(self):
+        evt = Event()
+        self.queue.put('a', self._job('a', evt), key='10000')
+        self.assertTrue(self.queue.wait_for('20000', timeout=0.1))
+        self.assertFalse(self.queue.wait_for('10000', timeout=0.1))
+        evt.set()
+        self.assertTrue(self.queue.wait_for('10000', timeout=5))
+
+    def test_restart(self):
+        self.queue.put('a', self._job('a'))
+        self.queue.stop(timeout=5)
+        self.queue.put('b', self._job('b'))
+        self.queue.flush(timeout=5)
+        self.assertEqual(self.saved, ['a', 'b'])
+
+    def test_flush_timeout(self):
+        evt = Event()
+        self.queue.put('a', self._job('a', evt))
+        st = time.time()
+        self.assertFalse(self.queue.flush(timeout=0.1))
+        self.assertLess(time.time() - st, 1)
+        evt.set()
+
+
+if __name__ == '__main__':
+    unittest.main()
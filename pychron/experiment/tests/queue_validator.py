@@ -0,0 +1,150 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+from threading import Lock
+
+from pychron.globals import globalv
+
+globalv.use_logger_display = False
+
+from pychron.experiment.utilities.queue_validator import QueueValidator, SCRIPT_DIRS
+from pychron.paths import paths
+from pychron.pyscripts.error import PyscriptError
+
+LOCK = Lock()
+
+
+class MockScript(object):
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def _call(self):
+        with LOCK:
+            self.calls.append(self.name)
+        if 'bad' in self.name:
+            raise PyscriptError(self.name, 'invalid')
+
+    def test(self):
+        self._call()
+
+    def calculate_estimated_duration(self, ctx, force=False):
+        self._call()
+        return ctx['duration'] * 10
+
+
+class MockSpec(object):
+    mass_spectrometer = 'Jan'
+    post_measurement_script = 'pm'
+    post_equilibration_script = 'pe'
+    conditionals = ''
+
+    def __init__(self, runid, extraction='ext', measurement='meas', duration=1, **kw):
+        self.runid = runid
+        self.extraction_script = extraction
+        self.measurement_script = measurement
+        self.duration = duration
+        self.__dict__.update(kw)
+
+    @property
+    def script_hash(self):
+        return str((self.extraction_script, self.measurement_script, self.duration))
+
+    def make_script_context(self):
+        return dict(duration=self.duration)
+
+
+class QueueValidatorTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        cls._paths = {}
+        for attr in list(SCRIPT_DIRS.values()) + ['conditionals_dir']:
+            d = os.path.join(cls.root, attr)
+            os.mkdir(d)
+            cls._paths[attr] = getattr(paths, attr)
+            setattr(paths, attr, d)
+
+        for attr, name in (('extraction_dir', 'ext'), ('extraction_dir', 'ext2'), ('extraction_dir', 'bad'),
+                           ('measurement_dir', 'meas'),
+                           ('post_measurement_dir', 'pm'), ('post_equilibration_dir', 'pe'),
+                           ('post_equilibration_dir', 'pe_bad')):
+            with open(os.path.join(getattr(paths, attr), 'jan_{}.py'.format(name)), 'w') as wfile:
+                wfile.write('def main():\n    pass\n')
+
+    @classmethod
+    def tearDownClass(cls):
+        for attr, d in cls._paths.items():
+            setattr(paths, attr, d)
+        shutil.rmtree(cls.root, ignore_errors=True)
+
+    def setUp(self):
+        self.calls = []
+        self.nloaded = []
+
+        def loader(spec):
+            with LOCK:
+                self.nloaded.append(spec.runid)
+            return {si: MockScript(getattr(spec, si), self.calls) for si in SCRIPT_DIRS}
+
+        self.validator = QueueValidator(loader=loader, nworkers=3)
+
+    def test_dedupe(self):
+        runs = [MockSpec('1000-{:02d}'.format(i)) for i in range(50)]
+        runs.append(MockSpec('2000-01', extraction='ext2', duration=2))
+        report = self.validator.validate(runs)
+
+        self.assertTrue(report.ok)
+        self.assertEqual(report.ncombinations, 2)
+        self.assertEqual(len(self.nloaded), 2)
+        # shared post scripts tested once
+        self.assertEqual(self.calls.count('pm'), 1)
+        self.assertEqual(self.calls.count('pe'), 1)
+        self.assertEqual(self.calls.count('meas'), 2)
+
+    def test_durations(self):
+        runs = [MockSpec('1000-01'), MockSpec('1000-02', duration=3), MockSpec('1000-03')]
+        report = self.validator.validate(runs)
+        # (extraction + measurement) + db save time
+        self.assertEqual(report.durations, [21, 61, 21])
+        self.assertEqual(report.total_duration, 103)
+
+    def test_no_duration(self):
+        runs = [MockSpec('1000-01'), MockSpec('1000-02')]
+        report = self.validator.validate(runs, duration=False)
+        self.assertEqual(report.durations, [0, 0])
+        self.assertEqual(self.calls.count('meas'), 1)
+
+    def test_invalid_script(self):
+        runs = [MockSpec('1000-01'), MockSpec('1000-02', extraction='bad')]
+        report = self.validator.validate(runs)
+        self.assertEqual(list(report.errors.keys()), ['2. 1000-02'])
+        self.assertTrue(report.runs[0].ok)
+
+    def test_invalid_shared_script(self):
+        runs = [MockSpec('1000-01', post_equilibration_script='pe_bad'),
+                MockSpec('1000-02', duration=2, post_equilibration_script='pe_bad')]
+        report = self.validator.validate(runs)
+        self.assertEqual(self.calls.count('pe_bad'), 1)
+        self.assertFalse(report.runs[0].ok)
+        self.assertFalse(report.runs[1].ok)
+
+    def test_missing_script(self):
+        runs = [MockSpec('1000-01', measurement='nofile')]
+        report = self.validator.validate(runs)
+        self.assertFalse(report.ok)
+        self.assertIn('Not a file', report.runs[0].errors[0])
+        self.assertEqual(self.nloaded, [])
+
+    def test_inline_conditionals(self):
+        runs = [MockSpec('1000-01', conditionals='Ar40>10,30'),
+                MockSpec('1000-02', conditionals='Ar40>10,start')]
+        report = self.validator.validate(runs)
+        self.assertEqual(list(report.errors.keys()), ['2. 1000-02'])
+
+
+if __name__ == '__main__':
+    unittest.main()
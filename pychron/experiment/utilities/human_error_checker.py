@@ -22,6 +22,7 @@ from traits.api import Bool
 # ============= local library imports  ==========================
 from pychron.core.ui.preference_binding import bind_preference
 from pychron.experiment.utilities.identifier import get_analysis_type
+from pychron.experiment.utilities.queue_validator import QueueValidator
 from pychron.loggable import Loggable
 from pychron.pychron_constants import LINE_STR, SCRIPT_NAMES, NULL_STR
 import six
@@ -85,8 +86,20 @@ class HumanErrorChecker(Loggable):
         self._script_context = {}
         self._warned = []
         inform = inform and not test_all
+
+        report = None
+        if test_scripts:
+            # test each unique combination of scripts once, concurrently, instead of run by run
+            report = QueueValidator().validate(runs, duration=False)
+
         for i, ai in enumerate(runs):
-            err = self._check_run(ai, inform, test_scripts)
+            err = self._check_run(ai, inform, False)
+            if report is not None:
+                rv = report.runs[i]
+                ai.executable = rv.ok
+                if err is None and not rv.ok:
+                    err = ', '.join(rv.errors)
+
             if err is not None:
                 ai.state = 'invalid'
                 ret['{}. {}'.format(i + 1, ai.runid)] = err
@@ -17,7 +17,6 @@
 # ============= enthought library imports =======================
 from __future__ import absolute_import
 import os
-import struct
 import time
 from datetime import datetime
 
@@ -25,6 +24,7 @@ from numpy import array
 from traits.api import Instance, Int, Str, Bool, provides
 from uncertainties import nominal_value, std_dev
 
+from pychron.core.helpers.binpack import pack_xy
 from pychron.core.helpers.isotope_utils import sort_isotopes
 from pychron.core.i_datastore import IDatastore
 from pychron.experiment.utilities.identifier import make_runid
@@ -33,7 +33,6 @@ from pychron.experiment.utilities.info_blob import encode_infoblob
 from pychron.loggable import Loggable
 from pychron.mass_spec.database.massspec_database_adapter import MassSpecDatabaseAdapter
 from pychron.pychron_constants import ALPHAS
-from six.moves import zip
 
 mkeys = ['l2 value', 'l1 value', 'ax value', 'h1 value', 'h2 value']
 
@@ -426,7 +425,7 @@ class MassSpecDatabaseImporter(Loggable):
         cvb = array(vb) - baseline.nominal_value
         blob1 = self._build_timeblob(tb, cvb)
 
-        blob2 = b''.join([struct.pack('>f', v) for v in vb])
+        blob2 = array(vb, dtype='>f4').tobytes()
         db.add_peaktimeblob(blob1, blob2, dbiso)
 
         # @todo: add filtered points blob
@@ -495,10 +494,7 @@ class MassSpecDatabaseImporter(Loggable):
     def _build_timeblob(self, t, v):
         """
         """
-        blob = b''
-        for ti, vi in zip(t, v):
-            blob += struct.pack('>ff', vi, ti)
-        return blob
+        return pack_xy(v, t)
 
     def _make_infoblob(self, baseline, baseline_err, n, baseline_position):
         rpts = n
@@ -0,0 +1,277 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+from __future__ import absolute_import
+
+from traits.api import Int, Any
+
+# ============= standard library imports ========================
+import os
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+# ============= local library imports  ==========================
+from pychron.core.helpers.filetools import add_extension
+from pychron.loggable import Loggable
+from pychron.paths import paths
+from pychron.pychron_constants import SCRIPT_NAMES, NULL_STR
+
+SCRIPT_DIRS = {'measurement_script': 'measurement_dir',
+               'extraction_script': 'extraction_dir',
+               'post_measurement_script': 'post_measurement_dir',
+               'post_equilibration_script': 'post_equilibration_dir'}
+
+# the scripts that contribute to a run's estimated duration
+DURATION_SCRIPTS = ('extraction_script', 'measurement_script')
+
+# as in AutomatedRunSpec.get_estimated_duration
+DB_SAVE_TIME = 1
+
+
+def script_path(slot, mass_spectrometer, name):
+    """
+    path of the script ``name`` used for ``slot``. same naming as AutomatedRun._make_script_name
+    """
+    root = getattr(paths, SCRIPT_DIRS[slot])
+    name = '{}_{}'.format(mass_spectrometer.lower(), name)
+    return os.path.join(root, add_extension(name, '.py'))
+
+
+def load_run_scripts(spec):
+    """
+    the pyscripts of ``spec`` as AutomatedRun loads them
+    """
+    arun = spec.make_run(new_uuid=False)
+    arun.refresh_scripts()
+    scripts = {si: getattr(arun, si) for si in SCRIPT_NAMES}
+    arun.spec = None
+    return scripts
+
+
+def conditionals_path(name):
+    return os.path.join(paths.conditionals_dir, add_extension(name, '.yaml'))
+
+
+class RunValidation(object):
+    def __init__(self, idx, runid):
+        self.idx = idx
+        self.runid = runid
+        self.errors = []
+        self.duration = 0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+class QueueValidationReport(object):
+    def __init__(self, runs):
+        self.runs = runs
+        self.elapsed = 0
+        self.ncombinations = 0
+        self.nscripts = 0
+        self.nconditionals = 0
+
+    @property
+    def ok(self):
+        return all(r.ok for r in self.runs)
+
+    @property
+    def errors(self):
+        """
+        same form as HumanErrorChecker.check_runs
+        """
+        return OrderedDict(('{}. {}'.format(r.idx + 1, r.runid), ', '.join(r.errors)) for r in self.runs if r.errors)
+
+    @property
+    def durations(self):
+        return [r.duration for r in self.runs]
+
+    @property
+    def total_duration(self):
+        return sum(self.durations)
+
+    def summary(self):
+        return 'runs={} combinations={} scripts={} conditionals={} invalid={} ' \
+               'duration={:0.0f}s elapsed={:0.3f}s'.format(len(self.runs), self.ncombinations, self.nscripts,
+                                                          self.nconditionals, len(self.errors),
+                                                          self.total_duration, self.elapsed)
+
+
+class QueueValidator(Loggable):
+    """
+    test the scripts and conditionals of a list of AutomatedRunSpecs and estimate their durations.
+
+    runs that use the same scripts, mass spectrometer and duration context (``script_hash``) are one combination.
+    each combination is loaded and tested once, concurrently in a pool of ``nworkers`` threads, and a script shared
+    by several combinations is syntax checked by only one of them. each conditionals file is parsed once::
+
+        report = QueueValidator().validate(runs)
+        if not report.ok:
+            hec.report_errors(report.errors)
+    """
+    nworkers = Int(4)
+
+    # callable(spec) -> {script name: PyScript or None}
+    loader = Any
+
+    def validate(self, runs, duration=True):
+        st = time.time()
+
+        results = [RunValidation(i, r.runid) for i, r in enumerate(runs)]
+        report = QueueValidationReport(results)
+
+        combinations = OrderedDict()
+        conditionals = OrderedDict()
+        owners = {}
+        missing = {}
+        for ri, rv in zip(runs, results):
+            keys = self._script_keys(ri)
+            for k in keys:
+                if k not in missing:
+                    p = script_path(*k)
+                    missing[k] = None if os.path.isfile(p) else 'Invalid script {}. Not a file {}'.format(k[2], p)
+
+            errs = [missing[k] for k in keys if missing[k]]
+            if errs:
+                rv.errors.extend(errs)
+            else:
+                ckey = (ri.mass_spectrometer.lower(), tuple(keys), ri.script_hash)
+                combo = combinations.get(ckey)
+                if combo is None:
+                    combo = combinations[ckey] = (ri, [])
+                    for k in keys:
+                        owners.setdefault(k, ckey)
+                combo[1].append(rv)
+
+            c = ri.conditionals
+            if c and c != NULL_STR:
+                conditionals.setdefault(c, []).append(rv)
+
+        tasks = [(ckey, spec, [k for k, o in owners.items() if o == ckey], duration)
+                 for ckey, (spec, _) in combinations.items()]
+
+        n = max(1, min(self.nworkers, len(tasks)))
+        pool = ThreadPool(n)
+        try:
+            combo_results = pool.map(self._validate_combination, tasks)
+            cond_results = pool.map(self._validate_conditionals, list(conditionals.keys()))
+        finally:
+            pool.close()
+            pool.join()
+
+        script_errors = {}
+        for _, _, serrs in combo_results:
+            script_errors.update(serrs)
+
+        for (ckey, (_, rvs)), (errs, dur, _) in zip(combinations.items(), combo_results):
+            keys = ckey[1]
+            errs = errs + [script_errors[k] for k in keys if k in script_errors and script_errors[k] not in errs]
+            for rv in rvs:
+                rv.errors.extend(errs)
+                if duration:
+                    rv.duration = dur + DB_SAVE_TIME
+
+        for rvs, err in zip(conditionals.values(), cond_results):
+            if err:
+                for rv in rvs:
+                    rv.errors.append(err)
+
+        report.ncombinations = len(combinations)
+        report.nscripts = len(owners)
+        report.nconditionals = len(conditionals)
+        report.elapsed = time.time() - st
+        self.debug('validated queue. {}'.format(report.summary()))
+        return report
+
+    # private
+    def _script_keys(self, spec):
+        ms = spec.mass_spectrometer
+        keys = []
+        for si in SCRIPT_NAMES:
+            name = getattr(spec, si)
+            if name and name != NULL_STR:
+                keys.append((si, ms, name))
+        return keys
+
+    def _validate_combination(self, args):
+        """
+        @return: errors of the combination, its estimated duration and {script key: error} of the owned scripts
+        """
+        ckey, spec, owned, duration = args
+
+        loader = self.loader or load_run_scripts
+        errors, script_errors = [], {}
+        dur = 0
+        try:
+            scripts = loader(spec)
+        except BaseException as e:
+            self.debug_exception()
+            return ['Failed loading scripts. {}'.format(e)], dur, script_errors
+
+        ctx = spec.make_script_context() if duration else None
+        for k in ckey[1]:
+            si = k[0]
+            script = scripts.get(si)
+            if script is None:
+                errors.append('Failed loading {}'.format(k[2]))
+                continue
+
+            # a duration test depends on the run context so it is not shared with other combinations
+            shared = not (duration and si in DURATION_SCRIPTS)
+            if shared and k not in owned:
+                continue
+
+            try:
+                if shared:
+                    script.test()
+                else:
+                    dur += script.calculate_estimated_duration(ctx, force=True)
+            except BaseException as e:
+                msg = 'Invalid script {}. {}'.format(k[2], e)
+                if shared:
+                    script_errors[k] = msg
+                else:
+                    errors.append(msg)
+
+        return errors, dur, script_errors
+
+    def _validate_conditionals(self, name):
+        """
+        @return: error message or None. as in AutomatedRun._add_conditionals ``name`` is a conditionals file or an
+        inline "teststr,start_count"
+        """
+        from pychron.experiment.conditional.conditional import conditionals_from_file
+        from pychron.experiment.conditional.utilities import CompiledTestStr
+
+        p = conditionals_path(name)
+        try:
+            if os.path.isfile(p):
+                for cs in conditionals_from_file(p).values():
+                    for c in cs:
+                        c.compile()
+            elif ',' in name:
+                teststr, start = name.split(',')
+                int(start)
+                CompiledTestStr(teststr)
+            else:
+                self.debug('no conditionals file {}'.format(p))
+        except BaseException as e:
+            return 'Invalid conditionals {}. {}'.format(name, e)
+
+# ============= EOF =============================================
@@ -774,6 +774,16 @@ class GitRepoManager(Loggable):
         if index:
             index.commit(msg)
 
+    def commit_paths(self, ps, msg):
+        """
+        stage ``ps`` with a single index write and commit them
+        """
+        self.debug('commit {} paths message={}'.format(len(ps), msg))
+        index = self.index
+        if index:
+            index.add(ps)
+            index.commit(msg)
+
     def add(self, p, msg=None, msg_prefix=None, verbose=True, **kw):
         repo = self._repo
         # try:
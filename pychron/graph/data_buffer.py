@@ -0,0 +1,135 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+from numpy import empty, asarray, inf
+
+
+# ============= local library imports  ==========================
+
+
+class DataBuffer(object):
+    """
+    preallocated array for a plot series that grows one point at a time.
+
+    appending is amortized O(1). the storage doubles when it is full and ``data`` is a view of the filled part, so
+    nothing is copied per point. the running min and max are kept as points are added.
+
+    with ``maxlen`` only the last ``maxlen`` points are kept (a ring buffer). the storage is ``2*maxlen`` long and the
+    window is moved to the front once it reaches the end.
+
+    storage is never modified in place once it is replaced, so views handed to a plot stay valid::
+
+        buf = DataBuffer()
+        for x in xs:
+            buf.append(x)
+            plot.data.set_data('x0', buf.data)
+    """
+
+    def __init__(self, data=None, capacity=256, maxlen=None, dtype=float):
+        self.maxlen = maxlen
+        if data is None:
+            data = []
+        data = asarray(data, dtype=dtype).ravel()
+        if maxlen:
+            data = data[-maxlen:]
+            capacity = 2 * maxlen
+
+        n = data.shape[0]
+        self._buf = empty(max(capacity, 2 * n, 1), dtype=dtype)
+        self._buf[:n] = data
+        self._start = 0
+        self._end = n
+
+        self._min, self._max = inf, -inf
+        self._stale = False
+        if n:
+            self._min, self._max = data.min(), data.max()
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def data(self):
+        return self._buf[self._start:self._end]
+
+    @property
+    def min(self):
+        self._update_limits()
+        return self._min
+
+    @property
+    def max(self):
+        self._update_limits()
+        return self._max
+
+    def append(self, v):
+        buf = self._buf
+        if self._end == buf.shape[0]:
+            buf = self._reallocate()
+
+        buf[self._end] = v
+        self._end += 1
+
+        v = buf[self._end - 1]
+        if v < self._min:
+            self._min = v
+        if v > self._max:
+            self._max = v
+
+        if self.maxlen and self._end - self._start > self.maxlen:
+            # drop the oldest point
+            old = buf[self._start]
+            self._start += 1
+            if old == self._min or old == self._max:
+                self._stale = True
+
+    def extend(self, vs):
+        for v in vs:
+            self.append(v)
+
+    def clear(self):
+        self._start = self._end = 0
+        self._min, self._max = inf, -inf
+        self._stale = False
+
+    def _reallocate(self):
+        data = self.data
+        n = data.shape[0]
+        if self.maxlen:
+            capacity = 2 * self.maxlen
+        else:
+            capacity = 2 * self._buf.shape[0]
+
+        buf = empty(capacity, dtype=self._buf.dtype)
+        buf[:n] = data
+        self._buf = buf
+        self._start, self._end = 0, n
+        return buf
+
+    def _update_limits(self):
+        if self._stale:
+            data = self.data
+            if data.shape[0]:
+                self._min, self._max = data.min(), data.max()
+            else:
+                self._min, self._max = inf, -inf
+            self._stale = False
+
+# ============= EOF =============================================
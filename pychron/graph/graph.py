@@ -35,6 +35,7 @@ from traitsui.api import View, Item, UItem
 from pychron.core.helpers.color_generators import colorname_generator as color_generator
 from pychron.core.helpers.filetools import add_extension
 from pychron.graph.context_menu_mixin import ContextMenuMixin
+from pychron.graph.data_buffer import DataBuffer
 from pychron.graph.offset_plot_label import OffsetPlotLabel
 from .tools.contextual_menu_tool import ContextualMenuTool
 import six
@@ -460,6 +461,11 @@ class Graph(ContextMenuMixin):
         self.data_len = []
         self.data_limits = []
 
+        # (plotid, name): [DataBuffer, array last given to the plot]
+        self._data_buffers = {}
+        # plotid: ({names,}, y limits args)
+        self._pending_data = {}
+
         if clear_container:
             self.plotcontainer = pc = self.container_factory()
             if self.use_context_menu:
@@ -988,10 +994,16 @@ class Graph(ContextMenuMixin):
                   update_y_limits=False,
                   ypadding=10,
                   ymin_anchor=None,
+                  flush=True,
                   #                    do_after=None,
                   **kw):
+        """
+        append a point to a series. the series is kept in a ``DataBuffer`` so appending does not copy the data.
+
+        @param flush: if False the point is only buffered. it is given to the plot, and the y limits updated, by the
+        next ``flush_data``. use to limit how often a plot is redrawn when adding data at a high rate
+        """
 
-        #         def add(datum):
         # print 'adding data',plotid, series, len(self.series[plotid])
         try:
             names = self.series[plotid][series]
@@ -1005,34 +1017,75 @@ class Graph(ContextMenuMixin):
             datum = (datum,)
 
         data = plot.data
-        mi, ma = -Inf, Inf
-        for i, (name, di) in enumerate(zip(names, datum)):
-            d = data.get_data(name)
-            nd = hstack((d, di))
-            data.set_data(name, nd)
-
-            if i == 1:
-                # y values
-                mi = min(nd)
-                ma = max(nd)
+        pnames, limits = self._pending_data.get(plotid, (set(), None))
+        for name, di in zip(names, datum):
+            buf = self._get_data_buffer(plotid, data, name)
+            if hasattr(di, '__iter__'):
+                buf.extend(di)
+            else:
+                buf.append(di)
+            pnames.add(name)
 
         if update_y_limits:
-            if isinstance(ypadding, str):
-                ypad = max(0.1, abs(mi - ma)) * float(ypadding)
-            else:
-                ypad = ypadding
-            mi -= ypad
-            if ymin_anchor is not None:
-                mi = max(ymin_anchor, mi)
+            limits = (names[1] if len(datum) > 1 else None, ypadding, ymin_anchor)
 
-            self.set_y_limits(min_=mi,
-                              max_=ma + ypad,
-                              plotid=plotid)
+        self._pending_data[plotid] = (pnames, limits)
+        if flush:
+            self.flush_data(plotid)
+
+    def flush_data(self, plotid=None):
+        """
+        give the points buffered by ``add_datum`` to the plots and update the y limits
+
+        @param plotid: flush all plots if None
+        """
+        if plotid is None:
+            pids = list(self._pending_data.keys())
+        else:
+            pids = (plotid,)
 
-            #         if do_after:
-            #             do_after_timer(do_after, add, datum)
-            #         else:
-            #             add(datum)
+        for pid in pids:
+            try:
+                names, limits = self._pending_data.pop(pid)
+            except KeyError:
+                continue
+
+            data = self.plots[pid].data
+            for name in names:
+                entry = self._data_buffers[(pid, name)]
+                entry[1] = d = entry[0].data
+                data.set_data(name, d)
+
+            if limits:
+                yname, ypadding, ymin_anchor = limits
+                mi, ma = -Inf, Inf
+                if yname is not None:
+                    buf = self._data_buffers[(pid, yname)][0]
+                    mi, ma = buf.min, buf.max
+
+                if isinstance(ypadding, str):
+                    ypad = max(0.1, abs(mi - ma)) * float(ypadding)
+                else:
+                    ypad = ypadding
+                mi -= ypad
+                if ymin_anchor is not None:
+                    mi = max(ymin_anchor, mi)
+
+                self.set_y_limits(min_=mi,
+                                  max_=ma + ypad,
+                                  plotid=pid)
+
+    def _get_data_buffer(self, plotid, data, name):
+        """
+        return the buffer for a series. a new buffer is made from the plot's data if the series was set by other
+        means since it was last flushed
+        """
+        key = (plotid, name)
+        d = data.get_data(name)
+        entry = self._data_buffers.get(key)
+        if entry is None or entry[1] is not d:
+            entry = self._data_buffers[key] = [DataBuffer(d), d]
+        return entry[0]
 
     # def show_crosshairs(self, color='black'):
     #     """
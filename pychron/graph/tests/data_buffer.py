@@ -0,0 +1,75 @@
+from __future__ import absolute_import
+
+import unittest
+
+from numpy import arange, hstack, random
+
+from pychron.graph.data_buffer import DataBuffer
+
+
+class DataBufferTestCase(unittest.TestCase):
+    def test_append(self):
+        buf = DataBuffer(capacity=4)
+        for i in range(100):
+            buf.append(i)
+
+        self.assertEqual(len(buf), 100)
+        self.assertListEqual(list(buf.data), list(range(100)))
+        self.assertEqual(buf.min, 0)
+        self.assertEqual(buf.max, 99)
+
+    def test_initial_data(self):
+        buf = DataBuffer([3, 1, 2])
+        buf.append(0)
+        self.assertListEqual(list(buf.data), [3, 1, 2, 0])
+        self.assertEqual(buf.min, 0)
+        self.assertEqual(buf.max, 3)
+
+    def test_matches_hstack(self):
+        ys = random.RandomState(1).normal(size=1000)
+        buf = DataBuffer()
+        d = []
+        for y in ys:
+            buf.append(y)
+            d = hstack((d, y))
+            self.assertEqual(buf.min, min(d))
+            self.assertEqual(buf.max, max(d))
+        self.assertListEqual(list(buf.data), list(d))
+
+    def test_views_not_modified(self):
+        buf = DataBuffer(capacity=2, maxlen=3)
+        views = []
+        for i in range(10):
+            buf.append(i)
+            views.append((i, buf.data))
+
+        # growing or moving the window does not change data already given to a plot
+        for i, v in views:
+            self.assertEqual(v[-1], i)
+
+    def test_maxlen(self):
+        buf = DataBuffer(maxlen=5)
+        for i in range(20):
+            buf.append(i)
+            self.assertListEqual(list(buf.data), list(arange(max(0, i - 4), i + 1)))
+            self.assertEqual(buf.min, max(0, i - 4))
+            self.assertEqual(buf.max, i)
+
+    def test_maxlen_descending(self):
+        buf = DataBuffer(maxlen=3)
+        for i in range(10, 0, -1):
+            buf.append(i)
+        self.assertListEqual(list(buf.data), [3, 2, 1])
+        self.assertEqual(buf.max, 3)
+
+    def test_clear(self):
+        buf = DataBuffer([1, 2, 3])
+        buf.clear()
+        self.assertEqual(len(buf), 0)
+        buf.append(5)
+        self.assertEqual(buf.min, 5)
+        self.assertEqual(buf.max, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
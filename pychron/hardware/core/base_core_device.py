@@ -35,7 +35,7 @@ from .i_core_device import ICoreDevice
 from pychron.globals import globalv
 from pychron.hardware.core.exceptions import TimeoutError, CRCError
 from pychron.has_communicator import HasCommunicator
-from pychron.hardware.core.communicators.scheduler import CommunicationScheduler
+from pychron.hardware.core.communicators.scheduler import CommunicationScheduler, SCHEDULE_KWARGS
 from pychron.consumer_mixin import ConsumerMixin
 import six
 from six.moves import map
@@ -61,6 +61,8 @@ class BaseCoreDevice(HasCommunicator, ConsumerMixin):
     _auto_started = False
     _no_response_counter = 0
     _scheduler_name = None
+    _scheduler_priority = None
+    _scheduler_collision_delay = None
 
     def send_email_notification(self, message):
         if self.application:
@@ -112,6 +114,10 @@ class BaseCoreDevice(HasCommunicator, ConsumerMixin):
                     return False
 
                 self.set_attribute(config, '_scheduler_name', 'Communications', 'scheduler', optional=True)
+                self.set_attribute(config, '_scheduler_priority', 'Communications', 'scheduler_priority',
+                                   cast='int', optional=True)
+                self.set_attribute(config, '_scheduler_collision_delay', 'Communications', 'collision_delay',
+                                   cast='float', optional=True)
 
             self._load_hook(config)
 
@@ -173,9 +179,11 @@ class BaseCoreDevice(HasCommunicator, ConsumerMixin):
 
         comm = self.communicator
         if comm is not None:
+            skw = {k: kw.pop(k) for k in SCHEDULE_KWARGS if k in kw}
             if comm.scheduler:
+                skw.setdefault('priority', self._scheduler_priority)
                 r = comm.scheduler.schedule(comm.ask, args=(cmd,),
-                                            kwargs=kw)
+                                            kwargs=kw, **skw)
             else:
                 r = comm.ask(cmd, **kw)
             self._communicate_hook(cmd, r)
@@ -244,6 +252,8 @@ class BaseCoreDevice(HasCommunicator, ConsumerMixin):
                 if sc is None:
                     sc = CommunicationScheduler(name=name)
                     self.application.register_service(type(sc), sc)
+                if self._scheduler_collision_delay is not None:
+                    sc.collision_delay = self._scheduler_collision_delay
                 self.set_scheduler(sc)
 
     def set_scheduler(self, s):
@@ -0,0 +1,422 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from threading import Thread, Lock
+
+# ============= local library imports  ==========================
+from pychron.hardware.core.communicators.ethernet_communicator import MessageFrame, decode_packet
+from pychron.hardware.core.communicators.transport_metrics import TransportMetrics
+
+DEFAULT_DATASIZE = 2 ** 12
+
+# errors that mean the connection is unusable. LimitOverrunError is python 3.5.2+
+CONNECTION_ERRORS = (OSError, EOFError, asyncio.IncompleteReadError,
+                     getattr(asyncio, 'LimitOverrunError', ValueError))
+TIMEOUT_ERRORS = (asyncio.TimeoutError, FuturesTimeoutError)
+
+# asyncio.current_task is python 3.7+. Task.current_task was removed in 3.9
+current_task = getattr(asyncio, 'current_task', None) or asyncio.Task.current_task
+
+
+class EventLoopThread(object):
+    """
+    an asyncio event loop running on a daemon thread. coroutines are submitted from any thread with ``run``
+    """
+
+    def __init__(self):
+        self.loop = None
+        self._thread = None
+        self._lock = Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self.loop = asyncio.new_event_loop()
+                self._thread = Thread(target=self._run, name='EventLoopThread')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self._thread.join()
+                self.loop.close()
+                self._thread = None
+                self.loop = None
+
+    def run(self, coro, timeout=None):
+        """
+        run ``coro`` on the loop and wait for its result. raises the coroutine's exception or a TimeoutError
+        """
+        self.start()
+        fut = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return fut.result(timeout)
+        except TIMEOUT_ERRORS:
+            fut.cancel()
+            raise
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+
+_EVENT_LOOP = EventLoopThread()
+
+
+def get_event_loop_thread():
+    """
+    the loop shared by all transports
+    """
+    return _EVENT_LOOP
+
+
+async def read_packet(reader, frame, terminator=None, datasize=DEFAULT_DATASIZE):
+    """
+    read one response. a frame with a message length, or a terminator, delimits the response. otherwise it is
+    whatever arrives in one read, as Handler.get_packet
+    """
+    if frame.message_len:
+        nm = frame.nmessage_len
+        header = await reader.readexactly(nm)
+        n = int(header, 16)
+        data = header + await reader.readexactly(max(n - nm, 0))
+    elif terminator:
+        data = await reader.readuntil(terminator)
+    else:
+        data = await reader.read(datasize)
+        if not data:
+            raise EOFError('connection closed')
+
+    return decode_packet(data, frame)
+
+
+class TCPConnection(object):
+    """
+    a persistent connection. if ``pipeline`` requests are written without waiting for the previous response and
+    responses are matched to requests in order. this needs responses that are delimited by the message frame or the
+    terminator
+    """
+
+    def __init__(self, host, port, frame, terminator=None, pipeline=False, datasize=DEFAULT_DATASIZE,
+                 metrics=None):
+        self.host = host
+        self.port = port
+        self.frame = frame
+        self.terminator = terminator
+        self.pipeline = pipeline and (frame.message_len or bool(terminator))
+        self.datasize = datasize
+        self.metrics = metrics
+
+        self._reader = None
+        self._writer = None
+        self._lock = None
+        self._waiters = deque()
+        self._read_task = None
+
+    @property
+    def is_open(self):
+        # StreamWriter.is_closing is python 3.7+
+        return self._writer is not None and not self._writer.transport.is_closing()
+
+    async def open(self, timeout):
+        if not self.is_open:
+            self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                                                timeout)
+            if self.metrics:
+                self.metrics.record_connect()
+        return True
+
+    async def request(self, data, timeout, delay=None, frame=None, read=True):
+        if self.pipeline and read and not delay and frame is None:
+            return await self._pipelined_request(data, timeout)
+
+        async with self._get_lock():
+            if self._waiters:
+                # let the pipelined requests read their responses first
+                await asyncio.wait(list(self._waiters))
+
+            try:
+                await self.open(timeout)
+                self._writer.write(data)
+                await self._writer.drain()
+                if not read:
+                    return
+
+                if delay:
+                    await asyncio.sleep(delay)
+                return await asyncio.wait_for(read_packet(self._reader, frame or self.frame, self.terminator,
+                                                          self.datasize), timeout)
+            except TIMEOUT_ERRORS + CONNECTION_ERRORS:
+                # a late response would be read as the reply to the next request
+                self.close()
+                raise
+
+    async def read(self, timeout, datasize=None):
+        async with self._get_lock():
+            await self.open(timeout)
+            return await asyncio.wait_for(read_packet(self._reader, self.frame, self.terminator,
+                                                      datasize or self.datasize), timeout)
+
+    def close(self, exc=None):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_exception(exc or EOFError('connection closed'))
+
+    def _get_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _pipelined_request(self, data, timeout):
+        loop = asyncio.get_event_loop()
+        fut = loop.create_future()
+        async with self._get_lock():
+            await self.open(timeout)
+            self._waiters.append(fut)
+            self._writer.write(data)
+            if self._read_task is None:
+                self._read_task = loop.create_task(self._read_loop(self._reader))
+        try:
+            await self._writer.drain()
+            return await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except TIMEOUT_ERRORS + CONNECTION_ERRORS as e:
+            # responses can no longer be matched to requests
+            fut.cancel()
+            self.close(e)
+            raise
+
+    async def _read_loop(self, reader):
+        try:
+            while self._waiters:
+                r = await read_packet(reader, self.frame, self.terminator, self.datasize)
+                fut = self._waiters.popleft()
+                if not fut.done():
+                    fut.set_result(r)
+        except asyncio.CancelledError:
+            pass
+        except CONNECTION_ERRORS as e:
+            self.close(e)
+        finally:
+            if self._read_task is current_task():
+                self._read_task = None
+
+
+class UDPProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.queue.put_nowait(data)
+
+    def error_received(self, exc):
+        self.queue.put_nowait(exc)
+
+
+class UDPConnection(object):
+    """
+    one request at a time. a response that arrives after its request timed out is discarded
+    """
+
+    def __init__(self, host, port, frame, datasize=DEFAULT_DATASIZE, metrics=None, **kw):
+        self.host = host
+        self.port = port
+        self.frame = frame
+        self.datasize = datasize
+        self.metrics = metrics
+
+        self._transport = None
+        self._protocol = None
+        self._lock = None
+
+    async def open(self, timeout):
+        if self._transport is None:
+            loop = asyncio.get_event_loop()
+            self._transport, self._protocol = await loop.create_datagram_endpoint(
+                UDPProtocol, remote_addr=(self.host, self.port))
+            if self.metrics:
+                self.metrics.record_connect()
+        return True
+
+    async def request(self, data, timeout, delay=None, frame=None, read=True):
+        async with self._get_lock():
+            await self.open(timeout)
+            q = self._protocol.queue
+            while not q.empty():
+                q.get_nowait()
+
+            self._transport.sendto(data)
+            if not read:
+                return
+
+            if delay:
+                await asyncio.sleep(delay)
+            return await asyncio.wait_for(self._get(frame or self.frame), timeout)
+
+    async def read(self, timeout, datasize=None):
+        async with self._get_lock():
+            await self.open(timeout)
+            return await asyncio.wait_for(self._get(self.frame), timeout)
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+        self._transport = self._protocol = None
+
+    def _get_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _get(self, frame):
+        r = await self._protocol.queue.get()
+        if isinstance(r, Exception):
+            raise r
+        return decode_packet(r, frame)
+
+
+class AsyncTransport(object):
+    """
+    synchronous facade of a TCP or UDP connection served by the shared event loop.
+
+    the connection stays open between requests and all devices share one loop thread, so polling many devices does
+    not need a socket and a blocked thread per device. failures return None like EthernetCommunicator.ask and are
+    counted in ``metrics``::
+
+        t = AsyncTransport('localhost', 8000, 'TCP', read_terminator='\\n', pipeline=True)
+        r = t.ask('GetData\\r')
+        rs = t.ask_many(['GetValveState A\\r', 'GetValveState B\\r'])
+    """
+
+    def __init__(self, host, port, kind='TCP', message_frame=None, read_terminator=None, pipeline=False,
+                 datasize=DEFAULT_DATASIZE, metrics=None, loop_thread=None):
+        self.host = host
+        self.port = port
+        self.kind = kind
+        self.metrics = metrics or TransportMetrics()
+        self._loop_thread = loop_thread or get_event_loop_thread()
+
+        frame = message_frame
+        if not isinstance(frame, MessageFrame):
+            frame = MessageFrame()
+            frame.set_str(message_frame)
+
+        if read_terminator and not isinstance(read_terminator, bytes):
+            read_terminator = read_terminator.encode('utf-8')
+
+        klass = UDPConnection if kind.lower() == 'udp' else TCPConnection
+        self.connection = klass(host, port, frame, terminator=read_terminator, pipeline=pipeline,
+                                datasize=datasize, metrics=self.metrics)
+
+    def open(self, timeout=1.0):
+        try:
+            return self._loop_thread.run(self.connection.open(timeout), timeout + 1)
+        except TIMEOUT_ERRORS + CONNECTION_ERRORS:
+            return False
+
+    def ask(self, cmd, timeout=1.0, delay=None, message_frame=None):
+        """
+        @return: response str or None on timeout or connection error
+        """
+        frame = message_frame
+        if frame is not None and not isinstance(frame, MessageFrame):
+            f = MessageFrame()
+            f.set_str(frame)
+            frame = f
+
+        return self._call(self.connection.request(cmd.encode('utf-8'), timeout, delay=delay, frame=frame), timeout,
+                          delay)
+
+    def ask_many(self, cmds, timeout=1.0):
+        """
+        send ``cmds`` concurrently. with pipelining they are all written before the first response is read
+
+        @return: list of responses. None for a failed request
+        """
+
+        async def func():
+            async def ask(cmd):
+                st = time.time()
+                try:
+                    r = await self.connection.request(cmd.encode('utf-8'), timeout)
+                except TIMEOUT_ERRORS:
+                    self.metrics.record_timeout()
+                except CONNECTION_ERRORS:
+                    self.metrics.record_error()
+                else:
+                    self.metrics.record(time.time() - st)
+                    return r
+
+            return await asyncio.gather(*[ask(c) for c in cmds])
+
+        try:
+            return self._loop_thread.run(func(), timeout * len(cmds) + 1)
+        except TIMEOUT_ERRORS:
+            return [None for _ in cmds]
+
+    def tell(self, cmd, timeout=1.0):
+        """
+        @return: True if sent
+        """
+        try:
+            self._loop_thread.run(self.connection.request(cmd.encode('utf-8'), timeout, read=False), timeout + 1)
+            return True
+        except TIMEOUT_ERRORS + CONNECTION_ERRORS:
+            self.metrics.record_error()
+            return False
+
+    def read(self, timeout=1.0, datasize=None):
+        return self._call(self.connection.read(timeout, datasize), timeout)
+
+    def close(self):
+        loop = self._loop_thread.loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self.connection.close)
+        else:
+            self.connection.close()
+
+    def _call(self, coro, timeout, delay=None):
+        st = time.time()
+        try:
+            # allow for connecting and the delay before reading
+            r = self._loop_thread.run(coro, 2 * timeout + (delay or 0) + 1)
+        except TIMEOUT_ERRORS:
+            self.metrics.record_timeout()
+        except CONNECTION_ERRORS:
+            self.metrics.record_error()
+        else:
+            self.metrics.record(time.time() - st)
+            return r
+
+# ============= EOF =============================================
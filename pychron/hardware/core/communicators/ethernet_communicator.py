@@ -21,7 +21,7 @@ import socket
 import time
 
 # ============= enthought library imports =======================
-from traits.api import Float
+from traits.api import Float, Instance
 
 # ============= local library imports  ==========================
 from pychron.globals import globalv
@@ -52,6 +52,28 @@ class MessageFrame(object):
                 self.message_len = True
 
 
+def decode_packet(data, frame):
+    """
+    strip the message length header and check the checksum of a packet received with ``frame``
+
+    @return: str or None if the checksum does not match
+    """
+    if frame.message_len:
+        # trim off header
+        data = data[frame.nmessage_len:]
+
+    if frame.checksum:
+        nc = frame.nchecksum
+        checksum = data[-nc:]
+        data = data[:-nc]
+        comp = computeCRC(data)
+        if comp != checksum:
+            print('checksum fail computed={}, expected={}'.format(comp, checksum))
+            return
+
+    return data.decode('utf-8')
+
+
 class Handler(object):
     sock = None
     datasize = 2 ** 12
@@ -112,20 +134,7 @@ class Handler(object):
             if sum >= msg_len:
                 break
 
-        if frame.message_len:
-            # trim off header
-            data = data[nm:]
-
-        if frame.checksum:
-            nc = frame.nchecksum
-            checksum = data[-nc:]
-            data = data[:-nc]
-            comp = computeCRC(data)
-            if comp != checksum:
-                print('checksum fail computed={}, expected={}'.format(comp, checksum))
-                return
-
-        return data.decode('utf-8')
+        return decode_packet(data, frame)
 
 
 class TCPHandler(Handler):
@@ -184,6 +193,13 @@ class EthernetCommunicator(Communicator):
 
     default_timeout = 3
 
+    # serve requests from a persistent connection on the shared asyncio event loop
+    use_async = False
+    pipeline = False
+    read_terminator = None
+    transport = None
+    metrics = Instance('pychron.hardware.core.communicators.transport_metrics.TransportMetrics', ())
+
     @property
     def address(self):
         return '{}://{}:{}'.format(self.kind, self.host, self.port)
@@ -204,6 +220,15 @@ class EthernetCommunicator(Communicator):
         self.message_frame = self.config_get(config, 'Communications', 'message_frame', optional=True, default='')
         self.default_timeout = self.config_get(config, 'Communications', 'default_timeout', cast='int',
                                                optional=True, default=3)
+        self.use_async = self.config_get(config, 'Communications', 'use_async', cast='boolean', optional=True,
+                                         default=False)
+        self.pipeline = self.config_get(config, 'Communications', 'pipeline', cast='boolean', optional=True,
+                                        default=False)
+        self.read_terminator = self.config_get(config, 'Communications', 'read_terminator', optional=True)
+        if self.read_terminator == 'chr(10)':
+            self.read_terminator = chr(10)
+        elif self.read_terminator == 'chr(13)':
+            self.read_terminator = chr(13)
 
         if self.kind is None:
             self.kind = 'UDP'
@@ -222,7 +247,10 @@ class EthernetCommunicator(Communicator):
         self.simulation = False
 
         with self._lock:
-            handler = self.get_handler()
+            if self.use_async:
+                handler = self.get_transport()
+            else:
+                handler = self.get_handler()
 
         # send a test command so see if wer have connection
         cmd = self.test_cmd
@@ -271,6 +299,53 @@ class EthernetCommunicator(Communicator):
             self.error_mode = True
             self.handler = None
 
+    def get_transport(self):
+        """
+        the AsyncTransport used when ``use_async``. None if the connection cannot be opened
+        """
+        with self._lock:
+            t = self.transport
+            if t is None:
+                t = self._open_transport()
+                self.transport = t
+            return t
+
+    def get_metrics(self):
+        """
+        request counts and latencies of this device
+        """
+        return self.metrics.to_dict()
+
+    def ask_many(self, cmds, timeout=None, verbose=True):
+        """
+        send several commands. with ``use_async`` and ``pipeline`` they are all sent before the first response is
+        read
+
+        @return: list of responses. None for a failed command
+        """
+        if self.simulation:
+            return [None for _ in cmds]
+
+        if timeout is None:
+            timeout = self.default_timeout
+
+        if self.use_async:
+            t = self._request_transport()
+            if t is None:
+                return [None for _ in cmds]
+
+            cmds = ['{}{}'.format(c, self.write_terminator) for c in cmds]
+            try:
+                rs = t.ask_many(cmds, timeout=timeout)
+            finally:
+                self._end_request(t)
+            if verbose or self.verbose:
+                for c, r in zip(cmds, rs):
+                    self.log_response(c, process_response(r) if r is not None else 'ERROR: no response')
+            return rs
+
+        return [self.ask(c, timeout=timeout, verbose=verbose) for c in cmds]
+
     def ask(self, cmd, retries=3, verbose=True, quiet=False, info=None, timeout=None,
             message_frame=None, delay=None, use_error_mode=True, *args, **kw):
         """
@@ -294,6 +369,9 @@ class EthernetCommunicator(Communicator):
         cmd = '{}{}'.format(cmd, self.write_terminator)
         # print cmd
         # cmd = '{}\n'.format(cmd)
+        if self.use_async:
+            return self._ask_async(cmd, retries, verbose, quiet, info, timeout, message_frame, delay)
+
         r = None
         with self._lock:
             if use_error_mode and self.error_mode:
@@ -328,17 +406,42 @@ class EthernetCommunicator(Communicator):
         return r
 
     def reset(self):
-        if self.handler:
-            self.handler.end()
-        self._reset_connection()
+        with self._lock:
+            if self.handler:
+                self.handler.end()
+            if self.transport:
+                self.transport.close()
+            self._reset_connection()
 
     def read(self, datasize=None, *args, **kw):
+        if self.use_async:
+            t = self.get_transport()
+            if t:
+                return t.read(self.timeout, datasize=datasize)
+            return
+
         with self._lock:
             handler = self.get_handler()
             if handler:
                 return handler.get_packet(datasize=datasize)
 
     def tell(self, cmd, verbose=True, quiet=False, info=None):
+        if self.use_async:
+            t = self._request_transport()
+            cmd = '{}{}'.format(cmd, self.write_terminator)
+            try:
+                ok = t and t.tell(cmd, timeout=self.timeout)
+            finally:
+                self._end_request(t)
+
+            if ok:
+                if verbose or self.verbose and not quiet:
+                    self.log_tell(cmd, info)
+            else:
+                self.warning('tell. send packet failed. address: {}'.format(self.address))
+                self.error_mode = True
+            return
+
         with self._lock:
             handler = self.get_handler()
             try:
@@ -353,8 +456,68 @@ class EthernetCommunicator(Communicator):
     # private
     def _reset_connection(self):
         self.handler = None
+        self.transport = None
         self.error_mode = False
 
+    def _open_transport(self):
+        from pychron.hardware.core.communicators.async_transport import AsyncTransport
+
+        t = AsyncTransport(self.host, self.port, self.kind,
+                           message_frame=self.message_frame,
+                           read_terminator=self.read_terminator,
+                           pipeline=self.pipeline,
+                           metrics=self.metrics)
+        timeout = 0.01 if globalv.communication_simulation else self.timeout
+        if not t.open(timeout):
+            self.debug('Get Transport. failed connecting to {}. timeout={}'.format(self.address, timeout))
+            self.error_mode = True
+            return
+        return t
+
+    def _request_transport(self):
+        """
+        with ``use_end`` every request gets its own connection so one thread never closes the connection another
+        is using
+        """
+        if self.use_end:
+            return self._open_transport()
+        return self.get_transport()
+
+    def _end_request(self, t):
+        if self.use_end and t is not None:
+            t.close()
+
+    def _ask_async(self, cmd, retries, verbose, quiet, info, timeout, message_frame, delay):
+        """
+        same as ask but served by the transport. the communicator lock is not held so requests from several threads
+        can be pipelined
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+
+        r = None
+        t = self._request_transport()
+        if t is not None:
+            try:
+                for i in range(retries):
+                    r = t.ask(cmd, timeout=timeout, delay=delay, message_frame=message_frame)
+                    if r is not None:
+                        break
+                    self.debug('doing retry {}'.format(i))
+            finally:
+                self._end_request(t)
+
+        if r is None:
+            re = 'ERROR: Connection refused: {}, timeout={}'.format(self.address, timeout)
+            self.error_mode = True
+        else:
+            re = process_response(r)
+            self.error_mode = False
+
+        if verbose or (self.verbose and not quiet):
+            self.log_response(cmd, re, info)
+        return r
+
     def _ask(self, cmd, timeout=None, message_frame=None, delay=None, use_error_mode=True):
         if self.error_mode:
             self.handler = None
@@ -369,6 +532,7 @@ class EthernetCommunicator(Communicator):
         if not handler:
             return
 
+        st = time.time()
         try:
             handler.send_packet(cmd)
 
@@ -376,12 +540,20 @@ class EthernetCommunicator(Communicator):
                 time.sleep(delay)
 
             try:
-                return handler.get_packet(message_frame=message_frame)
+                r = handler.get_packet(message_frame=message_frame)
+                self.metrics.record(time.time() - st)
+                return r
+            except socket.timeout as e:
+                self.warning('ask. get packet. timeout: {} address: {}'.format(e, self.address))
+                self.metrics.record_timeout()
+                self.error_mode = True
             except socket.error as e:
                 self.warning('ask. get packet. error: {} address: {}'.format(e, self.address))
+                self.metrics.record_error()
                 self.error_mode = True
         except socket.error as e:
             self.warning('ask. send packet. error: {} address: {}'.format(e, self.address))
+            self.metrics.record_error()
             self.error_mode = True
 
 # ============= EOF ====================================
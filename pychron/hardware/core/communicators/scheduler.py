@@ -19,20 +19,53 @@ from __future__ import absolute_import
 from traits.api import Float, HasTraits
 
 # ============= standard library imports ========================
-from threading import Lock
+import heapq
+import time
+from collections import deque
+from itertools import count
+from threading import Condition
 
 # ============= local library imports  ==========================
 
+HIGH_PRIORITY = 0
+NORMAL_PRIORITY = 5
+LOW_PRIORITY = 10
 
-# SINGLE_ITEM_BUF = True
-# SINGLE_ITEM_BUF=False
-class CommunicationScheduler(HasTraits):
-    """
+# keyword arguments of BaseCoreDevice.ask that are consumed by CommunicationScheduler.schedule
+SCHEDULE_KWARGS = ('priority', 'deadline', 'coalesce')
+
+
+class Ticket(object):
+    def __init__(self, func, args, kwargs, priority, deadline, key, seq):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.deadline = deadline
+        self.key = key
+        self.seq = seq
+        self.submitted = time.time()
+
+        self.started = False
+        self.done = False
+        self.result = None
+        self.error = None
 
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
 
+
+class CommunicationScheduler(HasTraits):
+    """
         this class should be used when working with multiple rs485 devices on the same port.
 
-        it uses a simple lock and sleep cycle to avoid collision on the data lines
+        commands run one at a time, in the thread of the caller, at least ``collision_delay`` ms apart. a waiting
+        command with a lower ``priority`` number runs first, so a valve actuation is not held up by a queue of
+        temperature readbacks. commands of equal priority run in the order they were scheduled.
+
+        a command that has not started ``deadline`` seconds after it was scheduled is dropped and returns None.
+        with ``coalesce`` a command identical to one that is waiting is not sent again, the caller gets the result
+        of the waiting one.
 
         when setting up the devices use device.set_scheduler to set the shared scheduler
 
@@ -43,68 +76,159 @@ class CommunicationScheduler(HasTraits):
 
     def __init__(self, *args, **kw):
         super(CommunicationScheduler, self).__init__(*args, **kw)
-        self._lock = Lock()
-
-    #        self._condition = Condition()
-    #        self._command_queue = Queue()
-    #        self._buffer = Queue()
-    #
-    #        consumer = Consumer(self._command_queue,
-    #                            self._buffer,
-    # #                            self._condition,
-    #                            self.collision_delay)
-    #        consumer.start()
-
-    def schedule(self, func, args=None, kwargs=None):
+        self._cond = Condition()
+        self._heap = []
+        self._pending = {}
+        self._seq = count()
+        self._busy = False
+        self._last_end = 0
+
+        self._waits = deque(maxlen=500)
+        self._nscheduled = 0
+        self._ncoalesced = 0
+        self._nexpired = 0
+        self._max_depth = 0
+
+    @property
+    def depth(self):
+        with self._cond:
+            return len(self._heap)
+
+    def schedule(self, func, args=None, kwargs=None, priority=None, deadline=None, coalesce=False):
+        """
+        run ``func(*args, **kwargs)`` when the bus is free
+
+        @param priority: lower runs first. default NORMAL_PRIORITY
+        @param deadline: seconds. return None if ``func`` has not started by then
+        @param coalesce: share the result of an identical waiting command. only use for reads
+        @return: the result of ``func``
+        """
         if args is None:
             args = tuple()
         if kwargs is None:
             kwargs = dict()
-
-        #        while SINGLE_ITEM_BUF and not self._buffer.empty():
-        #            time.sleep(0.0001)
-        #
-        #        self._command_queue.put((func, args, kwargs))
-        #
-        #        try:
-        #            r = self._buffer.get(timeout=0.5)
-        #        except Empty:
-        #            r = None
-
-        with self._lock:
-            r = func(*args, **kwargs)
-
-        return r
-
-# class Consumer(Thread):
-#
-#    def __init__(self, q, b, cd):
-#        Thread.__init__(self)
-#        self._q = q
-#        self._buf = b
-# #        self.logger = add_console(name='consumer')
-# #        self.cond = cond
-#        self.cd = cd
-#
-#    def run(self):
-#        while 1:
-# #            self.cond.acquire()
-#            while self._q.empty():
-#                time.sleep(0.0001)
-# #                self.cond.wait(timeout=0.05)
-# #            st = time.time()
-#            func, args, kwargs = self._q.get()
-#
-#            while SINGLE_ITEM_BUF and not self._buf.empty():
-#                time.sleep(0.0001)
-#
-#            r = func(*args, **kwargs)
-# #            self.logger.info(r)
-#            self._buf.put(r)
-# #            self.cond.release()
-#
-# #            time.sleep(self.cd/1000.)
-# #            time.sleep(max(0.0001, self.cd / 1000. - (time.time() - st) - 0.001))
-
+        if priority is None:
+            priority = NORMAL_PRIORITY
+
+        key = None
+        if coalesce:
+            key = (func, tuple(args), tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+
+        with self._cond:
+            self._nscheduled += 1
+            ticket = self._pending.get(key) if key is not None else None
+            if ticket is not None:
+                self._ncoalesced += 1
+                self._merge(ticket, priority, deadline)
+                while not ticket.done:
+                    self._cond.wait(1)
+                return self._result(ticket)
+
+            dl = time.time() + deadline if deadline is not None else None
+            ticket = Ticket(func, args, kwargs, priority, dl, key, next(self._seq))
+            heapq.heappush(self._heap, ticket)
+            if key is not None:
+                self._pending[key] = ticket
+            self._max_depth = max(self._max_depth, len(self._heap))
+
+            if not self._acquire(ticket):
+                return
+
+        try:
+            ticket.result = func(*args, **kwargs)
+        except BaseException as e:
+            ticket.error = e
+
+        with self._cond:
+            self._busy = False
+            self._last_end = time.time()
+            ticket.done = True
+            self._cond.notify_all()
+
+        return self._result(ticket)
+
+    def stats(self):
+        """
+        @return: dict of queue depth and wait times in seconds
+        """
+        with self._cond:
+            ws = sorted(self._waits)
+            n = len(ws)
+            return dict(depth=len(self._heap),
+                        max_depth=self._max_depth,
+                        nscheduled=self._nscheduled,
+                        ncoalesced=self._ncoalesced,
+                        nexpired=self._nexpired,
+                        mean_wait=sum(ws) / n if n else 0,
+                        max_wait=ws[-1] if n else 0,
+                        p95_wait=ws[min(n - 1, int(0.95 * n))] if n else 0)
+
+    def reset_stats(self):
+        with self._cond:
+            self._waits.clear()
+            self._nscheduled = self._ncoalesced = self._nexpired = 0
+            self._max_depth = len(self._heap)
+
+    # private
+    def _acquire(self, ticket):
+        """
+        wait until ``ticket`` is the most urgent command and the bus has been quiet for ``collision_delay``
+
+        @return: False if the deadline passed
+        """
+        cd = self.collision_delay / 1000.
+        while 1:
+            now = time.time()
+            if ticket.deadline is not None and now > ticket.deadline:
+                self._remove(ticket)
+                self._nexpired += 1
+                ticket.done = True
+                self._cond.notify_all()
+                return False
+
+            if not self._busy and self._heap[0] is ticket:
+                rem = self._last_end + cd - now
+                if rem <= 0:
+                    heapq.heappop(self._heap)
+                    self._pending.pop(ticket.key, None)
+                    self._busy = True
+                    ticket.started = True
+                    self._waits.append(now - ticket.submitted)
+                    return True
+                # wait out the collision delay. a more urgent command may arrive meanwhile
+                timeout = rem
+            else:
+                timeout = 1
+
+            if ticket.deadline is not None:
+                timeout = min(timeout, max(0, ticket.deadline - now))
+            self._cond.wait(timeout)
+
+    def _merge(self, ticket, priority, deadline):
+        if priority < ticket.priority:
+            ticket.priority = priority
+            heapq.heapify(self._heap)
+            self._cond.notify_all()
+
+        # the shared command is dropped only once every caller's deadline has passed
+        if ticket.deadline is not None:
+            if deadline is None:
+                ticket.deadline = None
+            else:
+                ticket.deadline = max(ticket.deadline, time.time() + deadline)
+
+    def _remove(self, ticket):
+        self._heap.remove(ticket)
+        heapq.heapify(self._heap)
+        self._pending.pop(ticket.key, None)
+
+    def _result(self, ticket):
+        if ticket.error is not None:
+            raise ticket.error
+        return ticket.result
 
 # ============= EOF ====================================
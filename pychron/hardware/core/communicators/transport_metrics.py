@@ -0,0 +1,86 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+from collections import deque
+from threading import Lock
+
+
+# ============= local library imports  ==========================
+
+
+class TransportMetrics(object):
+    """
+    request counts and latencies of one device. latency percentiles are of the last ``nlatencies`` requests
+    """
+
+    def __init__(self, nlatencies=100):
+        self._lock = Lock()
+        self._latencies = deque(maxlen=nlatencies)
+        self.nrequests = 0
+        self.ntimeouts = 0
+        self.nerrors = 0
+        self.nconnects = 0
+        self.total_latency = 0
+        self.max_latency = 0
+        self.last_latency = 0
+
+    def record(self, latency):
+        with self._lock:
+            self.nrequests += 1
+            self.last_latency = latency
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self._latencies.append(latency)
+
+    def record_timeout(self):
+        with self._lock:
+            self.nrequests += 1
+            self.ntimeouts += 1
+
+    def record_error(self):
+        with self._lock:
+            self.nrequests += 1
+            self.nerrors += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.nconnects += 1
+
+    def reset(self):
+        with self._lock:
+            self._latencies.clear()
+            self.nrequests = self.ntimeouts = self.nerrors = self.nconnects = 0
+            self.total_latency = self.max_latency = self.last_latency = 0
+
+    def to_dict(self):
+        with self._lock:
+            n = self.nrequests - self.ntimeouts - self.nerrors
+            ls = sorted(self._latencies)
+            p95 = ls[min(len(ls) - 1, int(0.95 * len(ls)))] if ls else 0
+            return dict(nrequests=self.nrequests,
+                        ntimeouts=self.ntimeouts,
+                        nerrors=self.nerrors,
+                        nconnects=self.nconnects,
+                        last_latency=self.last_latency,
+                        mean_latency=self.total_latency / n if n else 0,
+                        max_latency=self.max_latency,
+                        p95_latency=p95)
+
+# ============= EOF =============================================
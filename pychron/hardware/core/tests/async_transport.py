@@ -0,0 +1,207 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import socket
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+from six.moves import socketserver
+
+from pychron.globals import globalv
+from pychron.hardware.core.communicators.async_transport import AsyncTransport
+from pychron.hardware.core.communicators.ethernet_communicator import EthernetCommunicator, MessageFrame
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+
+class LineHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.nconnections += 1
+        while 1:
+            line = self.rfile.readline()
+            if not line:
+                break
+
+            cmd = line.strip().decode('utf-8')
+            if cmd == 'Slow':
+                time.sleep(0.3)
+
+            resp = '{}-ok'.format(cmd)
+            if self.server.framed:
+                resp = '{:04X}{}'.format(len(resp) + 4, resp)
+            else:
+                resp = '{}\n'.format(resp)
+            self.wfile.write(resp.encode('utf-8'))
+
+
+class UDPHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data, sock = self.request
+        sock.sendto(data.strip() + b'-ok', self.client_address)
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    nconnections = 0
+    framed = False
+
+
+class AsyncTransportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = Server(('127.0.0.1', 0), LineHandler)
+        self.port = self.server.server_address[1]
+        t = threading.Thread(target=self.server.serve_forever)
+        t.daemon = True
+        t.start()
+
+        self.transport = AsyncTransport('127.0.0.1', self.port, 'TCP', read_terminator='\n', pipeline=True)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_ask(self):
+        t = self.transport
+        self.assertEqual(t.ask('Foo\n'), 'Foo-ok\n')
+        self.assertEqual(t.ask('Bar\n'), 'Bar-ok\n')
+
+        m = t.metrics.to_dict()
+        self.assertEqual(m['nrequests'], 2)
+        self.assertEqual(m['nconnects'], 1)
+        self.assertEqual(self.server.nconnections, 1)
+        self.assertGreater(m['mean_latency'], 0)
+
+    def test_ask_many(self):
+        cmds = ['Cmd{}\n'.format(i) for i in range(20)]
+        rs = self.transport.ask_many(cmds)
+        self.assertEqual(rs, ['Cmd{}-ok\n'.format(i) for i in range(20)])
+        self.assertEqual(self.transport.metrics.nconnects, 1)
+
+    def test_concurrent_threads(self):
+        rs = {}
+
+        def func(i):
+            rs[i] = self.transport.ask('T{}\n'.format(i))
+
+        ts = [threading.Thread(target=func, args=(i,)) for i in range(10)]
+        for ti in ts:
+            ti.start()
+        for ti in ts:
+            ti.join()
+
+        self.assertEqual(rs, {i: 'T{}-ok\n'.format(i) for i in range(10)})
+
+    def test_timeout(self):
+        t = self.transport
+        self.assertIsNone(t.ask('Slow\n', timeout=0.1))
+        self.assertEqual(t.metrics.ntimeouts, 1)
+
+        # the late response is not read as the reply to the next request
+        self.assertEqual(t.ask('Foo\n'), 'Foo-ok\n')
+        self.assertEqual(t.metrics.nconnects, 2)
+
+    def test_message_frame(self):
+        self.server.framed = True
+        t = AsyncTransport('127.0.0.1', self.port, 'TCP', message_frame=MessageFrame(message_len=True),
+                           pipeline=True)
+        try:
+            self.assertEqual(t.ask_many(['A\n', 'B\n']), ['A-ok', 'B-ok'])
+        finally:
+            t.close()
+
+    def test_connection_refused(self):
+        s = socket.socket()
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+        s.close()
+
+        t = AsyncTransport('127.0.0.1', port, 'TCP')
+        self.assertFalse(t.open(0.5))
+        self.assertIsNone(t.ask('Foo\n', timeout=0.5))
+        self.assertEqual(t.metrics.nerrors, 1)
+
+    def test_udp(self):
+        server = socketserver.UDPServer(('127.0.0.1', 0), UDPHandler)
+        th = threading.Thread(target=server.serve_forever)
+        th.daemon = True
+        th.start()
+
+        t = AsyncTransport('127.0.0.1', server.server_address[1], 'UDP')
+        try:
+            self.assertEqual(t.ask('Foo\n'), 'Foo-ok')
+            self.assertEqual(t.ask('Bar\n'), 'Bar-ok')
+        finally:
+            t.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_communicator(self):
+        c = EthernetCommunicator(name='test')
+        c.host, c.port, c.kind = '127.0.0.1', self.port, 'TCP'
+        c.use_async = True
+        c.read_terminator = '\n'
+        c.write_terminator = '\n'
+        c.simulation = False
+
+        self.assertEqual(c.ask('Foo', verbose=False), 'Foo-ok\n')
+        self.assertEqual(c.ask_many(['A', 'B'], verbose=False), ['A-ok\n', 'B-ok\n'])
+        self.assertEqual(c.get_metrics()['nrequests'], 3)
+        c.reset()
+
+    def _communicator(self, **kw):
+        c = EthernetCommunicator(name='test', **kw)
+        c.host, c.port, c.kind = '127.0.0.1', self.port, 'TCP'
+        c.use_async = True
+        c.read_terminator = '\n'
+        c.write_terminator = '\n'
+        c.simulation = False
+        return c
+
+    def _ask_threads(self, c, n=8):
+        rs = {}
+
+        def ask(i):
+            rs[i] = c.ask('Foo{}'.format(i), verbose=False)
+
+        ts = [threading.Thread(target=ask, args=(i,)) for i in range(n)]
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join(5)
+        return rs
+
+    def test_communicator_shared_transport(self):
+        c = self._communicator()
+        rs = self._ask_threads(c)
+        self.assertEqual(rs, {i: 'Foo{}-ok\n'.format(i) for i in range(8)})
+
+        # the threads share one connection
+        self.assertEqual(self.server.nconnections, 1)
+        c.reset()
+
+    def test_communicator_use_end(self):
+        c = self._communicator()
+        c.use_end = True
+        rs = self._ask_threads(c)
+        self.assertEqual(rs, {i: 'Foo{}-ok\n'.format(i) for i in range(8)})
+        self.assertEqual(self.server.nconnections, 8)
+        self.assertIsNone(c.transport)
+
+    def test_sync_communicator_imports(self):
+        # a sync communicator must work where the asyncio transport cannot be imported
+        code = ('import sys\n'
+                'from pychron.hardware.core.communicators.ethernet_communicator import EthernetCommunicator\n'
+                'c = EthernetCommunicator(name=\'test\')\n'
+                'c.get_metrics()\n'
+                'sys.exit(\'pychron.hardware.core.communicators.async_transport\' in sys.modules)\n')
+        self.assertEqual(subprocess.call([sys.executable, '-c', code]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
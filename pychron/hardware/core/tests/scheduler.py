@@ -0,0 +1,95 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import threading
+import time
+import unittest
+
+from pychron.hardware.core.communicators.scheduler import CommunicationScheduler, HIGH_PRIORITY, LOW_PRIORITY
+
+
+class SchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = CommunicationScheduler(collision_delay=0)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _cmd(self, name, duration=0.0):
+        with self.lock:
+            self.calls.append(name)
+        time.sleep(duration)
+        return name
+
+    def _start(self, *args, **kw):
+        results = kw.pop('results', None)
+
+        def func():
+            r = self.scheduler.schedule(self._cmd, args=args, **kw)
+            if results is not None:
+                results.append(r)
+
+        t = threading.Thread(target=func)
+        t.start()
+        return t
+
+    def test_result(self):
+        self.assertEqual(self.scheduler.schedule(self._cmd, args=('a',)), 'a')
+
+    def test_error(self):
+        def func():
+            raise ValueError('bad')
+
+        self.assertRaises(ValueError, self.scheduler.schedule, func)
+        # the bus is released
+        self.assertEqual(self.scheduler.schedule(self._cmd, args=('a',)), 'a')
+
+    def test_priority(self):
+        ts = [self._start('slow', 0.2)]
+        time.sleep(0.05)
+        for i in range(3):
+            ts.append(self._start('low{}'.format(i), priority=LOW_PRIORITY))
+            time.sleep(0.01)
+        ts.append(self._start('valve', priority=HIGH_PRIORITY))
+        for t in ts:
+            t.join()
+
+        self.assertEqual(self.calls, ['slow', 'valve', 'low0', 'low1', 'low2'])
+        st = self.scheduler.stats()
+        self.assertEqual(st['max_depth'], 4)
+        self.assertEqual(st['depth'], 0)
+        self.assertGreater(st['max_wait'], 0.1)
+
+    def test_deadline(self):
+        results = []
+        ts = [self._start('slow', 0.2)]
+        time.sleep(0.05)
+        ts.append(self._start('late', deadline=0.05, results=results))
+        for t in ts:
+            t.join()
+
+        self.assertEqual(self.calls, ['slow'])
+        self.assertEqual(results, [None])
+        self.assertEqual(self.scheduler.stats()['nexpired'], 1)
+
+    def test_coalesce(self):
+        results = []
+        ts = [self._start('slow', 0.2)]
+        time.sleep(0.05)
+        ts.extend([self._start('temp', coalesce=True, results=results) for _ in range(5)])
+        for t in ts:
+            t.join()
+
+        self.assertEqual(self.calls, ['slow', 'temp'])
+        self.assertEqual(results, ['temp'] * 5)
+        self.assertEqual(self.scheduler.stats()['ncoalesced'], 4)
+
+    def test_collision_delay(self):
+        self.scheduler.collision_delay = 50
+        st = time.time()
+        for i in range(4):
+            self.scheduler.schedule(self._cmd, args=(i,))
+        self.assertGreaterEqual(time.time() - st, 0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,286 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+from __future__ import absolute_import
+
+from traits.api import Int, Float, Any
+
+# ============= standard library imports ========================
+import time
+from collections import deque, OrderedDict
+from threading import Thread, Condition
+
+# ============= local library imports  ==========================
+from pychron.loggable import Loggable
+
+
+class MeasurementRow(object):
+    def __init__(self, dev, tag, value, unit, timestamp):
+        self.dev = dev
+        self.tag = tag
+        self.value = value
+        self.unit = unit
+        self.timestamp = timestamp
+
+
+class ConnectionRow(object):
+    def __init__(self, ts, appname, username, devname, com, addr, status):
+        self.ts = ts
+        self.appname = appname
+        self.username = username
+        self.devname = devname
+        self.com = com
+        self.addr = addr
+        self.status = bool(status)
+
+    @property
+    def key(self):
+        return self.appname, self.devname
+
+    @property
+    def state(self):
+        return self.username, self.com, self.addr, self.status
+
+
+class LabspyBatchWriter(Loggable):
+    """
+    buffers measurements and connection statuses and writes them on a worker thread with one ``writer`` call per
+    batch::
+
+        writer(measurements, connections) -> False if the database is not available
+
+    a batch is written ``period`` seconds after its first row was added or as soon as ``batch_size`` measurements
+    are waiting. only the latest status of a connection is kept, and a status that has not changed since it was
+    last written is not written again until it is ``heartbeat`` seconds old.
+
+    ``add_measurement`` and ``update_connection`` never wait for the database. if ``writer`` fails the batch goes
+    back in the buffer and the next attempt waits twice as long, up to ``max_backoff``. while the database is down
+    the buffer keeps the newest ``max_buffer`` measurements and drops the oldest
+    """
+    writer = Any
+    period = Float(5)
+    batch_size = Int(200)
+    max_buffer = Int(10000)
+    heartbeat = Float(300)
+    max_backoff = Float(300)
+
+    def __init__(self, *args, **kw):
+        super(LabspyBatchWriter, self).__init__(*args, **kw)
+        self._cond = Condition()
+        self._measurements = deque()
+        self._connections = OrderedDict()
+        # key: (state, time written)
+        self._written = {}
+        self._first = None
+        self._thread = None
+        self._stopped = False
+        self._writing = False
+        self._flushing = False
+        self._backoff = 0
+        self._retry = 0
+
+        self.nwritten = 0
+        self.ndropped = 0
+        self.nfailed = 0
+
+    @property
+    def npending(self):
+        with self._cond:
+            return len(self._measurements) + len(self._connections)
+
+    def add_measurement(self, dev, tag, value, unit, timestamp=None):
+        row = MeasurementRow(dev, tag, value, unit, timestamp or time.time())
+        with self._cond:
+            self._measurements.append(row)
+            self._trim()
+            self._added()
+
+    def update_connection(self, ts, appname, username, devname, com, addr, status):
+        row = ConnectionRow(ts, appname, username, devname, com, addr, status)
+        with self._cond:
+            key = row.key
+            w = self._written.get(key)
+            if w is not None:
+                state, wt = w
+                if state == row.state and time.time() - wt < self.heartbeat:
+                    # drop a waiting status that the unchanged one would have replaced
+                    self._connections.pop(key, None)
+                    return
+
+            self._connections.pop(key, None)
+            self._connections[key] = row
+            self._added()
+
+    def flush(self, timeout=None):
+        """
+        write everything buffered now, ignoring the period and any backoff
+
+        @return: True if the buffer was written
+        """
+        st = time.time()
+        with self._cond:
+            if not (self._measurements or self._connections or self._writing):
+                return True
+
+            self._flushing = True
+            self._retry = 0
+            self._start_worker()
+            self._cond.notify_all()
+            while self._flushing:
+                rem = 1
+                if timeout is not None:
+                    rem = timeout - (time.time() - st)
+                    if rem <= 0:
+                        return False
+                self._cond.wait(min(rem, 1))
+
+            # cleared by a failed write with rows left in the buffer
+            return not (self._measurements or self._connections)
+
+    def stop(self, timeout=10):
+        """
+        flush and stop the worker thread. a later add starts a new one
+
+        @return: True if the buffer was written
+        """
+        ret = self.flush(timeout)
+        if not ret:
+            self.warning('labspy writer stopped with {} rows unwritten'.format(self.npending))
+
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            t = self._thread
+
+        if t is not None:
+            t.join(timeout)
+        return ret
+
+    # private
+    def _added(self):
+        if self._first is None:
+            self._first = time.time()
+        self._start_worker()
+        self._cond.notify_all()
+
+    def _trim(self):
+        n = len(self._measurements) - self.max_buffer
+        if n > 0:
+            for i in range(n):
+                self._measurements.popleft()
+            if not self.ndropped:
+                self.warning('labspy buffer full. dropping oldest measurements')
+            self.ndropped += n
+
+    def _start_worker(self):
+        self._stopped = False
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name='LabspyBatchWriter')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _due(self):
+        """
+        @return: seconds until the buffer should be written. 0 if it is due
+        """
+        if not self._measurements and not self._connections:
+            return
+
+        if self._flushing:
+            return 0
+
+        now = time.time()
+        if self._retry > now:
+            return self._retry - now
+
+        if len(self._measurements) >= self.batch_size:
+            return 0
+
+        return max(0, self._first + self.period - now)
+
+    def _run(self):
+        while 1:
+            with self._cond:
+                while 1:
+                    due = self._due()
+                    if due == 0:
+                        break
+                    if self._stopped:
+                        # anything left is waiting for a retry. stop gave up on it
+                        self._thread = None
+                        return
+                    self._cond.wait(1 if due is None else min(due, 1))
+
+                ms = [self._measurements.popleft() for _ in range(min(self.batch_size, len(self._measurements)))]
+                cs = list(self._connections.values())
+                self._connections.clear()
+                self._first = time.time() if self._measurements else None
+                self._writing = True
+
+            ok = self._write(ms, cs)
+
+            with self._cond:
+                self._writing = False
+                if ok:
+                    self._backoff = 0
+                    self._retry = 0
+                    self.nwritten += len(ms) + len(cs)
+                    now = time.time()
+                    for c in cs:
+                        self._written[c.key] = (c.state, now)
+                    if not self._measurements and not self._connections:
+                        self._flushing = False
+                else:
+                    self._flushing = False
+                    self._requeue(ms, cs)
+                self._cond.notify_all()
+
+    def _write(self, ms, cs):
+        st = time.time()
+        try:
+            if self.writer(ms, cs) is False:
+                self.nfailed += 1
+                self.debug('labspy database not available')
+                return False
+        except BaseException as e:
+            self.nfailed += 1
+            self.warning('labspy write failed. {}'.format(e))
+            self.debug_exception()
+            return False
+
+        et = time.time() - st
+        if et > self.period:
+            self.debug('slow labspy write. {} rows in {:0.2f}s'.format(len(ms) + len(cs), et))
+        return True
+
+    def _requeue(self, ms, cs):
+        self._measurements.extendleft(reversed(ms))
+        self._trim()
+
+        # a newer status of the same connection replaces the failed one
+        for c in cs:
+            if c.key not in self._connections:
+                self._connections[c.key] = c
+
+        if self._first is None:
+            self._first = time.time()
+
+        self._backoff = min(self.max_backoff, max(self.period, self._backoff * 2))
+        self._retry = time.time() + self._backoff
+        self.debug('retrying labspy write in {:0.1f}s'.format(self._backoff))
+
+# ============= EOF =============================================
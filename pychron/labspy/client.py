@@ -24,10 +24,11 @@ from threading import Thread, Lock
 
 import yaml
 from apptools.preferences.preference_binding import bind_preference
-from traits.api import Instance, Bool, Int
+from traits.api import Instance, Bool, Int, Float
 
 from pychron.core.helpers.logger_setup import logging_setup
 from pychron.hardware.core.i_core_device import ICoreDevice
+from pychron.labspy.batch_writer import LabspyBatchWriter
 from pychron.labspy.database_adapter import LabspyDatabaseAdapter
 from pychron.loggable import Loggable
 from pychron.paths import paths
@@ -82,9 +83,11 @@ class LabspyClient(Loggable):
     Used in conjunction with ExperimentPlugin
     """
     db = Instance(LabspyDatabaseAdapter)
+    writer = Instance(LabspyBatchWriter)
 
     use_connection_status = Bool
     connection_status_period = Int
+    write_period = Float(5)
 
     _timer = None
     session_lock = None
@@ -96,12 +99,20 @@ class LabspyClient(Loggable):
             # self.start()
         self.session_lock = Lock()
 
+    def stop(self):
+        """
+        write the buffered measurements and connection statuses
+        """
+        self.writer.stop()
+
     def bind_preferences(self):
         self.db.bind_preferences()
         bind_preference(self, 'use_connection_status',
                         'pychron.labspy.use_connection_status')
         bind_preference(self, 'connection_status_period',
                         'pychron.labspy.connection_status_period')
+        bind_preference(self, 'write_period',
+                        'pychron.labspy.write_period')
 
     def test_connection(self, **kw):
         return self.db.connect(**kw)
@@ -184,7 +195,6 @@ class LabspyClient(Loggable):
         hid = self._generate_hid(exp)
         exp = self.db.get_experiment(hid)
 
-    @auto_connect
     def update_connection(self, ts, devname, com, addr, status, verbose=False):
         if verbose:
             self.debug(
@@ -199,11 +209,7 @@ class LabspyClient(Loggable):
         except ValueError:
             pass
 
-        with self.db.session_ctx():
-            self.db.set_connection(ts,
-                                   appname.strip(),
-                                   user.strip(),
-                                   devname, com, addr, status)
+        self.writer.update_connection(ts, appname.strip(), user.strip(), devname, com, addr, status)
 
     @auto_connect
     def update_status(self, **kw):
@@ -247,7 +253,6 @@ class LabspyClient(Loggable):
                     
                 self.db.add_measurement('{}Monitor'.format(ms), '{}{}'.format(ms, name), v, units)
 
-    @auto_connect
     def add_measurement(self, dev, tag, val, unit):
         val = float(val)
         self.debug(
@@ -255,11 +260,11 @@ class LabspyClient(Loggable):
                                                                         tag,
                                                                         val,
                                                                         unit))
+        self.writer.add_measurement(dev, tag, val, unit)
         try:
-            self.db.add_measurement(dev, tag, val, unit)
             self._check_notifications(dev, tag, val, unit)
         except BaseException as e:
-            self.debug('failed adding measurement. {}'.format(e))
+            self.debug('failed checking notifications. {}'.format(e))
 
     def connect(self):
         self.warning('not connected to db {}'.format(self.db.public_url))
@@ -321,9 +326,34 @@ class LabspyClient(Loggable):
             else:
                 self.warning('Email Plugin not enabled')
 
+    def _write_batch(self, measurements, connections):
+        with self.session_lock:
+            if not self.db.connected:
+                self.connect()
+
+            if not self.db.connected:
+                return False
+
+            db = self.db
+            with db.session_ctx(use_parent_session=False):
+                with db.deferred_commit():
+                    if measurements:
+                        db.add_measurements([(m.dev, m.tag, m.value, m.unit, datetime.fromtimestamp(m.timestamp))
+                                             for m in measurements])
+                    for c in connections:
+                        db.set_connection(c.ts, c.appname, c.username, c.devname, c.com, c.addr, c.status)
+        return True
+
+    def _write_period_changed(self, new):
+        if new > 0:
+            self.writer.period = new
+
     def _db_default(self):
         return LabspyDatabaseAdapter()
 
+    def _writer_default(self):
+        return LabspyBatchWriter(writer=self._write_batch, period=self.write_period)
+
     def _run_dict(self, run):
 
         spec = run.spec
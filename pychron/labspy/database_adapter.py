@@ -96,17 +96,40 @@ class LabspyDatabaseAdapter(DatabaseAdapter):
         dev = Device(name=dev)
         return self._add_item(dev)
 
-    def add_measurement(self, dev, name, value, unit):
-        pinfo = self.get_process_info(dev, name)
+    def add_measurement(self, dev, name, value, unit, pub_date=None, pinfo=None):
+        if pinfo is None:
+            pinfo = self.get_process_info(dev, name)
         # if not pinfo:
         #     pinfo = self.add_process_info(dev, name, unit)
         if pinfo:
             measurement = Measurement(value=value)
+            if pub_date is not None:
+                measurement.pub_date = pub_date
             measurement.process = pinfo
             return self._add_item(measurement)
         else:
             self.warning('ProcessInfo={} Device={} not available'.format(name, dev))
 
+    def add_measurements(self, rows):
+        """
+        add many measurements in one transaction. the process info of each device and tag is queried once
+
+        :param rows: list of (dev, name, value, unit, pub_date)
+        """
+        pinfos = {}
+        with self.deferred_commit():
+            for dev, name, value, unit, pub_date in rows:
+                key = (dev, name)
+                if key in pinfos:
+                    pinfo = pinfos[key]
+                else:
+                    pinfo = pinfos[key] = self.get_process_info(dev, name)
+                    if not pinfo:
+                        self.warning('ProcessInfo={} Device={} not available'.format(name, dev))
+
+                if pinfo:
+                    self.add_measurement(dev, name, value, unit, pub_date=pub_date, pinfo=pinfo)
+
     def add_process_info(self, dev, name, unit):
         self.debug('add process info {} {} {}'.format(dev, name, unit))
         dbdev = self.get_device(dev)
@@ -69,6 +69,11 @@ class LabspyClientPlugin(BaseTaskPlugin):
         lc = self.application.get_service(LabspyClient)
         return lc.test_connection(warn=False)
 
+    def stop(self):
+        client = self.application.get_service(LabspyClient)
+        if client:
+            client.stop()
+
     @on_trait_change('application:started')
     def _start(self):
         plugin = self.application.get_plugin('pychron.dashboard.tasks.server.plugin.DashboardServerPlugin')
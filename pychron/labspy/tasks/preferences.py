@@ -17,7 +17,7 @@
 # ============= enthought library imports =======================
 from __future__ import absolute_import
 from envisage.ui.tasks.preferences_pane import PreferencesPane
-from traits.api import Int, Str, Password, Bool
+from traits.api import Int, Str, Password, Bool, Float
 from traitsui.api import View, Item, Spring, Label, VGroup, HGroup
 
 from pychron.core.ui.custom_label_editor import CustomLabel
@@ -36,6 +36,7 @@ class LabspyPreferences(BasePreferencesHelper, ConnectionMixin):
 
     use_connection_status = Bool
     connection_status_period = Int
+    write_period = Float
 
     def _get_connection_dict(self):
         return dict(username=self.username,
@@ -74,9 +75,17 @@ class LabspyPreferencesPane(PreferencesPane):
                        label='Connection Status',
                        show_border=True)
 
+        wgrp = VGroup(Item('write_period',
+                           label='Write Period (s)',
+                           tooltip='Measurements and connection statuses are buffered and written to the database '
+                                   'every X seconds'),
+                      label='Writer',
+                      show_border=True)
+
         v = View(VGroup(
             dbconngrp,
-            csgrp))
+            csgrp,
+            wgrp))
         return v
 
 
@@ -0,0 +1,153 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import time
+import unittest
+
+from pychron.globals import globalv
+from pychron.labspy.batch_writer import LabspyBatchWriter
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+
+class BatchWriterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.nfail = 0
+        self.available = True
+        self.writer = LabspyBatchWriter(writer=self._write, period=10, batch_size=3)
+
+    def tearDown(self):
+        self.nfail = 0
+        self.available = True
+        self.writer.stop(1)
+
+    def _write(self, ms, cs):
+        if self.nfail:
+            self.nfail -= 1
+            raise IOError('lost connection')
+        if not self.available:
+            return False
+        self.batches.append(([m.value for m in ms], [(c.devname, c.status) for c in cs]))
+
+    def _wait(self, n, timeout=2):
+        st = time.time()
+        while len(self.batches) < n and time.time() - st < timeout:
+            time.sleep(0.01)
+
+    def _connection(self, dev, status):
+        self.writer.update_connection(None, 'app', 'user', dev, 'Serial', '/dev/tty', status)
+
+    def test_batch_size(self):
+        for i in range(3):
+            self.writer.add_measurement('Env', 'temp', i, 'C')
+        self._wait(1)
+        self.assertEqual(self.batches, [([0, 1, 2], [])])
+
+    def test_period(self):
+        self.writer.period = 0.05
+        self.writer.add_measurement('Env', 'temp', 1, 'C')
+        self.assertEqual(self.batches, [])
+        self._wait(1)
+        self.assertEqual(self.batches, [([1], [])])
+
+    def test_flush(self):
+        self.writer.add_measurement('Env', 'temp', 1, 'C')
+        self._connection('a', True)
+        self.assertTrue(self.writer.flush(2))
+        self.assertEqual(self.batches, [([1], [('a', True)])])
+        self.assertEqual(self.writer.npending, 0)
+        self.assertTrue(self.writer.flush(2))
+
+    def test_latest_status(self):
+        self._connection('a', True)
+        self._connection('b', True)
+        self._connection('a', False)
+        self.writer.flush(2)
+        self.assertEqual(self.batches, [([], [('b', True), ('a', False)])])
+
+    def test_unchanged_status(self):
+        self._connection('a', True)
+        self.writer.flush(2)
+
+        self._connection('a', True)
+        self.assertEqual(self.writer.npending, 0)
+
+        self._connection('a', False)
+        self.writer.flush(2)
+        self.assertEqual(self.batches, [([], [('a', True)]), ([], [('a', False)])])
+
+    def test_unchanged_status_reverted(self):
+        self._connection('a', True)
+        self.writer.flush(2)
+
+        # changed and changed back before it was written
+        self._connection('a', False)
+        self._connection('a', True)
+        self.assertEqual(self.writer.npending, 0)
+
+    def test_heartbeat(self):
+        self.writer.heartbeat = 0
+        self._connection('a', True)
+        self.writer.flush(2)
+        self._connection('a', True)
+        self.writer.flush(2)
+        self.assertEqual(len(self.batches), 2)
+
+    def test_retry(self):
+        self.nfail = 1
+        self.writer.add_measurement('Env', 'temp', 1, 'C')
+        self.assertFalse(self.writer.flush(2))
+        self.assertEqual(self.writer.npending, 1)
+
+        # nothing is lost and the order is kept
+        self.writer.add_measurement('Env', 'temp', 2, 'C')
+        self.assertTrue(self.writer.flush(2))
+        self.assertEqual(self.batches, [([1, 2], [])])
+        self.assertEqual(self.writer.nfailed, 1)
+
+    def test_backoff(self):
+        self.writer.period = 0.2
+        self.nfail = 1
+        self.writer.add_measurement('Env', 'temp', 1, 'C')
+        time.sleep(0.3)
+        self.assertEqual(self.writer.nfailed, 1)
+        # the retry waits at least one period
+        self.assertEqual(self.batches, [])
+        self._wait(1)
+        self.assertEqual(self.batches, [([1], [])])
+
+    def test_not_available(self):
+        self.available = False
+        self.writer.add_measurement('Env', 'temp', 1, 'C')
+        self.assertFalse(self.writer.flush(2))
+        self.available = True
+        self.assertTrue(self.writer.flush(2))
+        self.assertEqual(self.batches, [([1], [])])
+
+    def test_max_buffer(self):
+        self.writer.max_buffer = 4
+        self.writer.batch_size = 100
+        self.available = False
+        for i in range(6):
+            self.writer.add_measurement('Env', 'temp', i, 'C')
+
+        self.assertEqual(self.writer.ndropped, 2)
+        self.available = True
+        self.writer.flush(2)
+        self.assertEqual(self.batches, [([2, 3, 4, 5], [])])
+
+    def test_stop(self):
+        self.writer.add_measurement('Env', 'temp', 1, 'C')
+        self.assertTrue(self.writer.stop(2))
+        self.assertEqual(self.batches, [([1], [])])
+
+        # a later add starts a new worker
+        self.writer.add_measurement('Env', 'temp', 2, 'C')
+        self.writer.flush(2)
+        self.assertEqual(len(self.batches), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,6 +20,7 @@ from __future__ import absolute_import
 from traits.api import HasTraits, Any, String
 
 # ============= standard library imports ========================
+import logging
 # ============= local library imports  ==========================
 from pychron.core.confirmation import confirmation_dialog
 from pychron.globals import globalv
@@ -133,6 +134,12 @@ class Loggable(HasTraits):
     def debug(self, msg):
         self._log_('debug', msg)
 
+    def debug_enabled(self):
+        """
+        check before formatting debug messages that are expensive to make
+        """
+        return self.logger is not None and self.logger.isEnabledFor(logging.DEBUG)
+
     # dialogs
     def warning_dialog(self, msg, sound=None, title='Warning'):
         self.warning(msg)
@@ -202,6 +202,7 @@ class Paths(object):
     media_storage_dir = None
 
     repository_dataset_dir = None
+    repository_sidecar_dir = None
     project_dir = None
     meta_root = None
     dvc_dir = None
@@ -432,6 +433,7 @@ class Paths(object):
         self.corrections_dir = join(self.data_dir, 'stage_corrections')
         self.dvc_dir = join(self.data_dir, '.dvc')
         self.repository_dataset_dir = join(self.dvc_dir, 'repositories')
+        self.repository_sidecar_dir = join(self.dvc_dir, 'sidecars')
         self.meta_root = join(self.dvc_dir, 'MetaData')
         self.sample_dir = join(self.data_dir, 'sample_entry')
         self.media_storage_dir = join(self.data_dir, 'media')
@@ -23,7 +23,7 @@ from pyface.constant import YES
 from six.moves import zip
 from traits.api import Bool, List, HasTraits, Str, Float, Instance
 
-from pychron.core.progress import progress_loader
+from pychron.core.progress import progress_loader, progress_iterator
 from pychron.options.options_manager import BlanksOptionsManager, ICFactorOptionsManager, \
     IsotopeEvolutionOptionsManager, \
     FluxOptionsManager
@@ -32,6 +32,7 @@ from pychron.pipeline.editors.flux_results_editor import FluxResultsEditor
 from pychron.pipeline.editors.results_editor import IsoEvolutionResultsEditor
 from pychron.pipeline.nodes.figure import FigureNode
 from pychron.pipeline.state import get_detector_set
+from pychron.processing.batch_fit import batch_fit_analyses
 from pychron.pychron_constants import NULL_STR
 
 
@@ -339,6 +340,12 @@ class FitIsotopeEvolutionNode(FitNode):
             if self.check_refit(unks):
                 return
 
+            progress_iterator(unks, self._load_raw_data, threshold=1)
+
+            # fit the intercepts of all the analyses at once. isotopes that can't be batched are fit individually
+            # when their value is first requested
+            batch_fit_analyses(unks, self._keys, refit=True)
+
             fs = progress_loader(unks, self._assemble_result, threshold=1, step=10)
 
             if self.editor:
@@ -353,14 +360,18 @@ class FitIsotopeEvolutionNode(FitNode):
                 e.plotter_options = po
                 state.editors.append(e)
 
-    def _assemble_result(self, xi, prog, i, n):
+    def _load_raw_data(self, xi, prog, i, n):
         if prog:
             prog.change_message('Load raw data {}'.format(xi.record_id))
 
-        fits = self._fits
         xi.load_raw_data(self._keys)
+        xi.set_fits(self._fits)
 
-        xi.set_fits(fits)
+    def _assemble_result(self, xi, prog, i, n):
+        if prog:
+            prog.change_message('Assemble results {}'.format(xi.record_id))
+
+        fits = self._fits
         isotopes = xi.isotopes
         for f in fits:
             k = f.name
@@ -443,7 +454,7 @@ class FitIsotopeEvolutionNode(FitNode):
                                    rsquared_threshold=rsquared_threshold,
                                    rsquared_goodness=rsquared_goodness,
 
-                                   regression_str=iso.regressor.tostring(),
+                                   regression_str=iso.regression_str(),
                                    fit=iso.fit,
                                    isotope=k)
 
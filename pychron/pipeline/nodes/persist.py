@@ -42,6 +42,7 @@ from pychron.pipeline.state import get_isotope_set
 from pychron.pipeline.tables.xlsx_table_options import XLSXAnalysisTableWriterOptions
 from pychron.pipeline.tables.xlsx_table_writer import XLSXAnalysisTableWriter
 from pychron.processing.analyses.analysis import EXTRACTION_ATTRS, META_ATTRS
+from pychron.processing.batch_fit import batch_fit_analyses
 
 
 class PersistNode(BaseDVCNode):
@@ -117,6 +118,9 @@ class IsotopeEvolutionPersistNode(DVCPersistNode):
         if not state.saveable_keys:
             return
 
+        # isotopes refit since the Fit IsoEvo node, e.g. by editing a fit, are fit again in one batch
+        batch_fit_analyses(state.unknowns, state.saveable_keys)
+
         wrapper = lambda x, prog, i, n: self._save_fit(x, prog, i, n, state.saveable_keys)
         progress_iterator(state.unknowns, wrapper, threshold=1)
         # for ai in state.unknowns:
@@ -0,0 +1,29 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import unittest
+
+from pychron.pipeline.tables.util import iso_value, correction_value, age_value
+
+
+class TableUtilTestCase(unittest.TestCase):
+    def test_iso_value_cached(self):
+        self.assertIs(iso_value('intercept'), iso_value('intercept'))
+
+    def test_iso_value_keyword(self):
+        self.assertIs(iso_value('intercept', ve='error'), iso_value('intercept', ve='error'))
+        self.assertIsNot(iso_value('intercept'), iso_value('intercept', ve='error'))
+
+    def test_iso_value_attr(self):
+        self.assertIsNot(iso_value('intercept'), iso_value('blank'))
+
+    def test_correction_value_cached(self):
+        self.assertIs(correction_value(), correction_value())
+        self.assertIsNot(correction_value(), correction_value(ve='error'))
+
+    def test_age_value_cached(self):
+        self.assertIs(age_value(), age_value())
+
+
+if __name__ == '__main__':
+    unittest.main()
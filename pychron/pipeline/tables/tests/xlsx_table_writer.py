@@ -0,0 +1,47 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import unittest
+
+from pychron.globals import globalv
+from pychron.pipeline.tables.xlsx_table_writer import XLSXAnalysisTableWriter
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+
+class StubWorkbook(object):
+    def __init__(self):
+        self.formats = []
+
+    def add_format(self, props):
+        fmt = dict(props)
+        self.formats.append(fmt)
+        return fmt
+
+
+class XLSXTableWriterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.writer = XLSXAnalysisTableWriter()
+        self.writer._workbook = StubWorkbook()
+        self.writer._formats = {}
+
+    def test_get_format_shared(self):
+        a = self.writer._get_format(bold=True, num_format='0.000')
+        b = self.writer._get_format(num_format='0.000', bold=True)
+        self.assertIs(a, b)
+        self.assertEqual(len(self.writer._workbook.formats), 1)
+
+    def test_get_format_distinct(self):
+        a = self.writer._get_format(bold=True)
+        b = self.writer._get_format(bold=False)
+        self.assertIsNot(a, b)
+        self.assertEqual(len(self.writer._workbook.formats), 2)
+
+    def test_get_format_empty(self):
+        self.assertIs(self.writer._get_format(), self.writer._get_format())
+        self.assertEqual(self.writer._workbook.formats, [{}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,8 +25,28 @@ from uncertainties import nominal_value, std_dev
 from pychron.pychron_constants import PLUSMINUS, SIGMA, LAMBDA
 
 
+def cached_factory(factory):
+    """
+        return the same function for the same arguments. a table writer uses the column functions as part of the
+        key of the values it shares between sheets
+    """
+    cache = {}
+
+    def wrapper(*args, **kw):
+        key = args, tuple(sorted(kw.items()))
+        try:
+            return cache[key]
+        except KeyError:
+            f = cache[key] = factory(*args, **kw)
+            return f
+
+    return wrapper
+
+
+@cached_factory
 def iso_value(attr, ve='value'):
     def f(x, k):
+        v = None
         if k in x.isotopes:
             iso = x.isotopes[k]
             if attr == 'intercept':
@@ -49,6 +69,7 @@ def iso_value(attr, ve='value'):
     return f
 
 
+@cached_factory
 def correction_value(ve='value'):
     def f(x, k):
         v = None
@@ -94,6 +115,7 @@ def error(x, k):
         return ''
 
 
+@cached_factory
 def age_value(target_units='Ma'):
     def wrapper(x, k):
         v = value(x, k)
@@ -82,6 +82,7 @@ class XLSXAnalysisTableWriterOptions(BasePersistenceOptions):
 
     name = dumpable(Str('Untitled'))
     auto_view = dumpable(Bool(False))
+    use_constant_memory = dumpable(Bool(True))
 
     unknown_note_name = dumpable(Str('Default'))
     available_unknown_note_names = List
@@ -238,6 +239,8 @@ Ages calculated relative to FC-2 Fish Canyon Tuff sanidine interlaboratory stand
 
         grp = VGroup(Item('name', label='Filename'),
                      Item('auto_view', label='Open in Excel'),
+                     Item('use_constant_memory', label='Low Memory',
+                          tooltip='Write the table row by row to keep memory use low for large tables'),
                      show_border=True)
 
         appearence_grp = VGroup(Item('hide_gridlines', label='Hide Gridlines'),
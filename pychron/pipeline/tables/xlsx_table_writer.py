@@ -42,6 +42,18 @@ def format_mswd(t):
     return 'mswd={}{:0.3f}'.format('' if v else '*', m)
 
 
+class RowPlan(object):
+    """
+        how to write an analysis row. the value key, writer and format properties of each column are worked out
+        once per sheet instead of once per cell
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        # (highlight, last) -> row format, column formats
+        self.formats = {}
+
+
 class XLSXAnalysisTableWriter(BaseTableWriter):
     _workbook = None
     _current_row = 0
@@ -51,8 +63,18 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
     _ital = None
     _options = Instance(XLSXAnalysisTableWriterOptions)
 
+    _formats = None
+    _values = None
+
     def _new_workbook(self, path):
-        self._workbook = xlsxwriter.Workbook(add_extension(path, '.xlsx'), {'nan_inf_to_errors': True})
+        wopts = {'nan_inf_to_errors': True}
+        if self._options and self._options.use_constant_memory:
+            # each row is flushed to disk when the next row is started so memory does not grow with the table.
+            # the sheets are written strictly top to bottom
+            wopts['constant_memory'] = True
+
+        self._workbook = xlsxwriter.Workbook(add_extension(path, '.xlsx'), wopts)
+        self._formats = {}
 
     def build(self, groups, path=None, options=None):
         if options is None:
@@ -65,18 +87,22 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
 
         self._new_workbook(path)
 
-        self._bold = self._workbook.add_format({'bold': True})
-        self._superscript = self._workbook.add_format({'font_script': 1})
-        self._subscript = self._workbook.add_format({'font_script': 2})
-        self._ital = self._workbook.add_format({'italic': True})
+        self._bold = self._get_format(bold=True)
+        self._superscript = self._get_format(font_script=1)
+        self._subscript = self._get_format(font_script=2)
+        self._ital = self._get_format(italic=True)
 
         unknowns = groups.get('unknowns')
+        munknowns = groups.get('machine_unknowns')
+
+        # the human and machine sheets show the same analyses. keep the values of the first for the second
+        self._values = {} if unknowns and munknowns else None
+
         if unknowns:
             # make a human optimized table
             self._make_human_unknowns(unknowns)
 
             # make a machine optimized table
-        munknowns = groups.get('machine_unknowns')
         if munknowns:
             self._make_machine_unknowns(munknowns)
 
@@ -100,6 +126,8 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
                 self._make_summary_sheet(unknowns)
 
         self._workbook.close()
+        self._values = None
+        self._formats = None
 
         view = self._options.auto_view
         if not view:
@@ -425,7 +453,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
         cols = [c for c in cols if c.enabled]
         self._make_title(sh, 'Summary', cols)
 
-        fmt = self._workbook.add_format({'bottom': 1, 'align': 'center'})
+        fmt = self._get_format(bottom=1, align='center')
         sh.set_row(self._current_row, 5)
         self._current_row += 1
 
@@ -444,7 +472,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
         sh.set_row(self._current_row, 5)
         self._current_row += 1
         self._write_header(sh, cols, include_units=False)
-        center = self._workbook.add_format({'align': 'center'})
+        center = self._get_format(align='center')
         for ug in unks:
             ug.set_temporary_age_units(self._options.age_units)
             for i, ci in enumerate(cols):
@@ -505,6 +533,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
         worksheet = self._workbook.add_worksheet(name)
 
         cols = self._get_columns(name, groups)
+        plan = self._get_row_plan(cols)
         self._format_worksheet(worksheet, cols, (7, 2))
 
         self._make_title(worksheet, name, cols)
@@ -539,9 +568,12 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
                     ag.set_preferred_kinds(sg)
                 n = len(items) - 1
                 if options.individual_age_sorting != NULL_STR:
-                    items = sorted(items, attrgetter('age'),
+                    items = sorted(items, key=attrgetter('age'),
                                    reverse=options.individual_age_sorting == DESCENDING)
 
+                # keyed by analysis. items may be sorted differently than ag.analyses
+                cums = {id(a): c for a, c in zip(ag.analyses, ag.cumulative_ar39s())} if ag else None
+
                 for i, item in enumerate(items):
                     ounits = item.arar_constants.age_units
                     item.arar_constants.age_units = options.age_units
@@ -549,11 +581,11 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
                     is_plateau_step = None
                     if ag:
                         if label == 'plateau' and options.highlight_non_plateau:
-                            is_plateau_step = ag.get_is_plateau_step(i)
+                            is_plateau_step = ag.get_is_plateau_step(item)
 
-                    self._make_analysis(worksheet, cols, item, i == n and (not subgroup or nsubgroups == 1),
+                    self._make_analysis(worksheet, plan, item, i == n and (not subgroup or nsubgroups == 1),
                                         is_plateau_step=is_plateau_step,
-                                        cum=ag.cumulative_ar39(i) if ag else '')
+                                        cum=cums[id(item)] if ag else '')
 
                 if ag:
                     if nsubgroups > 1:
@@ -590,6 +622,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
         worksheet = self._workbook.add_worksheet(name)
 
         cols = self._get_machine_columns(name, groups)
+        plan = self._get_row_plan(cols)
         self._format_worksheet(worksheet, cols, (5, 2))
 
         self._make_title(worksheet, name, cols)
@@ -602,7 +635,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
 
             n = len(group.analyses) - 1
             for i, item in enumerate(group.analyses):
-                self._make_analysis(worksheet, cols, item, i == n)
+                self._make_analysis(worksheet, plan, item, i == n)
             self._current_row += 1
 
         self._current_row = 1
@@ -633,8 +666,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
         except AttributeError:
             title = None
 
-        fmt = self._workbook.add_format({'font_size': 14, 'bold': True,
-                                         'bottom': 6 if not title else 0})
+        fmt = self._get_format(font_size=14, bold=True, bottom=6 if not title else 0)
         sh.write_rich_string(self._current_row, 0, 'Table X. {}'.format(name), fmt)
         if title:
             self._current_row += 1
@@ -662,8 +694,8 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
     def _write_header(self, sh, cols, include_units=True):
         names, units = self._get_names_units(cols)
 
-        border = self._workbook.add_format({'bottom': 2, 'align': 'center'})
-        center = self._workbook.add_format({'align': 'center'})
+        border = self._get_format(bottom=2, align='center')
+        center = self._get_format(align='center')
         if include_units:
             t = ((names, False), (units, True))
         else:
@@ -721,14 +753,11 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
         age_idx = next((i for i, c in enumerate(cols) if c.label == 'Age'), 0)
         cum_idx = next((i for i, c in enumerate(cols) if c.attr == 'cumulative_ar39'), 0)
 
-        fmt = self._get_number_format('summary_age')
-        kcafmt = self._get_number_format('summary_kca')
+        fmt = self._get_number_format('summary_age', bottom=1)
+        kcafmt = self._get_number_format('summary_kca', bottom=1)
 
-        fmt.set_bottom(1)
-        kcafmt.set_bottom(1)
-
-        fmt2 = self._workbook.add_format({'bottom': 1, 'bold': True})
-        border = self._workbook.add_format({'bottom': 1})
+        fmt2 = self._get_format(bottom=1, bold=True)
+        border = self._get_format(bottom=1)
 
         for i in range(age_idx + 1):
             sh.write_blank(row, i, '', fmt)
@@ -767,60 +796,118 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
             sh.write_number(row, cum_idx, ag.valid_total_ar39(), fmt)
         self._current_row += 1
 
-    def _get_number_format(self, kind=None):
+    def _get_format(self, **props):
+        """
+            return the one format with these properties. the workbook keeps every format added to it so formats are
+            shared by all the cells that look the same instead of being made per cell
+        """
+        key = tuple(sorted(props.items()))
+        try:
+            return self._formats[key]
+        except KeyError:
+            fmt = self._formats[key] = self._workbook.add_format(props)
+            return fmt
+
+    def _get_num_format(self, kind=None):
         try:
             sf = getattr(self._options, '{}_sig_figs'.format(kind))
         except AttributeError as e:
             sf = self._options.sig_figs
 
-        fn = self._workbook.add_format()
         fmt = '0.{}'.format('0' * sf)
         if not self._options.ensure_trailing_zeros:
             fmt = '{}#'.format(fmt)
+        return fmt
 
-        fn.set_num_format(fmt)
-        return fn
+    def _get_number_format(self, kind=None, **props):
+        return self._get_format(num_format=self._get_num_format(kind), **props)
 
-    def _make_analysis(self, sh, cols, item, last, is_plateau_step=None, cum=''):
-        row = self._current_row
+    def _get_row_plan(self, cols):
+        columns = []
+        for j, c in enumerate(cols[1:]):
+            if c.label in ('N', 'Power'):
+                kind = 'write'
+            elif c.label == 'RunDate':
+                kind = 'datetime'
+            else:
+                kind = 'number'
 
-        fmt = self._workbook.add_format()
+            props = {}
+            if c.sigformat:
+                props['num_format'] = self._get_num_format(c.sigformat)
+            elif c.fformat:
+                for cmd, args in c.fformat:
+                    props[cmd[4:] if cmd.startswith('set_') else cmd] = args[0]
 
-        status = 'X' if item.is_omitted() else ''
-        highlight_color = self._options.highlight_color.name()
-        if is_plateau_step is False:
-            fmt.set_bg_color(highlight_color)
-            sh.set_row(0, -1, fmt)
-            if not status:
-                status = 'pX'
+            key = None if c.attr == 'cumulative_ar39' else (c.attr, c.func)
+            columns.append((j + 1, c, key, kind, props))
 
-        sh.write(row, 0, status, fmt)
-        for j, c in enumerate(cols[1:]):
-            cfmt = self._get_fmt(item, c)
-            if c.attr == 'cumulative_ar39':
-                txt = cum
-            else:
-                txt = self._get_txt(item, c)
+        return RowPlan(columns)
 
-            if cfmt:
-                if is_plateau_step is False:
-                    cfmt.set_bg_color(highlight_color)
+    def _get_row_formats(self, plan, highlight, last):
+        key = highlight, last
+        try:
+            return plan.formats[key]
+        except KeyError:
+            rprops = {}
+            if highlight:
+                rprops['bg_color'] = self._options.highlight_color.name()
+            if last:
+                rprops['bottom'] = 1
+
+            fmt = self._get_format(**rprops)
+            cfmts = [self._get_format(**dict(props, **rprops)) if props else fmt
+                     for _, _, _, _, props in plan.columns]
+            r = plan.formats[key] = fmt, cfmts
+            return r
+
+    def _get_values(self, item, plan):
+        vs = None
+        if self._values is not None:
+            # values that depend on the age units are only shared if both sheets used the same units
+            key = id(item), item.arar_constants.age_units
+            vs = self._values.get(key)
+            if vs is None:
+                vs = self._values[key] = {}
+
+        values = []
+        for _, c, key, _, _ in plan.columns:
+            if key is None:
+                v = None
+            elif vs is None:
+                v = self._get_txt(item, c)
             else:
-                cfmt = fmt
+                try:
+                    v = vs[key]
+                except KeyError:
+                    v = vs[key] = self._get_txt(item, c)
+            values.append(v)
+        return values
+
+    def _make_analysis(self, sh, plan, item, last, is_plateau_step=None, cum=''):
+        row = self._current_row
 
-            if last:
-                cfmt.set_bottom(1)
+        status = 'X' if item.is_omitted() else ''
+        highlight = is_plateau_step is False
+        if highlight and not status:
+            status = 'pX'
 
-            if c.label in ('N', 'Power'):
-                sh.write(row, j + 1, txt, cfmt)
-            elif c.label == 'RunDate':
-                sh.write_datetime(row, j + 1, txt, cfmt)
+        fmt, cfmts = self._get_row_formats(plan, highlight, last)
+
+        sh.write(row, 0, status, fmt)
+        values = self._get_values(item, plan)
+        for (col, c, key, kind, _), cfmt, txt in zip(plan.columns, cfmts, values):
+            if key is None:
+                txt = cum
+
+            if kind == 'write':
+                sh.write(row, col, txt, cfmt)
+            elif kind == 'datetime':
+                sh.write_datetime(row, col, txt, cfmt)
+            elif isinstance(txt, float):
+                sh.write_number(row, col, txt, cell_format=cfmt)
             else:
-                # self.debug('writing {} attr={} label={}'.format(type(txt), c.attr, c.label))
-                if isinstance(txt, float):
-                    sh.write_number(row, j + 1, txt, cell_format=cfmt)
-                else:
-                    sh.write(row, j + 1, txt, fmt)
+                sh.write(row, col, txt, fmt)
 
         self._current_row += 1
 
@@ -828,8 +915,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
         fmt = self._bold
         start_col = 0
         if self._options.include_kca:
-            nfmt = self._get_number_format('summary_kca')
-            nfmt.set_bold(True)
+            nfmt = self._get_number_format('summary_kca', bold=True)
             idx = next((i for i, c in enumerate(cols) if c.label == 'K/Ca'))
 
             nsigma = self._options.asummary_kca_nsigma
@@ -844,8 +930,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
             sh.write_rich_string(self._current_row, idx + 2, pv.error_kind, fmt)
             self._current_row += 1
 
-        nfmt = self._get_number_format('summary_age')
-        nfmt.set_bold(True)
+        nfmt = self._get_number_format('summary_age', bold=True)
 
         idx = next((i for i, c in enumerate(cols) if c.label == 'Age'))
 
@@ -891,7 +976,7 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
             self._current_row += 1
 
     def _make_notes(self, sh, ncols, name):
-        top = self._workbook.add_format({'top': 1})
+        top = self._get_format(top=1)
         sh.write_rich_string(self._current_row, 0, self._bold, 'Notes:', top)
         for i in range(1, ncols):
             sh.write_blank(self._current_row, i, 'Notes:', cell_format=top)
@@ -973,18 +1058,6 @@ class XLSXAnalysisTableWriter(BaseTableWriter):
         units = [c.units for c in cols]
         return names, units
 
-    def _get_fmt(self, item, col):
-        fmt = None
-        if col.sigformat:
-            fmt = self._get_number_format(col.sigformat)
-
-        elif col.fformat:
-            fmt = self._workbook.add_format()
-            for cmd, args in col.fformat:
-                getattr(fmt, cmd)(*args)
-
-        return fmt
-
     def _get_txt(self, item, col):
         attr = col.attr
         if attr is None:
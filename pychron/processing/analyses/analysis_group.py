@@ -479,6 +479,18 @@ class StepHeatAnalysisGroup(AnalysisGroup):
 
         return nominal_value(cum / self.total_ar39 * 100)
 
+    def cumulative_ar39s(self):
+        """
+            cumulative_ar39 of every analysis in one pass
+        """
+        total = self.total_ar39
+        cum = 0
+        cs = []
+        for a in self.analyses:
+            cum += a.get_computed_value('k39')
+            cs.append(nominal_value(cum / total * 100))
+        return cs
+
     def get_plateau_mswd_tuple(self):
         return self.plateau_mswd, self.plateau_mswd_valid, self.nsteps
 
@@ -0,0 +1,152 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+from numpy import array, zeros, isfinite
+
+# ============= local library imports  ==========================
+from pychron.core.helpers.fits import FITS, fit_to_degree
+from pychron.core.regression.batch_regressor import ols_batch, BATCH_ERROR_TYPES, CI
+from pychron.core.regression.ols_core import PolynomialFit
+
+
+def _batch_key(iso, refit):
+    """
+    return the group key for an isotope or None if it has to be fit by its own regressor
+    """
+    if not refit and iso.fit_result is not None:
+        return
+
+    if iso.use_stored_value or iso.user_defined_value or iso.user_defined_error:
+        return
+
+    n = iso.xs.shape[0]
+    if n < 2 or iso.ys.shape[0] != n:
+        return
+
+    fit = iso.fit
+    if not fit or fit.lower() not in FITS:
+        return
+
+    # PolynomialRegressor uses a confidence interval when no error type is set
+    error_type = iso.error_type or CI
+    if error_type not in BATCH_ERROR_TYPES:
+        return
+
+    fod = iso.filter_outliers_dict or {}
+    filt = bool(fod.get('filter_outliers', False))
+    iterations = fod.get('iterations', 1) if filt else 0
+    std_devs = fod.get('std_devs', 2) if filt else 0
+
+    return n, fit_to_degree(fit), error_type, filt, iterations, std_devs
+
+
+def _base_excluded(iso):
+    """
+    points excluded by the user or by truncation on an existing regressor
+    """
+    return iso.get_regressor_excluded()
+
+
+def fit_isotope(iso):
+    """
+    fit a single isotope with the plain numpy PolynomialFit instead of a traits regressor
+
+    @return: PolynomialFit or None if the isotope has to be fit by its regressor
+    """
+    key = _batch_key(iso, True)
+    if key is not None:
+        n, degree, error_type, filt, iterations, std_devs = key
+        fit = PolynomialFit(iso.offset_xs, iso.ys, degree,
+                            excluded=_base_excluded(iso),
+                            filter_outliers_dict=iso.filter_outliers_dict,
+                            error_calc_type=error_type)
+
+        if fit.n > degree + 1 and isfinite(fit.intercept) and isfinite(fit.intercept_error):
+            return fit
+
+
+def batch_fit_isotopes(isotopes, refit=False, chunksize=2000):
+    """
+    fit the intercepts of many isotopes with a few stacked least squares solves instead of one OLSRegressor per
+    isotope. isotopes are grouped by number of points, fit, error type and outlier filtering.
+
+    the results are attached with ``set_fit_result`` so ``value``, ``error``, ``noutliers`` etc do not build a
+    regressor. isotopes that cannot be batched (averages, MC errors, too few points...) are left alone and are fit
+    lazily by their regressor as usual.
+
+    @param isotopes: iterable of IsotopicMeasurement
+    @param refit: refit isotopes that already have a fit result
+    @return: number of isotopes fit
+    """
+    groups = {}
+    for iso in isotopes:
+        key = _batch_key(iso, refit)
+        if key is not None:
+            groups.setdefault(key, []).append(iso)
+
+    nfit = 0
+    for (n, degree, error_type, filt, iterations, std_devs), isos in groups.items():
+        for i in range(0, len(isos), chunksize):
+            chunk = isos[i:i + chunksize]
+
+            xs = array([iso.offset_xs for iso in chunk])
+            ys = array([iso.ys for iso in chunk])
+
+            excluded = None
+            for j, iso in enumerate(chunk):
+                exc = _base_excluded(iso)
+                if exc:
+                    if excluded is None:
+                        excluded = zeros(xs.shape, dtype=bool)
+                    excluded[j, list(exc)] = True
+
+            results = ols_batch(xs, ys, degree, excluded,
+                                filter_outliers=filt, iterations=iterations, std_devs=std_devs,
+                                error_calc=error_type)
+            for iso, r in zip(chunk, results):
+                if r is not None:
+                    iso.set_fit_result(r)
+                    nfit += 1
+
+    return nfit
+
+
+def batch_fit_analyses(analyses, keys, refit=False):
+    """
+    batch fit the isotopes and baselines named by ``keys`` for all ``analyses``.
+
+    keys are isotope names or detector names. a detector name selects the baseline of that detector, the same
+    convention used by the isotope evolution options
+    """
+    isos = []
+    for a in analyses:
+        isotopes = a.isotopes
+        for k in keys:
+            if k in isotopes:
+                iso = isotopes[k]
+            else:
+                iso = a.get_isotope(detector=k, kind='baseline')
+
+            if iso is not None:
+                isos.append(iso)
+
+    return batch_fit_isotopes(isos, refit)
+
+# ============= EOF =============================================
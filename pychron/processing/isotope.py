@@ -19,17 +19,21 @@
 #     String, Either, Dict, cached_property, Event, List, Bool, Int, Array
 # ============= standard library imports ========================
 import re
-import struct
 from binascii import hexlify
 from six.moves import map
 from six.moves import range
 
-from numpy import array, Inf, polyfit, gradient
+from numpy import array, Inf, polyfit, gradient, append as npappend
 from uncertainties import ufloat, nominal_value, std_dev
 
 from pychron.core.geometry.geometry import curvature_at
-from pychron.core.helpers.fits import natural_name_fit, fit_to_degree
+from pychron.core.helpers.binpack import pack_xy, unpack_xy
+from pychron.core.helpers.fits import natural_name_fit, fit_to_degree, FITS
+from pychron.core.regression.base_regressor import coefficients_tostring
+from pychron.core.regression.batch_regressor import CI
 from pychron.core.regression.mean_regressor import MeanRegressor
+from pychron.core.regression.streaming_regressor import StreamingPolynomialFit
+from pychron.processing.batch_fit import fit_isotope
 import six
 from six.moves import zip
 
@@ -76,8 +80,7 @@ class BaseMeasurement(object):
         if endianness is None:
             endianness = self.endianness
 
-        fmt = '{}ff'.format(endianness)
-        txt = b''.join((struct.pack(fmt, x, y) for x, y in zip(self.xs, self.ys)))
+        txt = pack_xy(self.xs, self.ys, endianness)
         if as_hex:
             txt = hexlify(txt)
         return txt
@@ -90,27 +93,30 @@ class BaseMeasurement(object):
             print(e)
             return
 
+        self.set_data(xs, ys, n_only)
+
+    def set_data(self, xs, ys, n_only=False):
         if n_only:
             self.n = len(xs)
         else:
-            self.xs = array(xs)
-            self.ys = array(ys)
+            self.xs = xs.astype(float)
+            self.ys = ys.astype(float)
+            self._data_changed()
+
+    def append_data(self, x, y):
+        self.xs = npappend(self.xs, x)
+        self.ys = npappend(self.ys, y)
 
-            # print self.name, self.xs.shape, self.ys.shape
-            # print self.name, self.ys
+    def _data_changed(self):
+        pass
 
     def _unpack_blob(self, blob, endianness=None):
         if endianness is None:
             endianness = self.endianness
 
         try:
-            x, y = zip(*[struct.unpack('{}ff'.format(endianness), blob[i:i + 8]) for i in range(0, len(blob), 8)])
-            if self.reverse_unpack:
-                return y, x
-            else:
-                return x, y
-
-        except struct.error as e:
+            return unpack_xy(blob, endianness, reverse=self.reverse_unpack)
+        except ValueError as e:
             print('unpack_blob', e)
 
     def get_slope(self, n=-1):
@@ -151,6 +157,10 @@ class IsotopicMeasurement(BaseMeasurement):
     _value = 0
     _error = 0
     _regressor = None
+    _fit_result = None
+    _fit_result_token = None
+    _stream = None
+    _stream_token = None
     _fit = None
 
     _oerror = None
@@ -169,6 +179,9 @@ class IsotopicMeasurement(BaseMeasurement):
         return reg.rsquared
 
     def get_rsquared(self):
+        r = self._get_fit_result(compute=False)
+        if r is not None:
+            return r.rsquared
         return self._regressor.rsquared
 
     def get_gradient(self):
@@ -180,18 +193,28 @@ class IsotopicMeasurement(BaseMeasurement):
 
     @property
     def rsquared(self):
-        if self._regressor:
+        r = self._get_fit_result(compute=False)
+        if r is not None:
+            return r.rsquared
+        elif self._regressor:
             return self._regressor.rsquared
 
     @property
     def rsquared_adj(self):
-        if self._regressor:
+        r = self._get_fit_result(compute=False)
+        if r is not None:
+            return r.rsquared_adj
+        elif self._regressor:
             return self._regressor.rsquared_adj
 
     @property
     def fn(self):
         if self._fn is not None:
-            n = self._fn
+            return self._fn
+
+        r = self._get_fit_result(compute=False)
+        if r is not None:
+            n = r.n
         elif self._regressor:
             n = self._regressor.clean_xs.shape[0]
         else:
@@ -203,8 +226,128 @@ class IsotopicMeasurement(BaseMeasurement):
     def fn(self, v):
         self._fn = v
 
+    @property
+    def fit_result(self):
+        return self._fit_result
+
+    def set_fit_result(self, r):
+        """
+        use a precomputed fit for value, error and fit statistics. see pychron.processing.batch_fit
+
+        the result is discarded when the data, fit, error type, filtering or regressor exclusions change
+        """
+        self._fit_result = r
+        self._fit_result_token = self._make_fit_result_token()
+
+    def append_data(self, x, y):
+        """
+        add a point during data collection. the fit is updated incrementally instead of refit from scratch.
+        see StreamingPolynomialFit
+        """
+        stream = self._get_stream(create=True)
+        super(IsotopicMeasurement, self).append_data(x, y)
+        stream.add(x - self.time_zero_offset, y)
+        self._stream_token = self._make_stream_token()
+
+    def get_slope(self, n=-1):
+        if n == -1:
+            stream = self._get_stream()
+            if stream is not None:
+                s = stream.slope()
+                if s is not None:
+                    return s
+
+        return super(IsotopicMeasurement, self).get_slope(n)
+
+    def get_regressor_excluded(self):
+        """
+        points excluded by the user or by truncation on the current regressor
+        """
+        reg = self._regressor
+        if reg is not None:
+            return set(reg.user_excluded) ^ set(reg.truncate_excluded)
+        return set()
+
+    def _clear_fit_result(self):
+        self._fit_result = None
+        self._fit_result_token = None
+
+    def _make_fit_result_token(self):
+        fod = self.filter_outliers_dict
+        return (self.xs, self.ys,
+                (self.time_zero_offset, self.fit, self.error_type,
+                 tuple(sorted(fod.items())) if fod else None,
+                 frozenset(self.get_regressor_excluded())))
+
+    def _get_fit_result(self, compute=True):
+        """
+        the plain numpy fit of this isotope. see pychron.processing.batch_fit.fit_isotope
+
+        the result is reused as long as its token matches. xs and ys are compared by identity because they are
+        replaced, not modified, when new data arrives
+
+        @param compute: fit the isotope if there is no valid result
+        @return: fit result or None if the regressor has to be used
+        """
+        token = self._fit_result_token
+        if token is not None:
+            ctoken = self._make_fit_result_token()
+            if token[0] is ctoken[0] and token[1] is ctoken[1] and token[2] == ctoken[2]:
+                return self._fit_result
+
+        if compute:
+            r = self._get_stream_result()
+            if r is None:
+                r = fit_isotope(self)
+
+            self.set_fit_result(r)
+            return r
+
+    def _make_stream_token(self):
+        return self.xs, self.ys, self.time_zero_offset
+
+    def _get_stream(self, create=False):
+        """
+        the streaming fit of this isotope if it is in sync with xs and ys
+
+        @param create: build a new streaming fit from the current data if there is no valid one
+        """
+        token = self._stream_token
+        if token is not None and token[0] is self.xs and token[1] is self.ys and token[2] == self.time_zero_offset:
+            return self._stream
+
+        if create:
+            stream = StreamingPolynomialFit()
+            stream.extend(self.offset_xs, self.ys)
+            self._stream = stream
+            self._stream_token = self._make_stream_token()
+            return stream
+
+    def _get_stream_result(self):
+        """
+        fit result from the streaming fit. None if there is no streaming fit or the fit needs outlier filtering or
+        excluded points. those are fit exactly by fit_isotope or the regressor
+        """
+        stream = self._get_stream()
+        if stream is None:
+            return
+
+        fod = self.filter_outliers_dict
+        if (fod and fod.get('filter_outliers')) or self.get_regressor_excluded():
+            return
+
+        fit = self.fit
+        if fit:
+            fit = fit.lower()
+            if 'average' in fit:
+                return stream.result(0, self.error_type or 'SEM', mean=True)
+            elif fit in FITS and fit_to_degree(fit) <= stream.max_degree:
+                # PolynomialRegressor uses a confidence interval when no error type is set
+                return stream.result(fit_to_degree(fit), self.error_type or CI)
+
     def set_filtering(self, d):
         self.filter_outliers_dict = d.copy()
+        self._clear_fit_result()
         if self._regressor:
             self._regressor.dirty = True
 
@@ -267,6 +410,7 @@ class IsotopicMeasurement(BaseMeasurement):
                                      'std_devs': std_devs}
 
         self._fn = None
+        self._clear_fit_result()
         if self._regressor:
             self._regressor.dirty = True
 
@@ -275,6 +419,7 @@ class IsotopicMeasurement(BaseMeasurement):
             setattr(self, k, v)
 
     def set_fit_error_type(self, e):
+        self._clear_fit_result()
         self.attr_set(error_type=e)
 
     def set_fit(self, fit, notify=True):
@@ -339,6 +484,10 @@ class IsotopicMeasurement(BaseMeasurement):
         #     return self._value
 
         if not self.use_stored_value and not self.user_defined_value and self.xs.shape[0] > 1:
+            r = self._get_fit_result()
+            if r is not None:
+                return r.intercept
+
             v = self.regressor.predict(0)
             return v
         else:
@@ -352,6 +501,10 @@ class IsotopicMeasurement(BaseMeasurement):
         #     return self._error
 
         if not self.use_stored_value and not self.user_defined_error and self.xs.shape[0] > 1:
+            r = self._get_fit_result()
+            if r is not None:
+                return r.intercept_error
+
             v = self.regressor.predict_error(0)
             return v
         else:
@@ -451,16 +604,32 @@ class IsotopicMeasurement(BaseMeasurement):
     def fit(self, f):
         f = natural_name_fit(f)
         self._fit = f
+        self._clear_fit_result()
 
     def standard_fit_error(self):
+        r = self._get_fit_result()
+        if r is not None:
+            return r.standard_error_fit
         return self.regressor.calculate_standard_error_fit()
 
     def noutliers(self):
+        r = self._get_fit_result()
+        if r is not None:
+            return self.xs.shape[0] - r.n
         return self.regressor.xs.shape[0] - self.regressor.clean_xs.shape[0]
 
+    def regression_str(self):
+        r = self._get_fit_result()
+        if r is not None and 'average' not in self.fit.lower():
+            return coefficients_tostring(r.coefficients, r.coefficient_errors)
+        return self.regressor.tostring()
+
     def _get_curvature_ys(self):
         return self.regressor.predict(self.xs)
 
+    def _data_changed(self):
+        self._clear_fit_result()
+
     # def _error_type_changed(self):
     #     self.regressor.error_calc_type = self.error_type
 
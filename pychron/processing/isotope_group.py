@@ -20,7 +20,6 @@ import logging
 import os
 from six.moves.configparser import ConfigParser
 
-from numpy import append as npappend
 from traits.api import Property, Dict, Str
 from traits.has_traits import HasTraits
 from uncertainties import ufloat
@@ -241,10 +240,7 @@ class IsotopeGroup(HasTraits):
             if kind == 'sniff':
                 isotope._value = signal
 
-            xs = npappend(isotope.xs, x)
-            ys = npappend(isotope.ys, signal)
-            isotope.xs = xs
-            isotope.ys = ys
+            isotope.append_data(x, signal)
             # isotope.trait_setq(xs=xs, ys=ys)
             # isotope.xs = hstack((isotope.xs, (x,)))
             # isotope.ys = hstack((isotope.ys, (signal,)))
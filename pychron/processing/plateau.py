@@ -16,23 +16,21 @@
 
 # ============= enthought library imports =======================
 from __future__ import absolute_import
-from numpy import argmax, array
 from traits.api import HasTraits, List, Array
 
-from pychron.core.stats.core import validate_mswd, calculate_mswd
-from six.moves import range
+# ============= standard library imports ========================
+from collections import deque
 
+from numpy import argmax, array, asarray, cumsum, concatenate, isfinite, isnan, where, median, zeros
 
-def memoize(function):
-    cache = {}
+# ============= local library imports  ==========================
+from pychron.core.stats.core import validate_mswd, calculate_mswd, get_mswd_limits
+from six.moves import range
 
-    def closure(*args):
-        # return function(*args)
-        if args not in cache:
-            cache[args] = function(*args)
-        return cache[args]
+# relative distance from a criterion's limit below which the prefix sum result is confirmed with a direct sum
+EDGE_TOL = 1e-9
 
-    return closure
+_mswd_limits = {}
 
 
 class Log():
@@ -43,6 +41,70 @@ class Log():
 log = Log()
 
 
+def mswd_limits(n):
+    try:
+        return _mswd_limits[n]
+    except KeyError:
+        r = _mswd_limits[n] = get_mswd_limits(n)
+        return r
+
+
+def prefix_sum(xs):
+    return concatenate(([0], cumsum(xs)))
+
+
+def overlap_ends(ages, errors, overlap_sigma):
+    """
+        for each start the last end such that every pair of steps in start..end overlaps at overlap_sigma.
+
+        a window that overlaps pairwise is extended by a step if the step overlaps the window's highest lower bound
+        and lowest upper bound. a window stays valid when its first step is dropped so the end never moves back and
+        the bounds of the sliding window are kept in monotonic queues. O(n)
+    """
+    n = len(ages)
+    ends = zeros(n, dtype=int)
+    if not n:
+        return ends
+
+    # same expression as Plateau._overlap so that ties compare identically
+    es = [e * overlap_sigma for e in errors]
+    los = [a - e for a, e in zip(ages, es)]
+    his = [a + e for a, e in zip(ages, es)]
+
+    maxq, minq = deque(), deque()
+
+    def push(j):
+        while maxq and los[maxq[-1]] <= los[j]:
+            maxq.pop()
+        maxq.append(j)
+        while minq and his[minq[-1]] >= his[j]:
+            minq.pop()
+        minq.append(j)
+
+    e = -1
+    for s in range(n):
+        if e < s:
+            maxq.clear()
+            minq.clear()
+            push(s)
+            e = s
+        else:
+            while maxq[0] < s:
+                maxq.popleft()
+            while minq[0] < s:
+                minq.popleft()
+
+        while e + 1 < n:
+            j = e + 1
+            if not (los[j] < his[minq[0]] and los[maxq[0]] < his[j]):
+                break
+            push(j)
+            e = j
+
+        ends[s] = e
+    return ends
+
+
 class Plateau(HasTraits):
     ages = Array
     errors = Array
@@ -60,6 +122,8 @@ class Plateau(HasTraits):
     def find_plateaus(self, method=''):
         """
             method: str either fleck 1977 or mahon 1996
+
+            returns the (start, end) of the plateau with the most steps
         """
         if method.lower() == 'mahon 1996':
             self.use_mswd = True
@@ -69,22 +133,28 @@ class Plateau(HasTraits):
             self.use_overlap = True
 
         n = len(self.ages)
-        excludes = self.excludes
+        excludes = set(self.excludes)
         ss = [s for i, s in enumerate(self.signals) if i not in excludes]
 
         self.total_signal = float(sum(ss))
-        # log.info(self.total_signal)
+        if not n or not self.total_signal:
+            return []
+
+        self._signals = [(s if i not in excludes else 0) for i, s in enumerate(self.signals)]
+        self._csignals = prefix_sum(asarray(self._signals, dtype=float))
+        self._included = array([i not in excludes for i in range(n)])
+        if self.use_overlap:
+            self._overlap_ends = overlap_ends(self.ages, self.errors, self.overlap_sigma)
+        if self.use_mswd:
+            self._make_mswd_sums()
 
         idxs = []
         spans = []
-
-        overlap_func = memoize(self._overlap)
         for i in range(n):
             if i in excludes:
                 continue
-            idx = self._find_plateaus(n, i, excludes, overlap_func)
+            idx = self._find_plateau(n, i)
             if idx:
-                # log.debug('found {} {}'.format(*idx))
                 idxs.append(idx)
                 spans.append(idx[1] - idx[0])
 
@@ -93,32 +163,90 @@ class Plateau(HasTraits):
 
         return idxs
 
-    def _find_plateaus(self, n, start, excludes, overlap_func):
-        potential_end = None
-        for i in range(start, n, 1):
-            if i in excludes:
-                continue
-
-            if not self.check_nsteps(start, i):
-                log.debug('{} {} nsteps failed'.format(start, i))
-                continue
-
-            if self.use_overlap and not self.check_overlap(start, i, overlap_func):
-                log.debug('{} {} overlap failed'.format(start, i))
-                # potential_end=None
-                break
-
-            if self.use_mswd and not self.check_mswd(start, i):
-                continue
-
-            if not self.check_percent_released(start, i):
-                log.debug('{} {} percent failed'.format(start, i))
+    def _find_plateau(self, n, start):
+        """
+            the last end that passes every criterion. all ends from start are tested at once
+        """
+        first = start + max(self.nsteps - 1, 0)
+        last = n - 1
+        if self.use_overlap:
+            # once the overlap fails it fails for every longer window
+            last = self._overlap_ends[start]
+
+        if first > last:
+            return
+
+        ends = where(self._included[first:last + 1])[0] + first
+        if not len(ends):
+            return
+
+        ok = self._check_percent_released(start, ends)
+        if self.use_mswd:
+            ok &= self._check_mswd(start, ends)
+
+        ok = where(ok)[0]
+        if len(ok):
+            potential_end = int(ends[ok[-1]])
+            if potential_end:
+                return start, potential_end
+
+    def _check_percent_released(self, start, ends):
+        cs = self._csignals
+        frac = self.gas_fraction / 100.
+        fs = (cs[ends + 1] - cs[start]) / self.total_signal
+        ok = fs >= frac
+
+        # the prefix sums may round differently than summing the window
+        for k in where(abs(fs - frac) <= EDGE_TOL * max(abs(frac), 1))[0]:
+            ok[k] = self.check_percent_released(start, ends[k])
+        return ok
+
+    def _make_mswd_sums(self):
+        ages = asarray(self.ages, dtype=float)
+        errors = asarray(self.errors, dtype=float)
+
+        # steps that make the mswd of any window that contains them nan or inf
+        bad = ~isfinite(ages) | isnan(errors) | (errors == 0)
+
+        ws = 1 / errors ** 2
+        ws[bad] = 0
+
+        xs = ages.copy()
+        xs[bad] = 0
+        # center the ages so the sum of squares does not lose the scatter
+        if (~bad).any():
+            xs[~bad] -= median(xs[~bad])
+
+        self._cbad = prefix_sum(bad)
+        self._cws = prefix_sum(ws)
+        self._cwxs = prefix_sum(ws * xs)
+        self._cwxxs = prefix_sum(ws * xs * xs)
+
+    def _check_mswd(self, start, ends):
+        """
+            mswd = (sum(w*x**2) - sum(w*x)**2 / sum(w)) / (n - 1) from prefix sums of the weights w = 1/error**2
+        """
+        i, j = start, ends + 1
+        ms = ends - start + 1
+        sw = self._cws[j] - self._cws[i]
+        swx = self._cwxs[j] - self._cwxs[i]
+        swxx = self._cwxxs[j] - self._cwxxs[i]
+
+        ok = zeros(len(ends), dtype=bool)
+        for k, m in enumerate(ms):
+            if m < 2 or self._cbad[j[k]] != self._cbad[i]:
                 continue
 
-            potential_end = i
+            mswd = 0 if not sw[k] else max(swxx[k] - swx[k] ** 2 / sw[k], 0) / (m - 1)
+            # rounding of the differenced sums scales with the sums themselves
+            tol = EDGE_TOL * ((self._cwxxs[j[k]] + self._cwxxs[i]) / (m - 1) + 1)
 
-        if potential_end:
-            return start, potential_end
+            low, high = mswd_limits(m)
+            if min(abs(mswd - low), abs(mswd - high)) <= tol:
+                ok[k] = self.check_mswd(start, ends[k])
+            else:
+                ok[k] = low <= mswd <= high
+        return ok
 
     def check_percent_released(self, start, end):
         ss = sum([(s if not i in self.excludes else 0)
@@ -132,12 +260,15 @@ class Plateau(HasTraits):
         """
             return False if not valid
         """
-        ages = self.ages[start, end + 1]
-        errors = self.errors[start, end + 1]
+        ages = self.ages[start:end + 1]
+        errors = self.errors[start:end + 1]
         mswd = calculate_mswd(ages, errors)
         return validate_mswd(mswd, len(ages))
 
-    def check_overlap(self, start, end, overlap_func):
+    def check_overlap(self, start, end, overlap_func=None):
+        if overlap_func is None:
+            overlap_func = self._overlap
+
         overlap_sigma = self.overlap_sigma
         for c, i in enumerate(range(start, end, 1)):
             for j in range(start + c, end + 1, 1):
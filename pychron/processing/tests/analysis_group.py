@@ -0,0 +1,38 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import unittest
+
+from uncertainties import ufloat
+
+from pychron.globals import globalv
+from pychron.processing.analyses.analysis_group import StepHeatAnalysisGroup
+
+globalv.use_logger_display = False
+globalv.use_warning_display = False
+
+
+class StubStep(object):
+    def __init__(self, k39):
+        self.k39 = ufloat(k39, k39 * 0.01)
+
+    def get_computed_value(self, key):
+        return getattr(self, key)
+
+
+class StepHeatAnalysisGroupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.group = StepHeatAnalysisGroup(analyses=[StubStep(k) for k in (1, 5, 12, 30, 8, 2.5)])
+
+    def test_cumulative_ar39s(self):
+        cs = self.group.cumulative_ar39s()
+        self.assertEqual(len(cs), len(self.group.analyses))
+        for i, c in enumerate(cs):
+            self.assertAlmostEqual(c, self.group.cumulative_ar39(i))
+
+    def test_cumulative_ar39s_total(self):
+        self.assertAlmostEqual(self.group.cumulative_ar39s()[-1], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
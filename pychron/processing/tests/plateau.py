@@ -2,7 +2,68 @@ from __future__ import absolute_import
 __author__ = 'ross'
 import unittest
 
-from pychron.processing.plateau import Plateau
+from numpy import argmax, array, random, where
+
+from pychron.core.stats.core import validate_mswd, calculate_mswd
+from pychron.processing.plateau import Plateau, overlap_ends
+
+
+def reference_find_plateaus(ages, errors, signals, excludes=(), nsteps=3, overlap_sigma=2, gas_fraction=50,
+                            method='fleck 1977'):
+    """
+        brute force plateau search. every window is checked pair by pair
+    """
+    use_mswd = method == 'mahon 1996'
+    ss = [s for i, s in enumerate(signals) if i not in excludes]
+    total = float(sum(ss))
+
+    def overlap(i, j):
+        a1, a2 = ages[i], ages[j]
+        e1, e2 = errors[i] * overlap_sigma, errors[j] * overlap_sigma
+        return a1 - e1 < a2 + e2 and a1 + e1 > a2 - e2
+
+    def check(start, end):
+        if use_mswd:
+            a, e = ages[start:end + 1], errors[start:end + 1]
+            return validate_mswd(calculate_mswd(a, e), len(a))
+        return all(overlap(i, j) for i in range(start, end) for j in range(i + 1, end + 1))
+
+    def check_percent(start, end):
+        s = sum([(s if i not in excludes else 0) for i, s in enumerate(signals)][start:end + 1])
+        return s / total >= gas_fraction / 100.
+
+    idxs, spans = [], []
+    for start in range(len(ages)):
+        if start in excludes:
+            continue
+        pe = None
+        for end in range(start + nsteps - 1, len(ages)):
+            if end in excludes:
+                continue
+            if not check(start, end):
+                if use_mswd:
+                    continue
+                break
+            if check_percent(start, end):
+                pe = end
+        if pe:
+            idxs.append((start, pe))
+            spans.append(pe - start)
+
+    if spans:
+        return idxs[argmax(array(spans))]
+    return idxs
+
+
+def make_spectrum(rs, n):
+    ages = 10 + rs.normal(0, rs.uniform(0.01, 3), n)
+    ages += where(rs.rand(n) < 0.2, rs.normal(0, 5, n), 0)
+    errors = rs.uniform(0.05, 1.5, n)
+    if rs.rand() < 0.2:
+        errors[rs.randint(n)] = 0
+    signals = rs.uniform(0, 1, n)
+    excludes = sorted(set(rs.randint(0, n, rs.randint(0, 3)).tolist()))
+    return ages, errors, signals, excludes
 
 
 class PlateauTestCase(unittest.TestCase):
@@ -116,6 +177,50 @@ class PlateauTestCase(unittest.TestCase):
         idx = (1, 4)
         return ages, errors, signals, exclude, idx
 
+    def test_find_plateaus_excludes(self):
+        ages = [7, 1, 1, 1, 1, 1, 7]
+        errors = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+        signals = [1, 1, 1, 1, 1, 1, 100]
+
+        # without step 6 steps 1-5 hold more than 50% of the gas
+        p = Plateau(ages=ages, errors=errors, signals=signals, excludes=[6])
+        self.assertEqual(p.find_plateaus(), (1, 5))
+
+    def test_find_plateaus_mahon(self):
+        ages = [7, 1, 1.05, 0.95, 1, 1.02, 7]
+        errors = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+        signals = [1, 1, 1, 1, 1, 1, 1]
+
+        p = Plateau(ages=ages, errors=errors, signals=signals)
+        self.assertEqual(p.find_plateaus('Mahon 1996'), (1, 5))
+
+    def test_overlap_ends(self):
+        ends = overlap_ends(array([1, 1.1, 1.25, 5, 5]), array([0.1, 0.1, 0.1, 0.1, 0.1]), 1)
+        self.assertEqual(list(ends), [1, 2, 2, 4, 4])
+
+        # a step without an error only fails to overlap with itself
+        ends = overlap_ends(array([1, 1, 1]), array([0, 0.1, 0.1]), 2)
+        self.assertEqual(list(ends), [2, 2, 2])
+
+    def test_corpus_fleck(self):
+        rs = random.RandomState(2)
+        for i in range(100):
+            self._test_corpus(rs, rs.randint(1, 60), 'fleck 1977')
+
+    def test_corpus_mahon(self):
+        rs = random.RandomState(3)
+        for i in range(15):
+            self._test_corpus(rs, rs.randint(1, 20), 'mahon 1996')
+
+    def _test_corpus(self, rs, n, method):
+        ages, errors, signals, excludes = make_spectrum(rs, n)
+        kw = dict(nsteps=rs.randint(1, 6), overlap_sigma=rs.choice([1, 2]), gas_fraction=rs.choice([0, 30, 50, 70]))
+
+        p = Plateau(ages=ages, errors=errors, signals=signals, excludes=excludes, **kw)
+        pidx = p.find_plateaus(method)
+        idx = reference_find_plateaus(ages, errors, signals, excludes, method=method, **kw)
+        self.assertEqual(tuple(pidx), tuple(idx), '{} {} {} {}'.format(method, n, excludes, kw))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,129 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+import hashlib
+import io
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+# ============= local library imports  ==========================
+
+
+def text_hash(text):
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8')
+    return hashlib.sha1(text).hexdigest()
+
+
+class CodeCache(object):
+    """
+    compiled pyscripts keyed by the sha1 of their text.
+
+    a queue that uses the same extraction and measurement scripts for every run compiles each script, and each
+    script it gosubs, once. an edited script has a new hash so it is recompiled the next time it is used.
+
+    ``read`` returns the text of a script file and only rereads it if the file's mtime or size changed, so a gosub
+    picks up edits to the child script without reopening an unchanged file for every run::
+
+        text = CODE_CACHE.read(path)
+        code = CODE_CACHE.compile(text)
+        exec(code, ctx)
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._codes = OrderedDict()
+        self._files = {}
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.compile_time = 0
+        self.read_time = 0
+
+    def compile(self, text, filename='<string>'):
+        """
+        same as compile(text, filename, 'exec'). raises SyntaxError for invalid text, which is not cached
+        """
+        key = (text_hash(text), filename)
+        with self._lock:
+            code = self._codes.pop(key, None)
+            if code is not None:
+                # most recently used last
+                self._codes[key] = code
+                self.hits += 1
+                return code
+
+        st = time.time()
+        code = compile(text, filename, 'exec')
+        et = time.time() - st
+
+        with self._lock:
+            self.misses += 1
+            self.compile_time += et
+            self._codes[key] = code
+            while len(self._codes) > self.maxsize:
+                self._codes.popitem(last=False)
+
+        return code
+
+    def read(self, path):
+        """
+        text of ``path``. raises IOError/OSError like open
+        """
+        st = os.stat(path)
+        sig = (st.st_mtime, st.st_size)
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None and entry[0] == sig:
+                return entry[1]
+
+        t = time.time()
+        with io.open(path, 'r', encoding='utf-8') as rfile:
+            text = rfile.read()
+
+        with self._lock:
+            self.read_time += time.time() - t
+            self._files[path] = (sig, text)
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._codes.clear()
+            self._files.clear()
+            self.hits = self.misses = 0
+            self.compile_time = self.read_time = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(hits=self.hits,
+                        misses=self.misses,
+                        ncodes=len(self._codes),
+                        nfiles=len(self._files),
+                        compile_time=self.compile_time,
+                        read_time=self.read_time)
+
+
+CODE_CACHE = CodeCache()
+
+# ============= EOF =============================================
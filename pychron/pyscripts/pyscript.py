@@ -32,6 +32,7 @@ from traits.api import Str, Any, Bool, Property, Int, Dict
 from pychron.globals import globalv
 from pychron.loggable import Loggable
 from pychron.paths import paths
+from pychron.pyscripts.code_cache import CODE_CACHE
 from pychron.pyscripts.error import PyscriptError, IntervalError, GosubError, \
     KlassError, MainError
 
@@ -297,7 +298,9 @@ class PyScript(Loggable):
             self.testing_syntax = True
             self._syntax_error = True
 
+            st = time.time()
             r = self._execute(argv=argv)
+            self.debug('tested in {:0.3f}s. code cache {}'.format(time.time() - st, CODE_CACHE.stats()))
             if r is not None:
                 self.console_info('invalid syntax')
                 ee = PyscriptError(self.filename, r)
@@ -342,7 +345,7 @@ class PyScript(Loggable):
         else:
 
             try:
-                code = compile(snippet, '<string>', 'exec')
+                code = CODE_CACHE.compile(snippet)
             except BaseException as e:
                 self.debug(traceback.format_exc())
                 return e
@@ -378,8 +381,7 @@ class PyScript(Loggable):
 
     def check_for_modifications(self):
         old = self.toblob()
-        with open(self.filename, 'r') as f:
-            new = f.read()
+        new = CODE_CACHE.read(self.filename)
 
         return old != new
 
@@ -406,15 +408,7 @@ class PyScript(Loggable):
         self._setup_docstr_context()
 
     def get_context(self):
-        ctx = dict()
-        for k in self.get_commands():
-            if isinstance(k, tuple):
-                ka, kb = k
-                name, func = ka, getattr(self, kb)
-            else:
-                name, func = k, getattr(self, k)
-
-            ctx[name] = func
+        ctx = {name: getattr(self, attr) for name, attr in self._get_command_template()}
 
         exp_ctx = {}
         for v in self.get_variables() + self.load_interpolation_context():
@@ -445,6 +439,21 @@ class PyScript(Loggable):
     def get_command_register(self):
         return []
 
+    def _get_command_template(self):
+        """
+            (name, attribute) of each command. the registers are filled at import so this is built once per class
+        """
+        cls = self.__class__
+        template = cls.__dict__.get('_command_template')
+        if template is None:
+            template = []
+            for k in self.get_commands():
+                if not isinstance(k, tuple):
+                    k = (k, k)
+                template.append(k)
+            cls._command_template = template
+        return template
+
     def truncate(self, style=None):
         if style is None:
             self._truncate = True
@@ -485,8 +494,7 @@ class PyScript(Loggable):
         self._interval_stack = LifoQueue()
 
         if self.root and self.name and load:
-            with open(self.filename, 'r') as f:
-                self.text = f.read()
+            self.text = CODE_CACHE.read(self.filename)
 
             return True
 
@@ -0,0 +1,90 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from pychron.pyscripts.code_cache import CodeCache
+
+SCRIPT = '''
+def main():
+    ret.append(x + 1)
+'''
+
+
+class CodeCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = CodeCache(maxsize=2)
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _write(self, name, text):
+        p = os.path.join(self.root, name)
+        with open(p, 'w') as wfile:
+            wfile.write(text)
+        return p
+
+    def test_compile(self):
+        code = self.cache.compile(SCRIPT)
+        ctx = {'x': 1, 'ret': []}
+        exec(code, ctx)
+        ctx['main']()
+        self.assertEqual(ctx['ret'], [2])
+
+    def test_hit(self):
+        a = self.cache.compile(SCRIPT)
+        b = self.cache.compile(SCRIPT)
+        self.assertIs(a, b)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_changed_text(self):
+        a = self.cache.compile(SCRIPT)
+        b = self.cache.compile(SCRIPT.replace('+ 1', '+ 2'))
+        self.assertIsNot(a, b)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_syntax_error(self):
+        self.assertRaises(SyntaxError, self.cache.compile, 'def main(:')
+        self.assertEqual(self.cache.stats()['ncodes'], 0)
+
+    def test_maxsize(self):
+        a = self.cache.compile('a=1')
+        self.cache.compile('b=1')
+        # a is now the most recently used
+        self.cache.compile('a=1')
+        self.cache.compile('c=1')
+        self.assertEqual(self.cache.stats()['ncodes'], 2)
+        self.assertIs(self.cache.compile('a=1'), a)
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_read(self):
+        p = self._write('child.py', SCRIPT)
+        self.assertEqual(self.cache.read(p), SCRIPT)
+        t = self.cache.read_time
+        self.assertEqual(self.cache.read(p), SCRIPT)
+        self.assertEqual(self.cache.read_time, t)
+
+    def test_read_modified(self):
+        p = self._write('child.py', SCRIPT)
+        self.cache.read(p)
+
+        new = SCRIPT.replace('+ 1', '+ 10')
+        self._write('child.py', new)
+        st = os.stat(p)
+        os.utime(p, (st.st_atime, time.time() + 10))
+        self.assertEqual(self.cache.read(p), new)
+
+    def test_clear(self):
+        self.cache.compile(SCRIPT)
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()['ncodes'], 0)
+        self.assertEqual(self.cache.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,7 +23,7 @@ import struct
 from numpy import array, vstack
 from traits.api import Array, Any, Instance, Float
 
-from pychron.core.helpers.binpack import pack
+from pychron.core.helpers.binpack import pack_points
 from pychron.core.helpers.formatting import floatfmt
 from pychron.loggable import Loggable
 from pychron.managers.data_managers.csv_data_manager import CSVDataManager
@@ -149,16 +149,16 @@ class ResponseRecorder(Loggable):
     def get_response_blob(self):
         if len(self.response_data):
             # return ''.join([struct.pack('<ff', x, y) for x, y in self.response_data])
-            return pack('<ff', self.response_data)
+            return pack_points(self.response_data, '<')
 
     def get_output_blob(self):
         if len(self.output_data):
-            return pack('<ff', self.output_data)
+            return pack_points(self.output_data, '<')
             # return ''.join([struct.pack('<ff', x, y) for x, y in self.output_data])
 
     def get_setpoint_blob(self):
         if len(self.setpoint_data):
-            return pack('<ff', self.setpoint_data)
+            return pack_points(self.setpoint_data, '<')
             # return ''.join([struct.pack('<ff', x, y) for x, y in self.setpoint_data])
 
     @property
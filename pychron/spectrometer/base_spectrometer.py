@@ -16,7 +16,6 @@
 import os
 from random import random
 
-from numpy import array
 from traits.api import Any, cached_property, List, TraitError, Str, Property, Bool
 
 from pychron.core.helpers.filetools import list_directory2
@@ -26,6 +25,7 @@ from pychron.pychron_constants import NULL_STR
 from pychron.spectrometer import get_spectrometer_config_path, get_spectrometer_config_name, \
     set_spectrometer_config_name
 from pychron.spectrometer.base_detector import BaseDetector
+from pychron.spectrometer.intensity_map import IntensityMap
 from pychron.spectrometer.spectrometer_device import SpectrometerDevice
 
 
@@ -64,6 +64,7 @@ class BaseSpectrometer(SpectrometerDevice):
 
     _prev_signals = None
     _no_intensity_change_cnt = 0
+    _intensity_map = None
 
     def convert_to_axial(self, det, v):
         return v
@@ -472,13 +473,16 @@ class BaseSpectrometer(SpectrometerDevice):
         if not keys and globalv.communication_simulation:
             keys, signals = self._get_simulation_data()
 
-        signals = array(signals)
+        # detector order
+        imap = self._get_intensity_map()
+        plan = imap.plan(keys)
+        keys, signals = imap.map(keys, signals)
 
         self._check_intensity_no_change(signals)
 
-        for k, v in zip(keys, signals):
-            det = self.get_detector(k)
-            det.set_intensity(v)
+        dets = self.detectors
+        for i, v in zip(plan.positions, signals):
+            dets[i].set_intensity(v)
 
         return keys, signals
 
@@ -529,14 +533,12 @@ class BaseSpectrometer(SpectrometerDevice):
         if data is not None:
 
             keys, signals = data
-
-            def func(k):
-                return signals[keys.index(k)] if k in keys else 0
+            d = dict(zip(keys, signals))
 
             if isinstance(dkeys, (tuple, list)):
-                return [func(key) for key in dkeys]
+                return [d.get(key, 0) for key in dkeys]
             else:
-                return func(dkeys)
+                return d.get(dkeys, 0)
 
     def get_detector(self, name):
         """
@@ -569,6 +571,15 @@ class BaseSpectrometer(SpectrometerDevice):
         time.sleep(self.integration_time)
 
     # private
+    def _get_intensity_map(self):
+        names = self.detector_names
+        imap = self._intensity_map
+        if imap is None:
+            imap = self._intensity_map = IntensityMap(names)
+        elif imap.names != tuple(names):
+            imap.set_names(names)
+        return imap
+
     def _spectrometer_configuration_changed(self, new):
         if new:
             set_spectrometer_config_name(new)
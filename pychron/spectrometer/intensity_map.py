@@ -0,0 +1,153 @@
+# ===============================================================================
+# Copyright 2018 ross
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===============================================================================
+
+# ============= enthought library imports =======================
+# ============= standard library imports ========================
+from __future__ import absolute_import
+
+from numpy import array, asarray, arange, array_equal
+
+# ============= local library imports  ==========================
+
+# detector order of an untagged GetData word
+UNTAGGED_KEYS = ('H2', 'H1', 'AX', 'L1', 'L2', 'CDD')
+
+
+def parse_intensities(datastr, tagged=True, keys=UNTAGGED_KEYS):
+    """
+    parse a data word, e.g. "H2,1.0,H1,2.0,AX,3.0" or "1.0,2.0,3.0"
+
+    @return: list of keys, float array of signals
+    """
+    data = datastr.split(',')
+    if tagged:
+        return data[::2], array(data[1::2], dtype=float)
+    else:
+        return list(keys), array(data, dtype=float)
+
+
+class ReadoutPlan(object):
+    """
+    how to reorder one key order into detector order. ``positions`` are the detector indices of the first
+    ``nknown`` keys
+    """
+
+    def __init__(self, keys, order, positions):
+        self.keys = keys
+        self.order = order
+        self.positions = positions
+        self.nknown = len(positions)
+        self.identity = array_equal(order, arange(len(order)))
+
+
+class IntensityMap(object):
+    """
+    puts the keys and signals of a readout in a fixed detector order.
+
+    a spectrometer returns its keys in the same order every count so the index map for a key order is computed once
+    and reordering a readout is a single array take. keys that are not detectors follow the detectors in the order
+    they were read::
+
+        imap = IntensityMap(['H1', 'AX', 'L1'])
+        keys, signals = imap.map(['L1', 'H1', 'AX'], [1, 2, 3])
+        # keys = ['H1', 'AX', 'L1'], signals = [2, 3, 1]
+    """
+
+    def __init__(self, names=()):
+        self.set_names(names)
+
+    def set_names(self, names):
+        self.names = tuple(names)
+        self._index = {n: i for i, n in enumerate(self.names)}
+        self._plans = {}
+
+    def index(self, name):
+        return self._index.get(name)
+
+    def plan(self, keys):
+        kt = tuple(keys)
+        p = self._plans.get(kt)
+        if p is None:
+            idx = self._index
+            known = sorted((idx[k], j) for j, k in enumerate(kt) if k in idx)
+            extra = [j for j, k in enumerate(kt) if k not in idx]
+            order = array([j for _, j in known] + extra, dtype=int)
+            p = ReadoutPlan([kt[j] for j in order], order, [i for i, _ in known])
+            self._plans[kt] = p
+        return p
+
+    def map(self, keys, signals):
+        """
+        @return: list of keys, float array of signals in detector order
+        """
+        signals = asarray(signals, dtype=float)
+        n = len(signals)
+        if len(keys) != n:
+            n = min(n, len(keys))
+            keys, signals = keys[:n], signals[:n]
+
+        p = self.plan(keys)
+        if not p.identity:
+            signals = signals.take(p.order)
+        return list(p.keys), signals
+
+
+if __name__ == '__main__':
+    import timeit
+
+    class Detector(object):
+        def __init__(self, name, isotope):
+            self.name = name
+            self.isotope = isotope
+
+    names = ['H2', 'H1', 'AX', 'L1', 'L2', 'CDD', 'L2(CDD)', 'AX(CDD)']
+    detectors = [Detector(n, 'Ar{}'.format(40 - i)) for i, n in enumerate(names)]
+    word = ','.join('{},{}'.format(n, 1.2345e-3 * (i + 1)) for i, n in enumerate(reversed(names)))
+    isotopes = {}
+
+    def append_data(iso, det, x, signal):
+        isotopes.setdefault((iso, det), []).append(signal)
+
+    # the per count path before IntensityMap: parse, then a linear detector scan and keys.index per key
+    def string_path():
+        data = word.split(',')
+        keys, signals = data[::2], list(map(float, data[1::2]))
+        for k in keys:
+            det = next((d for d in detectors if d.name == k), None)
+            if det:
+                append_data(det.isotope, det.name, 0, signals[keys.index(det.name)])
+
+    imap = IntensityMap(names)
+    plans = {}
+
+    def mapped_path():
+        keys, signals = parse_intensities(word)
+        keys, signals = imap.map(keys, signals)
+        kt = tuple(keys)
+        plan = plans.get(kt)
+        if plan is None:
+            dets = {d.name: d for d in detectors}
+            plan = plans[kt] = [(dets[k], i) for i, k in enumerate(kt) if k in dets]
+        for det, i in plan:
+            append_data(det.isotope, det.name, 0, signals[i])
+
+    nloops = 20000
+    for name, func in (('string parse + linear lookup', string_path),
+                       ('vectorized parse + index map', mapped_path)):
+        t = timeit.timeit(func, number=nloops)
+        print('{:<30s} {:0.2f} us/count'.format(name, t / nloops * 1e6))
+
+# ============= EOF =============================================
@@ -0,0 +1,62 @@
+from __future__ import absolute_import
+__author__ = 'ross'
+
+import unittest
+
+from pychron.spectrometer.intensity_map import IntensityMap, parse_intensities
+
+DETS = ('H2', 'H1', 'AX', 'L1', 'L2', 'CDD')
+
+
+class IntensityMapTestCase(unittest.TestCase):
+    def test_parse_tagged(self):
+        keys, signals = parse_intensities('H2,1.0,H1,2.5,AX,3e-2\r')
+        self.assertEqual(keys, ['H2', 'H1', 'AX'])
+        self.assertEqual(list(signals), [1.0, 2.5, 0.03])
+
+    def test_parse_untagged(self):
+        keys, signals = parse_intensities('1,2,3,4,5,6', tagged=False)
+        self.assertEqual(keys, list(DETS))
+        self.assertEqual(list(signals), [1, 2, 3, 4, 5, 6])
+
+    def test_parse_invalid(self):
+        self.assertRaises(ValueError, parse_intensities, 'H2,1.0,H1,foo')
+
+    def test_map_identity(self):
+        imap = IntensityMap(DETS)
+        keys, signals = imap.map(list(DETS), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(keys, list(DETS))
+        self.assertEqual(list(signals), [1, 2, 3, 4, 5, 6])
+        self.assertTrue(imap.plan(DETS).identity)
+
+    def test_map_reorder(self):
+        imap = IntensityMap(DETS)
+        keys, signals = imap.map(['CDD', 'AX', 'Foo', 'H2'], [6, 3, 10, 1])
+        self.assertEqual(keys, ['H2', 'AX', 'CDD', 'Foo'])
+        self.assertEqual(list(signals), [1, 3, 6, 10])
+
+        plan = imap.plan(['CDD', 'AX', 'Foo', 'H2'])
+        self.assertEqual(plan.positions, [0, 2, 5])
+        self.assertEqual(plan.nknown, 3)
+
+    def test_plan_cached(self):
+        imap = IntensityMap(DETS)
+        self.assertIs(imap.plan(['AX', 'H1']), imap.plan(('AX', 'H1')))
+
+    def test_set_names(self):
+        imap = IntensityMap(DETS)
+        imap.plan(['AX', 'H1'])
+        imap.set_names(('AX', 'H1'))
+        self.assertEqual(imap.map(['H1', 'AX'], [2, 1])[0], ['AX', 'H1'])
+        self.assertEqual(imap.index('H1'), 1)
+        self.assertIsNone(imap.index('H2'))
+
+    def test_map_length_mismatch(self):
+        imap = IntensityMap(DETS)
+        keys, signals = imap.map(list(DETS), [1, 2, 3])
+        self.assertEqual(keys, ['H2', 'H1', 'AX'])
+        self.assertEqual(len(signals), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
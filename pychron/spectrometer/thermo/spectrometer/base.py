@@ -31,6 +31,7 @@ from pychron.pychron_constants import QTEGRA_INTEGRATION_TIMES, \
 from pychron.spectrometer import get_spectrometer_config_path, \
     set_spectrometer_config_name
 from pychron.spectrometer.base_spectrometer import BaseSpectrometer
+from pychron.spectrometer.intensity_map import parse_intensities
 
 
 def normalize_integration_time(it):
@@ -328,15 +329,7 @@ class ThermoSpectrometer(BaseSpectrometer):
         datastr = self.ask('GetData', verbose=False, quiet=True, use_error_mode=False)
         if datastr:
             if 'ERROR' not in datastr:
-                data = datastr.split(',')
-                if tagged:
-                    keys = data[::2]
-                    signals = data[1::2]
-                else:
-                    keys = ['H2', 'H1', 'AX', 'L1', 'L2', 'CDD']
-                    signals = data
-
-            signals = list(map(float, signals))
+                keys, signals = parse_intensities(datastr, tagged)
 
         # if not keys and globalv.communication_simulation:
         #     keys, signals = self._get_simulation_data()
@@ -360,15 +353,12 @@ class ThermoSpectrometer(BaseSpectrometer):
         if data is not None:
 
             keys, signals = data
-
-            def func(k):
-                return signals[keys.index(k)] if k in keys else 0
+            d = dict(zip(keys, signals))
 
             if isinstance(dkeys, (tuple, list)):
-                return [func(key) for key in dkeys]
+                return [d.get(key, 0) for key in dkeys]
             else:
-                return func(dkeys)
-                # return signals[keys.index(dkeys)] if dkeys in keys else 0
+                return d.get(dkeys, 0)
 
     def clear_cached_config(self):
         self._config = None
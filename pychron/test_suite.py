@@ -28,9 +28,13 @@ def suite():
     from pychron.experiment.tests.peak_hop_parse import PeakHopTxtCase
     from pychron.canvas.canvas2D.tests.calibration_item import CalibrationObjectTestCase
     from pychron.experiment.tests.duration_tracker import DurationTrackerTestCase
+    from pychron.experiment.tests.queue_validator import QueueValidatorTestCase
+    from pychron.experiment.tests.persistence_queue import PersistenceQueueTestCase
     from pychron.core.tests.spell_correct import SpellCorrectTestCase
     from pychron.core.tests.filtering_tests import FilteringTestCase
     from pychron.core.stats.tests.peak_detection_test import MultiPeakDetectionTestCase
+    from pychron.core.stats.tests.monte_carlo_test import MonteCarloTestCase
+    from pychron.core.stats.tests.probability_curves_test import ProbabilityCurvesTestCase
     from pychron.experiment.tests.repository_identifier import ExperimentIdentifierTestCase
 
     from pychron.stage.tests.stage_map import StageMapTestCase, \
@@ -38,12 +42,30 @@ def suite():
     # from pychron.entry.tests.sample_loader import SampleLoaderTestCase
     from pychron.core.helpers.tests.floatfmt import FloatfmtTestCase
     from pychron.core.helpers.tests.strtools import CamelCaseTestCase
+    from pychron.core.helpers.tests.binpack import BinpackTestCase
+    from pychron.dvc.tests.data_sidecar import DataSidecarTestCase
+    from pychron.dvc.tests.analysis_cache import AnalysisCacheTestCase
+    from pychron.dvc.tests.bulk_query import BulkQueryTestCase
+    from pychron.dvc.tests.commit_batcher import CommitBatcherTestCase
+    from pychron.dvc.tests.parallel_loader import ParallelLoaderTestCase
+    from pychron.dvc.tests.meta_index import MetaIndexTestCase
+    from pychron.graph.tests.data_buffer import DataBufferTestCase
+    from pychron.experiment.tests.data_journal import DataJournalTestCase
+    from pychron.hardware.core.tests.async_transport import AsyncTransportTestCase
+    from pychron.hardware.core.tests.scheduler import SchedulerTestCase
+    from pychron.spectrometer.tests.intensity_map import IntensityMapTestCase
+    from pychron.dvc.tests.transfer_engine import TransferEngineTestCase
+    from pychron.labspy.tests.batch_writer import BatchWriterTestCase
+    from pychron.pipeline.tables.tests.util import TableUtilTestCase
+    from pychron.pipeline.tables.tests.xlsx_table_writer import XLSXTableWriterTestCase
+    from pychron.processing.tests.analysis_group import StepHeatAnalysisGroupTestCase
     # from pychron.processing.tests.analysis_modifier import AnalysisModifierTestCase
     from pychron.experiment.tests.backup import BackupTestCase
     from pychron.core.xml.tests.xml_parser import XMLParserTestCase
     # from pychron.entry.tests.analysis_loader import XLSAnalysisLoaderTestCase
     from pychron.core.regression.tests.regression import OLSRegressionTest, MeanRegressionTest, \
-        FilterOLSRegressionTest, OLSRegressionTest2
+        FilterOLSRegressionTest, OLSRegressionTest2, BatchOLSRegressionTest, PolynomialFitTest, \
+        StreamingRegressionTest
     from pychron.experiment.tests.frequency_test import FrequencyTestCase, FrequencyTemplateTestCase
     from pychron.experiment.tests.position_regex_test import XYTestCase
     from pychron.experiment.tests.renumber_aliquot_test import RenumberAliquotTestCase
@@ -53,6 +75,7 @@ def suite():
     from pychron.processing.tests.ratio import RatioTestCase
     from pychron.pyscripts.tests.extraction_script import WaitForTestCase
     from pychron.pyscripts.tests.measurement_pyscript import InterpolationTestCase, DocstrContextTestCase
+    from pychron.pyscripts.tests.code_cache import CodeCacheTestCase
     from pychron.experiment.tests.conditionals import ConditionalsTestCase, ParseConditionalsTestCase
     from pychron.experiment.tests.identifier import IdentifierTestCase
     from pychron.experiment.tests.comment_template import CommentTemplaterTestCase
@@ -74,10 +97,14 @@ def suite():
              PeakHopYamlCase2,
              CalibrationObjectTestCase,
              DurationTrackerTestCase,
+             QueueValidatorTestCase,
+             PersistenceQueueTestCase,
              SpellCorrectTestCase,
              # SimilarTestCase,
              FilteringTestCase,
              MultiPeakDetectionTestCase,
+             MonteCarloTestCase,
+             ProbabilityCurvesTestCase,
              ExperimentIdentifierTestCase,
              StageMapTestCase,
              TransformTestCase,
@@ -96,9 +123,13 @@ def suite():
              OLSRegressionTest2,
              MeanRegressionTest,
              FilterOLSRegressionTest,
+             BatchOLSRegressionTest,
+             PolynomialFitTest,
+             StreamingRegressionTest,
              PlateauTestCase,
              ExternalPipetteTestCase,
              WaitForTestCase,
+             CodeCacheTestCase,
              XYTestCase,
              FrequencyTestCase,
              FrequencyTemplateTestCase,
@@ -108,7 +139,24 @@ def suite():
              IdentifierTestCase,
              CommentTemplaterTestCase,
              FloatfmtTestCase,
-             CamelCaseTestCase)
+             CamelCaseTestCase,
+             BinpackTestCase,
+             DataSidecarTestCase,
+             AnalysisCacheTestCase,
+             BulkQueryTestCase,
+             CommitBatcherTestCase,
+             ParallelLoaderTestCase,
+             MetaIndexTestCase,
+             DataBufferTestCase,
+             DataJournalTestCase,
+             AsyncTransportTestCase,
+             SchedulerTestCase,
+             IntensityMapTestCase,
+             TransferEngineTestCase,
+             BatchWriterTestCase,
+             TableUtilTestCase,
+             XLSXTableWriterTestCase,
+             StepHeatAnalysisGroupTestCase)
 
     for t in tests:
         suite.addTest(loader.loadTestsFromTestCase(t))